@@ -5,21 +5,32 @@
 
 import sys
 import os
-import shutil
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QUrl, QTimer
+from PySide6.QtCore import Qt, QUrl, QTimer, Signal
 from PySide6.QtGui import QAction, QIcon
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QFileDialog, QMessageBox,
     QToolBar, QStyle, QSlider, QLabel, QPushButton, QHBoxLayout, QVBoxLayout,
-    QStatusBar
+    QStatusBar, QProgressBar
 )
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
+
+from thumbnails import ThumbnailService, SliderPreview
+from seeking import KeyframeIndexer, DragSeeker
+from single_instance import SingleInstance
+from cli import parse_args, prepare_environment, PlaybackSession
+from playback_stats import StatsSampler, StatsOverlay
+from frame_ring import DEFAULT_FRAME_BUDGET, QtFrameStepper
 
 
 class VideoPlayer(QMainWindow):
+    # Andamento da reprodução (para cli.PlaybackSession): origem = caminho ou URL
+    mediaLoading = Signal(str)
+    mediaStarted = Signal(str)
+    mediaEnded = Signal(str)
+    mediaFailed = Signal(str, str)
+    playbackFinished = Signal()  # fim da fila (sem --loop)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Leitor de Vídeo Qt")
@@ -29,16 +40,33 @@ class VideoPlayer(QMainWindow):
         self.current_url: QUrl | None = None
         self.current_local_path: Path | None = None  # caminho do ficheiro aberto (se local)
         self.save_path: Path | None = None  # destino para "Guardar"
-
-        # Media
-        self.audio = QAudioOutput()
-        self.audio.setVolume(0.5)
-        self.player = QMediaPlayer()
-        self.player.setAudioOutput(self.audio)
-
-        # UI vídeo
-        self.video_widget = QVideoWidget()
-        self.player.setVideoOutput(self.video_widget)
+        self.copy_worker = None  # CopyWorker da cópia em curso (Guardar / Guardar como…)
+        self.stream_url: QUrl | None = None  # URL de rede aberto com "Abrir URL…"
+        self.recorder = None  # StreamRecorder da gravação do stream em curso
+        self.record_timer = QTimer(self)
+        self.record_timer.setInterval(1000)
+        self.record_timer.timeout.connect(self._update_recording_status)
+        # Fila da linha de comandos (ficheiros/URLs tocados um a seguir ao outro)
+        self.queue: list[str] = []
+        self.queue_pos = -1
+        self.loop = False
+        self.start_ms = 0  # posição inicial pedida para o 1.º item
+        self.rate = 1.0
+        self.muted = False
+        self.headless = False  # sem diálogos modais: ninguém os fecharia
+        self._started = False  # mediaStarted já emitido para o item atual
+        self._failed_in_row = 0
+
+        # Media: o QMediaPlayer (e com ele o backend multimédia do Qt) só é criado
+        # ao abrir o primeiro ficheiro (_ensure_player): a janela aparece antes
+        self.audio = None
+        self.player = None
+        self.stepper = None  # passo a passo com anel de fotogramas (frame_ring.py)
+        self.frame_budget = DEFAULT_FRAME_BUDGET
+
+        # UI vídeo (até lá, um painel preto no mesmo lugar)
+        self.video_widget = QWidget()
+        self.video_widget.setStyleSheet("background-color: black;")
 
         # Controlo playback
         self.play_btn = QPushButton()
@@ -47,17 +75,24 @@ class VideoPlayer(QMainWindow):
 
         self.stop_btn = QPushButton()
         self.stop_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaStop))
-        self.stop_btn.clicked.connect(self.player.stop)
+        self.stop_btn.clicked.connect(self.stop)
 
         self.position = QSlider(Qt.Horizontal)
         self.position.setRange(0, 0)
-        self.position.sliderMoved.connect(self.player.setPosition)
+        # Arrastar: seeks agrupados e ajustados a keyframes; seek exato ao largar
+        self.keyframes = KeyframeIndexer(parent=self)
+        self.seeker = DragSeeker(self.position, self._set_position, indexer=self.keyframes)
+        self.seeker.scheduler.rateChanged.connect(lambda r: self.status.showMessage(f"Seeks: {r:.0f}/s", 1000))
+
+        # Miniaturas ao passar o rato sobre o slider de posição
+        self.thumbnails = ThumbnailService(parent=self)
+        self.slider_preview = SliderPreview(self.position, self.thumbnails)
 
         self.time_label = QLabel("00:00 / 00:00")
         self.volume = QSlider(Qt.Horizontal)
         self.volume.setRange(0, 100)
         self.volume.setValue(50)
-        self.volume.valueChanged.connect(lambda v: self.audio.setVolume(v/100))
+        self.volume.valueChanged.connect(self._set_volume)
 
         controls = QHBoxLayout()
         controls.setContentsMargins(8, 8, 8, 8)
@@ -76,11 +111,10 @@ class VideoPlayer(QMainWindow):
         central_layout.addLayout(controls)
         self.setCentralWidget(central)
 
-        # Conexões de media
-        self.player.playbackStateChanged.connect(self._sync_play_icon)
-        self.player.durationChanged.connect(self._on_duration)
-        self.player.positionChanged.connect(self._on_position)
-        self.player.errorOccurred.connect(self._on_error)
+        # Estatísticas de reprodução (amostradas numa thread; overlay com Ctrl+I)
+        self.stats = StatsSampler("Video-Viewer-1.py", parent=self)
+        self.stats_overlay = StatsOverlay(central)
+        self.stats.updated.connect(self.stats_overlay.show_snapshot)
 
         # Menu e toolbar
         self._build_menus_and_toolbar()
@@ -88,11 +122,17 @@ class VideoPlayer(QMainWindow):
         # Status bar
         self.status = QStatusBar()
         self.setStatusBar(self.status)
+        self.copy_progress = QProgressBar()
+        self.copy_progress.setRange(0, 1000)
+        self.copy_progress.setMaximumWidth(200)
+        self.copy_progress.hide()
+        self.status.addPermanentWidget(self.copy_progress)
 
     # --- Menus e Toolbar ---
     def _build_menus_and_toolbar(self):
         file_menu = self.menuBar().addMenu("&Ficheiro")
         view_menu = self.menuBar().addMenu("&Ver")
+        playback_menu = self.menuBar().addMenu("&Reprodução")
         help_menu = self.menuBar().addMenu("&Ajuda")
 
         style = self.style()
@@ -123,6 +163,15 @@ class VideoPlayer(QMainWindow):
         self.act_delete = QAction(ic_delete, "Apagar ficheiro…", self)
         self.act_delete.triggered.connect(self.delete_file)
 
+        self.act_cancel_copy = QAction(style.standardIcon(QStyle.SP_BrowserStop), "Cancelar cópia", self)
+        self.act_cancel_copy.setShortcut("Esc")
+        self.act_cancel_copy.setEnabled(False)
+        self.act_cancel_copy.triggered.connect(self.cancel_copy)
+
+        self.act_stop_recording = QAction(style.standardIcon(QStyle.SP_MediaStop), "Parar gravação", self)
+        self.act_stop_recording.setEnabled(False)
+        self.act_stop_recording.triggered.connect(lambda: self._stop_recording(resume_direct=True))
+
         self.act_exit = QAction(ic_exit, "Sair", self)
         self.act_exit.setShortcut("Ctrl+Q")
         self.act_exit.triggered.connect(self.close)
@@ -131,12 +180,26 @@ class VideoPlayer(QMainWindow):
         self.act_fullscreen.setShortcut("F11")
         self.act_fullscreen.triggered.connect(self.toggle_fullscreen)
 
+        self.act_stats = QAction("Estatísticas de reprodução", self, checkable=True)
+        self.act_stats.setShortcut("Ctrl+I")
+        self.act_stats.toggled.connect(self.stats_overlay.setVisible)
+
+        self.act_next_frame = QAction("Fotograma seguinte", self)
+        self.act_next_frame.setShortcut(".")
+        self.act_next_frame.triggered.connect(self.step_forward)
+        self.act_prev_frame = QAction("Fotograma anterior", self)
+        self.act_prev_frame.setShortcut(",")
+        self.act_prev_frame.triggered.connect(self.step_back)
+
         self.act_about = QAction(ic_about, "Sobre", self)
         self.act_about.triggered.connect(self.show_about)
 
-        for a in [self.act_open, self.act_open_url, self.act_save, self.act_save_as, self.act_delete, self.act_exit]:
+        for a in [self.act_open, self.act_open_url, self.act_save, self.act_save_as, self.act_cancel_copy, self.act_stop_recording, self.act_delete, self.act_exit]:
             file_menu.addAction(a)
         view_menu.addAction(self.act_fullscreen)
+        view_menu.addAction(self.act_stats)
+        playback_menu.addAction(self.act_next_frame)
+        playback_menu.addAction(self.act_prev_frame)
         help_menu.addAction(self.act_about)
 
         # Toolbar
@@ -151,7 +214,7 @@ class VideoPlayer(QMainWindow):
         act_play.triggered.connect(self.toggle_play)
         tb.addAction(act_play)
         act_stop = QAction(self.style().standardIcon(QStyle.SP_MediaStop), "Parar", self)
-        act_stop.triggered.connect(self.player.stop)
+        act_stop.triggered.connect(self.stop)
         tb.addAction(act_stop)
 
     # --- Ações ---
@@ -160,13 +223,8 @@ class VideoPlayer(QMainWindow):
             "Vídeo (*.mp4 *.mkv *.avi *.mov *.m4v *.wmv *.webm);;Todos os ficheiros (*.*)"
         )
         path, _ = QFileDialog.getOpenFileName(self, "Abrir vídeo", str(Path.home()), filters)
-        if not path:
-            return
-        url = QUrl.fromLocalFile(path)
-        self._load_media(url)
-        self.current_local_path = Path(path)
-        self.save_path = None
-        self.status.showMessage(f"Aberto: {path}", 5000)
+        if path:
+            self.open_paths([path])
 
     def open_url(self):
         # Diálogo simples usando getText para URL
@@ -178,6 +236,86 @@ class VideoPlayer(QMainWindow):
         if not url.isValid():
             QMessageBox.warning(self, "URL inválido", "O URL não é válido.")
             return
+        self.open_paths([url.toString()])
+
+    def open_paths(self, paths, enqueue=False):
+        """Toca ficheiros/URLs um a seguir ao outro (linha de comandos, outra invocação, diálogos).
+
+        Com enqueue acrescenta-os à fila e só começa se não houver nada aberto.
+        """
+        if not paths:
+            return
+        if enqueue and self.current_url is not None:
+            self.queue.extend(paths)
+            self.status.showMessage(f"{len(paths)} item(s) adicionados à fila", 3000)
+            return
+        self.queue = list(paths)
+        self._play_queue_item(0)
+
+    def apply_options(self, options):
+        """Opções da linha de comandos (cli.py) que dizem respeito ao leitor."""
+        self.loop = options.loop
+        self.start_ms = options.start
+        self.headless = options.headless
+        self.rate = options.rate or 1.0
+        self.muted = options.mute
+        if options.volume is not None:
+            self.volume.setValue(options.volume)
+        if options.metrics:
+            self.stats.export_to(options.metrics, options.metrics_interval)
+        self.act_stats.setChecked(options.stats_overlay)
+        self.stats.set_rate(self.rate)
+        if options.frame_budget:
+            self.frame_budget = options.frame_budget
+            if self.stepper is not None:
+                self.stepper.set_budget(self.frame_budget)
+        if self.player is not None:
+            self.player.setPlaybackRate(self.rate)
+            self.audio.setMuted(self.muted)
+
+    def _play_queue_item(self, pos):
+        self.queue_pos = pos
+        item = self.queue[pos]
+        if os.path.isfile(item):
+            self._open_local(item)
+            return
+        url = QUrl(item)
+        if url.isValid() and url.scheme():
+            self._open_stream(url)
+        else:
+            self.status.showMessage(f"Não encontrado: {item}", 5000)
+            self.mediaFailed.emit(item, "ficheiro não encontrado")
+            QTimer.singleShot(0, self._skip_failed)
+
+    def _advance(self):
+        """Passa ao item seguinte da fila (ou volta ao início com loop)."""
+        if self.queue_pos + 1 < len(self.queue):
+            self._play_queue_item(self.queue_pos + 1)
+        elif self.loop and self.queue:
+            self._play_queue_item(0)
+        else:
+            self.playbackFinished.emit()
+
+    def _skip_failed(self):
+        self._failed_in_row += 1
+        if self._failed_in_row >= len(self.queue):
+            # Nenhum item da fila consegue tocar: parar mesmo com loop
+            self._failed_in_row = 0
+            self.playbackFinished.emit()
+        else:
+            self._advance()
+
+    def _open_local(self, path):
+        self._stop_recording()
+        self.stream_url = None
+        self._load_media(QUrl.fromLocalFile(path))
+        self.current_local_path = Path(path)
+        self.save_path = None
+        self.status.showMessage(f"Aberto: {path}", 5000)
+
+    def _open_stream(self, url: QUrl):
+        self._stop_recording()
+        self.stream_url = url
         self._load_media(url)
         self.current_local_path = None
         self.save_path = None
@@ -192,11 +330,7 @@ class VideoPlayer(QMainWindow):
         if not self.save_path:
             self.save_copy_as()
             return
-        try:
-            shutil.copy2(self.current_local_path, self.save_path)
-            self.status.showMessage(f"Guardado em: {self.save_path}", 5000)
-        except Exception as e:
-            QMessageBox.critical(self, "Erro ao guardar", str(e))
+        self._start_copy(self.current_local_path, self.save_path)
 
     def save_copy_as(self):
         if self.current_local_path:
@@ -209,14 +343,114 @@ class VideoPlayer(QMainWindow):
         self.save_path = Path(path)
         if self.current_local_path:
             # Copiar do ficheiro aberto
-            try:
-                shutil.copy2(self.current_local_path, self.save_path)
-                self.status.showMessage(f"Guardado em: {self.save_path}", 5000)
-            except Exception as e:
-                QMessageBox.critical(self, "Erro ao guardar", str(e))
+            self._start_copy(self.current_local_path, self.save_path)
+        elif self.stream_url is not None and self.stream_url.scheme() in ("http", "https"):
+            # Stream/URL: gravar para o destino enquanto continua a reproduzir
+            self._start_recording(self.stream_url, self.save_path)
         else:
-            # Se for stream/URL, não há origem local. Avisar.
-            QMessageBox.information(self, "Guardar como…", "O conteúdo é um stream/URL; não é possível copiar sem origem local.")
+            QMessageBox.information(self, "Guardar como…", "Só é possível gravar streams HTTP/HTTPS.")
+
+    # --- Gravação de streams ---
+    def _start_recording(self, url: QUrl, dst: Path):
+        # Uma única ligação à rede: o leitor passa a ler do servidor local do
+        # gravador, que reparte os mesmos bytes entre o ecrã e o ficheiro
+        from stream_recorder import StreamRecorder, RecordingError
+        self._stop_recording()
+        recorder = StreamRecorder(url.toString(), dst)
+        try:
+            recorder.start()
+        except (RecordingError, OSError) as e:
+            QMessageBox.critical(self, "Erro ao gravar", str(e))
+            return
+        self.recorder = recorder
+        # O gravador descarrega desde o byte 0 (o ficheiro tem de ficar completo);
+        # o leitor retoma onde estava e espera que esses bytes cheguem
+        if self.player.isSeekable():
+            self.start_ms = self.player.position()
+        self.player.stop()
+        self._load_media(QUrl(recorder.local_url))
+        self.act_stop_recording.setEnabled(True)
+        self.record_timer.start()
+        self.status.showMessage(f"A gravar para: {dst}")
+
+    def _stop_recording(self, resume_direct: bool = False):
+        """Termina a gravação e fecha o servidor local do gravador."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        if resume_direct:
+            # O servidor local vai fechar: continuar a ver diretamente do URL original
+            self.player.stop()
+        recorder.stop()
+        if resume_direct and self.stream_url is not None:
+            self._load_media(self.stream_url)
+        if self.record_timer.isActive():
+            self._recording_ended(recorder)
+
+    def _recording_ended(self, recorder):
+        self.record_timer.stop()
+        self.act_stop_recording.setEnabled(False)
+        msg = f"Gravação terminada: {recorder.path} ({recorder.bytes_written / 2**20:,.1f} MB)"
+        if recorder.error:
+            msg += f" — {recorder.error}"
+        self.status.showMessage(msg, 8000)
+
+    def _update_recording_status(self):
+        recorder = self.recorder
+        if recorder is None or not self.record_timer.isActive():
+            return
+        if not recorder.running:
+            # O download terminou (ou a ligação falhou). O leitor continua a ler do
+            # servidor local (seeks, novas ligações), que só fecha ao mudar de
+            # ficheiro ou ao fechar a janela (_stop_recording)
+            self._recording_ended(recorder)
+            return
+        self.status.showMessage(f"A gravar… {recorder.bytes_written / 2**20:,.1f} MB → {recorder.path}")
+
+    # --- Cópia em segundo plano ---
+    def _start_copy(self, src: Path, dst: Path):
+        if self.copy_worker is not None and self.copy_worker.isRunning():
+            QMessageBox.information(self, "Guardar", "Já existe uma cópia em curso.")
+            return
+        from copy_engine import CopyWorker
+        self.copy_worker = CopyWorker(src, dst, self)
+        self.copy_worker.progress.connect(self._on_copy_progress)
+        self.copy_worker.completed.connect(self._on_copy_completed)
+        self.copy_worker.cancelled.connect(self._on_copy_cancelled)
+        self.copy_worker.failed.connect(self._on_copy_failed)
+        self.copy_progress.setValue(0)
+        self.copy_progress.show()
+        self.act_cancel_copy.setEnabled(True)
+        self.copy_worker.start()
+
+    def cancel_copy(self):
+        if self.copy_worker is not None:
+            self.copy_worker.cancel()
+
+    def _on_copy_progress(self, done, total, rate, eta):
+        self.copy_progress.setValue(int(done * 1000 / total) if total else 1000)
+        msg = f"A copiar… {done / 2**20:,.0f} / {total / 2**20:,.0f} MB"
+        if rate > 0:
+            msg += f" · {rate / 2**20:,.0f} MB/s"
+        if eta >= 0:
+            msg += f" · faltam {self._format_ms(eta * 1000)}"
+        self.status.showMessage(msg)
+
+    def _copy_finished(self):
+        self.copy_progress.hide()
+        self.act_cancel_copy.setEnabled(False)
+
+    def _on_copy_completed(self, dst):
+        self._copy_finished()
+        self.status.showMessage(f"Guardado em: {dst}", 5000)
+
+    def _on_copy_cancelled(self):
+        self._copy_finished()
+        self.status.showMessage("Cópia cancelada (pode ser retomada guardando de novo para o mesmo destino).", 8000)
+
+    def _on_copy_failed(self, message):
+        self._copy_finished()
+        QMessageBox.critical(self, "Erro ao guardar", message)
 
     def delete_file(self):
         if not self.current_local_path or not self.current_local_path.exists():
@@ -237,6 +471,8 @@ class VideoPlayer(QMainWindow):
                 self.current_local_path = None
                 self.current_url = None
                 self.player.setSource(QUrl())
+                self.slider_preview.set_source(None)
+                self.seeker.set_source(None)
                 self.time_label.setText("00:00 / 00:00")
                 self.position.setRange(0, 0)
             except Exception as e:
@@ -256,25 +492,128 @@ class VideoPlayer(QMainWindow):
             "- Multiplataforma: Windows, Ubuntu, macOS\n"
             "- Abrir ficheiro local ou URL/stream\n"
             "- Guardar cópia, Guardar como, Apagar ficheiro\n"
+            "- Gravar streams HTTP enquanto são vistos (Guardar como…)\n"
             "- Controlo de reprodução, volume e ecrã inteiro"
         )
 
     # --- Reprodução ---
+    def _ensure_player(self):
+        """Cria o leitor na primeira abertura de um ficheiro/URL.
+
+        O import do QtMultimedia e o arranque do backend (FFmpeg, dispositivo de
+        áudio) custam mais do que o resto da janela; adiá-los faz a janela
+        aparecer mais depressa quando o programa é aberto sem ficheiro.
+        """
+        if self.player is not None:
+            return self.player
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from PySide6.QtMultimediaWidgets import QVideoWidget
+
+        self.audio = QAudioOutput()
+        self.audio.setVolume(self.volume.value() / 100)
+        self.audio.setMuted(self.muted)
+        self.player = QMediaPlayer()
+        self.player.setAudioOutput(self.audio)
+        self.player.setPlaybackRate(self.rate)
+
+        video_widget = QVideoWidget()
+        self.centralWidget().layout().replaceWidget(self.video_widget, video_widget)
+        self.video_widget.deleteLater()
+        self.video_widget = video_widget
+        self.player.setVideoOutput(self.video_widget)
+
+        # Conexões de media
+        self.player.playbackStateChanged.connect(self._on_state)
+        self.player.mediaStatusChanged.connect(self._on_media_status)
+        self.player.durationChanged.connect(self._on_duration)
+        self.player.positionChanged.connect(self._on_position)
+        self.player.errorOccurred.connect(self._on_error)
+        self.player.bufferProgressChanged.connect(self.stats.set_buffer)
+        self.stats.attach_sinks([self.video_widget.videoSink()])
+        self.stepper = QtFrameStepper(self.player, self.video_widget.videoSink(), self.frame_budget, parent=self)
+        self.stepper.stepped.connect(self._on_stepped)
+        return self.player
+
     def _load_media(self, url: QUrl):
+        self._ensure_player()
         self.current_url = url
+        self._started = False
+        self.mediaLoading.emit(self._source_name(url))
+        self.stats.media_changed(self._source_name(url))
+        self.stepper.reset()
+        if self.player.source() == url:
+            self.player.setPosition(0)  # o mesmo ficheiro outra vez (p.ex. --loop): setSource não recomeça
         self.player.setSource(url)
+        self.slider_preview.set_source(url.toLocalFile() if url.isLocalFile() else None)
+        self.seeker.set_source(url.toLocalFile() if url.isLocalFile() else None)
         # Iniciar reprodução automaticamente após pequeno atraso para garantir preparação
         QTimer.singleShot(100, self.player.play)
         self._sync_play_icon()
 
+    def _is_playing(self) -> bool:
+        if self.player is None:
+            return False
+        from PySide6.QtMultimedia import QMediaPlayer  # já carregado: o leitor existe
+        return self.player.playbackState() == QMediaPlayer.PlayingState
+
     def toggle_play(self):
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self.player is None:
+            return
+        if self._is_playing():
             self.player.pause()
         else:
             self.player.play()
 
+    def stop(self):
+        if self.player is not None:
+            self.player.stop()
+
+    def step_forward(self):
+        if self.stepper is not None:
+            self.stepper.step_forward()
+
+    def step_back(self):
+        if self.stepper is not None:
+            self.stepper.step_back()
+
+    def _on_stepped(self, pos_ms: int, from_ring: bool):
+        if not self.position.isSliderDown():
+            self.position.setValue(pos_ms)
+        self._update_time_label(pos_ms, self.player.duration())
+        origin = "já descodificado" if from_ring else "descodificado agora"
+        self.status.showMessage(f"Fotograma em {self._format_ms(pos_ms)}.{pos_ms % 1000:03d} ({origin})", 2000)
+
+    def _set_position(self, ms: int):
+        if self.player is not None:
+            self.player.setPosition(ms)
+
+    def _set_volume(self, value: int):
+        if self.audio is not None:
+            self.audio.setVolume(value / 100)
+
+    @staticmethod
+    def _source_name(url: QUrl) -> str:
+        return url.toLocalFile() if url.isLocalFile() else url.toString()
+
+    def _on_state(self, state):
+        self._sync_play_icon()
+        self.stats.set_playing(self._is_playing())
+        if not self._started and self._is_playing():
+            self._started = True
+            self._failed_in_row = 0
+            self.mediaStarted.emit(self._source_name(self.current_url))
+            if self.start_ms:
+                self.player.setPosition(self.start_ms)
+                self.start_ms = 0
+
+    def _on_media_status(self, status):
+        from PySide6.QtMultimedia import QMediaPlayer
+        if status == QMediaPlayer.EndOfMedia:
+            self.mediaEnded.emit(self._source_name(self.current_url))
+            self._advance()
+
     def _sync_play_icon(self):
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self._is_playing():
             self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPause))
         else:
             self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
@@ -284,6 +623,7 @@ class VideoPlayer(QMainWindow):
         self._update_time_label(self.player.position(), duration_ms)
 
     def _on_position(self, pos_ms: int):
+        self.seeker.scheduler.completed(pos_ms)
         if not self.position.isSliderDown():
             self.position.setValue(pos_ms)
         self._update_time_label(pos_ms, self.player.duration())
@@ -303,14 +643,49 @@ class VideoPlayer(QMainWindow):
     def _on_error(self, err, what):
         # Qt6: errorOccurred(self, error, errorString)
         # Alguns formatos podem exigir codecs do sistema.
-        QMessageBox.warning(self, "Erro de reprodução", f"{what}")
+        self.mediaFailed.emit(self._source_name(self.current_url), what)
+        if self.headless:
+            self.status.showMessage(f"Erro de reprodução: {what}", 5000)
+        else:
+            QMessageBox.warning(self, "Erro de reprodução", f"{what}")
+        self._skip_failed()
+
+    def closeEvent(self, event):
+        if self.copy_worker is not None and self.copy_worker.isRunning():
+            self.copy_worker.cancel()
+            self.copy_worker.wait()
+        self._stop_recording()
+        self.thumbnails.shutdown()
+        self.keyframes.shutdown()
+        self.stats.shutdown()
+        super().closeEvent(event)
 
 
 def main():
-    app = QApplication(sys.argv)
+    # Modo sem janela: python Video-Viewer-1.py contact-sheets PASTA ...
+    if len(sys.argv) > 1 and sys.argv[1] == "contact-sheets":
+        from contact_sheet import cli
+        sys.exit(cli(sys.argv[2:]))
+
+    options = parse_args(sys.argv[1:], "Video-Viewer-1.py")
+    # Com outra instância aberta, os ficheiros vão para essa e esta termina já
+    instance = SingleInstance("Video-Viewer-1")
+    if options.forward and instance.forward(options.paths, options.enqueue):
+        sys.exit(0)
+
+    prepare_environment(options)
+    app = QApplication(sys.argv[:1])
     app.setApplicationName("Leitor de Vídeo Qt")
     w = VideoPlayer()
+    session = PlaybackSession(options, w, app, "Video-Viewer-1.py")
+    w.apply_options(options)
+    if options.forward:  # só uma janela interativa recebe os ficheiros de outras execuções
+        instance.listen(w, w.open_paths)
     w.show()
+    w.open_paths(options.paths, options.enqueue)
+    if not options.paths and options.exit_at_end:
+        session.write_report()
+        sys.exit(0)
     sys.exit(app.exec())
 
 
@@ -3,19 +3,29 @@
 
 import sys
 import os
-import shutil
 from pathlib import Path
-from PySide6.QtCore import Qt, QUrl, QTimer
+from PySide6.QtCore import Qt, QUrl, QTimer, Signal
 from PySide6.QtGui import QAction, QIcon
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QFileDialog, QMessageBox, QToolBar, QStyle,
     QSlider, QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QStatusBar, QListWidget,
     QInputDialog, QSplitter, QDial
 )
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
+
+from thumbnails import ThumbnailService, SliderPreview
+from seeking import KeyframeIndexer, DragSeeker
+from single_instance import SingleInstance
+from cli import parse_args, prepare_environment, PlaybackSession
+from playback_stats import StatsSampler, StatsOverlay
 
 class VideoPlayer(QMainWindow):
+    # Andamento da reprodução (para cli.PlaybackSession): origem = caminho ou URL
+    mediaLoading = Signal(str)
+    mediaStarted = Signal(str)
+    mediaEnded = Signal(str)
+    mediaFailed = Signal(str, str)
+    playbackFinished = Signal()  # fim da playlist (sem --loop)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Leitor de Vídeo Qt Avançado")
@@ -24,14 +34,20 @@ class VideoPlayer(QMainWindow):
         self.current_url = None
         self.current_local_path = None
         self.save_path = None
-
-        self.audio = QAudioOutput()
-        self.audio.setVolume(0.5)
-        self.player = QMediaPlayer()
-        self.player.setAudioOutput(self.audio)
-
-        self.video_widget = QVideoWidget()
-        self.player.setVideoOutput(self.video_widget)
+        self.current_row = -1  # linha da playlist em reprodução
+        self.loop = False
+        self.start_ms = 0  # posição inicial pedida para o 1.º item
+        self.muted = False
+        self.headless = False  # sem diálogos modais: ninguém os fecharia
+        self._started = False  # mediaStarted já emitido para o item atual
+        self._failed_in_row = 0
+
+        # O leitor só é criado ao abrir o primeiro vídeo (_ensure_player); até lá
+        # a área de vídeo é um painel preto e a janela abre sem esperar pelo QtMultimedia
+        self.audio = None
+        self.player = None
+        self.video_widget = QWidget()
+        self.video_widget.setStyleSheet("background-color: black;")
 
         self.playlist = QListWidget()
         self.playlist.itemDoubleClicked.connect(self.play_from_playlist)
@@ -42,17 +58,23 @@ class VideoPlayer(QMainWindow):
 
         self.stop_btn = QPushButton()
         self.stop_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaStop))
-        self.stop_btn.clicked.connect(self.player.stop)
+        self.stop_btn.clicked.connect(self.stop)
 
         self.position = QSlider(Qt.Horizontal)
         self.position.setRange(0, 0)
-        self.position.sliderMoved.connect(self.player.setPosition)
+        # Arrastar: seeks agrupados e ajustados a keyframes; seek exato ao largar
+        self.keyframes = KeyframeIndexer(parent=self)
+        self.seeker = DragSeeker(self.position, self._set_position, indexer=self.keyframes)
+        self.seeker.scheduler.rateChanged.connect(lambda r: self.status.showMessage(f"Seeks: {r:.0f}/s", 1000))
+
+        self.thumbnails = ThumbnailService(parent=self)
+        self.slider_preview = SliderPreview(self.position, self.thumbnails)
 
         self.time_label = QLabel("00:00 / 00:00")
         self.volume_slider = QSlider(Qt.Horizontal)
         self.volume_slider.setRange(0, 100)
         self.volume_slider.setValue(50)
-        self.volume_slider.valueChanged.connect(lambda v: self.audio.setVolume(v/100))
+        self.volume_slider.valueChanged.connect(self._set_volume)
 
         self.speed_dial = QDial()
         self.speed_dial.setRange(50, 200)
@@ -84,21 +106,21 @@ class VideoPlayer(QMainWindow):
         controls.addWidget(QLabel("Agudos"))
         controls.addWidget(self.treble_slider)
 
-        video_area = QSplitter()
-        video_area.addWidget(self.playlist)
-        video_area.addWidget(self.video_widget)
-        video_area.setStretchFactor(1, 1)
+        self.video_area = QSplitter()
+        self.video_area.addWidget(self.playlist)
+        self.video_area.addWidget(self.video_widget)
+        self.video_area.setStretchFactor(1, 1)
 
         central = QWidget()
         layout = QVBoxLayout(central)
-        layout.addWidget(video_area)
+        layout.addWidget(self.video_area)
         layout.addLayout(controls)
         self.setCentralWidget(central)
 
-        self.player.playbackStateChanged.connect(self._sync_play_icon)
-        self.player.durationChanged.connect(self._on_duration)
-        self.player.positionChanged.connect(self._on_position)
-        self.player.errorOccurred.connect(self._on_error)
+        # Estatísticas de reprodução (amostradas numa thread; overlay com Ctrl+I)
+        self.stats = StatsSampler("Video-Viewer-2.py", parent=self)
+        self.stats_overlay = StatsOverlay(self.video_widget)
+        self.stats.updated.connect(self.stats_overlay.show_snapshot)
 
         self._build_menus_and_toolbar()
         self.status = QStatusBar()
@@ -107,6 +129,7 @@ class VideoPlayer(QMainWindow):
 
     def _build_menus_and_toolbar(self):
         file_menu = self.menuBar().addMenu("&Ficheiro")
+        view_menu = self.menuBar().addMenu("&Ver")
 
         self.act_open = QAction("Abrir…", self)
         self.act_open.setShortcut("Ctrl+O")
@@ -125,6 +148,11 @@ class VideoPlayer(QMainWindow):
         for a in [self.act_open, self.act_open_url, self.act_add_playlist, self.act_exit]:
             file_menu.addAction(a)
 
+        self.act_stats = QAction("Estatísticas de reprodução", self, checkable=True)
+        self.act_stats.setShortcut("Ctrl+I")
+        self.act_stats.toggled.connect(self.stats_overlay.setVisible)
+        view_menu.addAction(self.act_stats)
+
         tb = QToolBar("Principal")
         tb.setMovable(False)
         self.addToolBar(tb)
@@ -138,13 +166,74 @@ class VideoPlayer(QMainWindow):
     def open_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Abrir vídeo", str(Path.home()), "Vídeo (*.mp4 *.mkv *.avi *.mov *.m4v *.wmv *.webm)")
         if path:
-            self._load_media(QUrl.fromLocalFile(path))
-            self.current_local_path = Path(path)
+            self.open_paths([path])
 
     def open_url(self):
         url_text, ok = QInputDialog.getText(self, "Abrir URL", "Introduza o URL do vídeo/stream:")
         if ok and url_text:
-            self._load_media(QUrl(url_text))
+            self.open_paths([url_text])
+
+    def open_paths(self, paths, enqueue=False):
+        """Acrescenta ficheiros/URLs à playlist (linha de comandos, outra invocação, diálogos).
+
+        O primeiro dos novos começa logo, exceto com enqueue se já houver algo aberto.
+        """
+        if not paths:
+            return
+        first = self.playlist.count()
+        self.playlist.addItems(paths)
+        if not (enqueue and self.current_url is not None):
+            self._play_row(first)
+
+    def apply_options(self, options):
+        """Opções da linha de comandos (cli.py) que dizem respeito ao leitor."""
+        self.loop = options.loop
+        self.start_ms = options.start
+        self.headless = options.headless
+        self.muted = options.mute
+        if options.volume is not None:
+            self.volume_slider.setValue(options.volume)
+        if options.rate is not None:
+            speed = round(options.rate * 100)
+            self.speed_dial.setRange(min(self.speed_dial.minimum(), speed), max(self.speed_dial.maximum(), speed))
+            self.speed_dial.setValue(speed)
+        if options.metrics:
+            self.stats.export_to(options.metrics, options.metrics_interval)
+        self.act_stats.setChecked(options.stats_overlay)
+        if self.audio is not None:
+            self.audio.setMuted(self.muted)
+
+    def _play_row(self, row):
+        self.current_row = row
+        self.playlist.setCurrentRow(row)
+        item = self.playlist.item(row).text()
+        if os.path.isfile(item):
+            self._load_media(QUrl.fromLocalFile(item))
+            self.current_local_path = Path(item)
+        elif "://" in item:
+            self._load_media(QUrl(item))
+            self.current_local_path = None
+        else:
+            self.mediaFailed.emit(item, "ficheiro não encontrado")
+            QTimer.singleShot(0, self._skip_failed)
+
+    def _advance(self):
+        """Passa à linha seguinte da playlist (ou volta ao início com loop)."""
+        if self.current_row + 1 < self.playlist.count():
+            self._play_row(self.current_row + 1)
+        elif self.loop and self.playlist.count():
+            self._play_row(0)
+        else:
+            self.playbackFinished.emit()
+
+    def _skip_failed(self):
+        self._failed_in_row += 1
+        if self._failed_in_row >= self.playlist.count():
+            # Nenhum item da playlist consegue tocar: parar mesmo com loop
+            self._failed_in_row = 0
+            self.playbackFinished.emit()
+        else:
+            self._advance()
 
     def add_to_playlist(self):
         path, _ = QFileDialog.getOpenFileName(self, "Adicionar vídeo", str(Path.home()), "Vídeo (*.mp4 *.mkv *.avi *.mov *.m4v *.wmv *.webm)")
@@ -152,24 +241,106 @@ class VideoPlayer(QMainWindow):
             self.playlist.addItem(path)
 
     def play_from_playlist(self, item):
-        self._load_media(QUrl.fromLocalFile(item.text()))
+        self._play_row(self.playlist.row(item))
+
+    def _ensure_player(self):
+        """Cria o QMediaPlayer e o QVideoWidget na primeira abertura."""
+        if self.player is not None:
+            return self.player
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from PySide6.QtMultimediaWidgets import QVideoWidget
+
+        self.audio = QAudioOutput()
+        self.audio.setVolume(self.volume_slider.value() / 100)
+        self.audio.setMuted(self.muted)
+        self.player = QMediaPlayer()
+        self.player.setAudioOutput(self.audio)
+        self.player.setPlaybackRate(self.speed_dial.value() / 100.0)
+
+        video_widget = QVideoWidget()
+        self.video_area.replaceWidget(self.video_area.indexOf(self.video_widget), video_widget)
+        self.stats_overlay.set_anchor(video_widget)
+        self.video_widget.deleteLater()
+        self.video_widget = video_widget
+        self.player.setVideoOutput(self.video_widget)
+
+        self.player.playbackStateChanged.connect(self._on_state)
+        self.player.mediaStatusChanged.connect(self._on_media_status)
+        self.player.durationChanged.connect(self._on_duration)
+        self.player.positionChanged.connect(self._on_position)
+        self.player.errorOccurred.connect(self._on_error)
+        self.player.bufferProgressChanged.connect(self.stats.set_buffer)
+        self.stats.set_rate(self.player.playbackRate())
+        self.stats.attach_sinks([self.video_widget.videoSink()])
+        return self.player
 
     def _load_media(self, url: QUrl):
+        self._ensure_player()
         self.current_url = url
+        self._started = False
+        self.mediaLoading.emit(self._source_name(url))
+        self.stats.media_changed(self._source_name(url))
+        if self.player.source() == url:
+            self.player.setPosition(0)  # o mesmo ficheiro outra vez (p.ex. --loop): setSource não recomeça
         self.player.setSource(url)
+        self.slider_preview.set_source(url.toLocalFile() if url.isLocalFile() else None)
+        self.seeker.set_source(url.toLocalFile() if url.isLocalFile() else None)
         QTimer.singleShot(100, self.player.play)
 
+    def _is_playing(self):
+        if self.player is None:
+            return False
+        from PySide6.QtMultimedia import QMediaPlayer  # já carregado: o leitor existe
+        return self.player.playbackState() == QMediaPlayer.PlayingState
+
     def toggle_play(self):
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self.player is None:
+            return
+        if self._is_playing():
             self.player.pause()
         else:
             self.player.play()
 
+    def stop(self):
+        if self.player is not None:
+            self.player.stop()
+
+    def _set_position(self, ms):
+        if self.player is not None:
+            self.player.setPosition(ms)
+
+    def _set_volume(self, value):
+        if self.audio is not None:
+            self.audio.setVolume(value / 100)
+
     def change_speed(self, value):
-        self.player.setPlaybackRate(value / 100.0)
+        self.stats.set_rate(value / 100.0)
+        if self.player is not None:
+            self.player.setPlaybackRate(value / 100.0)
+
+    @staticmethod
+    def _source_name(url):
+        return url.toLocalFile() if url.isLocalFile() else url.toString()
+
+    def _on_state(self, state):
+        self._sync_play_icon()
+        self.stats.set_playing(self._is_playing())
+        if not self._started and self._is_playing():
+            self._started = True
+            self._failed_in_row = 0
+            self.mediaStarted.emit(self._source_name(self.current_url))
+            if self.start_ms:
+                self.player.setPosition(self.start_ms)
+                self.start_ms = 0
+
+    def _on_media_status(self, status):
+        from PySide6.QtMultimedia import QMediaPlayer
+        if status == QMediaPlayer.EndOfMedia:
+            self.mediaEnded.emit(self._source_name(self.current_url))
+            self._advance()
 
     def _sync_play_icon(self):
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self._is_playing():
             self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPause))
         else:
             self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
@@ -179,6 +350,7 @@ class VideoPlayer(QMainWindow):
         self._update_time_label(self.player.position(), duration_ms)
 
     def _on_position(self, pos_ms):
+        self.seeker.scheduler.completed(pos_ms)
         if not self.position.isSliderDown():
             self.position.setValue(pos_ms)
         self._update_time_label(pos_ms, self.player.duration())
@@ -195,10 +367,40 @@ class VideoPlayer(QMainWindow):
         self.time_label.setText(f"{self._format_ms(pos_ms)} / {self._format_ms(dur_ms)}")
 
     def _on_error(self, err, what):
-        QMessageBox.warning(self, "Erro de reprodução", f"{what}")
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+        self.mediaFailed.emit(self._source_name(self.current_url), what)
+        if self.headless:
+            self.status.showMessage(f"Erro de reprodução: {what}", 5000)
+        else:
+            QMessageBox.warning(self, "Erro de reprodução", f"{what}")
+        self._skip_failed()
+
+    def closeEvent(self, event):
+        self.thumbnails.shutdown()
+        self.keyframes.shutdown()
+        self.stats.shutdown()
+        super().closeEvent(event)
+
+def main():
+    options = parse_args(sys.argv[1:], "Video-Viewer-2.py")
+    # Com outra instância aberta, os ficheiros vão para essa e esta termina já
+    instance = SingleInstance("Video-Viewer-2")
+    if options.forward and instance.forward(options.paths, options.enqueue):
+        sys.exit(0)
+
+    prepare_environment(options)
+    app = QApplication(sys.argv[:1])
     player = VideoPlayer()
+    session = PlaybackSession(options, player, app, "Video-Viewer-2.py")
+    player.apply_options(options)
+    if options.forward:  # só uma janela interativa recebe os ficheiros de outras execuções
+        instance.listen(player, player.open_paths)
     player.show()
+    player.open_paths(options.paths, options.enqueue)
+    if not options.paths and options.exit_at_end:
+        session.write_report()
+        sys.exit(0)
     sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,38 @@
 
 import sys
 import os
-import shutil
+from argparse import ArgumentTypeError
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from PySide6.QtCore import Qt, QUrl, QTimer
+from PySide6.QtCore import Qt, QUrl, QModelIndex, QTimer, Signal
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QFileDialog, QMessageBox, QToolBar, QStyle,
-    QSlider, QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QStatusBar, QListWidget,
-    QInputDialog, QSplitter, QDial
+    QSlider, QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QStatusBar, QListView,
+    QInputDialog, QSplitter, QDial, QLineEdit, QStackedWidget
 )
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
+
+from playlist_model import PlaylistModel, PlaylistLoader
+from thumbnails import ThumbnailService, SliderPreview, ListPreview
+from media_index import MediaIndexer
+from library_watcher import LibraryWatcher
+from seeking import KeyframeIndexer, DragSeeker
+from marked_slider import MarkedSlider
+from single_instance import SingleInstance
+from cli import parse_args, parse_time, prepare_environment, PlaybackSession
+from playback_stats import StatsSampler, StatsOverlay
+from clip_export import ExportError
+from export_queue import ExportQueue, QueueLocked, journal_path
 
 class VideoPlayer(QMainWindow):
+    # Andamento da reprodução (para cli.PlaybackSession): origem = caminho ou URL
+    mediaLoading = Signal(str)
+    mediaStarted = Signal(str)
+    mediaEnded = Signal(str)
+    mediaFailed = Signal(str, str)
+    playbackFinished = Signal()  # fim da fila/playlist (sem --loop)
+    exportJobChanged = Signal(dict)  # tarefa da fila de exportação (vem de outra thread)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Leitor de Vídeo Qt Avançado")
@@ -24,17 +43,55 @@ class VideoPlayer(QMainWindow):
         self.current_url = None
         self.current_local_path = None
         self.save_path = None
-
-        self.audio = QAudioOutput()
-        self.audio.setVolume(0.5)
-        self.player = QMediaPlayer()
-        self.player.setAudioOutput(self.audio)
-
-        self.video_widget = QVideoWidget()
-        self.player.setVideoOutput(self.video_widget)
-
-        self.playlist = QListWidget()
-        self.playlist.itemDoubleClicked.connect(self.play_from_playlist)
+        self.playlist_loader = None
+        self.current_playlist_path = None  # entrada da playlist em reprodução
+        # Fila da linha de comandos / "abrir": enquanto existir, a ordem de
+        # reprodução (e o pré-carregamento) segue-a em vez das linhas da playlist
+        self.queue = []
+        self.queue_pos = -1
+        self.loop = False
+        self.start_ms = 0  # posição inicial pedida para o 1.º item
+        self.muted = False
+        self.headless = False  # sem diálogos modais: ninguém os fecharia
+        self._started = False  # mediaStarted já emitido para o item atual
+        self._failed_in_row = 0
+
+        # Dois leitores: o segundo pré-carrega o item seguinte da playlist e a
+        # passagem de um para o outro é feita sem pausa (gapless_player.py).
+        # São criados ao abrir o primeiro vídeo (_ensure_player): até lá a área
+        # de vídeo é um painel preto e a janela abre sem esperar pelo QtMultimedia
+        self.player = None
+        self.video_widgets = []
+        self.video_widget = QStackedWidget()
+        placeholder = QWidget()
+        placeholder.setStyleSheet("background-color: black;")
+        self.video_widget.addWidget(placeholder)
+
+        # Playlist virtualizada: modelo com os caminhos + vista que só pinta as linhas visíveis
+        self.playlist_model = PlaylistModel(self)
+        self.playlist = QListView()
+        self.playlist.setUniformItemSizes(True)
+        self.playlist.setModel(self.playlist_model)
+        self.playlist.doubleClicked.connect(self.play_from_playlist)
+
+        self.playlist_search = QLineEdit()
+        self.playlist_search.setPlaceholderText("Procurar na playlist…")
+        self.playlist_search.setClearButtonEnabled(True)
+        self.playlist_search.textChanged.connect(self.playlist_model.set_filter)
+
+        # Durações e duração total a partir do índice de metadados (SQLite)
+        self.playlist_info = QLabel()
+        self.media_indexer = MediaIndexer(parent=self)
+        self.media_indexer.indexed.connect(self._on_metadata)
+        for sig in (self.playlist_model.rowsInserted, self.playlist_model.rowsRemoved, self.playlist_model.modelReset):
+            sig.connect(self._update_playlist_info)
+
+        # Biblioteca: pastas vigiadas (inotify ou verificação periódica), lidas de forma
+        # incremental; os ficheiros novos/alterados/apagados atualizam a playlist e o índice
+        self.library = LibraryWatcher(self.media_indexer.index, parent=self)
+        self.library.changed.connect(self._on_library_changed)
+        self.library.scanned.connect(self._on_library_scanned)
+        self.library.failed.connect(self._on_library_failed)
 
         self.play_btn = QPushButton()
         self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
@@ -42,32 +99,53 @@ class VideoPlayer(QMainWindow):
 
         self.stop_btn = QPushButton()
         self.stop_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaStop))
-        self.stop_btn.clicked.connect(self.player.stop)
+        self.stop_btn.clicked.connect(self.stop)
 
-        self.position = QSlider(Qt.Horizontal)
+        # Slider com as mudanças de cena (scene_detect.py) marcadas por cima
+        self.position = MarkedSlider(Qt.Horizontal)
         self.position.setRange(0, 0)
-        self.position.sliderMoved.connect(self.player.setPosition)
+        # Arrastar: seeks agrupados e ajustados a keyframes; seek exato ao largar
+        # (os índices de keyframes ficam na mesma base de dados dos metadados)
+        self.keyframes = KeyframeIndexer(self.media_indexer.index, parent=self)
+        self.seeker = DragSeeker(self.position, self._set_position, indexer=self.keyframes)
+        self.seeker.scheduler.rateChanged.connect(lambda r: self.status.showMessage(f"Seeks: {r:.0f}/s", 1000))
+
+        # Mudanças de cena do ficheiro atual, detetadas numa thread e guardadas no índice;
+        # o detetor (NumPy) só é criado ao abrir o primeiro ficheiro local
+        self.scene_detector = None
+        self.scene_times = []
+
+        self.thumbnails = ThumbnailService(parent=self)
+        self.slider_preview = SliderPreview(self.position, self.thumbnails)
 
         self.time_label = QLabel("00:00 / 00:00")
         self.volume_slider = QSlider(Qt.Horizontal)
         self.volume_slider.setRange(0, 100)
         self.volume_slider.setValue(50)
-        self.volume_slider.valueChanged.connect(lambda v: self.audio.setVolume(v/100))
+        self.volume_slider.valueChanged.connect(self._set_volume)
 
         self.speed_dial = QDial()
-        self.speed_dial.setRange(50, 200)
+        self.speed_dial.setRange(50, 400)
         self.speed_dial.setValue(100)
         self.speed_dial.valueChanged.connect(self.change_speed)
 
         self.bass_slider = QSlider(Qt.Horizontal)
         self.bass_slider.setRange(-10, 10)
         self.bass_slider.setValue(0)
-        self.bass_slider.valueChanged.connect(lambda v: self.status.showMessage(f"Graves: {v}"))
+        self.bass_slider.valueChanged.connect(self._update_equalizer)
 
         self.treble_slider = QSlider(Qt.Horizontal)
         self.treble_slider.setRange(-10, 10)
         self.treble_slider.setValue(0)
-        self.treble_slider.valueChanged.connect(lambda v: self.status.showMessage(f"Agudos: {v}"))
+        self.treble_slider.valueChanged.connect(self._update_equalizer)
+
+        # Equalizador: o áudio passa a sair por AudioPipeline (criado só quando
+        # um dos controlos sai do zero; até lá o áudio segue o caminho normal e
+        # o NumPy nem chega a ser importado)
+        self.audio_pipeline = None
+        self.equalizer = None
+        self.time_stretch = None
+        self._have_audio_dsp = None  # desconhecido até ser preciso
 
         controls = QHBoxLayout()
         controls.addWidget(self.play_btn)
@@ -84,8 +162,17 @@ class VideoPlayer(QMainWindow):
         controls.addWidget(QLabel("Agudos"))
         controls.addWidget(self.treble_slider)
 
+        playlist_panel = QWidget()
+        playlist_layout = QVBoxLayout(playlist_panel)
+        playlist_layout.setContentsMargins(0, 0, 0, 0)
+        playlist_layout.addWidget(self.playlist_search)
+        playlist_layout.addWidget(self.playlist, 1)
+        playlist_layout.addWidget(self.playlist_info)
+
+        self.playlist_preview = ListPreview(self.playlist, self.thumbnails, self.playlist_model.path_at)
+
         video_area = QSplitter()
-        video_area.addWidget(self.playlist)
+        video_area.addWidget(playlist_panel)
         video_area.addWidget(self.video_widget)
         video_area.setStretchFactor(1, 1)
 
@@ -95,15 +182,22 @@ class VideoPlayer(QMainWindow):
         layout.addLayout(controls)
         self.setCentralWidget(central)
 
-        self.player.playbackStateChanged.connect(self._sync_play_icon)
-        self.player.durationChanged.connect(self._on_duration)
-        self.player.positionChanged.connect(self._on_position)
-        self.player.errorOccurred.connect(self._on_error)
+        # Estatísticas de reprodução (amostradas numa thread; overlay com Ctrl+I)
+        self.stats = StatsSampler("Video-Viewer-3.py", parent=self)
+        self.stats_overlay = StatsOverlay(self.video_widget)
+        self.stats.updated.connect(self.stats_overlay.show_snapshot)
 
         self._build_menus_and_toolbar()
         self.status = QStatusBar()
         self.setStatusBar(self.status)
         self._setup_shortcuts()
+        self.library.restore()
+
+        # Fila de exportação (export_queue.py): o mesmo corte em vários vídeos
+        self.export_queue = None
+        self.exportJobChanged.connect(self._on_export_job)
+        if journal_path("Video-Viewer-3").exists():
+            QTimer.singleShot(0, self._ensure_export_queue)  # retomar o que ficou por exportar
 
     def _build_menus_and_toolbar(self):
         file_menu = self.menuBar().addMenu("&Ficheiro")
@@ -124,13 +218,70 @@ class VideoPlayer(QMainWindow):
         self.act_load_playlist = QAction("Carregar Playlist…", self)
         self.act_load_playlist.triggered.connect(self.load_playlist)
 
+        self.act_watch_folder = QAction("Vigiar Pasta (Biblioteca)…", self)
+        self.act_watch_folder.triggered.connect(self.watch_folder)
+
+        self.act_unwatch_folder = QAction("Deixar de Vigiar Pasta…", self)
+        self.act_unwatch_folder.triggered.connect(self.unwatch_folder)
+
         self.act_exit = QAction("Sair", self)
         self.act_exit.setShortcut("Ctrl+Q")
         self.act_exit.triggered.connect(self.close)
 
-        for a in [self.act_open, self.act_open_url, self.act_add_playlist, self.act_save_playlist, self.act_load_playlist, self.act_exit]:
+        for a in [self.act_open, self.act_open_url, self.act_add_playlist, self.act_save_playlist, self.act_load_playlist,
+                  self.act_watch_folder, self.act_unwatch_folder, self.act_exit]:
             file_menu.addAction(a)
 
+        view_menu = self.menuBar().addMenu("&Ver")
+        self.act_stats = QAction("Estatísticas de reprodução", self, checkable=True)
+        self.act_stats.setShortcut("Ctrl+I")
+        self.act_stats.toggled.connect(self.stats_overlay.setVisible)
+        view_menu.addAction(self.act_stats)
+
+        playlist_menu = self.menuBar().addMenu("&Playlist")
+
+        self.act_find_playlist = QAction("Procurar na Playlist", self)
+        self.act_find_playlist.setShortcut("Ctrl+F")
+        self.act_find_playlist.triggered.connect(self.playlist_search.setFocus)
+
+        self.act_remove_playlist = QAction("Remover da Playlist", self)
+        self.act_remove_playlist.setShortcut("Delete")
+        self.act_remove_playlist.triggered.connect(self.remove_from_playlist)
+
+        self.act_move_up = QAction("Mover para cima", self)
+        self.act_move_up.setShortcut("Alt+Up")
+        self.act_move_up.triggered.connect(lambda: self.move_in_playlist(-1))
+
+        self.act_move_down = QAction("Mover para baixo", self)
+        self.act_move_down.setShortcut("Alt+Down")
+        self.act_move_down.triggered.connect(lambda: self.move_in_playlist(1))
+
+        for a in [self.act_find_playlist, self.act_remove_playlist, self.act_move_up, self.act_move_down]:
+            playlist_menu.addAction(a)
+
+        self.act_cut_playlist = QAction("Cortar o mesmo segmento de todos…", self)
+        self.act_cut_playlist.triggered.connect(self.cut_playlist)
+        self.act_export_workers = QAction("Exportações em paralelo…", self)
+        self.act_export_workers.triggered.connect(self.set_export_workers)
+        self.act_clear_exports = QAction("Esvaziar fila de exportação", self)
+        self.act_clear_exports.triggered.connect(self.clear_export_queue)
+        playlist_menu.addSeparator()
+        for a in [self.act_cut_playlist, self.act_export_workers, self.act_clear_exports]:
+            playlist_menu.addAction(a)
+
+        scenes_menu = self.menuBar().addMenu("&Cenas")
+        self.act_next_scene = QAction("Cena seguinte", self)
+        self.act_next_scene.setShortcut("PgDown")
+        self.act_next_scene.triggered.connect(lambda: self.jump_scene(1))
+        self.act_prev_scene = QAction("Cena anterior", self)
+        self.act_prev_scene.setShortcut("PgUp")
+        self.act_prev_scene.triggered.connect(lambda: self.jump_scene(-1))
+        self.act_goto_scene = QAction("Ir para cena…", self)
+        self.act_goto_scene.setShortcut("Ctrl+G")
+        self.act_goto_scene.triggered.connect(self.goto_scene)
+        for a in [self.act_next_scene, self.act_prev_scene, self.act_goto_scene]:
+            scenes_menu.addAction(a)
+
         tb = QToolBar("Principal")
         tb.setMovable(False)
         self.addToolBar(tb)
@@ -144,61 +295,558 @@ class VideoPlayer(QMainWindow):
     def open_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Abrir vídeo", str(Path.home()), "Vídeo (*.mp4 *.mkv *.avi *.mov *.m4v *.wmv *.webm)")
         if path:
-            self._load_media(QUrl.fromLocalFile(path))
-            self.current_local_path = Path(path)
+            self.open_paths([path])
 
     def open_url(self):
         url_text, ok = QInputDialog.getText(self, "Abrir URL", "Introduza o URL do vídeo/stream:")
         if ok and url_text:
-            self._load_media(QUrl(url_text))
+            self.open_paths([url_text])
+
+    def open_paths(self, paths, enqueue=False):
+        """Toca ficheiros/URLs por esta ordem (linha de comandos, outra invocação, diálogos).
+
+        Os ficheiros locais entram também na playlist (e no índice). Com enqueue
+        acrescentam-se à fila e só começam se não houver nada aberto.
+        """
+        if not paths:
+            return
+        local = [p for p in paths if os.path.isfile(p)]
+        if local:
+            self.playlist_model.append_paths(local)
+            self.media_indexer.submit(local)
+        if enqueue and self.current_url is not None:
+            if not self.queue:  # a tocar a partir da playlist: a fila começa no item atual
+                self.queue, self.queue_pos = [self._source_name(self.current_url)], 0
+            self.queue.extend(paths)
+            self._preload_next()
+            return
+        self.queue = list(paths)
+        self._play_queue_item(0)
+
+    def apply_options(self, options):
+        """Opções da linha de comandos (cli.py) que dizem respeito ao leitor."""
+        self.loop = options.loop
+        self.start_ms = options.start
+        self.headless = options.headless
+        self.muted = options.mute
+        if options.volume is not None:
+            self.volume_slider.setValue(options.volume)
+        if options.rate is not None:
+            speed = round(options.rate * 100)
+            self.speed_dial.setRange(min(self.speed_dial.minimum(), speed), max(self.speed_dial.maximum(), speed))
+            self.speed_dial.setValue(speed)
+        if options.metrics:
+            self.stats.export_to(options.metrics, options.metrics_interval)
+        self.act_stats.setChecked(options.stats_overlay)
+        if self.player is not None:
+            self.player.setMuted(self.muted)
+
+    def _play_queue_item(self, pos):
+        self.queue_pos = pos
+        item = self.queue[pos]
+        if os.path.isfile(item):
+            self._load_media(QUrl.fromLocalFile(item))
+            self.current_playlist_path = item
+            self.current_local_path = Path(item)
+            row = self.playlist_model.find(item)
+            if row >= 0:
+                self.playlist.setCurrentIndex(self.playlist_model.index(row))
+        elif "://" in item:
+            self._load_media(QUrl(item))
+        else:
+            self.mediaFailed.emit(item, "ficheiro não encontrado")
+            QTimer.singleShot(0, self._skip_failed)
+            return
+        self._preload_next()
+
+    def _advance(self):
+        """Passa ao item seguinte quando não havia nada pré-carregado (ou volta ao início com loop)."""
+        if self.queue:
+            if self.queue_pos + 1 < len(self.queue):
+                self._play_queue_item(self.queue_pos + 1)
+            elif self.loop:
+                self._play_queue_item(0)
+            else:
+                self.playbackFinished.emit()
+            return
+        row = self.playlist_model.find(self.current_playlist_path) if self.current_playlist_path else -1
+        if 0 <= row < self.playlist_model.rowCount() - 1:
+            self.play_from_playlist(self.playlist_model.index(row + 1))
+        elif self.loop and row >= 0:
+            self.play_from_playlist(self.playlist_model.index(0))
+        else:
+            self.playbackFinished.emit()
+
+    def _skip_failed(self):
+        self._failed_in_row += 1
+        if self._failed_in_row >= max(1, len(self.queue) or self.playlist_model.rowCount()):
+            # Nenhum item consegue tocar: parar mesmo com loop
+            self._failed_in_row = 0
+            self.playbackFinished.emit()
+        else:
+            self._advance()
 
     def add_to_playlist(self):
         path, _ = QFileDialog.getOpenFileName(self, "Adicionar vídeo", str(Path.home()), "Vídeo (*.mp4 *.mkv *.avi *.mov *.m4v *.wmv *.webm)")
         if path:
-            self.playlist.addItem(path)
+            if not self.playlist_model.append_paths([path]):
+                self.status.showMessage("O vídeo já está na playlist.", 3000)
+            self.media_indexer.submit([path])
+            self.playlist.setCurrentIndex(self.playlist_model.index(self.playlist_model.find(path)))
+
+    def remove_from_playlist(self):
+        index = self.playlist.currentIndex()
+        if index.isValid():
+            self.playlist_model.remove_row(index.row())
+
+    def move_in_playlist(self, step):
+        index = self.playlist.currentIndex()
+        if not index.isValid() or self.playlist_search.text():
+            return
+        row = index.row()
+        target = row + step
+        if 0 <= target < self.playlist_model.rowCount():
+            # moveRows usa a linha de destino "antes de", por isso descer exige +1
+            self.playlist_model.moveRow(QModelIndex(), row, QModelIndex(), target + 1 if step > 0 else target)
+            self.playlist.setCurrentIndex(self.playlist_model.index(target))
+
+    # --- Fila de exportação ---
+    def _ensure_export_queue(self):
+        if self.export_queue is None:
+            try:
+                self.export_queue = ExportQueue("Video-Viewer-3")
+            except QueueLocked as e:
+                self.status.showMessage(str(e), 8000)
+                return None
+            self.export_queue.listeners.append(self.exportJobChanged.emit)
+            counts = self.export_queue.counts()
+            unfinished = counts["pending"] + counts["running"]
+            if unfinished:
+                self.status.showMessage(f"Fila de exportação retomada: {unfinished} tarefa(s)", 5000)
+        return self.export_queue
+
+    def cut_playlist(self):
+        """O mesmo segmento (sem recodificar) de cada vídeo visível na playlist, para uma pasta."""
+        paths = [self.playlist_model.path_at(row) for row in range(self.playlist_model.rowCount())]
+        paths = [p for p in paths if os.path.isfile(p)]
+        if not paths:
+            self.status.showMessage("Não há ficheiros locais na playlist.", 5000)
+            return
+        text, ok = QInputDialog.getText(self, "Cortar o mesmo segmento",
+                                        f"Segmento a exportar de {len(paths)} vídeo(s) (início-fim, p.ex. 0:30-1:45):")
+        if not ok or not text.strip():
+            return
+        try:
+            start, end = (parse_time(t.strip()) for t in text.split("-", 1))
+        except ArgumentTypeError as e:
+            QMessageBox.warning(self, "Cortar o mesmo segmento", str(e))
+            return
+        except ValueError:  # sem "-"
+            QMessageBox.warning(self, "Cortar o mesmo segmento", "Use início-fim, p.ex. 0:30-1:45.")
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "Pasta para os segmentos", str(Path(paths[0]).parent))
+        if not out_dir or self._ensure_export_queue() is None:
+            return
+        try:
+            added = self.export_queue.add_cuts(paths, start, end, out_dir)
+        except ExportError as e:
+            QMessageBox.warning(self, "Cortar o mesmo segmento", str(e))
+            return
+        self.status.showMessage(f"{added} corte(s) na fila — {self.export_queue.summary()}", 8000)
+
+    def set_export_workers(self):
+        if self._ensure_export_queue() is None:
+            return
+        n, ok = QInputDialog.getInt(self, "Exportações em paralelo", "Processos ffmpeg ao mesmo tempo:",
+                                    self.export_queue.concurrency, 1, os.cpu_count() or 1)
+        if ok:
+            self.export_queue.set_concurrency(n)
+
+    def clear_export_queue(self):
+        if self.export_queue is not None:
+            n = self.export_queue.cancel_pending()
+            self.status.showMessage(f"{n} tarefa(s) retirada(s) da fila de exportação", 5000)
+
+    def _on_export_job(self, job):
+        self.status.showMessage(f"{ExportQueue.describe(job)} — {self.export_queue.summary()}", 8000)
 
     def save_playlist(self):
         path, _ = QFileDialog.getSaveFileName(self, "Guardar Playlist", str(Path.home() / "playlist.txt"), "Texto (*.txt)")
         if path:
             try:
                 with open(path, "w", encoding="utf-8") as f:
-                    for i in range(self.playlist.count()):
-                        f.write(self.playlist.item(i).text() + "\n")
+                    for p in self.playlist_model.paths():
+                        f.write(p + "\n")
                 self.status.showMessage(f"Playlist guardada em {path}", 5000)
             except Exception as e:
                 QMessageBox.critical(self, "Erro", str(e))
 
     def load_playlist(self):
         path, _ = QFileDialog.getOpenFileName(self, "Carregar Playlist", str(Path.home()), "Texto (*.txt)")
-        if path:
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    self.playlist.clear()
-                    for line in f:
-                        self.playlist.addItem(line.strip())
-                self.status.showMessage(f"Playlist carregada de {path}", 5000)
-            except Exception as e:
-                QMessageBox.critical(self, "Erro", str(e))
+        if not path:
+            return
+        # Cancelar um carregamento anterior ainda em curso; os lotes que ele já
+        # tinha enviado e ainda estão na fila de eventos são ignorados (_current_loader)
+        if self.playlist_loader is not None:
+            for signal in (self.playlist_loader.batch_ready, self.playlist_loader.progress,
+                           self.playlist_loader.loaded, self.playlist_loader.failed):
+                signal.disconnect()
+            if self.playlist_loader.isRunning():
+                self.playlist_loader.requestInterruption()
+                self.playlist_loader.wait()
+            self.playlist_loader.deleteLater()
+        self.playlist_model.clear()
+        self.act_load_playlist.setEnabled(False)
+        self.playlist_loader = PlaylistLoader(path, parent=self)
+        self.playlist_loader.batch_ready.connect(self._on_playlist_batch)
+        self.playlist_loader.progress.connect(self._on_playlist_progress)
+        self.playlist_loader.loaded.connect(self._on_playlist_loaded)
+        self.playlist_loader.failed.connect(self._on_playlist_failed)
+        self.playlist_loader.start()
+
+    def _current_loader(self):
+        return self.playlist_loader is not None and self.sender() is self.playlist_loader
+
+    def _on_playlist_batch(self, paths):
+        if self._current_loader():
+            self.playlist_model.append_paths(paths)
+            self.media_indexer.submit(paths)
+
+    def _on_playlist_progress(self, done, total):
+        if not self._current_loader():
+            return
+        pct = int(done * 100 / total) if total else 100
+        self.status.showMessage(f"A carregar playlist… {pct}% ({len(self.playlist_model)} entradas)")
+
+    def _on_playlist_loaded(self, count):
+        if not self._current_loader():
+            return
+        self.act_load_playlist.setEnabled(True)
+        added = len(self.playlist_model)
+        msg = f"Playlist carregada de {self.playlist_loader.path} ({added} entradas"
+        if count > added:
+            msg += f", {count - added} duplicadas ignoradas"
+        self.status.showMessage(msg + ")", 5000)
+
+    def _on_playlist_failed(self, message):
+        if not self._current_loader():
+            return
+        self.act_load_playlist.setEnabled(True)
+        QMessageBox.critical(self, "Erro", message)
+
+    def watch_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Vigiar pasta", str(Path.home()))
+        if folder:
+            self.library.add_root(folder)
+            self.status.showMessage(f"A ler a pasta {folder}…")
+
+    def unwatch_folder(self):
+        if not self.library.roots:
+            self.status.showMessage("Não há pastas vigiadas.", 3000)
+            return
+        folder, ok = QInputDialog.getItem(self, "Deixar de vigiar", "Pasta:", self.library.roots, 0, False)
+        if ok and folder:
+            self.library.remove_root(folder)
+
+    def _on_library_changed(self, added, removed, modified):
+        if removed:
+            self.playlist_model.remove_paths(removed)
+            self.media_indexer.index.remove(removed)
+        if added:
+            self.playlist_model.append_paths(added)
+        if added or modified:
+            self.media_indexer.submit(added + modified)
+
+    def _on_library_scanned(self, root, dirs, seconds):
+        if dirs:
+            self.status.showMessage(f"Biblioteca: {dirs} pastas lidas em {seconds:.1f}s ({root})", 5000)
+
+    def _on_library_failed(self, root, message):
+        self.status.showMessage(f"Biblioteca: erro ao ler {root}: {message}", 10000)
+
+    def _on_metadata(self, infos):
+        if self.playlist_model.update_metadata(infos):
+            self._update_playlist_info()
+
+    def _update_playlist_info(self, *args):
+        n = len(self.playlist_model)
+        self.playlist_info.setText(f"{n} vídeos · duração total {self._format_ms(self.playlist_model.total_ms)}")
+
+    def play_from_playlist(self, index):
+        # Escolher na playlist volta a seguir a ordem das linhas
+        self.queue = []
+        path = self.playlist_model.path_at(index.row())
+        self._load_media(QUrl.fromLocalFile(path))
+        self.current_playlist_path = path
+        self._preload_next()
+
+    def _next_item(self):
+        """Caminho/URL a tocar a seguir: da fila, se existir, senão da linha seguinte da playlist."""
+        if self.queue:
+            if self.queue_pos + 1 < len(self.queue):
+                return self.queue[self.queue_pos + 1]
+            return self.queue[0] if self.loop else None
+        row = self.playlist_model.find(self.current_playlist_path) if self.current_playlist_path else -1
+        if 0 <= row < self.playlist_model.rowCount() - 1:
+            return self.playlist_model.path_at(row + 1)
+        return self.playlist_model.path_at(0) if self.loop and row >= 0 else None
+
+    def _preload_next(self):
+        item = self._next_item()
+        if item is not None and os.path.isfile(item):
+            self.player.preload(QUrl.fromLocalFile(item))
+            self.keyframes.request(item)
+        elif item is not None and "://" in item:
+            self.player.preload(QUrl(item))
+        else:
+            self.player.preload(None)
 
-    def play_from_playlist(self, item):
-        self._load_media(QUrl.fromLocalFile(item.text()))
+    def _on_playlist_advanced(self, url):
+        # O leitor já passou sozinho para o item pré-carregado
+        self.mediaEnded.emit(self._source_name(self.current_url))
+        if self.queue:
+            self.queue_pos = self.queue_pos + 1 if self.queue_pos + 1 < len(self.queue) else 0
+        self.current_url = url
+        self.current_playlist_path = url.toLocalFile() if url.isLocalFile() else None
+        self.mediaLoading.emit(self._source_name(url))
+        self.stats.media_changed(self._source_name(url))
+        self._started = False
+        if self._is_playing():
+            self._on_state(None)
+        self.slider_preview.set_source(self.current_playlist_path)
+        self.seeker.set_source(self.current_playlist_path)
+        self._set_scene_source(self.current_playlist_path)
+        row = self.playlist_model.find(self.current_playlist_path) if self.current_playlist_path else -1
+        if row >= 0:
+            self.playlist.setCurrentIndex(self.playlist_model.index(row))
+        self._preload_next()
+
+    def _ensure_player(self):
+        """Cria os dois leitores e os QVideoWidget na primeira abertura."""
+        if self.player is not None:
+            return self.player
+        from PySide6.QtMultimediaWidgets import QVideoWidget
+        from gapless_player import GaplessPlayer
+
+        placeholder = self.video_widget.widget(0)
+        self.video_widgets = [QVideoWidget(), QVideoWidget()]
+        for w in self.video_widgets:
+            self.video_widget.addWidget(w)
+        self.video_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+
+        self.player = GaplessPlayer(self.video_widgets, self)
+        self.player.setVolume(self.volume_slider.value() / 100)
+        self.player.setMuted(self.muted)
+        self.player.setPlaybackRate(self.speed_dial.value() / 100.0)
+        self.player.activeChanged.connect(self.video_widget.setCurrentIndex)
+        self.player.advanced.connect(self._on_playlist_advanced)
+        self.player.transitionGap.connect(lambda ms: self.status.showMessage(f"Transição: {ms:.0f} ms", 3000))
+        self.player.playbackStateChanged.connect(self._on_state)
+        self.player.mediaStatusChanged.connect(self._on_media_status)
+        self.player.durationChanged.connect(self._on_duration)
+        self.player.positionChanged.connect(self._on_position)
+        self.player.errorOccurred.connect(self._on_error)
+        self.player.bufferProgressChanged.connect(self.stats.set_buffer)
+        self.stats.set_rate(self.player.playbackRate())
+        # Só conta o leitor ativo: o de reserva descodifica o 1.º fotograma do item seguinte
+        self.stats.attach_sinks(self.player.video_sinks, lambda: self.player.active)
+        # Controlos de áudio mexidos antes de haver leitor
+        if ((self.equalizer is not None and self.equalizer.enabled)
+                or (self.time_stretch is not None and self.time_stretch.rate != 1.0)):
+            self._ensure_audio_pipeline()
+        return self.player
 
     def _load_media(self, url: QUrl):
+        self._ensure_player()
         self.current_url = url
-        self.player.setSource(url)
-        QTimer.singleShot(100, self.player.play)
+        self.current_playlist_path = None
+        self._started = False
+        self.mediaLoading.emit(self._source_name(url))
+        self.stats.media_changed(self._source_name(url))
+        if self.player.source() == url and self.player.preloaded is None:
+            # O mesmo ficheiro outra vez (p.ex. --loop de um só): setSource não recomeça
+            self.player.setPosition(0)
+            self.player.play()
+        else:
+            # A reprodução começa quando o leitor indicar LoadedMedia (sem atraso fixo)
+            self.player.setSource(url)
+        self.slider_preview.set_source(url.toLocalFile() if url.isLocalFile() else None)
+        self.seeker.set_source(url.toLocalFile() if url.isLocalFile() else None)
+        self._set_scene_source(url.toLocalFile() if url.isLocalFile() else None)
+        # Duração conhecida do índice: mostrar já, sem esperar por durationChanged
+        duration = self.playlist_model.duration(url.toLocalFile()) if url.isLocalFile() else None
+        if duration:
+            self._on_duration(duration)
+
+    # --- Cenas ---
+    def _ensure_scene_detector(self):
+        if self.scene_detector is None:
+            try:
+                from scene_detect import SceneDetector
+            except ImportError:  # NumPy em falta: sem deteção de cenas
+                return None
+            self.scene_detector = SceneDetector(self.media_indexer.index, parent=self)
+            self.scene_detector.found.connect(self._on_scenes)
+            self.scene_detector.finished.connect(self._on_scenes_finished)
+        return self.scene_detector
+
+    def _set_scene_source(self, path):
+        self.scene_times = []
+        self.position.set_ticks([])
+        if path and self._ensure_scene_detector() is not None:
+            times = self.scene_detector.request(path)
+            if times is not None:
+                self._on_scenes(path, times, 0, True)
+
+    def _on_scenes(self, path, times, analysed_ms, complete):
+        # Resultados parciais incluídos: as marcas aparecem enquanto a análise avança
+        self.playlist_model.set_scene_count(path, len(times) + 1)
+        if path != self._current_local_file():
+            return
+        self.scene_times = list(times)
+        self.position.set_ticks(self.scene_times)
+        duration = self.playlist_model.duration(path)
+        if not complete and duration:
+            pct = min(100, analysed_ms * 100 // duration)
+            self.status.showMessage(f"Cenas: {len(times) + 1} até agora ({pct}% analisado)", 2000)
+
+    def _on_scenes_finished(self, path, realtime):
+        if path == self._current_local_file():
+            self.status.showMessage(f"Cenas: {len(self.scene_times) + 1} (análise a {realtime:.0f}× tempo real)", 5000)
+
+    def _current_local_file(self):
+        return self.current_url.toLocalFile() if self.current_url is not None and self.current_url.isLocalFile() else None
+
+    def jump_scene(self, step):
+        """Salta para o início da cena seguinte (step=1) ou anterior (step=-1)."""
+        if self.player is None or not self.scene_times:
+            return
+        pos = self.player.position()
+        if step > 0:
+            i = bisect_right(self.scene_times, pos + 500)  # não ficar no corte onde já se está
+            if i == len(self.scene_times):
+                return
+            target = self.scene_times[i]
+        else:
+            # Perto do início de uma cena recua para a anterior, senão para o início desta
+            i = bisect_left(self.scene_times, pos - 1000)
+            target = self.scene_times[i - 1] if i > 0 else 0
+        self._set_position(target)
+        self.status.showMessage(f"Cena {bisect_right(self.scene_times, target) + 1} — {self._format_ms(target)}", 2000)
+
+    def goto_scene(self):
+        if self.player is None or not self.scene_times:
+            self.status.showMessage("Sem cenas detetadas para este vídeo.", 3000)
+            return
+        starts = [0] + self.scene_times
+        items = [f"{n} — {self._format_ms(ms)}" for n, ms in enumerate(starts, 1)]
+        current = max(0, bisect_right(starts, self.player.position()) - 1)
+        item, ok = QInputDialog.getItem(self, "Ir para cena", "Cena:", items, current, False)
+        if ok:
+            self._set_position(starts[items.index(item)])
+
+    def _is_playing(self):
+        if self.player is None:
+            return False
+        from PySide6.QtMultimedia import QMediaPlayer  # já carregado: o leitor existe
+        return self.player.playbackState() == QMediaPlayer.PlayingState
 
     def toggle_play(self):
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self.player is None:
+            return
+        if self._is_playing():
             self.player.pause()
         else:
             self.player.play()
 
+    def stop(self):
+        if self.player is not None:
+            self.player.stop()
+
+    def _set_position(self, ms):
+        if self.player is not None:
+            self.player.setPosition(ms)
+
     def change_speed(self, value):
-        self.player.setPlaybackRate(value / 100.0)
+        rate = value / 100.0
+        self.stats.set_rate(rate)
+        if self.player is not None:
+            self.player.setPlaybackRate(rate)
+        if rate != 1.0:
+            self._load_audio_dsp()
+        if self.time_stretch is not None:
+            # O leitor entrega o áudio à velocidade pedida; o WSOLA repõe o tom original
+            self.time_stretch.set_rate(rate)
+            if rate != 1.0:
+                self._ensure_audio_pipeline()
+        self.status.showMessage(f"Velocidade: {value}%", 2000)
+
+    # --- Áudio ---
+    def _set_volume(self, value):
+        if self.player is not None:
+            self.player.setVolume(value / 100)
+        if self.audio_pipeline is not None:
+            self.audio_pipeline.setVolume(value / 100)
+
+    def _load_audio_dsp(self):
+        """Importa o processamento de áudio (NumPy, Qt 6.8) só quando um controlo o pede."""
+        if self._have_audio_dsp is None:
+            try:
+                from audio_dsp import ShelvingEqualizer, TimeStretch
+                import audio_pipeline
+                self._have_audio_dsp = audio_pipeline.available()
+            except ImportError:  # NumPy em falta: os controlos de áudio ficam só informativos
+                self._have_audio_dsp = False
+            if self._have_audio_dsp:
+                self.equalizer = ShelvingEqualizer()
+                self.time_stretch = TimeStretch()
+        return self._have_audio_dsp
+
+    def _ensure_audio_pipeline(self):
+        # Sem leitor ainda: o pipeline é criado em _ensure_player
+        if self.audio_pipeline is None and self.player is not None and self._load_audio_dsp():
+            from audio_pipeline import AudioPipeline
+            self.audio_pipeline = AudioPipeline(self.player.players, self.player.audio_outputs, self)
+            self.audio_pipeline.setVolume(self.volume_slider.value() / 100)
+            # Primeiro a velocidade (a partir de 1× há menos amostras para equalizar)
+            self.audio_pipeline.stages += [self.time_stretch, self.equalizer]
+        return self.audio_pipeline
+
+    def _update_equalizer(self, *args):
+        bass, treble = self.bass_slider.value(), self.treble_slider.value()
+        if not self._load_audio_dsp():
+            self.status.showMessage(f"Graves: {bass} dB · Agudos: {treble} dB (equalizador requer NumPy e Qt 6.8)", 3000)
+            return
+        self.equalizer.set_gains(bass, treble)
+        if self.equalizer.enabled:
+            self._ensure_audio_pipeline()
+        self.status.showMessage(f"Graves: {bass:+d} dB · Agudos: {treble:+d} dB", 3000)
+
+    @staticmethod
+    def _source_name(url):
+        return url.toLocalFile() if url.isLocalFile() else url.toString()
+
+    def _on_state(self, state):
+        self._sync_play_icon()
+        self.stats.set_playing(self._is_playing())
+        if not self._started and self._is_playing():
+            self._started = True
+            self._failed_in_row = 0
+            self.mediaStarted.emit(self._source_name(self.current_url))
+            if self.start_ms:
+                self.player.setPosition(self.start_ms)
+                self.start_ms = 0
+
+    def _on_media_status(self, status):
+        from PySide6.QtMultimedia import QMediaPlayer
+        # Com o seguinte pré-carregado, a passagem é feita pelo GaplessPlayer (advanced)
+        if status == QMediaPlayer.EndOfMedia and self.player.preloaded is None:
+            self.mediaEnded.emit(self._source_name(self.current_url))
+            self._advance()
 
     def _sync_play_icon(self):
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self._is_playing():
             self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPause))
         else:
             self.play_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
@@ -208,6 +856,7 @@ class VideoPlayer(QMainWindow):
         self._update_time_label(self.player.position(), duration_ms)
 
     def _on_position(self, pos_ms):
+        self.seeker.scheduler.completed(pos_ms)
         if not self.position.isSliderDown():
             self.position.setValue(pos_ms)
         self._update_time_label(pos_ms, self.player.duration())
@@ -224,10 +873,52 @@ class VideoPlayer(QMainWindow):
         self.time_label.setText(f"{self._format_ms(pos_ms)} / {self._format_ms(dur_ms)}")
 
     def _on_error(self, err, what):
-        QMessageBox.warning(self, "Erro de reprodução", f"{what}")
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+        self.mediaFailed.emit(self._source_name(self.current_url), what)
+        if self.headless:
+            self.status.showMessage(f"Erro de reprodução: {what}", 5000)
+        else:
+            QMessageBox.warning(self, "Erro de reprodução", f"{what}")
+        self._skip_failed()
+
+    def closeEvent(self, event):
+        if self.playlist_loader is not None and self.playlist_loader.isRunning():
+            self.playlist_loader.requestInterruption()
+            self.playlist_loader.wait()
+        self.playlist_model.shutdown()
+        self.thumbnails.shutdown()
+        self.library.shutdown()
+        self.keyframes.shutdown()
+        if self.scene_detector is not None:
+            self.scene_detector.shutdown()  # o que ficou por analisar continua na próxima vez
+        self.media_indexer.shutdown()
+        self.stats.shutdown()
+        if self.export_queue is not None:
+            self.export_queue.shutdown()  # as exportações em curso são retomadas na próxima vez
+        if self.audio_pipeline is not None:
+            self.audio_pipeline.close()
+        super().closeEvent(event)
+
+def main():
+    options = parse_args(sys.argv[1:], "Video-Viewer-3.py")
+    # Com outra instância aberta, os ficheiros vão para essa e esta termina já
+    instance = SingleInstance("Video-Viewer-3")
+    if options.forward and instance.forward(options.paths, options.enqueue):
+        sys.exit(0)
+
+    prepare_environment(options)
+    app = QApplication(sys.argv[:1])
     player = VideoPlayer()
+    session = PlaybackSession(options, player, app, "Video-Viewer-3.py")
+    player.apply_options(options)
+    if options.forward:  # só uma janela interativa recebe os ficheiros de outras execuções
+        instance.listen(player, player.open_paths)
     player.show()
+    player.open_paths(options.paths, options.enqueue)
+    if not options.paths and options.exit_at_end:
+        session.write_report()
+        sys.exit(0)
     sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,41 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import os
 import sys
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QAction, QFileDialog, QSlider, QLabel, QStyle, QStatusBar,
-    QMessageBox)
-from PyQt5.QtCore import Qt, QUrl, QTime, QTimer
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtMultimediaWidgets import QVideoWidget
+    QMessageBox, QInputDialog)
+from PyQt5.QtCore import Qt, QUrl, QTime, QTimer, pyqtSignal
+
+from seeking import DragSeeker
+from single_instance import SingleInstance
+from cli import parse_args, prepare_environment, PlaybackSession
+from marked_slider import MarkedSlider
+from clip_export import ClipExporter, ExportError, keyframe_before, default_output
+from export_queue import ExportQueue, QueueLocked, concat_output, journal_path
 
 
 class VideoEditorViewer(QMainWindow):
+    # Andamento da reprodução (para cli.PlaybackSession): origem = caminho ou URL
+    mediaLoading = pyqtSignal(str)
+    mediaStarted = pyqtSignal(str)
+    mediaEnded = pyqtSignal(str)
+    mediaFailed = pyqtSignal(str, str)
+    playbackFinished = pyqtSignal()  # fim da fila (sem --loop)
+    exportJobChanged = pyqtSignal(dict)  # tarefa da fila de exportação (vem de outra thread)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Editor / Exibidor de Vídeo - Qt")
         self.resize(900, 600)
 
-        # Player e widget de vídeo
-        self.mediaPlayer = QMediaPlayer(None, QMediaPlayer.VideoSurface)
-        self.videoWidget = QVideoWidget()
-        self.mediaPlayer.setVideoOutput(self.videoWidget)
+        # Player e widget de vídeo: criados ao carregar o primeiro ficheiro
+        # (ensurePlayer); até lá um painel preto, para a janela abrir mais depressa
+        self.mediaPlayer = None
+        self.videoWidget = QWidget()
+        self.videoWidget.setStyleSheet("background-color: black;")
 
         # Controlo de reprodução
         self.playButton = QPushButton("Ligar")
@@ -35,10 +50,12 @@ class VideoEditorViewer(QMainWindow):
         self.stopButton.setEnabled(False)
         self.stopButton.clicked.connect(self.stop)
 
-        # Slider de progresso
-        self.positionSlider = QSlider(Qt.Horizontal)
+        # Slider de progresso, com as marcas de entrada/saída do segmento a exportar
+        self.positionSlider = MarkedSlider(Qt.Horizontal)
         self.positionSlider.setRange(0, 0)
-        self.positionSlider.sliderMoved.connect(self.setPosition)
+        # Arrastar: um seek de cada vez (o mais recente), ao ritmo do leitor
+        self.seeker = DragSeeker(self.positionSlider, self.setPosition)
+        self.seeker.scheduler.rateChanged.connect(lambda r: self.statusBar.showMessage(f"Seeks: {r:.0f}/s", 1000))
 
         # Rótulo de tempo
         self.timeLabel = QLabel("00:00 / 00:00")
@@ -87,16 +104,61 @@ class VideoEditorViewer(QMainWindow):
         fileMenu.addSeparator()
         fileMenu.addAction(exitAction)
 
+        # Editar: segmento entre as marcas, exportado sem recodificar (clip_export.py)
+        self.exporter = ClipExporter(self)
+        self.exporter.progress.connect(self.exportProgress)
+        self.exporter.completed.connect(lambda dst: self.exportFinished(f"Segmento exportado para: {dst}"))
+        self.exporter.cancelled.connect(lambda: self.exportFinished("Exportação cancelada."))
+        self.exporter.failed.connect(lambda msg: self.exportFinished(f"Falha ao exportar: {msg}"))
+        markInAction = QAction("Marcar entrada", self)
+        markInAction.setShortcut("I")
+        markInAction.triggered.connect(self.markIn)
+        markOutAction = QAction("Marcar saída", self)
+        markOutAction.setShortcut("O")
+        markOutAction.triggered.connect(self.markOut)
+        clearMarksAction = QAction("Limpar marcas", self)
+        clearMarksAction.triggered.connect(self.positionSlider.clear_marks)
+        exportAction = QAction("Exportar segmento…", self)
+        exportAction.setShortcut("Ctrl+E")
+        exportAction.triggered.connect(self.exportSegment)
+        self.cancelExportAction = QAction("Cancelar exportação", self)
+        self.cancelExportAction.setEnabled(False)
+        self.cancelExportAction.triggered.connect(self.exporter.cancel)
+
+        editMenu = menubar.addMenu("Editar")
+        editMenu.addAction(markInAction)
+        editMenu.addAction(markOutAction)
+        editMenu.addAction(clearMarksAction)
+        editMenu.addSeparator()
+        editMenu.addAction(exportAction)
+        editMenu.addAction(self.cancelExportAction)
+
+        # Fila de exportação (export_queue.py): vários segmentos, em processos à parte
+        self.exportQueue = None
+        self.segmentList = []  # segmentos do ficheiro atual para exportar juntos
+        self.exportJobChanged.connect(self.exportJobUpdated)
+        queueAction = QAction("Adicionar segmento à fila", self)
+        queueAction.setShortcut("Ctrl+Shift+E")
+        queueAction.triggered.connect(self.queueSegment)
+        joinAction = QAction("Juntar segmento à lista", self)
+        joinAction.setShortcut("Ctrl+J")
+        joinAction.triggered.connect(self.joinSegment)
+        exportJoinedAction = QAction("Exportar segmentos juntos…", self)
+        exportJoinedAction.triggered.connect(self.exportJoined)
+        workersAction = QAction("Exportações em paralelo…", self)
+        workersAction.triggered.connect(self.setExportWorkers)
+        clearQueueAction = QAction("Esvaziar fila de exportação", self)
+        clearQueueAction.triggered.connect(self.clearExportQueue)
+        editMenu.addSeparator()
+        for action in (queueAction, joinAction, exportJoinedAction, workersAction, clearQueueAction):
+            editMenu.addAction(action)
+        if journal_path("Video-Viewer").exists():
+            QTimer.singleShot(0, self.ensureExportQueue)  # retomar o que ficou por exportar
+
         # Barra de estado
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
 
-        # Ligações do mediaPlayer aos eventos
-        self.mediaPlayer.stateChanged.connect(self.mediaStateChanged)
-        self.mediaPlayer.positionChanged.connect(self.positionChanged)
-        self.mediaPlayer.durationChanged.connect(self.durationChanged)
-        self.mediaPlayer.error.connect(self.handleError)
-
         # Timer para actualizar tempo (opcional, mais suave)
         self.timer = QTimer(self)
         self.timer.setInterval(500)
@@ -105,20 +167,120 @@ class VideoEditorViewer(QMainWindow):
         # Ficheiro aberto
         self.currentFile = None
 
+        # Fila da linha de comandos (ficheiros/URLs tocados um a seguir ao outro)
+        self.queue = []
+        self.queuePos = -1
+        self.loop = False
+        self.startMs = 0  # posição inicial pedida para o 1.º item
+        self.rate = 1.0
+        self.muted = False
+        self.headless = False  # sem diálogos modais: ninguém os fecharia
+        self.started = False  # mediaStarted já emitido para o item atual
+        self.failedInRow = 0
+
     # --- Ações do menu / botões ---
     def openFile(self):
         """Abre um diálogo para escolher um ficheiro de vídeo local."""
         fname, _ = QFileDialog.getOpenFileName(self, "Abrir ficheiro de vídeo", str(Path.home()),
                                               "Vídeos (*.mp4 *.avi *.mkv *.mov);;Todos os ficheiros (*)")
         if fname:
-            self.loadFile(fname)
+            self.openPaths([fname])
+
+    def openPaths(self, paths, enqueue=False):
+        """Toca ficheiros/URLs um a seguir ao outro (linha de comandos, outra invocação, diálogo).
+
+        Com enqueue acrescenta-os à fila e só começa se não houver nada aberto.
+        """
+        if not paths:
+            return
+        if enqueue and self.currentFile is not None:
+            self.queue.extend(paths)
+            self.statusBar.showMessage(f"{len(paths)} item(s) adicionados à fila", 3000)
+            return
+        self.queue = list(paths)
+        self.playQueueItem(0)
+
+    def applyOptions(self, options):
+        """Opções da linha de comandos (cli.py) que dizem respeito ao leitor."""
+        self.loop = options.loop
+        self.startMs = options.start
+        self.headless = options.headless
+        self.rate = options.rate or 1.0
+        self.muted = options.mute
+        if options.volume is not None:
+            self.volumeSlider.setValue(options.volume)
+        if self.mediaPlayer is not None:
+            self.mediaPlayer.setPlaybackRate(self.rate)
+            self.mediaPlayer.setMuted(self.muted)
+
+    def playQueueItem(self, pos):
+        self.queuePos = pos
+        item = self.queue[pos]
+        if "://" in item or Path(item).is_file():
+            self.loadFile(item)
+        else:
+            self.statusBar.showMessage(f"Ficheiro não encontrado: {item}")
+            self.mediaFailed.emit(item, "ficheiro não encontrado")
+            QTimer.singleShot(0, self.skipFailed)
+
+    def advance(self):
+        """Passa ao item seguinte da fila (ou volta ao início com loop)."""
+        if self.queuePos + 1 < len(self.queue):
+            self.playQueueItem(self.queuePos + 1)
+        elif self.loop and self.queue:
+            self.playQueueItem(0)
+        else:
+            self.playbackFinished.emit()
+
+    def skipFailed(self):
+        self.failedInRow += 1
+        if self.failedInRow >= len(self.queue):
+            # Nenhum item da fila consegue tocar: parar mesmo com loop
+            self.failedInRow = 0
+            self.playbackFinished.emit()
+        else:
+            self.advance()
+
+    def ensurePlayer(self):
+        """Cria o QMediaPlayer e o QVideoWidget (só na primeira vez)."""
+        if self.mediaPlayer is not None:
+            return self.mediaPlayer
+        from PyQt5.QtMultimedia import QMediaPlayer
+        from PyQt5.QtMultimediaWidgets import QVideoWidget
+
+        self.mediaPlayer = QMediaPlayer(None, QMediaPlayer.VideoSurface)
+        videoWidget = QVideoWidget()
+        self.centralWidget().layout().replaceWidget(self.videoWidget, videoWidget)
+        self.videoWidget.deleteLater()
+        self.videoWidget = videoWidget
+        self.mediaPlayer.setVideoOutput(self.videoWidget)
+        self.mediaPlayer.setVolume(self.volumeSlider.value())
+        self.mediaPlayer.setMuted(self.muted)
+        self.mediaPlayer.setPlaybackRate(self.rate)
+
+        # Ligações do mediaPlayer aos eventos
+        self.mediaPlayer.stateChanged.connect(self.mediaStateChanged)
+        self.mediaPlayer.mediaStatusChanged.connect(self.mediaStatusChanged)
+        self.mediaPlayer.positionChanged.connect(self.positionChanged)
+        self.mediaPlayer.durationChanged.connect(self.durationChanged)
+        self.mediaPlayer.error.connect(self.handleError)
+        return self.mediaPlayer
 
     def loadFile(self, filename: str):
-        """Carrega o ficheiro no QMediaPlayer."""
-        url = QUrl.fromLocalFile(filename)
+        """Carrega o ficheiro (ou URL) no QMediaPlayer."""
+        from PyQt5.QtMultimedia import QMediaContent
+        self.ensurePlayer()
+        url = QUrl(filename) if "://" in filename else QUrl.fromLocalFile(filename)
+        self.started = False
+        self.mediaLoading.emit(filename)
+        self.positionSlider.clear_marks()
+        self.segmentList = []
+        if self.mediaPlayer.currentMedia().canonicalUrl() == url:
+            self.mediaPlayer.setPosition(0)  # o mesmo ficheiro outra vez (p.ex. --loop)
         content = QMediaContent(url)
         self.mediaPlayer.setMedia(content)
         self.currentFile = filename
+        self.seeker.set_source(filename if url.isLocalFile() else None)
         self.playButton.setEnabled(True)
         self.pauseButton.setEnabled(True)
         self.stopButton.setEnabled(True)
@@ -127,30 +289,165 @@ class VideoEditorViewer(QMainWindow):
         self.play()
 
     def play(self):
-        if self.mediaPlayer.mediaStatus() == QMediaPlayer.NoMedia:
+        if self.mediaPlayer is None or self.mediaPlayer.mediaStatus() == self.mediaPlayer.NoMedia:
             self.statusBar.showMessage("Nenhum ficheiro carregado.")
             return
         self.mediaPlayer.play()
         self.timer.start()
 
     def pause(self):
-        self.mediaPlayer.pause()
+        if self.mediaPlayer is not None:
+            self.mediaPlayer.pause()
         self.timer.stop()
 
     def stop(self):
-        self.mediaPlayer.stop()
+        if self.mediaPlayer is not None:
+            self.mediaPlayer.stop()
         self.timer.stop()
         # Repor slider para início
         self.positionSlider.setValue(0)
 
+    # --- Segmento: marcas de entrada/saída e exportação ---
+    def markIn(self):
+        if self.mediaPlayer is None or self.currentFile is None:
+            return
+        # Sem recodificar, o segmento só pode começar num keyframe (sem índice, o ffmpeg ajusta)
+        ms = keyframe_before(self.seeker.keyframes, self.mediaPlayer.position())
+        self.positionSlider.set_in(ms)
+        self.statusBar.showMessage(f"Entrada: {QTime(0, 0, 0).addMSecs(ms).toString('hh:mm:ss')}", 3000)
+
+    def markOut(self):
+        if self.mediaPlayer is None or self.currentFile is None:
+            return
+        ms = self.mediaPlayer.position()
+        self.positionSlider.set_out(ms)
+        self.statusBar.showMessage(f"Saída: {QTime(0, 0, 0).addMSecs(ms).toString('hh:mm:ss')}", 3000)
+
+    def markedSegment(self):
+        """Segmento entre as marcas, ou None (com o motivo na barra de estado)."""
+        if not self.currentFile or not Path(self.currentFile).is_file():
+            self.statusBar.showMessage("Só é possível exportar segmentos de ficheiros locais.", 5000)
+            return None
+        segment = self.positionSlider.segment(self.mediaPlayer.duration())
+        if segment is None:
+            self.statusBar.showMessage("Marque a entrada (I) e/ou a saída (O) do segmento.", 5000)
+        return segment
+
+    def exportSegment(self):
+        segment = self.markedSegment()
+        if segment is None:
+            return
+        start, end = segment
+        suffix = Path(self.currentFile).suffix
+        dst, _ = QFileDialog.getSaveFileName(self, "Exportar segmento",
+                                             str(default_output(self.currentFile, start, end)),
+                                             f"Mesmo formato (*{suffix})")
+        if not dst:
+            return
+        if not dst.lower().endswith(suffix.lower()):
+            dst += suffix  # os pacotes copiados têm de ir para o mesmo tipo de contentor
+        try:
+            self.exporter.start(self.currentFile, dst, start, end)
+        except ExportError as e:
+            QMessageBox.warning(self, "Exportar segmento", str(e))
+            return
+        self.cancelExportAction.setEnabled(True)
+        self.statusBar.showMessage("A exportar segmento…")
+
+    def exportProgress(self, fraction, mbPerSec, realtime):
+        self.statusBar.showMessage(
+            f"A exportar segmento… {fraction:.0%} ({mbPerSec:.0f} MB/s, {realtime:.0f}× o tempo real)")
+
+    def exportFinished(self, message):
+        self.cancelExportAction.setEnabled(False)
+        self.statusBar.showMessage(message, 8000)
+
+    # --- Fila de exportação ---
+    def ensureExportQueue(self):
+        if self.exportQueue is None:
+            try:
+                self.exportQueue = ExportQueue("Video-Viewer")
+            except QueueLocked as e:
+                self.statusBar.showMessage(str(e), 8000)
+                return None
+            self.exportQueue.listeners.append(self.exportJobChanged.emit)
+            counts = self.exportQueue.counts()
+            unfinished = counts["pending"] + counts["running"]
+            if unfinished:
+                self.statusBar.showMessage(f"Fila de exportação retomada: {unfinished} tarefa(s)", 5000)
+        return self.exportQueue
+
+    def queueSegment(self):
+        segment = self.markedSegment()
+        if segment is None or self.ensureExportQueue() is None:
+            return
+        try:
+            self.exportQueue.add_cut(self.currentFile, *segment)
+        except ExportError as e:
+            QMessageBox.warning(self, "Fila de exportação", str(e))
+            return
+        self.positionSlider.clear_marks()  # pronto para marcar o próximo
+
+    def joinSegment(self):
+        segment = self.markedSegment()
+        if segment is None:
+            return
+        self.segmentList.append(segment)
+        self.positionSlider.clear_marks()
+        self.statusBar.showMessage(f"{len(self.segmentList)} segmento(s) para exportar juntos", 5000)
+
+    def exportJoined(self):
+        if not self.segmentList:
+            self.statusBar.showMessage("Junte primeiro segmentos à lista (Ctrl+J).", 5000)
+            return
+        if self.ensureExportQueue() is None:
+            return
+        suffix = Path(self.currentFile).suffix
+        dst, _ = QFileDialog.getSaveFileName(self, "Exportar segmentos juntos",
+                                             str(concat_output(self.currentFile, len(self.segmentList))),
+                                             f"Mesmo formato (*{suffix})")
+        if not dst:
+            return
+        if not dst.lower().endswith(suffix.lower()):
+            dst += suffix
+        try:
+            self.exportQueue.add_concat(self.currentFile, self.segmentList, dst, priority=1)
+        except ExportError as e:
+            QMessageBox.warning(self, "Fila de exportação", str(e))
+            return
+        self.segmentList = []
+
+    def setExportWorkers(self):
+        if self.ensureExportQueue() is None:
+            return
+        n, ok = QInputDialog.getInt(self, "Exportações em paralelo", "Processos ffmpeg ao mesmo tempo:",
+                                    self.exportQueue.concurrency, 1, os.cpu_count() or 1)
+        if ok:
+            self.exportQueue.set_concurrency(n)
+
+    def clearExportQueue(self):
+        if self.exportQueue is not None:
+            n = self.exportQueue.cancel_pending()
+            self.statusBar.showMessage(f"{n} tarefa(s) retirada(s) da fila de exportação", 5000)
+
+    def exportJobUpdated(self, job):
+        self.statusBar.showMessage(f"{ExportQueue.describe(job)} — {self.exportQueue.summary()}", 8000)
+
     # --- Eventos do player ---
     def mediaStateChanged(self, state):
-        if state == QMediaPlayer.PlayingState:
+        if state == self.mediaPlayer.PlayingState and not self.started:
+            self.started = True
+            self.failedInRow = 0
+            self.mediaStarted.emit(self.currentFile)
+            if self.startMs:
+                self.mediaPlayer.setPosition(self.startMs)
+                self.startMs = 0
+        if state == self.mediaPlayer.PlayingState:
             self.playButton.setEnabled(False)
             self.pauseButton.setEnabled(True)
             self.stopButton.setEnabled(True)
             self.statusBar.showMessage("A reproduzir")
-        elif state == QMediaPlayer.PausedState:
+        elif state == self.mediaPlayer.PausedState:
             self.playButton.setEnabled(True)
             self.pauseButton.setEnabled(False)
             self.statusBar.showMessage("Em pausa")
@@ -161,8 +458,15 @@ class VideoEditorViewer(QMainWindow):
             self.stopButton.setEnabled(False)
             self.statusBar.showMessage("Parado")
 
+    def mediaStatusChanged(self, status):
+        if status == self.mediaPlayer.EndOfMedia:
+            self.mediaEnded.emit(self.currentFile)
+            self.advance()
+
     def positionChanged(self, position):
-        self.positionSlider.setValue(position)
+        self.seeker.scheduler.completed(position)
+        if not self.positionSlider.isSliderDown():
+            self.positionSlider.setValue(position)
         self.updateTimeLabel()
 
     def durationChanged(self, duration):
@@ -170,10 +474,12 @@ class VideoEditorViewer(QMainWindow):
         self.updateTimeLabel()
 
     def setPosition(self, position):
-        self.mediaPlayer.setPosition(position)
+        if self.mediaPlayer is not None:
+            self.mediaPlayer.setPosition(position)
 
     def setVolume(self, value):
-        self.mediaPlayer.setVolume(value)
+        if self.mediaPlayer is not None:
+            self.mediaPlayer.setVolume(value)
 
     def updateTimeLabel(self):
         pos = self.mediaPlayer.position() // 1000  # segundos
@@ -186,17 +492,40 @@ class VideoEditorViewer(QMainWindow):
 
     def handleError(self, error):
         # Mostrar mensagem de erro simples
-        err = self.mediaPlayer.errorString()
-        if err:
-            QMessageBox.critical(self, "Erro de reprodução", err)
+        err = self.mediaPlayer.errorString() or "Erro desconhecido no QMediaPlayer."
+        self.mediaFailed.emit(self.currentFile or "", err)
+        if self.headless:
+            self.statusBar.showMessage(f"Erro de reprodução: {err}")
         else:
-            QMessageBox.critical(self, "Erro de reprodução", "Erro desconhecido no QMediaPlayer.")
+            QMessageBox.critical(self, "Erro de reprodução", err)
+        self.skipFailed()
+
+    def closeEvent(self, event):
+        self.exporter.cancel()
+        if self.exportQueue is not None:
+            self.exportQueue.shutdown()  # as exportações em curso são retomadas na próxima vez
+        super().closeEvent(event)
 
 
 def main():
-    app = QApplication(sys.argv)
+    options = parse_args(sys.argv[1:], "Video-Viewer.py")
+    # Com outra instância aberta, os ficheiros vão para essa e esta termina já
+    instance = SingleInstance("Video-Viewer")
+    if options.forward and instance.forward(options.paths, options.enqueue):
+        sys.exit(0)
+
+    prepare_environment(options)
+    app = QApplication(sys.argv[:1])
     window = VideoEditorViewer()
+    session = PlaybackSession(options, window, app, "Video-Viewer.py")
+    window.applyOptions(options)
+    if options.forward:  # só uma janela interativa recebe os ficheiros de outras execuções
+        instance.listen(window, window.openPaths)
     window.show()
+    window.openPaths(options.paths, options.enqueue)
+    if not options.paths and options.exit_at_end:
+        session.write_report()
+        sys.exit(0)
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,274 @@
+# Processamento de áudio em blocos (NumPy)
+# Equalizador de graves/agudos: dois filtros "shelf" (receitas RBJ) em cascata.
+# Um filtro IIR é sequencial amostra a amostra, o que em Python puro é lento.
+# Aqui o filtro é escrito em espaço de estados e, para um bloco de N amostras,
+# tudo o que depende do bloco é pré-calculado em matrizes:
+#   saída  Y  = T·X + O·s        (T: resposta impulsional NxN, O: NxK)
+#   estado s' = A^N·s + R·X      (R: KxN)
+# Cada bloco custa assim umas poucas multiplicações de matrizes (BLAS), para
+# todos os canais de uma vez, sem ciclos em Python nem alocações.
+#
+# Velocidade sem mudar o tom: TimeStretch (WSOLA), também em streaming.
+
+import math
+
+import numpy as np
+
+BLOCK_SIZE = 256
+
+
+def _biquad_shelf(kind: str, freq: float, gain_db: float, sample_rate: int):
+    """Coeficientes (b, a) normalizados de um filtro shelf (slope S = 1)."""
+    A = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * freq / sample_rate
+    cos_w0, sin_w0 = math.cos(w0), math.sin(w0)
+    alpha = sin_w0 / 2 * math.sqrt(2)
+    sq = 2 * math.sqrt(A) * alpha
+    if kind == "low":
+        b = (A * ((A + 1) - (A - 1) * cos_w0 + sq),
+             2 * A * ((A - 1) - (A + 1) * cos_w0),
+             A * ((A + 1) - (A - 1) * cos_w0 - sq))
+        a = ((A + 1) + (A - 1) * cos_w0 + sq,
+             -2 * ((A - 1) + (A + 1) * cos_w0),
+             (A + 1) + (A - 1) * cos_w0 - sq)
+    else:
+        b = (A * ((A + 1) + (A - 1) * cos_w0 + sq),
+             -2 * A * ((A - 1) + (A + 1) * cos_w0),
+             A * ((A + 1) + (A - 1) * cos_w0 - sq))
+        a = ((A + 1) - (A - 1) * cos_w0 + sq,
+             2 * ((A - 1) - (A + 1) * cos_w0),
+             (A + 1) - (A - 1) * cos_w0 - sq)
+    return np.array(b) / a[0], np.array(a) / a[0]
+
+
+def _biquad_state_space(b, a):
+    """(A, B, C, D) de um biquad na forma direta II transposta."""
+    A = np.array([[-a[1], 1.0], [-a[2], 0.0]])
+    B = np.array([[b[1] - a[1] * b[0]], [b[2] - a[2] * b[0]]])
+    C = np.array([[1.0, 0.0]])
+    D = np.array([[b[0]]])
+    return A, B, C, D
+
+
+def _series(first, second):
+    """Sistema equivalente a `first` seguido de `second`."""
+    A1, B1, C1, D1 = first
+    A2, B2, C2, D2 = second
+    k1, k2 = A1.shape[0], A2.shape[0]
+    A = np.zeros((k1 + k2, k1 + k2))
+    A[:k1, :k1] = A1
+    A[k1:, :k1] = B2 @ C1
+    A[k1:, k1:] = A2
+    B = np.vstack([B1, B2 @ D1])
+    C = np.hstack([D2 @ C1, C2])
+    D = D2 @ D1
+    return A, B, C, D
+
+
+class BlockFilter:
+    """Filtro linear (A, B, C, D) aplicado em blocos de `block_size` amostras."""
+
+    def __init__(self, system, block_size: int = BLOCK_SIZE):
+        A, B, C, D = system
+        n, k = block_size, A.shape[0]
+        self.block_size = n
+        # Potências de A: A^0 .. A^N
+        powers = np.empty((n + 1, k, k))
+        powers[0] = np.eye(k)
+        for i in range(1, n + 1):
+            powers[i] = powers[i - 1] @ A
+        self.powers = powers
+        # Resposta impulsional h[0] = D, h[m] = C·A^(m-1)·B
+        h = np.empty(n)
+        h[0] = D[0, 0]
+        h[1:] = (C @ powers[:n - 1] @ B)[:, 0, 0]
+        idx = np.arange(n)
+        lag = idx[:, None] - idx[None, :]
+        self.T = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+        self.O = (C @ powers[:n])[:, 0, :]  # linha i: C·A^i
+        self.R = (powers[n - 1::-1] @ B)[:, :, 0].T  # coluna j: A^(N-1-j)·B
+
+
+class ShelvingEqualizer:
+    """Graves (low shelf) e agudos (high shelf) para áudio intercalado float32.
+
+    `process(samples)` recebe um array (frames, canais) e devolve um array
+    com a mesma forma, reutilizando buffers internos (válido até à chamada
+    seguinte). Com os dois ganhos a 0 dB o áudio passa sem ser tocado.
+    """
+
+    def __init__(self, sample_rate: int = 48000, channels: int = 2, block_size: int = BLOCK_SIZE,
+                 bass_hz: float = 200.0, treble_hz: float = 4000.0):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.bass_hz = bass_hz
+        self.treble_hz = treble_hz
+        self.bass_db = 0.0
+        self.treble_db = 0.0
+        self._filter = None
+        self._state = np.zeros((4, channels))
+        # Buffers de trabalho pré-alocados
+        self._x = np.zeros((block_size, channels))
+        self._y = np.zeros((block_size, channels))
+        self._tmp = np.zeros((block_size, channels))
+        self._s = np.zeros((4, channels))
+        self._out = np.zeros((0, channels), dtype=np.float32)
+
+    @property
+    def enabled(self) -> bool:
+        return self._filter is not None
+
+    def set_gains(self, bass_db: float, treble_db: float):
+        """Muda os ganhos (dB). O estado do filtro mantém-se: sem estalidos."""
+        self.bass_db, self.treble_db = float(bass_db), float(treble_db)
+        if self.bass_db == 0 and self.treble_db == 0:
+            self._filter = None
+            self._state[:] = 0
+            return
+        low = _biquad_state_space(*_biquad_shelf("low", self.bass_hz, self.bass_db, self.sample_rate))
+        high = _biquad_state_space(*_biquad_shelf("high", self.treble_hz, self.treble_db, self.sample_rate))
+        # Atribuição única: a thread de áudio vê o filtro antigo ou o novo, nunca meio feito
+        self._filter = BlockFilter(_series(low, high), self.block_size)
+
+    def reset(self):
+        """Limpar o estado (p.ex. depois de um seek)."""
+        self._state[:] = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        filt = self._filter
+        if filt is None:
+            return samples
+        frames = samples.shape[0]
+        if self._out.shape[0] < frames:
+            self._out = np.zeros((frames, self.channels), dtype=np.float32)
+        out = self._out[:frames]
+        n = self.block_size
+        x, y, tmp, s, state = self._x, self._y, self._tmp, self._s, self._state
+        for start in range(0, frames, n):
+            m = min(n, frames - start)
+            if m == n:
+                x[:] = samples[start:start + n]
+                np.matmul(filt.T, x, out=y)
+                np.matmul(filt.O, state, out=tmp)
+                y += tmp
+                np.matmul(filt.powers[n], state, out=s)
+                np.matmul(filt.R, x, out=state)
+                state += s
+                out[start:start + n] = y
+            else:
+                # Último bloco incompleto: as mesmas contas com as submatrizes
+                xm = samples[start:start + m].astype(np.float64)
+                ym = filt.T[:m, :m] @ xm + filt.O[:m] @ state
+                state[:] = filt.powers[m] @ state + filt.R[:, n - m:] @ xm
+                out[start:start + m] = ym
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+
+class TimeStretch:
+    """Mudança de velocidade sem mudar o tom (WSOLA), em streaming.
+
+    Com velocidade `rate` entram `rate` segundos de áudio por cada segundo que
+    sai. A saída é feita de janelas de `window` amostras sobrepostas a 50%;
+    para cada janela procura-se, até `tolerance` amostras à volta da posição
+    nominal, o troço da entrada mais parecido com a continuação natural da
+    janela anterior (correlação calculada de uma só vez para todos os
+    desvios, numa versão subamostrada). Latência: window + tolerance amostras.
+    """
+
+    MIN_RATE = 0.25
+    MAX_RATE = 4.0
+
+    def __init__(self, channels: int = 2, window: int = 1024, tolerance: int = 256, decimate: int = 4):
+        self.channels = channels
+        self.window = window
+        self.hop = window // 2
+        self.tolerance = tolerance
+        self.decimate = decimate
+        self.rate = 1.0
+        # Hann periódica: com sobreposição de 50% as janelas somam 1
+        self._win = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(window) / window))[:, None].astype(np.float32)
+        self._in = np.zeros((window * 16, channels), dtype=np.float32)
+        self._out = np.zeros((window * 4, channels), dtype=np.float32)
+        self._ola = np.zeros((window, channels), dtype=np.float32)
+        self._reset_pending = False
+        self.reset()
+
+    def set_rate(self, rate: float):
+        """Muda a velocidade; o estado é limpo no próximo process(), na thread de áudio."""
+        rate = min(self.MAX_RATE, max(self.MIN_RATE, float(rate)))
+        if rate != self.rate:
+            self.rate = rate
+            self._reset_pending = True
+
+    def reset(self):
+        self._in_len = 0
+        self._ola[:] = 0
+        self._prev = None  # início (no buffer) da última janela usada
+        self._pos = float(self.tolerance)  # posição nominal da próxima janela
+
+    def _append(self, samples):
+        n = samples.shape[0]
+        if self._in_len + n > self._in.shape[0]:
+            grown = np.zeros((max(self._in.shape[0] * 2, self._in_len + n), self.channels), dtype=np.float32)
+            grown[:self._in_len] = self._in[:self._in_len]
+            self._in = grown
+        self._in[self._in_len:self._in_len + n] = samples
+        self._in_len += n
+
+    def _discard(self, n):
+        """Esquece as primeiras `n` amostras do buffer de entrada."""
+        if n <= 0:
+            return
+        self._in[:self._in_len - n] = self._in[n:self._in_len]
+        self._in_len -= n
+        self._pos -= n
+        if self._prev is not None:
+            self._prev -= n
+
+    def _best_offset(self, nominal):
+        """Desvio (em amostras) da entrada mais parecida com a continuação natural."""
+        if self._prev is None:
+            return 0
+        d, tol, w = self.decimate, self.tolerance, self.window
+        natural = self._in[self._prev + self.hop:self._prev + self.hop + w:d].mean(axis=1)
+        region = self._in[nominal - tol:nominal + tol + w:d].mean(axis=1)
+        candidates = np.lib.stride_tricks.sliding_window_view(region, natural.shape[0])
+        scores = candidates @ natural
+        return int(np.argmax(scores)) * d - tol
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.rate == 1.0:
+            return samples
+        if self._reset_pending:
+            self._reset_pending = False
+            self.reset()
+        self._append(samples)
+        w, hop, tol = self.window, self.hop, self.tolerance
+        produced = 0
+        while True:
+            nominal = int(self._pos)
+            need = nominal + tol + w
+            if self._prev is not None:
+                need = max(need, self._prev + hop + w)
+            if need > self._in_len:
+                break
+            start = nominal + self._best_offset(nominal)
+            self._ola += self._in[start:start + w] * self._win
+            if produced + hop > self._out.shape[0]:
+                grown = np.zeros((self._out.shape[0] * 2, self.channels), dtype=np.float32)
+                grown[:produced] = self._out[:produced]
+                self._out = grown
+            self._out[produced:produced + hop] = self._ola[:hop]
+            produced += hop
+            self._ola[:hop] = self._ola[hop:]
+            self._ola[hop:] = 0
+            self._prev = start
+            self._pos += self.rate * hop
+        # Manter só o que ainda pode ser usado (a partir da janela anterior ou da região de procura)
+        keep_from = int(self._pos) - tol
+        if self._prev is not None:
+            keep_from = min(keep_from, self._prev + hop)
+        self._discard(keep_from)
+        return self._out[:produced]
@@ -0,0 +1,164 @@
+# Saída de áudio com processamento próprio para os leitores PySide6
+# O QMediaPlayer entrega o áudio descodificado a um QAudioBufferOutput (Qt 6.8+)
+# em float32 / 48 kHz / estéreo; os blocos passam pelas etapas de audio_dsp.py
+# e são escritos num QAudioSink. As QAudioOutput dos leitores ficam sem som,
+# mas continuam a servir de relógio à reprodução (o vídeo continua sincronizado;
+# o áudio processado chega com o atraso do buffer do QAudioSink, ~60 ms).
+# O processamento e o QAudioSink vivem numa thread própria (a ligação a
+# audioBufferReceived é em fila): uma pausa da thread da interface não esvazia
+# o buffer de 60 ms e não há cortes no som.
+
+import numpy as np
+
+from PySide6.QtCore import QObject, QThread, Qt, Signal, Slot
+from PySide6.QtMultimedia import QAudioBuffer, QAudioFormat, QAudioSink, QMediaDevices, QMediaPlayer
+
+try:
+    from PySide6.QtMultimedia import QAudioBufferOutput
+except ImportError:  # Qt < 6.8
+    QAudioBufferOutput = None
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+SINK_BUFFER_MS = 60
+MAX_BACKLOG_MS = 250
+
+
+def available() -> bool:
+    return QAudioBufferOutput is not None
+
+
+class _SinkWorker(QObject):
+    """Aplica as etapas e escreve no QAudioSink, na thread de áudio (criado e usado só nela)."""
+
+    def __init__(self, audio_format, stages):
+        super().__init__()
+        self.format = audio_format
+        self.stages = stages  # a mesma lista do AudioPipeline
+        self.frame_bytes = CHANNELS * 4
+        self.sink = None
+        self.device = None
+        self._backlog = bytearray()  # o que não coube no buffer do QAudioSink
+        self._max_backlog = SAMPLE_RATE * MAX_BACKLOG_MS // 1000 * self.frame_bytes
+
+    @Slot()
+    def start(self):
+        self.sink = QAudioSink(QMediaDevices.defaultAudioOutput(), self.format, self)
+        self.sink.setBufferSize(SAMPLE_RATE * SINK_BUFFER_MS // 1000 * self.frame_bytes)
+        self.device = self.sink.start()
+
+    @Slot()
+    def stop(self):
+        if self.sink is not None:
+            self.sink.stop()
+        self.device = None
+
+    @Slot(float)
+    def set_volume(self, volume):
+        self.sink.setVolume(volume)
+
+    @Slot(bool)
+    def set_playing(self, playing):
+        if playing:
+            self.sink.resume()
+        else:
+            self.sink.suspend()
+
+    @Slot()
+    def reset(self):
+        self._backlog.clear()
+        for stage in self.stages:
+            stage.reset()
+
+    @Slot(QAudioBuffer)
+    def on_buffer(self, buffer):
+        if not buffer.isValid():
+            return
+        frames = buffer.frameCount()
+        samples = np.frombuffer(buffer.constData(), dtype=np.float32, count=frames * CHANNELS)
+        samples = samples.reshape(frames, CHANNELS)
+        for stage in self.stages:
+            samples = stage.process(samples)
+        self._write(samples.astype(np.float32, copy=False).tobytes())
+
+    def _write(self, data: bytes):
+        if self._backlog:
+            self._backlog += data
+            data = bytes(self._backlog)
+            self._backlog.clear()
+        written = self.device.write(data) if self.device is not None else 0
+        rest = data[max(0, written):]
+        if rest:
+            # Latência limitada: se o QAudioSink não acompanhar, descartar o mais antigo
+            self._backlog += rest[-self._max_backlog // self.frame_bytes * self.frame_bytes:]
+
+
+class AudioPipeline(QObject):
+    """Processa o áudio de um ou mais QMediaPlayer (p.ex. os dois do GaplessPlayer).
+
+    `stages` é uma lista de objetos com `process(array) -> array` (frames x
+    canais, float32) e `reset()`; são aplicados por ordem, na thread de áudio.
+    """
+
+    _start = Signal()
+    _stop = Signal()
+    _volume = Signal(float)
+    _playing = Signal(bool)
+    _reset = Signal()
+
+    def __init__(self, players, audio_outputs=(), parent=None):
+        super().__init__(parent)
+        if QAudioBufferOutput is None:
+            raise RuntimeError("É necessário o Qt 6.8 ou mais recente (QAudioBufferOutput).")
+        self.stages = []
+        self.format = QAudioFormat()
+        self.format.setSampleRate(SAMPLE_RATE)
+        self.format.setChannelCount(CHANNELS)
+        self.format.setSampleFormat(QAudioFormat.Float)
+
+        self._thread = QThread()
+        self._thread.setObjectName("audio-pipeline")
+        self._worker = _SinkWorker(self.format, self.stages)
+        self._worker.moveToThread(self._thread)
+        self._start.connect(self._worker.start)
+        self._stop.connect(self._worker.stop, Qt.BlockingQueuedConnection)
+        self._volume.connect(self._worker.set_volume)
+        self._playing.connect(self._worker.set_playing)
+        self._reset.connect(self._worker.reset)
+        self._thread.start(QThread.TimeCriticalPriority)
+        self._start.emit()
+
+        self.players = list(players)
+        self.buffer_outputs = []
+        for player in self.players:
+            output = QAudioBufferOutput(self.format, self)
+            # Em fila: o bloco é processado na thread de áudio, não na da interface
+            output.audioBufferReceived.connect(self._worker.on_buffer, Qt.QueuedConnection)
+            player.setAudioBufferOutput(output)
+            player.playbackStateChanged.connect(self._on_state)
+            self.buffer_outputs.append(output)
+        self.audio_outputs = list(audio_outputs)
+        for output in self.audio_outputs:
+            output.setMuted(True)
+
+    def setVolume(self, volume: float):
+        self._volume.emit(float(volume))
+
+    def reset(self):
+        """Descartar áudio pendente e estado dos filtros (seek, mudança de ficheiro)."""
+        self._reset.emit()
+
+    def close(self):
+        for player in self.players:
+            player.setAudioBufferOutput(None)
+        for output in self.audio_outputs:
+            output.setMuted(False)
+        if self._thread.isRunning():
+            self._stop.emit()
+            self._thread.quit()
+            self._thread.wait()
+
+    def _on_state(self, state):
+        self._playing.emit(state == QMediaPlayer.PlayingState)
+        if state == QMediaPlayer.StoppedState:
+            self.reset()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparação dos leitores do repositório (sem ecrã)
+--------------------------------------------------
+Corre cada janela de leitor tal como está nos scripts, com
+QT_QPA_PLATFORM=offscreen, sobre os mesmos clipes de teste:
+ - pyqt5        Video-Viewer.py    (PyQt5 QMediaPlayer)
+ - pyside6-v1   Video-Viewer-1.py  (PySide6 QMediaPlayer)
+ - pyside6-v2   Video-Viewer-2.py
+ - pyside6-v3   Video-Viewer-3.py  (GaplessPlayer)
+ - vlc          python-vlc.py      (libvlc)
+ - vlc-o        python-vlc-o.py
+
+Cada leitor corre num processo próprio (PyQt5 e PySide6 não podem coexistir) e
+mede: tempo até ao 1.º fotograma, latência de seek, CPU% e RSS durante a
+reprodução e fotogramas perdidos. O resultado é JSON, para comparar versões.
+
+Sem ficheiros indicados, gera um clipe de teste com o ffmpeg.
+
+Execução:
+ python benchmarks/bench_backends.py [video ...] [--backends pyqt5,vlc] [--seconds 5] [--json out.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# nome -> (script, classe da janela, tipo de backend)
+BACKENDS = {
+    "pyqt5": ("Video-Viewer.py", "VideoEditorViewer", "qt5"),
+    "pyside6-v1": ("Video-Viewer-1.py", "VideoPlayer", "qt6"),
+    "pyside6-v2": ("Video-Viewer-2.py", "VideoPlayer", "qt6"),
+    "pyside6-v3": ("Video-Viewer-3.py", "VideoPlayer", "qt6"),
+    "vlc": ("python-vlc.py", "VideoPlayerVLC", "vlc"),
+    "vlc-o": ("python-vlc-o.py", "VideoPlayerVLC", "vlc"),
+}
+
+SEEK_FRACTIONS = (0.5, 0.2, 0.8, 0.35, 0.65)
+SEEK_TOLERANCE_MS = 1000
+
+
+def make_clip(directory, seconds=20):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        sys.exit("ffmpeg não encontrado: indique os vídeos a usar")
+    out = Path(directory) / "bench-720p30.mp4"
+    subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=30:duration={seconds}",
+                    "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                    "-c:v", "libx264", "-g", "60", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", str(out)],
+                   check=True)
+    return str(out)
+
+
+def clip_fps(path) -> float:
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return 30.0
+    out = subprocess.run([ffprobe, "-v", "error", "-select_streams", "v:0", "-show_entries",
+                          "stream=avg_frame_rate", "-of", "csv=p=0", str(path)], capture_output=True, text=True).stdout
+    try:
+        num, _, den = out.strip().partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 30.0
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+# --- Adaptadores: a mesma interface para as três famílias de leitores ---
+class QtProbe:
+    """Conta fotogramas e guarda o PTS do último (QVideoSink no Qt6, QVideoProbe no Qt5)."""
+
+    def __init__(self, window, kind):
+        self.window = window
+        self.kind = kind
+        self.frames = 0
+        self.last_pts_ms = None
+        if kind == "qt6":
+            widgets = getattr(window, "video_widgets", None) or [window.video_widget]
+            for widget in widgets:
+                widget.videoSink().videoFrameChanged.connect(self._on_frame)
+        else:
+            from PyQt5.QtMultimedia import QVideoProbe
+            self._probe = QVideoProbe(window)
+            if not self._probe.setSource(window.mediaPlayer):
+                # Backend sem sondas de vídeo: usar a posição como aproximação
+                self._probe = None
+                window.mediaPlayer.positionChanged.connect(self._on_position)
+            else:
+                self._probe.videoFrameProbed.connect(self._on_frame)
+
+    @property
+    def player(self):
+        return self.window.player if self.kind == "qt6" else self.window.mediaPlayer
+
+    @property
+    def counts_frames(self):
+        return self.kind == "qt6" or self._probe is not None
+
+    def _on_frame(self, frame):
+        if frame.isValid():
+            self.frames += 1
+            self.last_pts_ms = frame.startTime() / 1000 if frame.startTime() >= 0 else self.player.position()
+
+    def _on_position(self, pos):
+        if pos > 0:
+            self.last_pts_ms = pos
+
+    def pts(self):
+        return self.last_pts_ms
+
+    def load(self, path):
+        if self.kind == "qt6":
+            from PySide6.QtCore import QUrl
+            self.window._load_media(QUrl.fromLocalFile(path))
+        else:
+            self.window.loadFile(path)
+        self.mute()
+
+    def mute(self):
+        player = self.player
+        if hasattr(player, "setMuted"):
+            player.setMuted(True)
+        elif player.audioOutput() is not None:
+            player.audioOutput().setMuted(True)
+
+    def seek(self, ms):
+        self.last_pts_ms = None
+        self.player.setPosition(int(ms))
+
+    def position(self):
+        return self.player.position()
+
+    def duration(self):
+        return self.player.duration()
+
+    def dropped(self, expected, frames):
+        return max(0, round(expected - frames)) if self.counts_frames else None
+
+
+class VlcProbe:
+    """Estatísticas do libvlc (fotogramas mostrados/perdidos) e tempo do leitor ativo."""
+
+    counts_frames = True
+
+    def __init__(self, window, kind):
+        import vlc
+        self.vlc = vlc
+        self.window = window
+        self._seeking = False
+
+    def _stats(self):
+        media = self.window.media_player.get_media()
+        stats = self.vlc.MediaStats()
+        if media is None or not media.get_stats(stats):
+            return 0, 0
+        return stats.displayed_pictures, stats.lost_pictures
+
+    @property
+    def frames(self):
+        return self._stats()[0]
+
+    def pts(self):
+        # O libvlc não expõe o PTS do fotograma mostrado: usa-se o relógio do leitor,
+        # depois de ter mudado desde o pedido de seek
+        t = self.window.media_player.get_time()
+        if t < 0 or (self._seeking and t == self._seek_from):
+            return None
+        self._seeking = False
+        return t
+
+    def load(self, path):
+        self.window.load_video(path)
+
+    def seek(self, ms):
+        self._seeking = True
+        self._seek_from = self.window.media_player.get_time()
+        self.window.media_player.set_time(int(ms))
+
+    def position(self):
+        return self.window.media_player.get_time()
+
+    def duration(self):
+        return self.window.media_player.get_length()
+
+    def dropped(self, expected, frames):
+        return self._stats()[1]
+
+
+def wait_until(app, condition, timeout):
+    """Processa eventos até `condition()` ser verdadeira; devolve o tempo (s) ou None."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        app.processEvents()
+        if condition():
+            return time.perf_counter() - start
+        time.sleep(0.001)
+    return None
+
+
+def run_worker(name, path, seconds, fps):
+    script, class_name, kind = BACKENDS[name]
+    # Importar primeiro a biblioteca Qt do script (os módulos partilhados seguem-na)
+    if kind == "qt6":
+        from PySide6.QtWidgets import QApplication
+    else:
+        from PyQt5.QtWidgets import QApplication
+    if kind == "vlc":
+        import vlc_pool
+        # Sem ecrã nem placa de som: saídas nulas na instância partilhada
+        vlc_pool.shared_instance(vlc_pool.DEFAULT_OPTIONS + ("--vout=dummy", "--aout=dummy"))
+
+    app = QApplication(sys.argv[:1])
+    spec = importlib.util.spec_from_file_location(f"bench_{name.replace('-', '_')}", ROOT / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    window = getattr(module, class_name)()
+    window.show()
+    # Os leitores só criam o backend ao abrir o primeiro ficheiro; aqui é criado já,
+    # para ligar as sondas (o custo do arranque é medido em bench_startup.py)
+    for ensure in ("_ensure_player", "ensurePlayer", "_ensure_pool"):
+        if hasattr(window, ensure):
+            getattr(window, ensure)()
+    probe = VlcProbe(window, kind) if kind == "vlc" else QtProbe(window, kind)
+
+    result = {"script": script}
+    t0 = time.perf_counter()
+    probe.load(path)
+    ttff = wait_until(app, lambda: probe.frames > 0 or (probe.pts() or 0) > 0, 15)
+    if ttff is None:
+        result["error"] = "sem fotogramas após 15 s"
+        return result
+    result["ttff_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    # Reprodução: CPU, RSS e fotogramas numa janela de `seconds` segundos
+    frames0, pos0 = probe.frames, probe.position()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    rss = []
+    end = wall0 + seconds
+    while time.perf_counter() < end:
+        wait_until(app, lambda: False, 0.2)
+        rss.append(rss_bytes())
+    wall = time.perf_counter() - wall0
+    frames = probe.frames - frames0
+    played_ms = max(0, probe.position() - pos0)
+    expected = played_ms / 1000 * fps
+    result.update(
+        cpu_percent=round((time.process_time() - cpu0) / wall * 100, 1),
+        rss_mb_mean=round(statistics.mean(rss) / 2**20, 1),
+        rss_mb_max=round(max(rss) / 2**20, 1),
+        frames=frames,
+        expected_frames=round(expected),
+        dropped_frames=probe.dropped(expected, frames),
+    )
+
+    # Seeks: tempo até chegar um fotograma (ou posição) perto do destino
+    duration = probe.duration()
+    latencies = []
+    for fraction in SEEK_FRACTIONS if duration > 0 else ():
+        target = duration * fraction
+        probe.seek(target)
+        dt = wait_until(app, lambda: probe.pts() is not None and abs(probe.pts() - target) <= SEEK_TOLERANCE_MS, 5)
+        latencies.append(None if dt is None else dt * 1000)
+        wait_until(app, lambda: False, 0.3)
+    done = [x for x in latencies if x is not None]
+    result.update(
+        seek_ms_median=round(statistics.median(done), 1) if done else None,
+        seek_ms_max=round(max(done), 1) if done else None,
+        seek_timeouts=len(latencies) - len(done),
+    )
+    window.close()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="lista separada por vírgulas")
+    parser.add_argument("--seconds", type=float, default=5, help="duração da medição de reprodução")
+    parser.add_argument("--timeout", type=float, default=120, help="tempo máximo por leitor e clipe")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--fps", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, args.files[0], args.seconds, args.fps)
+        print(json.dumps(result))
+        sys.stdout.flush()
+        os._exit(0)  # não esperar pelo encerramento do Qt/VLC
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    report = {"revision": git_revision(), "python": platform.python_version(),
+              "platform": platform.platform(), "seconds": args.seconds, "clips": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or [make_clip(tmp)]
+        for path in files:
+            fps = clip_fps(path)
+            clip = report["clips"][Path(path).name] = {"fps": fps, "backends": {}}
+            for name in args.backends.split(","):
+                cmd = [sys.executable, __file__, "--worker", name, "--seconds", str(args.seconds),
+                       "--fps", str(fps), path]
+                try:
+                    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=args.timeout)
+                    lines = proc.stdout.strip().splitlines()
+                    result = json.loads(lines[-1]) if lines else {"error": proc.stderr.strip()[-500:]}
+                except subprocess.TimeoutExpired:
+                    result = {"error": "timeout"}
+                except ValueError:
+                    result = {"error": proc.stderr.strip()[-500:]}
+                clip["backends"][name] = result
+                print(f"{Path(path).name} {name:>11}: {result}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
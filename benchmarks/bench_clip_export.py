@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportar um segmento: cópia de pacotes vs recodificação
+--------------------------------------------------------
+Exporta o mesmo segmento de um vídeo com o comando de clip_export.py
+(ffmpeg -c copy, início no keyframe anterior) e, para comparar, recodificado
+com libx264 -preset veryfast. Para cada um indica:
+ - wall_s       tempo total do processo ffmpeg
+ - mb_per_s     MB do segmento escritos por segundo
+ - realtime     segundos de vídeo exportados por segundo de relógio
+A cópia deve ficar limitada pelo disco (dezenas a centenas de vezes o tempo
+real); a recodificação pelo CPU.
+
+Sem ficheiro indicado, gera um clipe de teste com o ffmpeg.
+
+Execução:
+ python benchmarks/bench_clip_export.py [video] [--start 10] [--duration 30] [--runs 3] [--no-reencode] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_backends import git_revision, make_clip
+
+from clip_export import build_command
+
+
+def reencode_command(ffmpeg, src, dst, start_ms, end_ms):
+    return [ffmpeg, "-hide_banner", "-nostdin", "-v", "error", "-y", "-ss", f"{start_ms / 1000:.3f}",
+            "-i", str(src), "-t", f"{(end_ms - start_ms) / 1000:.3f}",
+            "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac", str(dst)]
+
+
+def run(cmd, dst, seconds, runs):
+    times = []
+    for _ in range(runs):
+        if os.path.exists(dst):
+            os.remove(dst)
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        times.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip()[-300:]}
+    wall = statistics.median(times)
+    size = os.path.getsize(dst)
+    return {"wall_s": round(wall, 3), "size_mb": round(size / 2 ** 20, 1),
+            "mb_per_s": round(size / 2 ** 20 / wall, 1), "realtime": round(seconds / wall, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="vídeo de origem (por omissão, um clipe gerado)")
+    parser.add_argument("--start", type=float, default=10, help="início do segmento, em segundos")
+    parser.add_argument("--duration", type=float, default=30, help="duração do segmento, em segundos")
+    parser.add_argument("--runs", type=int, default=3, help="repetições de cada exportação (mediana)")
+    parser.add_argument("--no-reencode", action="store_true", help="medir só a cópia de pacotes")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        sys.exit("ffmpeg não encontrado")
+    start_ms = int(args.start * 1000)
+    end_ms = start_ms + int(args.duration * 1000)
+    report = {"revision": git_revision(), "start_s": args.start, "duration_s": args.duration, "results": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-clip-") as tmp:
+        src = os.path.abspath(args.video) if args.video else make_clip(tmp, seconds=int(args.start + args.duration) + 5)
+        report["source_mb"] = round(os.path.getsize(src) / 2 ** 20, 1)
+        dst = str(Path(tmp) / f"segment{Path(src).suffix}")
+        commands = {"copy": build_command(src, dst, start_ms, end_ms, ffmpeg)}
+        if not args.no_reencode:
+            commands["reencode"] = reencode_command(ffmpeg, src, dst, start_ms, end_ms)
+        for name, cmd in commands.items():
+            r = report["results"][name] = run(cmd, dst, args.duration, args.runs)
+            if "error" in r:
+                print(f"{name:>9}: erro — {r['error']}")
+                continue
+            print(f"{name:>9}: {r['wall_s']:7.2f} s  {r['mb_per_s']:7.1f} MB/s  {r['realtime']:7.1f}× tempo real"
+                  f"  ({r['size_mb']:.1f} MB)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Escalabilidade das folhas de contacto (contact_sheet.py) com o n.º de processos
+-------------------------------------------------------------------------------
+Gera as folhas de contacto de um conjunto de vídeos com 1, 2, 4, … processos
+e mostra ficheiros/s, aceleração face a 1 processo e eficiência por núcleo.
+Cada execução usa uma pasta de destino nova (o manifesto não é reaproveitado).
+
+Sem pasta indicada, gera com o ffmpeg 16 clipes de teste de 30 s.
+
+Execução:
+ python benchmarks/bench_contact_sheet.py [pasta] [--workers 1,2,4,8] [--backend qt|vlc] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import contact_sheet
+
+
+def make_clips(directory, count=16, seconds=30):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        sys.exit("ffmpeg não encontrado: indique a pasta de vídeos a usar")
+    for i in range(count):
+        out = Path(directory) / f"clip-{i:02d}.mp4"
+        subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi",
+                        "-i", f"testsrc2=size=1280x720:rate=30:duration={seconds}",
+                        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", str(out)], check=True)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", nargs="?")
+    cores = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in (1, 2, 4, 8, 16, 32) if n <= cores)
+    parser.add_argument("--workers", default=default_workers)
+    parser.add_argument("--backend", choices=("qt", "vlc"), default="qt")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-sheets-") as tmp:
+        folder = args.folder or make_clips(tmp)
+        results = {"cores": cores, "backend": args.backend, "runs": {}}
+        base = None
+        for workers in map(int, args.workers.split(",")):
+            out_dir = Path(tmp) / f"out-{workers}"
+            counts = contact_sheet.run([folder], out_dir, workers=workers, backend=args.backend,
+                                       progress=lambda msg: None)
+            rate = counts.get("files_per_second", 0.0)
+            base = base or rate
+            speedup = rate / base if base else 0.0
+            results["runs"][workers] = {**counts, "speedup": round(speedup, 2),
+                                        "efficiency": round(speedup / workers, 2)}
+            print(f"{workers:>3} processos: {rate:6.2f} ficheiros/s  x{speedup:4.2f}  "
+                  f"eficiência {speedup / workers:4.0%}  ({counts['ok']} ok, {counts['error']} erros)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
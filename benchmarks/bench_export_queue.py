@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fila de exportação: débito por número de processos
+---------------------------------------------------
+Põe na fila de export_queue.py as mesmas N exportações sem recodificar
+(segmentos diferentes do mesmo vídeo) e corre-as com 1, 2, 4, ... processos
+em paralelo. Para cada nível indica:
+ - wall_s        tempo até a fila esvaziar
+ - total_mb_s    MB escritos por segundo, somando todas as tarefas
+ - job_mb_s      mediana do MB/s de cada tarefa (registado no diário)
+ - job_realtime  mediana do fator de tempo real de cada tarefa
+Enquanto total_mb_s cresce com os processos, o disco ainda tem folga; quando
+deixa de crescer (e job_mb_s cai), mais processos só dividem o mesmo débito.
+
+Sem ficheiro indicado, gera um clipe de teste com o ffmpeg. O diário fica numa
+pasta temporária (a fila dos leitores não é tocada).
+
+Execução:
+ python benchmarks/bench_export_queue.py [video] [--jobs 8] [--duration 20] [--workers 1,2,4] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench_backends import git_revision, make_clip
+
+from export_queue import ExportQueue
+
+
+def run_level(src, out_dir, journal_dir, workers, jobs, duration_ms):
+    for f in Path(out_dir).iterdir():
+        f.unlink()
+    queue = ExportQueue(f"bench-{workers}", concurrency=workers, journal_dir=journal_dir)
+    idle = threading.Event()
+
+    def on_job(job):
+        counts = queue.counts()
+        if not counts["pending"] and not counts["running"]:
+            idle.set()
+
+    queue.listeners.append(on_job)
+    t0 = time.perf_counter()
+    for i in range(jobs):
+        queue.add_cut(src, i * 1000, i * 1000 + duration_ms, output=Path(out_dir) / f"seg{i}{Path(src).suffix}")
+    idle.clear()  # uma tarefa rápida pode ter esvaziado a fila antes de entrar a seguinte
+    on_job(None)
+    idle.wait()
+    wall = time.perf_counter() - t0
+    done = [j for j in queue.jobs.values() if j["status"] == "done"]
+    failed = [j for j in queue.jobs.values() if j["status"] == "failed"]
+    queue.shutdown()
+    if failed:
+        return {"error": failed[0]["error"]}
+    results = [j["result"] for j in done]
+    return {"wall_s": round(wall, 3), "total_mb_s": round(sum(r["size_mb"] for r in results) / wall, 1),
+            "job_mb_s": statistics.median(r["mb_per_s"] for r in results),
+            "job_realtime": statistics.median(r["realtime"] for r in results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="vídeo de origem (por omissão, um clipe gerado)")
+    parser.add_argument("--jobs", type=int, default=8, help="exportações por nível")
+    parser.add_argument("--duration", type=float, default=20, help="duração de cada segmento, em segundos")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, os.cpu_count() or 4)),
+                        help="níveis de concorrência, separados por vírgulas")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg não encontrado")
+    levels = sorted({int(n) for n in args.workers.split(",")})
+    duration_ms = int(args.duration * 1000)
+    report = {"revision": git_revision(), "jobs": args.jobs, "duration_s": args.duration,
+              "cpu_count": os.cpu_count(), "results": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-queue-") as tmp:
+        src = os.path.abspath(args.video) if args.video else make_clip(tmp, seconds=args.jobs + int(args.duration) + 5)
+        report["source_mb"] = round(os.path.getsize(src) / 2 ** 20, 1)
+        out_dir = Path(tmp) / "out"
+        out_dir.mkdir()
+        for workers in levels:
+            r = report["results"][workers] = run_level(src, out_dir, Path(tmp) / "journal", workers, args.jobs,
+                                                       duration_ms)
+            if "error" in r:
+                print(f"{workers:>3} processo(s): erro — {r['error']}")
+                continue
+            print(f"{workers:>3} processo(s): {r['wall_s']:7.2f} s  {r['total_mb_s']:7.1f} MB/s no total"
+                  f"  {r['job_mb_s']:7.1f} MB/s e {r['job_realtime']:6.1f}× tempo real por tarefa")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pausa entre itens da playlist: leitor simples vs. GaplessPlayer
+----------------------------------------------------------------
+Reproduz uma sequência de vídeos curtos e mede, em cada transição, o tempo entre
+o fim do item (EndOfMedia) e o primeiro fotograma do item seguinte:
+ - "simples": um QMediaPlayer; no fim faz setSource() e play() após 100 ms,
+   como o Video-Viewer-3.py fazia antes
+ - "gapless": GaplessPlayer, com o item seguinte pré-carregado no 2.º leitor
+
+Sem ficheiros indicados, gera clipes de teste com o ffmpeg.
+
+Execução:
+ QT_QPA_PLATFORM=offscreen python benchmarks/bench_gapless.py [video1 video2 ...] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QUrl, QTimer
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtMultimedia import QMediaPlayer, QVideoSink
+
+from gapless_player import GaplessPlayer
+
+
+def make_clips(directory, count=4, seconds=2):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        sys.exit("ffmpeg não encontrado: indique os vídeos a usar")
+    clips = []
+    for i in range(count):
+        out = Path(directory) / f"clip{i}.mp4"
+        subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", f"testsrc=size=640x360:rate=30:duration={seconds}",
+                        "-f", "lavfi", "-i", f"sine=frequency={440 + 110 * i}:duration={seconds}",
+                        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", str(out)], check=True)
+        clips.append(str(out))
+    return clips
+
+
+def run_simple(app, files):
+    player = QMediaPlayer()
+    sink = QVideoSink()
+    player.setVideoOutput(sink)
+    gaps = []
+    state = {"i": 0, "ended": None}
+
+    def on_status(status):
+        if status == QMediaPlayer.EndOfMedia:
+            state["i"] += 1
+            if state["i"] >= len(files):
+                app.quit()
+                return
+            state["ended"] = time.perf_counter()
+            player.setSource(QUrl.fromLocalFile(files[state["i"]]))
+            QTimer.singleShot(100, player.play)
+
+    def on_frame(frame):
+        if state["ended"] is not None and frame.isValid():
+            gaps.append((time.perf_counter() - state["ended"]) * 1000)
+            state["ended"] = None
+
+    player.mediaStatusChanged.connect(on_status)
+    sink.videoFrameChanged.connect(on_frame)
+    player.setSource(QUrl.fromLocalFile(files[0]))
+    player.play()
+    app.exec()
+    player.stop()
+    return gaps
+
+
+def run_gapless(app, files):
+    sinks = [QVideoSink(), QVideoSink()]
+    player = GaplessPlayer(sinks)
+    player.setMuted(True)
+    gaps = []
+    state = {"i": 0}
+
+    def on_advanced(url):
+        state["i"] += 1
+        if state["i"] + 1 < len(files):
+            player.preload(QUrl.fromLocalFile(files[state["i"] + 1]))
+
+    def on_status(status):
+        if status == QMediaPlayer.EndOfMedia and state["i"] + 1 >= len(files):
+            app.quit()
+
+    player.advanced.connect(on_advanced)
+    player.transitionGap.connect(gaps.append)
+    player.mediaStatusChanged.connect(on_status)
+    player.setSource(QUrl.fromLocalFile(files[0]))
+    player.preload(QUrl.fromLocalFile(files[1]))
+    app.exec()
+    player.stop()
+    return gaps
+
+
+def summary(gaps):
+    if not gaps:
+        return {"n": 0}
+    return {"n": len(gaps), "median_ms": round(statistics.median(gaps), 1),
+            "max_ms": round(max(gaps), 1), "min_ms": round(min(gaps), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files if len(args.files) >= 2 else make_clips(tmp)
+        results = {"simple": summary(run_simple(app, files)),
+                   "gapless": summary(run_gapless(app, files))}
+    for mode, r in results.items():
+        print(f"{mode:>8}: {r}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
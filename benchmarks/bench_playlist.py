@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da playlist (playlist_store.py e playlist_model.py)
+-------------------------------------------------------------
+Com N entradas (1 000 000 por omissão), cronometra cada operação uma a uma
+— nunca uma média de um ciclo — e indica a mediana, o percentil 99 e o pior
+caso de:
+ - acrescentar, deduplicar (caminho repetido rejeitado), procurar caminho
+ - remover do fim/do meio e mover, cada uma seguida de uma procura: a
+   primeira procura depois de editar conta como uma operação à parte
+ - procurar na playlist com o filtro de pesquisa ativo (PlaylistModel.find)
+ - escrever no campo de pesquisa (PlaylistModel.set_filter, o que corre na
+   thread da interface a cada tecla)
+Objetivo: percentil 99 abaixo de TARGET_MS em todas; com alguma acima, o
+processo termina com código 1.
+
+Indica também, sem objetivo, quanto tempo o filtro leva a aparecer depois
+da última tecla (espera de FILTER_DELAY_MS + filtro na thread) e o custo do
+filtro em si.
+
+Execução:
+ python benchmarks/bench_playlist.py [N] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bench_backends import git_revision
+
+from playlist_store import PlaylistStore
+
+TARGET_MS = 1.0
+
+
+def make_paths(n):
+    return [f"/media/arquivo/{i // 1000:04d}/Gravacao_{i:07d}.mp4" for i in range(n)]
+
+
+def timed(fn, repeat):
+    """Tempo de cada uma das `repeat` chamadas de fn(i), em ms."""
+    samples = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def summary(samples):
+    ordered = sorted(samples)
+    return {"median_ms": round(statistics.median(ordered), 4),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 4),
+            "max_ms": round(ordered[-1], 4), "ops": len(ordered)}
+
+
+def report(results, name, samples):
+    r = results[name] = summary(samples)
+    r["ok"] = r["p99_ms"] < TARGET_MS
+    verdict = "ok" if r["ok"] else "FALHA"
+    print(f"{name:<40} {r['median_ms'] * 1000:9.1f} µs  p99 {r['p99_ms'] * 1000:9.1f} µs"
+          f"  máx {r['max_ms'] * 1000:9.1f} µs  {verdict}")
+
+
+def edit_then_lookup(store, edit, probe, repeat):
+    """Tempos de `edit(i)` e da procura que se lhe segue, separados."""
+    edits, lookups = [], []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        edit(i)
+        t1 = time.perf_counter()
+        store.index_of(probe(i))
+        t2 = time.perf_counter()
+        edits.append((t1 - t0) * 1000)
+        lookups.append((t2 - t1) * 1000)
+    return edits, lookups
+
+
+def bench_store(paths, results):
+    n = len(paths)
+    t0 = time.perf_counter()
+    store = PlaylistStore(paths)
+    print(f"carregar {n} entradas: {time.perf_counter() - t0:.3f} s")
+
+    extra = [f"/media/novos/{i}.mkv" for i in range(10_000)]
+    report(results, "acrescentar (novo caminho)", timed(lambda i: store.append(extra[i]), len(extra)))
+    report(results, "acrescentar (duplicado, rejeitado)", timed(lambda i: store.append(paths[i]), 10_000))
+    report(results, "procurar caminho (index_of)", timed(lambda i: store.index_of(paths[(i * 7919) % n]), 100_000))
+    report(results, "contém caminho (in)", timed(lambda i: paths[(i * 7919) % n] in store, 100_000))
+
+    # Cada edição é seguida de uma procura de um caminho no fim da lista (o pior caso)
+    last = lambda i: store.path_at(len(store) - 1)
+    edits, lookups = edit_then_lookup(store, lambda i: store.remove(len(store) - 1), last, 1_000)
+    report(results, "remover do fim", edits)
+    edits, more = edit_then_lookup(store, lambda i: store.remove(len(store) // 2), last, 1_000)
+    report(results, "remover do meio", edits)
+    lookups += more
+    edits, more = edit_then_lookup(store, lambda i: store.move(len(store) // 2, 0), last, 1_000)
+    report(results, "mover (meio -> início)", edits)
+    lookups += more
+    edits, more = edit_then_lookup(store, lambda i: store.move(0, len(store) - 1), lambda i: paths[(i * 7919) % n], 1_000)
+    report(results, "mover (início -> fim)", edits)
+    lookups += more
+    report(results, "primeira procura após editar", lookups)
+
+
+def bench_model(paths, results):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QCoreApplication, QElapsedTimer, QEventLoop
+    from playlist_model import FILTER_DELAY_MS, PlaylistModel
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    model = PlaylistModel()
+    model.append_paths(paths)
+    n = len(paths)
+
+    def wait_filter(text):
+        """Escreve `text` letra a letra e devolve (ms até o filtro aparecer, linhas visíveis)."""
+        typed = timed(lambda i: model.set_filter(text[:i + 1]), len(text))
+        clock = QElapsedTimer()
+        clock.start()
+        loop = QEventLoop()
+        model.modelReset.connect(loop.quit)
+        try:
+            while model._filter_text != text and clock.elapsed() < 30_000:
+                loop.exec()
+        finally:
+            model.modelReset.disconnect(loop.quit)
+        return typed, clock.elapsed(), model.rowCount()
+
+    keystrokes = []
+    for text in ("g", "gravacao_01", "gravacao_0123"):
+        model.set_filter("")
+        typed, latency, rows = wait_filter(text)
+        keystrokes += typed
+        results[f"filtro {text!r}"] = {"latency_ms": latency, "rows": rows}
+        print(f"filtro {text!r:<33} aparece {latency:6d} ms após a última tecla"
+              f" (espera {FILTER_DELAY_MS} ms + filtro na thread; {rows} resultados)")
+    report(results, "escrever no campo de pesquisa", keystrokes)
+    report(results, "procurar com filtro ativo (find)", timed(lambda i: model.find(paths[(i * 7919) % n]), 100_000))
+
+    for text in ("g", "gr", "gravacao_01", "gravacao_012"):
+        t0 = time.perf_counter()
+        rows = model.store.filter(text)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"  (filtro na thread) {text!r:<21} {ms:9.1f} ms  {len(rows)} resultados")
+    model.shutdown()
+    app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("n", nargs="?", type=int, default=1_000_000, help="número de entradas")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    paths = make_paths(args.n)
+    results = {}
+    bench_store(paths, results)
+    bench_model(paths, results)
+    failed = [name for name, r in results.items() if r.get("ok") is False]
+    if args.json:
+        data = {"revision": git_revision(), "n": args.n, "target_ms": TARGET_MS, "results": results}
+        Path(args.json).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    if failed:
+        print(f"acima de {TARGET_MS} ms (p99): {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
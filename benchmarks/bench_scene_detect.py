@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deteção de cenas: velocidade da análise face ao tempo real
+----------------------------------------------------------
+Analisa um vídeo inteiro com scene_detect.py (ffmpeg numa só thread + NumPy)
+e indica:
+ - realtime        segundos de vídeo analisados por segundo de relógio
+                   (objetivo: pelo menos 10×)
+ - cpu_cores       CPU gasto (ffmpeg + Python) a dividir pelo tempo de relógio:
+                   deve ficar perto de 1
+ - numpy_ms        tempo total do cálculo das diferenças, em ms (o resto é
+                   descodificação)
+ - cuts            cortes encontrados
+Para comparar, repete com a descodificação completa (sem -skip_frame noref
+nem -skip_loop_filter all), só o ffmpeg.
+
+Sem ficheiro indicado, gera um clipe de teste com o ffmpeg.
+
+Execução:
+ python benchmarks/bench_scene_detect.py [video] [--seconds 60] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_backends import git_revision, make_clip
+
+import scene_detect
+from media_index import probe_file
+from scene_detect import scan_scenes, scene_command
+
+TARGET_REALTIME = 10
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run_detector(src):
+    cpu0, wall0 = cpu_seconds(), time.perf_counter()
+    scanner = None
+    for scanner in scan_scenes(src):
+        pass
+    wall = time.perf_counter() - wall0
+    if scanner is None or not scanner.analysed_ms:
+        return {"error": "nenhum fotograma analisado"}
+    if scanner.failed:
+        return {"error": "o ffmpeg terminou com erro antes do fim do vídeo"}
+    return {"wall_s": round(wall, 2), "realtime": round(scanner.analysed_ms / 1000 / wall, 1),
+            "cpu_cores": round((cpu_seconds() - cpu0) / wall, 2), "numpy_ms": round(scanner.compute_s * 1000, 1),
+            "cuts": len(scanner.cuts)}
+
+
+def run_full_decode(src, duration_s):
+    cmd = scene_command(src, 0, shutil.which("ffmpeg"))
+    for flag in ("-skip_frame", "-skip_loop_filter"):
+        i = cmd.index(flag)
+        del cmd[i:i + 2]
+    t0 = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    wall = time.perf_counter() - t0
+    return {"wall_s": round(wall, 2), "realtime": round(duration_s / wall, 1)}
+
+
+def probe_duration(src) -> float | None:
+    ms = probe_file(src)["duration_ms"]
+    return ms / 1000 if ms else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="vídeo a analisar (por omissão, um clipe gerado)")
+    parser.add_argument("--seconds", type=int, default=60, help="duração do clipe gerado")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg não encontrado")
+    report = {"revision": git_revision(), "params": scene_detect.PARAMS, "results": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-scenes-") as tmp:
+        src = os.path.abspath(args.video) if args.video else make_clip(tmp, seconds=args.seconds)
+        r = report["results"]["detector"] = run_detector(src)
+        if "error" in r:
+            sys.exit(f"erro — {r['error']}")
+        verdict = "ok" if r["realtime"] >= TARGET_REALTIME else f"abaixo de {TARGET_REALTIME}×"
+        print(f" detetor: {r['wall_s']:7.2f} s  {r['realtime']:6.1f}× tempo real ({verdict})"
+              f"  {r['cpu_cores']:.2f} núcleos  NumPy {r['numpy_ms']:.0f} ms  {r['cuts']} cortes")
+        duration = probe_duration(src)
+        if duration:
+            full = report["results"]["full_decode"] = run_full_decode(src, duration)
+            print(f"completa: {full['wall_s']:7.2f} s  {full['realtime']:6.1f}× tempo real"
+                  "  (ffmpeg sem saltar fotogramas nem o filtro de desbloqueio)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seeks em ficheiros com GOP longo: seek direto vs. DragSeeker (seeking.py)
+--------------------------------------------------------------------------
+Usa um QMediaPlayer (PySide6) com QVideoSink e mede:
+ - latência de um seek isolado para um instante arbitrário vs. para o
+   keyframe mais próximo (tempo até chegar o fotograma pedido)
+ - um arrasto simulado do slider (um evento sliderMoved a cada 16 ms):
+   "antes" cada evento faz setPosition; "depois" passa pelo DragSeeker.
+   Conta os seeks pedidos ao leitor e o tempo desde largar o slider até ao
+   fotograma exato.
+
+Sem ficheiro indicado, gera com o ffmpeg um clipe de 2 min com um keyframe a
+cada 10 s.
+
+Execução:
+ QT_QPA_PLATFORM=offscreen python benchmarks/bench_seek.py [video] [--gop 300] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt, QUrl
+from PySide6.QtWidgets import QApplication, QSlider
+from PySide6.QtMultimedia import QMediaPlayer, QVideoSink
+
+from seeking import DragSeeker, probe_keyframes, snap_to_keyframe
+
+TOLERANCE_MS = 50
+
+
+def make_clip(directory, seconds=120, gop=300):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        sys.exit("ffmpeg não encontrado: indique o vídeo a usar")
+    out = Path(directory) / f"long-gop-{gop}.mp4"
+    subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=30:duration={seconds}",
+                    "-c:v", "libx264", "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+                    "-bf", "2", "-pix_fmt", "yuv420p", str(out)], check=True)
+    return str(out)
+
+
+class Harness:
+    def __init__(self, app, path):
+        self.app = app
+        self.player = QMediaPlayer()
+        self.sink = QVideoSink()
+        self.player.setVideoOutput(self.sink)
+        self.last_pts = None
+        self.seeks = 0
+        self.sink.videoFrameChanged.connect(self._on_frame)
+        self.player.setSource(QUrl.fromLocalFile(path))
+        self.wait(lambda: self.player.mediaStatus() in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia), 10)
+        self.player.pause()
+
+    def _on_frame(self, frame):
+        if frame.isValid():
+            self.last_pts = frame.startTime() / 1000
+
+    def seek(self, ms):
+        self.seeks += 1
+        self.last_pts = None
+        self.player.setPosition(int(ms))
+
+    def wait(self, condition, timeout):
+        start = time.perf_counter()
+        while time.perf_counter() - start < timeout:
+            self.app.processEvents()
+            if condition():
+                return (time.perf_counter() - start) * 1000
+            time.sleep(0.0005)
+        return None
+
+    def wait_frame(self, target, timeout=5):
+        return self.wait(lambda: self.last_pts is not None and abs(self.last_pts - target) <= TOLERANCE_MS, timeout)
+
+
+def single_seeks(h, keyframes, duration, n):
+    rng = random.Random(1)
+    exact, snapped = [], []
+    for _ in range(n):
+        target = rng.randrange(0, duration - 1000)
+        h.seek(target)
+        exact.append(h.wait_frame(target))
+        key = snap_to_keyframe(keyframes, target)
+        h.seek(key)
+        snapped.append(h.wait_frame(key))
+    return exact, snapped
+
+
+def drag(h, slider, duration, use_seeker, keyframes):
+    """Arrasta o slider de 10% a 90% em ~1 s e devolve (seeks, ms até ao fotograma final)."""
+    seeker = None
+    if use_seeker:
+        seeker = DragSeeker(slider, h.seek)
+        seeker.keyframes = keyframes
+        h.player.positionChanged.connect(seeker.scheduler.completed)
+    else:
+        slider.sliderMoved.connect(h.seek)
+    h.seeks = 0
+    slider.setSliderDown(True)
+    steps = 60
+    for i in range(steps + 1):
+        value = int(duration * (0.1 + 0.8 * i / steps))
+        slider.setSliderPosition(value)  # emite sliderMoved com o slider em baixo
+        h.wait(lambda: False, 0.016)
+    released = time.perf_counter()
+    target = slider.value()
+    slider.setSliderDown(False)  # emite sliderReleased
+    ms = h.wait_frame(target, 10)
+    latency = None if ms is None else (time.perf_counter() - released) * 1000
+    if seeker is not None:
+        slider.sliderMoved.disconnect(seeker._on_moved)
+        slider.sliderReleased.disconnect(seeker._on_released)
+        h.player.positionChanged.disconnect(seeker.scheduler.completed)
+    else:
+        slider.sliderMoved.disconnect(h.seek)
+    return h.seeks, latency
+
+
+def stats(values):
+    done = [v for v in values if v is not None]
+    if not done:
+        return {"n": 0}
+    return {"n": len(done), "median_ms": round(statistics.median(done), 1),
+            "max_ms": round(max(done), 1), "timeouts": len(values) - len(done)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?")
+    parser.add_argument("--gop", type=int, default=300, help="fotogramas entre keyframes no clipe gerado")
+    parser.add_argument("-n", type=int, default=10, help="seeks isolados")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file or make_clip(tmp, gop=args.gop)
+        t0 = time.perf_counter()
+        keyframes = probe_keyframes(path)
+        index_ms = (time.perf_counter() - t0) * 1000
+        if not keyframes:
+            sys.exit("ffprobe não encontrado ou sem keyframes")
+        h = Harness(app, path)
+        duration = h.player.duration()
+        exact, snapped = single_seeks(h, keyframes, duration, args.n)
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(0, duration)
+        before = drag(h, slider, duration, False, keyframes)
+        after = drag(h, slider, duration, True, keyframes)
+    results = {
+        "keyframes": len(keyframes), "index_ms": round(index_ms, 1),
+        "seek_exact": stats(exact), "seek_keyframe": stats(snapped),
+        "drag_before": {"seeks": before[0], "release_to_frame_ms": before[1] and round(before[1], 1)},
+        "drag_after": {"seeks": after[0], "release_to_frame_ms": after[1] and round(after[1], 1)},
+    }
+    for k, v in results.items():
+        print(f"{k:>14}: {v}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
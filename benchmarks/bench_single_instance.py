@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Abrir mais um ficheiro: instância nova vs instância já aberta
+--------------------------------------------------------------
+Compara, para cada script, o tempo que demora a ter um ficheiro aberto:
+ - cold_ms      arranque a frio: processo novo, QApplication, janela e backend,
+                até open_paths() terminar
+ - forward_ms   com o leitor já aberto: a segunda invocação do script entrega
+                o ficheiro pelo QLocalServer (single_instance.py) e o leitor
+                aberto termina open_paths()
+ - client_ms    quanto tempo vive o processo da segunda invocação
+Indica também a memória (RSS) do processo a frio e da segunda invocação: é a
+memória que deixa de ficar duplicada.
+
+Os processos correm com QT_QPA_PLATFORM=offscreen e com um nome de servidor
+próprio, para não entregarem ficheiros a um leitor que esteja aberto.
+Sem ficheiros indicados, gera um clipe de teste com o ffmpeg.
+
+Execução:
+ python benchmarks/bench_single_instance.py [video] [--backends pyside6-v1,vlc] [--runs 5] [--json out.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench_backends import BACKENDS, ROOT, git_revision, make_clip, rss_bytes
+
+
+def _emit(**data):
+    print(json.dumps(data), flush=True)
+
+
+def run_worker(name, paths):
+    """Corre o main() do script, com marcas de tempo em open_paths() e listen()."""
+    import single_instance
+
+    script, class_name, kind = BACKENDS[name]
+    spec = importlib.util.spec_from_file_location(f"single_{name.replace('-', '_')}", ROOT / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    cls = getattr(module, class_name)
+    attr = "openPaths" if hasattr(cls, "openPaths") else "open_paths"
+    open_paths = getattr(cls, attr)
+
+    def timed_open_paths(self, paths, enqueue=False):
+        if not paths:
+            return
+        try:
+            open_paths(self, paths, enqueue)
+        except Exception as e:
+            _emit(event="error", error=f"{type(e).__name__}: {e}")
+            return
+        _emit(event="opened", time=time.time(), rss_mb=round(rss_bytes() / 2 ** 20, 1))
+
+    setattr(cls, attr, timed_open_paths)
+
+    init, listen = single_instance.SingleInstance.__init__, single_instance.SingleInstance.listen
+
+    def bench_init(self, key, parent=None):
+        init(self, f"bench-{key}", parent)
+
+    def timed_listen(self, *args):
+        ok = listen(self, *args)
+        _emit(event="listening", ok=ok)
+        return ok
+
+    single_instance.SingleInstance.__init__ = bench_init
+    single_instance.SingleInstance.listen = timed_listen
+
+    sys.argv = [script] + paths
+    try:
+        module.main()
+    except SystemExit:
+        # Segunda invocação: entregou os argumentos e saiu sem abrir janela
+        _emit(event="exit", time=time.time(), rss_mb=round(rss_bytes() / 2 ** 20, 1))
+        raise
+
+
+class Worker:
+    """Processo de trabalho com as linhas JSON do stdout numa fila."""
+
+    def __init__(self, name, paths):
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        self.started = time.time()
+        self.proc = subprocess.Popen([sys.executable, __file__, "--worker", name, *paths], env=env,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.events = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            try:
+                self.events.put(json.loads(line))
+            except ValueError:
+                pass
+        self.events.put({"event": "eof"})
+
+    def wait_for(self, event, timeout=30):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                data = self.events.get(timeout=max(0.01, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"sem '{event}' ao fim de {timeout}s")
+            if data["event"] == event:
+                return data
+            if data["event"] in ("error", "eof"):
+                stderr = self.proc.stderr.read() if data["event"] == "eof" else ""
+                raise RuntimeError(data.get("error") or stderr.strip()[-300:] or "o processo terminou")
+
+    def stop(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+def measure(name, video, runs):
+    result = {"cold_ms": [], "forward_ms": [], "client_ms": []}
+    try:
+        for _ in range(runs):
+            cold = Worker(name, [video])
+            try:
+                opened = cold.wait_for("opened")
+                result["cold_ms"].append((opened["time"] - cold.started) * 1000)
+                result["cold_rss_mb"] = opened["rss_mb"]
+            finally:
+                cold.stop()
+
+        primary = Worker(name, [])
+        try:
+            primary.wait_for("listening")
+            for _ in range(runs):
+                client = Worker(name, [video])
+                exited = client.wait_for("exit")
+                client.proc.wait()
+                client_done = time.time()
+                opened = primary.wait_for("opened")
+                result["forward_ms"].append((opened["time"] - client.started) * 1000)
+                result["client_ms"].append((client_done - client.started) * 1000)
+                result["client_rss_mb"] = exited["rss_mb"]
+        finally:
+            primary.stop()
+    except (RuntimeError, TimeoutError) as e:
+        return {"error": str(e)}
+    for key in ("cold_ms", "forward_ms", "client_ms"):
+        result[key] = round(statistics.median(result[key]), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="ficheiro a abrir (por omissão, um clipe gerado)")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="lista separada por vírgulas")
+    parser.add_argument("--runs", type=int, default=5, help="medições de cada tipo (mediana)")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args, extra = parser.parse_known_args()
+
+    if args.worker:
+        run_worker(args.worker, ([args.video] if args.video else []) + extra)
+        return
+
+    report = {"revision": git_revision(), "runs": args.runs, "results": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-single-") as tmp:
+        video = os.path.abspath(args.video) if args.video else make_clip(tmp, seconds=5)
+        for name in args.backends.split(","):
+            r = report["results"][name] = measure(name, video, args.runs)
+            if "error" in r:
+                print(f"{name:>12}: erro — {r['error']}")
+                continue
+            print(f"{name:>12}: a frio {r['cold_ms']:6.0f} ms ({r['cold_rss_mb']:.0f} MB)   "
+                  f"instância aberta {r['forward_ms']:6.0f} ms   "
+                  f"2.ª invocação {r['client_ms']:6.0f} ms ({r['client_rss_mb']:.0f} MB)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
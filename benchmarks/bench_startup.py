@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arranque a frio dos leitores: tempo até a janela aparecer
+----------------------------------------------------------
+Para cada script (os mesmos de bench_backends.py) arranca um processo novo
+com QT_QPA_PLATFORM=offscreen e mede, a partir do momento em que o processo
+é lançado:
+ - imports_ms   até o módulo do script estar importado
+ - window_ms    até a janela estar construída
+ - shown_ms     até a janela estar exposta e pintada (o que o utilizador vê)
+Indica também que módulos pesados (QtMultimedia, vlc, NumPy) já estavam
+carregados nesse momento — com o backend adiado não deve haver nenhum.
+
+Uma execução extra com `python -X importtime` mostra os imports de topo que
+mais custam. Com --compare REV, a mesma medição é feita sobre a revisão REV
+do repositório (extraída para uma pasta temporária), para comparar.
+
+Execução:
+ python benchmarks/bench_startup.py [--backends pyside6-v1,vlc] [--runs 5] [--compare HEAD~1] [--json out.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from bench_backends import BACKENDS, ROOT, git_revision
+
+HEAVY_MODULES = ("PySide6.QtMultimedia", "PySide6.QtMultimediaWidgets", "PyQt5.QtMultimedia",
+                 "PyQt5.QtMultimediaWidgets", "vlc", "numpy")
+
+
+def run_worker(name, root):
+    t0 = float(os.environ["BENCH_SPAWN_TIME"])
+    harness = sorted(sys.modules)  # módulos do próprio benchmark, fora da contagem do -X importtime
+    script, class_name, kind = BACKENDS[name]
+    root = Path(root)
+    sys.path.insert(0, str(root))
+    if kind == "qt6":
+        from PySide6.QtWidgets import QApplication
+    else:
+        from PyQt5.QtWidgets import QApplication
+    spec = importlib.util.spec_from_file_location(f"startup_{name.replace('-', '_')}", root / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imports = time.time()
+
+    app = QApplication(sys.argv[:1])
+    window = getattr(module, class_name)()
+    built = time.time()
+    window.show()
+    handle = window.windowHandle()
+    deadline = time.monotonic() + 10
+    while not (handle is not None and handle.isExposed()) and time.monotonic() < deadline:
+        app.processEvents()
+        handle = window.windowHandle()
+    app.processEvents()  # pintura do primeiro fotograma da janela
+    shown = time.time()
+    return {
+        "imports_ms": round((imports - t0) * 1000, 1),
+        "window_ms": round((built - t0) * 1000, 1),
+        "shown_ms": round((shown - t0) * 1000, 1),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+        "harness_modules": harness,
+    }
+
+
+def spawn(name, root, importtime=False, timeout=60):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", BENCH_SPAWN_TIME=repr(time.time()))
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + [__file__, "--worker", name, "--root", str(root)]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=timeout)
+    lines = proc.stdout.strip().splitlines()
+    try:
+        result = json.loads(lines[-1])
+    except (IndexError, ValueError):
+        result = {"error": proc.stderr.strip()[-500:]}
+    return result, proc.stderr
+
+
+def top_imports(stderr, exclude=(), count=8):
+    """Imports de topo (não aninhados) ordenados pelo tempo cumulativo, em ms."""
+    exclude = set(exclude)
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if not module.startswith("  ") and module.strip() and module.strip() not in exclude:
+            rows.append((module.strip(), int(cumulative) / 1000))
+    rows.sort(key=lambda r: r[1], reverse=True)
+    return [(m, round(ms, 1)) for m, ms in rows[:count]]
+
+
+def measure(name, root, runs):
+    results = [spawn(name, root)[0] for _ in range(runs)]
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return results[0]
+    summary = {key: round(statistics.median(r[key] for r in ok), 1) for key in ("imports_ms", "window_ms", "shown_ms")}
+    summary["heavy_loaded"] = ok[-1]["heavy_loaded"]
+    summary["top_imports"] = top_imports(spawn(name, root, importtime=True)[1], ok[-1]["harness_modules"])
+    return summary
+
+
+def extract_revision(rev, directory):
+    archive = Path(directory) / "rev.tar"
+    with open(archive, "wb") as f:
+        subprocess.run(["git", "-C", str(ROOT), "archive", rev], stdout=f, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(directory)
+    return Path(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="lista separada por vírgulas")
+    parser.add_argument("--runs", type=int, default=5, help="arranques por script (mediana)")
+    parser.add_argument("--compare", metavar="REV", help="medir também esta revisão do repositório")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.root)))
+        sys.stdout.flush()
+        os._exit(0)  # não esperar pelo encerramento do Qt/VLC
+
+    report = {"revision": git_revision(), "runs": args.runs, "current": {}, "compare": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as tmp:
+        roots = {"current": ROOT}
+        if args.compare:
+            report["compare_revision"] = args.compare
+            roots["compare"] = extract_revision(args.compare, tmp)
+        for name in args.backends.split(","):
+            for label, root in roots.items():
+                r = report[label][name] = measure(name, root, args.runs)
+                tag = f"{name} ({args.compare})" if label == "compare" else name
+                if "error" in r:
+                    print(f"{tag:>24}: erro — {r['error'][-200:]}")
+                    continue
+                heavy = ", ".join(r["heavy_loaded"]) or "nenhum"
+                print(f"{tag:>24}: imports {r['imports_ms']:6.0f} ms  janela {r['window_ms']:6.0f} ms  "
+                      f"visível {r['shown_ms']:6.0f} ms  (módulos pesados: {heavy})")
+                print(" " * 26 + "  ".join(f"{m} {ms:.0f}" for m, ms in r["top_imports"][:5]))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
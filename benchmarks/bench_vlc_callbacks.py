@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Saída de vídeo do libvlc: vout nulo vs callbacks para buffers próprios
+----------------------------------------------------------------------
+Reproduz o mesmo ficheiro, sem janela, duas vezes:
+ - "dummy":     --vout=dummy (descodifica, não converte nem mostra nada)
+ - "callbacks": vlc_video.VlcVideoOutput (cada fotograma convertido para RV32
+                nos buffers NumPy reutilizados)
+Para cada um indica:
+ - cpu_percent     CPU do processo durante a reprodução
+ - frames          fotogramas entregues aos callbacks (só "callbacks")
+ - allocations     vezes que os buffers foram alocados — o ficheiro é aberto
+                   --opens vezes seguidas e deve ficar em 1
+ - listener_us     mediana do tempo gasto no listener por fotograma (com
+                   --analyse: luminância média do fotograma com NumPy, sobre
+                   a vista do buffer, sem cópia)
+A diferença de CPU entre os dois é o custo da conversão e da entrega.
+
+Sem ficheiro indicado, gera um clipe de teste com o ffmpeg.
+
+Execução:
+ python benchmarks/bench_vlc_callbacks.py [video] [--seconds 5] [--opens 2] [--analyse] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from bench_backends import git_revision, make_clip
+
+import vlc
+
+from vlc_video import VlcVideoOutput
+
+HEADLESS = ("--aout=dummy", "--quiet", "--no-video-title-show")
+
+
+def play(instance, player, path, seconds):
+    player.set_media(instance.media_new(path))
+    player.play()
+    time.sleep(seconds)
+    player.stop()
+
+
+def run(path, seconds, opens, callbacks, analyse):
+    options = HEADLESS if callbacks else HEADLESS + ("--vout=dummy",)
+    instance = vlc.Instance(*options)
+    player = instance.media_player_new()
+    output = None
+    costs, lumas = [], []
+    if callbacks:
+        output = VlcVideoOutput()
+        output.attach(player)
+        if analyse:
+            def luma(view):
+                t0 = time.perf_counter()
+                # BGRX: média ponderada dos três canais, sem copiar o buffer
+                lumas.append(view[..., 0].mean() * 0.114 + view[..., 1].mean() * 0.587 + view[..., 2].mean() * 0.299)
+                costs.append((time.perf_counter() - t0) * 1e6)
+
+            output.listeners.append(luma)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for _ in range(opens):
+        play(instance, player, path, seconds)
+    wall = time.perf_counter() - wall0
+    player.release()
+    instance.release()
+    result = {"cpu_percent": round((time.process_time() - cpu0) / wall * 100, 1)}
+    if output is not None:
+        result.update(frames=output.frames, allocations=output.allocations,
+                      size=f"{output.width}x{output.height}", pitch=output.pitch)
+        if output.frames == 0:
+            result["error"] = "nenhum fotograma entregue"
+    if costs:
+        result["listener_us"] = round(statistics.median(costs), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="vídeo de origem (por omissão, um clipe gerado)")
+    parser.add_argument("--seconds", type=float, default=5, help="segundos de reprodução por abertura")
+    parser.add_argument("--opens", type=int, default=2, help="aberturas seguidas do mesmo ficheiro")
+    parser.add_argument("--analyse", action="store_true", help="calcular a luminância de cada fotograma")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    report = {"revision": git_revision(), "seconds": args.seconds, "opens": args.opens, "results": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-vlc-cb-") as tmp:
+        src = os.path.abspath(args.video) if args.video else make_clip(tmp, seconds=int(args.seconds) + 5)
+        for name, callbacks in (("dummy", False), ("callbacks", True)):
+            r = report["results"][name] = run(src, args.seconds, args.opens, callbacks, args.analyse)
+            if "error" in r:
+                print(f"{name:>9}: erro — {r['error']}")
+                continue
+            line = f"{name:>9}: {r['cpu_percent']:6.1f}% CPU"
+            if callbacks:
+                line += f"  {r['frames']} fotogramas {r['size']}  {r['allocations']} alocação(ões)"
+            if "listener_us" in r:
+                line += f"  {r['listener_us']:.1f} µs/fotograma no listener"
+            print(line)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latência de abertura nos leitores VLC: a frio vs. com o PlayerPool
+-------------------------------------------------------------------
+Abre uma sequência de ficheiros e mede o tempo entre o pedido de abertura e o
+primeiro avanço do relógio de reprodução (primeiro fotograma apresentado):
+ - "frio": um vlc.Instance e um Media novos a cada ficheiro, como antes
+ - "pool": instância partilhada, com o ficheiro seguinte preparado em segundo plano
+
+Corre sem janela (vout "dummy"), por isso serve também em servidores de CI.
+
+Execução:
+ python benchmarks/bench_vlc_open.py video1.mp4 video2.mp4 [...] [--json resultado.json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import vlc
+
+import vlc_pool
+
+HEADLESS = ("--vout=dummy", "--aout=dummy", "--quiet")
+
+
+def wait_first_frame(player, started, timeout=10.0):
+    """Segundos desde `started` até o relógio do leitor avançar (None se expirar)."""
+    done = threading.Event()
+    result = {}
+
+    def on_time(event):
+        if event.u.new_time > 0 and not done.is_set():
+            result["t"] = time.perf_counter() - started
+            done.set()
+
+    events = player.event_manager()
+    events.event_attach(vlc.EventType.MediaPlayerTimeChanged, on_time)
+    done.wait(timeout)
+    events.event_detach(vlc.EventType.MediaPlayerTimeChanged)
+    return result.get("t")
+
+
+def run_cold(files, hold):
+    latencies = []
+    for path in files:
+        started = time.perf_counter()
+        instance = vlc.Instance(*HEADLESS)
+        player = instance.media_player_new()
+        player.set_media(instance.media_new(path))
+        player.play()
+        latencies.append(wait_first_frame(player, started))
+        time.sleep(hold)
+        player.stop()
+        player.release()
+        instance.release()
+    return latencies
+
+
+def run_pool(files, hold):
+    pool = vlc_pool.PlayerPool(size=2, instance=vlc_pool.shared_instance(vlc_pool.DEFAULT_OPTIONS + HEADLESS))
+    latencies = []
+    for i, path in enumerate(files):
+        started = time.perf_counter()
+        _, player = pool.activate(path)
+        latencies.append(wait_first_frame(player, started))
+        if i + 1 < len(files):
+            pool.prepare(files[i + 1])
+        time.sleep(hold)
+    pool.release()
+    return latencies
+
+
+def summary(latencies):
+    ok = [x * 1000 for x in latencies if x is not None]
+    if not ok:
+        return {"n": 0, "timeouts": len(latencies)}
+    return {
+        "n": len(ok),
+        "timeouts": len(latencies) - len(ok),
+        "first_ms": round(ok[0], 1),
+        "median_ms": round(statistics.median(ok), 1),
+        "median_after_first_ms": round(statistics.median(ok[1:]), 1) if len(ok) > 1 else None,
+        "max_ms": round(max(ok), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--hold", type=float, default=1.5,
+                        help="segundos de reprodução de cada ficheiro (tempo para preparar o seguinte)")
+    parser.add_argument("--json", help="guardar os resultados neste ficheiro")
+    args = parser.parse_args()
+
+    results = {"cold": summary(run_cold(args.files, args.hold)),
+               "pool": summary(run_pool(args.files, args.hold))}
+    for mode, r in results.items():
+        print(f"{mode:>5}: {r}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# Linha de comandos dos leitores
+# - ficheiros, URLs e playlists (.m3u/.m3u8/.txt/.pls) como argumentos; as
+#   playlists são expandidas nas entradas que contêm
+# - posição inicial, velocidade, volume, repetir a lista, sem som
+# - --headless: sem janela visível (plataforma Qt "offscreen", saída de vídeo
+#   nula no VLC), para automação e testes de carga
+# - --exit-at-end: termina no fim da lista; --stats-json: relatório da sessão
+#   (tempo até começar a tocar, tempo a tocar e erros de cada item, CPU, RSS)
+# - --metrics: estatísticas de reprodução exportadas a cada intervalo (JSONL ou
+#   texto do Prometheus, ver playback_stats.py); --stats-overlay mostra-as na janela
+#
+# As janelas emitem mediaLoading/mediaStarted/mediaEnded/mediaFailed (com a
+# origem) e playbackFinished (fim da lista); a PlaybackSession só escuta.
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from qt_compat import QtCore
+
+PLAYLIST_EXTENSIONS = {".m3u", ".m3u8", ".txt", ".pls"}
+
+
+def parse_time(text: str) -> int:
+    """'90', '1:30', '1:02:03.5' -> milissegundos."""
+    seconds = 0.0
+    try:
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+        if not math.isfinite(seconds):
+            raise ValueError(text)  # 'inf'/'nan' passam no float() mas não são posições
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"posição inválida: {text!r} (use segundos ou [hh:]mm:ss)")
+    if seconds < 0:
+        raise argparse.ArgumentTypeError(f"posição negativa: {text!r}")
+    return int(seconds * 1000)
+
+
+def _rate(text: str) -> float:
+    try:
+        rate = float(text)
+    except ValueError:
+        rate = 0
+    if not 0.1 <= rate <= 8:
+        raise argparse.ArgumentTypeError(f"velocidade inválida: {text!r} (0.1 a 8)")
+    return rate
+
+
+def _volume(text: str) -> int:
+    try:
+        volume = int(text)
+    except ValueError:
+        volume = -1
+    if not 0 <= volume <= 100:
+        raise argparse.ArgumentTypeError(f"volume inválido: {text!r} (0 a 100)")
+    return volume
+
+
+def _interval(text: str) -> float:
+    try:
+        seconds = float(text)
+    except ValueError:
+        seconds = 0
+    if not 0.1 <= seconds <= 3600:
+        raise argparse.ArgumentTypeError(f"intervalo inválido: {text!r} (0.1 a 3600 s)")
+    return seconds
+
+
+def _budget(text: str) -> int:
+    try:
+        frames = int(text)
+    except ValueError:
+        frames = 0
+    if not 2 <= frames <= 10000:
+        raise argparse.ArgumentTypeError(f"número de fotogramas inválido: {text!r} (2 a 10000)")
+    return frames
+
+
+def read_playlist(path: Path) -> list[str]:
+    """Entradas de uma playlist de texto/M3U/PLS; caminhos relativos à pasta da playlist."""
+    entries = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if path.suffix.lower() == ".pls":
+                key, _, value = line.partition("=")
+                if not key.lower().startswith("file"):
+                    continue
+                line = value.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "://" not in line and not os.path.isabs(line):
+                line = str(path.parent / line)
+            entries.append(line)
+    return entries
+
+
+def expand_items(items) -> list[str]:
+    """Ficheiros e URLs como estão (caminhos locais absolutos) e playlists expandidas."""
+    paths = []
+    for item in items:
+        if "://" in item:
+            paths.append(item)
+            continue
+        path = Path(item)
+        if path.is_file() and path.suffix.lower() in PLAYLIST_EXTENSIONS:
+            paths.extend(expand_items(read_playlist(path.resolve())))
+        else:
+            paths.append(str(path.resolve()) if path.exists() else item)
+    return paths
+
+
+def build_parser(prog: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description="Leitor de vídeo.")
+    parser.add_argument("items", nargs="*", metavar="FICHEIRO",
+                        help="ficheiros, URLs ou playlists (.m3u, .m3u8, .txt, .pls)")
+    parser.add_argument("-s", "--start", type=parse_time, default=0, metavar="POS",
+                        help="posição inicial do 1.º item, em segundos ou [hh:]mm:ss")
+    parser.add_argument("-r", "--rate", type=_rate, default=None, help="velocidade de reprodução (1 = normal)")
+    parser.add_argument("--volume", type=_volume, default=None, help="volume (0 a 100)")
+    parser.add_argument("--mute", action="store_true", help="sem som")
+    parser.add_argument("--loop", action="store_true", help="repetir a lista (ou o ficheiro) no fim")
+    parser.add_argument("--headless", action="store_true", help="sem janela visível (automação, testes de carga)")
+    parser.add_argument("--exit-at-end", action="store_true", help="terminar no fim da lista")
+    parser.add_argument("--stats-json", metavar="FICHEIRO",
+                        help="escrever o relatório da sessão em JSON ('-' para o stdout)")
+    parser.add_argument("--metrics", metavar="FICHEIRO",
+                        help="exportar as estatísticas de reprodução (.prom: Prometheus; outro: JSONL)")
+    parser.add_argument("--metrics-interval", type=_interval, default=1.0, metavar="S",
+                        help="intervalo de amostragem/exportação das estatísticas, em segundos")
+    parser.add_argument("--stats-overlay", action="store_true", help="mostrar as estatísticas por cima do vídeo")
+    parser.add_argument("--video-callbacks", action="store_true",
+                        help="leitores VLC: desenhar o vídeo a partir de buffers próprios em vez de numa janela "
+                             "nativa (fotogramas acessíveis; funciona com --headless)")
+    parser.add_argument("--frame-budget", type=_budget, default=None, metavar="N",
+                        help="fotogramas descodificados guardados para o passo a passo (por omissão 120)")
+    parser.add_argument("-e", "--enqueue", action="store_true",
+                        help="acrescentar à playlist/fila em vez de tocar já")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="abrir uma janela nova mesmo que o leitor já esteja aberto")
+    return parser
+
+
+def parse_args(argv, prog: str) -> argparse.Namespace:
+    options = build_parser(prog).parse_args(argv)
+    options.paths = expand_items(options.items)
+    # Uma execução automatizada não pode ir parar à janela que o utilizador tem aberta
+    options.forward = not (options.new_instance or options.headless or options.exit_at_end
+                           or options.stats_json or options.metrics)
+    return options
+
+
+def prepare_environment(options):
+    """Ajustes que têm de ser feitos antes de criar a QApplication."""
+    if options.headless:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+
+def _rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((rss if sys.platform == "darwin" else rss * 1024) / 2 ** 20, 1)
+
+
+class PlaybackSession(QtCore.QObject):
+    """Acompanha a reprodução de uma janela: relatório da sessão e saída no fim da lista."""
+
+    def __init__(self, options, window, app, prog: str):
+        super().__init__(window)
+        self.options = options
+        self.window = window
+        self.app = app
+        self.prog = prog
+        self.items = []
+        self._current = None
+        self._written = False
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._started_at = datetime.now().isoformat(timespec="seconds")
+        window.mediaLoading.connect(self._on_loading)
+        window.mediaStarted.connect(self._on_started)
+        window.mediaEnded.connect(self._on_ended)
+        window.mediaFailed.connect(self._on_failed)
+        window.playbackFinished.connect(self._on_finished)
+        app.aboutToQuit.connect(self.write_report)
+
+    def _on_loading(self, source):
+        self._close_current("stopped")
+        self._current = {"source": source, "status": "loading", "open_ms": None, "played_ms": None,
+                         "_loaded": time.perf_counter(), "_started": None}
+        self.items.append(self._current)
+
+    def _on_started(self, source):
+        item = self._current
+        if item is None or item["source"] != source:
+            self._on_loading(source)
+            item = self._current
+        if item["_started"] is None:
+            item["_started"] = time.perf_counter()
+            item["open_ms"] = round((item["_started"] - item["_loaded"]) * 1000, 1)
+            item["status"] = "playing"
+
+    def _on_ended(self, source):
+        if self._current is not None and self._current["source"] == source:
+            self._close_current("ended")
+
+    def _on_failed(self, source, message):
+        if self._current is None or self._current["source"] != source:
+            self._on_loading(source)
+        self._current["error"] = message
+        self._close_current("failed")
+
+    def _close_current(self, status):
+        item, self._current = self._current, None
+        if item is None:
+            return
+        if item["_started"] is not None:
+            item["played_ms"] = round((time.perf_counter() - item["_started"]) * 1000, 1)
+            item["status"] = status
+        else:
+            item["status"] = "failed" if status == "failed" else "not-started"
+
+    def _on_finished(self):
+        self._close_current("ended")
+        if self.options.exit_at_end:
+            # Depois de os sinais pendentes do leitor serem tratados
+            QtCore.QTimer.singleShot(0, self.app.quit)
+
+    def report(self) -> dict:
+        items = [{k: v for k, v in item.items() if not k.startswith("_")} for item in self.items]
+        opened = [i["open_ms"] for i in items if i["open_ms"] is not None]
+        report = {
+            "script": self.prog,
+            "started_at": self._started_at,
+            "options": {k: getattr(self.options, k) for k in
+                        ("start", "rate", "volume", "mute", "loop", "headless", "exit_at_end")},
+            "items": items,
+            "totals": {
+                "items": len(items),
+                "failed": sum(1 for i in items if i["status"] == "failed"),
+                "open_ms_mean": round(sum(opened) / len(opened), 1) if opened else None,
+                "open_ms_max": max(opened) if opened else None,
+                "wall_s": round(time.perf_counter() - self._wall0, 3),
+                "cpu_s": round(time.process_time() - self._cpu0, 3),
+                "peak_rss_mb": _rss_mb(),
+            },
+        }
+        stats = getattr(self.window, "stats", None)
+        if stats is not None:
+            report["playback"] = stats.snapshot()  # contadores e histogramas de playback_stats.py
+        return report
+
+    def write_report(self):
+        if self._written or not self.options.stats_json:
+            return
+        self._written = True
+        self._close_current("stopped")
+        text = json.dumps(self.report(), indent=2, ensure_ascii=False)
+        if self.options.stats_json == "-":
+            print(text, flush=True)
+        else:
+            Path(self.options.stats_json).write_text(text + "\n", encoding="utf-8")
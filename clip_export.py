@@ -0,0 +1,162 @@
+# Exportar um segmento sem recodificar (cortar entre as marcas de entrada e saída)
+# - o ffmpeg copia os pacotes (-c copy) para um contentor novo do mesmo tipo:
+#   o custo é ler e escrever o segmento, não descodificar e codificar — um
+#   segmento de 10 min de um ficheiro de 4 GB demora o tempo de ler ~500 MB
+# - sem recodificar, o segmento só pode começar num keyframe: a marca de
+#   entrada é ajustada ao keyframe anterior (índice de seeking.py) e o ffmpeg
+#   procura a partir daí (-ss antes de -i, só lê o que precisa)
+# - corre num processo à parte (QProcess): o progresso chega pelo -progress do
+#   ffmpeg e a janela continua a responder
+# - escreve para "<nome>.part<ext>" e só renomeia no fim; cancelar apaga o parcial
+
+import os
+import shutil
+import time
+from bisect import bisect_right
+from pathlib import Path
+
+from qt_compat import QtCore, Signal
+
+
+class ExportError(Exception):
+    pass
+
+
+def keyframe_before(times, ms: int) -> int:
+    """Último keyframe em ou antes de `ms` (`ms` se não houver índice)."""
+    if not times:
+        return ms
+    i = bisect_right(times, ms)
+    return times[i - 1] if i else times[0]
+
+
+def default_output(src, start_ms: int, end_ms: int) -> Path:
+    """'filme.mkv' -> 'filme_90s-690s.mkv', na mesma pasta."""
+    src = Path(src)
+    return src.with_name(f"{src.stem}_{start_ms // 1000}s-{end_ms // 1000}s{src.suffix}")
+
+
+def part_path(dst) -> Path:
+    """Ficheiro parcial com a mesma extensão (o ffmpeg escolhe o contentor por ela)."""
+    dst = Path(dst)
+    return dst.with_name(f"{dst.stem}.part{dst.suffix}")
+
+
+def build_command(src, dst, start_ms: int, end_ms: int, ffmpeg: str = "ffmpeg") -> list[str]:
+    """Linha de comandos do ffmpeg que copia [start_ms, end_ms) de `src` para `dst`."""
+    cmd = [ffmpeg, "-hide_banner", "-nostdin", "-v", "error", "-y"]
+    if start_ms > 0:
+        cmd += ["-ss", f"{start_ms / 1000:.3f}"]
+    cmd += ["-i", str(src), "-t", f"{(end_ms - start_ms) / 1000:.3f}",
+            # Vídeo, áudio e legendas; streams de dados (timecode, capítulos) ficam de fora
+            "-map", "0:v?", "-map", "0:a?", "-map", "0:s?", "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            "-progress", "pipe:1", "-nostats", str(dst)]
+    return cmd
+
+
+class ClipExporter(QtCore.QObject):
+    """Um segmento de cada vez, num processo ffmpeg.
+
+    progress(fração, MB/s escritos, fator de tempo real) chega a cada
+    atualização do ffmpeg (~2 por segundo); no fim, completed(destino),
+    cancelled() ou failed(mensagem).
+    """
+
+    progress = Signal(float, float, float)
+    completed = Signal(str)
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self.dst = None
+        self._part = None
+        self._duration_ms = 0
+        self._started = 0.0
+        self._buffer = b""
+        self._fields = {}
+        self._cancelled = False
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None
+
+    def start(self, src, dst, start_ms: int, end_ms: int):
+        if self.running:
+            raise ExportError("Já há uma exportação em curso.")
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            raise ExportError("ffmpeg não encontrado (é preciso para exportar sem recodificar).")
+        if end_ms <= start_ms:
+            raise ExportError("A marca de saída tem de ficar depois da de entrada.")
+        self.dst = Path(dst)
+        self._part = part_path(self.dst)
+        self._duration_ms = end_ms - start_ms
+        self._buffer = b""
+        self._fields = {}
+        self._cancelled = False
+        cmd = build_command(src, self._part, start_ms, end_ms, ffmpeg)
+        self.process = QtCore.QProcess(self)
+        self.process.readyReadStandardOutput.connect(self._on_output)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+        self._started = time.perf_counter()
+        self.process.start(cmd[0], cmd[1:])
+
+    def cancel(self):
+        """Termina o ffmpeg e apaga o parcial (espera pelo fim do processo)."""
+        if self.running:
+            self._cancelled = True
+            process = self.process
+            process.kill()
+            process.waitForFinished(2000)
+
+    def _on_output(self):
+        data = self._buffer + bytes(self.process.readAllStandardOutput())
+        *lines, self._buffer = data.split(b"\n")
+        for line in lines:
+            key, _, value = line.decode("utf-8", "replace").strip().partition("=")
+            self._fields[key] = value
+            # Cada bloco do -progress termina com progress=continue|end
+            if key == "progress":
+                self._report()
+
+    def _report(self):
+        try:
+            # out_time_ms também vem em µs; versões antigas do ffmpeg não têm out_time_us
+            done_ms = int(self._fields.get("out_time_us") or self._fields.get("out_time_ms", "0")) / 1000
+            written = int(self._fields.get("total_size", "0"))
+        except ValueError:
+            return  # "N/A" antes do primeiro pacote
+        elapsed = max(time.perf_counter() - self._started, 1e-6)
+        fraction = min(1.0, done_ms / self._duration_ms) if self._duration_ms else 0.0
+        self.progress.emit(fraction, written / 2 ** 20 / elapsed, done_ms / 1000 / elapsed)
+
+    def _on_finished(self, code, status=None):
+        process, self.process = self.process, None
+        error = bytes(process.readAllStandardError()).decode("utf-8", "replace").strip()
+        process.deleteLater()
+        if self._cancelled or code != 0:
+            try:
+                os.remove(self._part)
+            except OSError:
+                pass
+            if self._cancelled:
+                self.cancelled.emit()
+            else:
+                self.failed.emit(error.splitlines()[-1] if error else f"o ffmpeg terminou com o código {code}")
+            return
+        try:
+            os.replace(self._part, self.dst)
+        except OSError as e:
+            self.failed.emit(str(e))
+            return
+        self.completed.emit(str(self.dst))
+
+    def _on_error(self, error):
+        if error == QtCore.QProcess.FailedToStart and self.process is not None:
+            process, self.process = self.process, None
+            process.deleteLater()
+            self.failed.emit("não foi possível iniciar o ffmpeg")
@@ -0,0 +1,292 @@
+# Folhas de contacto (grelha de N×M fotogramas) para pastas inteiras, sem GUI
+# - cada ficheiro é tratado num processo de um ProcessPoolExecutor; cada
+#   processo tem o seu extrator de fotogramas (o mesmo dos leitores:
+#   QMediaPlayer + QVideoSink em modo offscreen, ou snapshot do libvlc), por
+#   isso o débito cresce com o número de núcleos
+# - tempo máximo por ficheiro: um vídeo que não descodifica não prende o lote
+#   (cada espera do extrator acaba no limite do ficheiro — um QTimer sai do
+#   ciclo de eventos — e o tempo é verificado entre passos; nada é
+#   interrompido por sinais a meio do código Qt)
+# - manifesto em JSON Lines na pasta de destino: cada ficheiro terminado fica
+#   registado logo; ao repetir o comando só os ficheiros em falta (ou
+#   alterados desde então) são processados
+#
+# Execução:
+#  python Video-Viewer-1.py contact-sheets PASTA [-o DESTINO] [--cols 4 --rows 4] [-j 8]
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from library_watcher import VIDEO_EXTENSIONS
+
+MANIFEST_NAME = "contact-sheets.jsonl"
+
+
+class SheetTimeout(Exception):
+    pass
+
+
+# --- Processo de trabalho ---
+_app = None
+_grabber = None
+
+
+def _init_worker(backend: str, width: int):
+    """Cria, uma vez por processo, a aplicação Qt sem ecrã e o extrator."""
+    global _app, _grabber
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # o Ctrl+C é tratado pelo processo principal
+    from PySide6.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication(["contact-sheet"])
+    from thumbnails import QtFrameGrabber, VlcFrameGrabber
+    _grabber = VlcFrameGrabber(width) if backend == "vlc" else QtFrameGrabber(width)
+
+
+def _compose(frames, cols, rows, width, title):
+    """Junta as miniaturas (bytes) numa grelha com uma linha de título."""
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QImage, QPainter, QColor
+
+    images = [QImage.fromData(data) for data in frames]
+    cell_h = max((img.height() for img in images if not img.isNull()), default=width * 9 // 16)
+    gap, header = 4, 24
+    sheet = QImage(cols * (width + gap) + gap, header + rows * (cell_h + gap) + gap, QImage.Format_RGB32)
+    sheet.fill(QColor(20, 20, 20))
+    painter = QPainter(sheet)
+    painter.setPen(QColor(230, 230, 230))
+    painter.drawText(gap, 0, sheet.width() - 2 * gap, header, Qt.AlignVCenter | Qt.AlignLeft, title)
+    for i, img in enumerate(images):
+        if img.isNull():
+            continue
+        x = gap + (i % cols) * (width + gap)
+        y = header + gap + (i // cols) * (cell_h + gap)
+        painter.drawImage(x, y + (cell_h - img.height()) // 2, img)
+    painter.end()
+    return sheet
+
+
+def make_sheet(path: str, output: str, cols: int, rows: int, width: int, timeout_s: float) -> dict:
+    """Gera a folha de contacto de `path` em `output` (corre no processo de trabalho)."""
+    deadline = time.monotonic() + timeout_s
+
+    def check_time():
+        if time.monotonic() >= deadline:
+            raise SheetTimeout()
+
+    # Nenhuma espera do extrator passa do limite do ficheiro
+    _grabber.deadline = deadline
+    try:
+        opened = _grabber.open(path)
+        check_time()
+        if not opened:
+            return {"status": "error", "error": "não foi possível abrir o ficheiro"}
+        duration = _grabber.duration_ms()
+        check_time()
+        if duration <= 0:
+            return {"status": "error", "error": "duração desconhecida"}
+        count = cols * rows
+        frames = []
+        for i in range(count):
+            # Instantes no meio de cada fatia: evita o fotograma preto inicial
+            data = _grabber.grab(int(duration * (i + 0.5) / count))
+            check_time()
+            frames.append(data or b"")
+        if not any(frames):
+            return {"status": "error", "error": "nenhum fotograma descodificado"}
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        sheet = _compose(frames, cols, rows, width, f"{Path(path).name}  ·  {_format_ms(duration)}")
+        if not sheet.save(output, None, 85):
+            return {"status": "error", "error": f"não foi possível gravar {output}"}
+        return {"status": "ok", "output": output, "frames": sum(1 for f in frames if f),
+                "duration_ms": duration}
+    except SheetTimeout:
+        return {"status": "timeout", "error": f"mais de {timeout_s:g}s"}
+    finally:
+        _grabber.deadline = None
+        _grabber.source = None  # o próximo ficheiro volta a abrir o leitor do zero
+
+
+def _job(path, output, cols, rows, width, timeout_s):
+    started = time.monotonic()
+    try:
+        result = make_sheet(path, output, cols, rows, width, timeout_s)
+    except Exception as e:
+        result = {"status": "error", "error": str(e)}
+    result["seconds"] = round(time.monotonic() - started, 3)
+    return result
+
+
+def _format_ms(ms):
+    s = ms // 1000
+    h, m = divmod(s // 60, 60)
+    return f"{h:d}:{m:02d}:{s % 60:02d}" if h else f"{m:02d}:{s % 60:02d}"
+
+
+# --- Processo principal ---
+class Manifest:
+    """Registo dos ficheiros tratados (JSON Lines, uma linha por ficheiro terminado)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # última linha cortada por uma interrupção
+                    self.entries[entry["path"]] = entry
+        self._file = None
+
+    def is_done(self, path: str, st) -> bool:
+        entry = self.entries.get(path)
+        return (entry is not None and entry.get("status") == "ok"
+                and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns
+                and os.path.exists(entry.get("output", "")))
+
+    def record(self, entry: dict):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self.entries[entry["path"]] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def find_videos(sources, recursive: bool = True):
+    for source in sources:
+        source = Path(source)
+        if source.is_file():
+            yield source.resolve()
+            continue
+        pattern = "**/*" if recursive else "*"
+        for p in sorted(source.glob(pattern)):
+            if p.suffix.lower() in VIDEO_EXTENSIONS and p.is_file():
+                yield p.resolve()
+
+
+def sheet_path(video: Path, sources, out_dir: Path) -> Path:
+    """Destino da folha, a espelhar a estrutura de pastas de origem.
+
+    A extensão do vídeo fica no nome (clip.mp4.jpg), para clip.mp4 e clip.mkv
+    da mesma pasta não darem a mesma folha.
+    """
+    for source in map(lambda s: Path(s).resolve(), sources):
+        if source.is_dir() and video.is_relative_to(source):
+            rel = video.relative_to(source)
+            return out_dir / rel.with_name(rel.name + ".jpg")
+    return out_dir / (video.name + ".jpg")
+
+
+def run(sources, out_dir, cols=4, rows=4, width=320, workers=None, timeout_s=60.0,
+        backend="qt", recursive=True, force=False, progress=print) -> dict:
+    out_dir = Path(out_dir).resolve()
+    manifest = Manifest(out_dir / MANIFEST_NAME)
+    jobs = []
+    skipped = 0
+    outputs: dict[Path, Path] = {}  # destino -> vídeo
+    jobs_seen = set()
+    clashes = []
+    for video in find_videos(sources, recursive):
+        output = sheet_path(video, sources, out_dir)
+        first = outputs.setdefault(output, video)
+        if first != video:
+            # Dois vídeos com o mesmo destino (p.ex. o mesmo nome vindo de pastas
+            # diferentes): só o primeiro é tratado, o outro fica registado como erro
+            clashes.append((output, video))
+            continue
+        if output in jobs_seen:
+            continue  # o mesmo ficheiro indicado duas vezes
+        jobs_seen.add(output)
+        st = video.stat()
+        if not force and manifest.is_done(str(video), st):
+            skipped += 1
+            continue
+        jobs.append((video, st, output))
+    counts = {"ok": 0, "error": 0, "timeout": 0, "skipped": skipped}
+    for output, video in clashes:
+        st = video.stat()
+        manifest.record({"path": str(video), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "status": "error",
+                         "error": f"mesmo destino que {outputs[output]}: {output}"})
+        counts["error"] += 1
+        progress(f"{'error':<7} {video.name}  mesmo destino que {outputs[output]}")
+    if not jobs:
+        manifest.close()
+        progress(f"Nada a fazer ({skipped} já feitas).")
+        return counts
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    progress(f"{len(jobs)} vídeos, {workers} processos ({skipped} já feitas).")
+    started = time.monotonic()
+    # "spawn": cada processo arranca limpo, sem herdar o estado Qt do processo principal
+    ctx = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker, initargs=(backend, width))
+    interrupted = False
+    try:
+        futures = {
+            pool.submit(_job, str(video), str(output), cols, rows, width, timeout_s): (video, st)
+            for video, st, output in jobs
+        }
+        for n, future in enumerate(as_completed(futures), 1):
+            video, st = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # processo de trabalho terminou de forma anormal
+                result = {"status": "error", "error": str(e)}
+            entry = {"path": str(video), "size": st.st_size, "mtime_ns": st.st_mtime_ns, **result}
+            manifest.record(entry)
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            detail = result.get("output") or result.get("error", "")
+            progress(f"[{n}/{len(jobs)}] {result['status']:<7} {video.name}  {detail}")
+    except KeyboardInterrupt:
+        progress("Interrompido: o manifesto permite retomar mais tarde.")
+        interrupted = True
+        raise
+    finally:
+        pool.shutdown(wait=not interrupted, cancel_futures=True)
+        manifest.close()
+    elapsed = time.monotonic() - started
+    counts["seconds"] = round(elapsed, 2)
+    counts["files_per_second"] = round(len(jobs) / elapsed, 3) if elapsed else 0.0
+    progress(f"Concluído em {elapsed:.1f}s: {counts['ok']} ok, {counts['error']} erros, "
+             f"{counts['timeout']} fora de tempo ({counts['files_per_second']} ficheiros/s).")
+    return counts
+
+
+def cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="contact-sheets", description="Gera folhas de contacto (grelhas de fotogramas) sem abrir a janela.")
+    parser.add_argument("sources", nargs="+", help="ficheiros de vídeo ou pastas")
+    parser.add_argument("-o", "--output", default="contact-sheets", help="pasta de destino (e do manifesto)")
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--width", type=int, default=320, help="largura de cada fotograma (px)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="processos (por omissão, um por núcleo)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="tempo máximo por ficheiro (s)")
+    parser.add_argument("--backend", choices=("qt", "vlc"), default="qt")
+    parser.add_argument("--no-recursive", action="store_true", help="não entrar nas subpastas")
+    parser.add_argument("--force", action="store_true", help="refazer mesmo o que o manifesto dá como feito")
+    args = parser.parse_args(argv)
+    try:
+        counts = run(args.sources, args.output, args.cols, args.rows, args.width, args.workers,
+                     args.timeout, args.backend, not args.no_recursive, args.force)
+    except KeyboardInterrupt:
+        return 130
+    return 0 if counts["error"] == 0 and counts["timeout"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,162 @@
+# Cópia de ficheiros grandes para "Guardar" / "Guardar como…"
+# - corre numa thread de trabalho (a janela continua a responder)
+# - usa cópia no kernel (os.copy_file_range / os.sendfile) quando existe, sem
+#   passar os dados pelo Python; caso contrário lê/escreve em blocos
+# - escreve para "<destino>.part"; uma cópia interrompida é retomada depois de
+#   verificar, bloco a bloco, o que já foi escrito
+# - pode ser cancelada entre blocos
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from qt_compat import QtCore, Signal
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+def _part_paths(dst: Path):
+    return dst.with_name(dst.name + ".part"), dst.with_name(dst.name + ".part.json")
+
+
+def _source_signature(src: Path, chunk_size: int) -> dict:
+    st = src.stat()
+    return {"source": str(src.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunk_size": chunk_size}
+
+
+def _verified_length(fin, fout, length: int, chunk_size: int, cancel) -> int:
+    """Quantos bytes do ficheiro parcial coincidem com a origem (em blocos inteiros)."""
+    done = 0
+    while done < length:
+        if cancel is not None and cancel.is_set():
+            raise CopyCancelled()
+        n = min(chunk_size, length - done)
+        fin.seek(done)
+        fout.seek(done)
+        if fin.read(n) != fout.read(n):
+            break
+        done += n
+    return done
+
+
+def _copy_range(fin, fout, offset: int, count: int, buf: memoryview) -> int:
+    """Copia até `count` bytes a partir de `offset`; devolve quantos foram copiados."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            return os.copy_file_range(fin.fileno(), fout.fileno(), count, offset, offset)
+        except OSError:
+            pass  # p.ex. sistemas de ficheiros diferentes em kernels antigos
+    if hasattr(os, "sendfile") and os.name == "posix":
+        try:
+            os.lseek(fout.fileno(), offset, os.SEEK_SET)
+            return os.sendfile(fout.fileno(), fin.fileno(), offset, count)
+        except OSError:
+            pass  # no macOS o sendfile só escreve para sockets
+    fin.seek(offset)
+    fout.seek(offset)
+    n = fin.readinto(buf[:count])
+    if n:
+        fout.write(buf[:n])
+    return n or 0
+
+
+def copy_file(src, dst, progress=None, cancel: threading.Event | None = None,
+              chunk_size: int = CHUNK_SIZE, resume: bool = True) -> int:
+    """Copia `src` para `dst` e devolve o número de bytes copiados nesta execução.
+
+    `progress(done, total)` é chamado depois de cada bloco. Se `cancel` for
+    ativado a cópia pára com CopyCancelled e o ficheiro parcial fica disponível
+    para ser retomado.
+    """
+    src, dst = Path(src), Path(dst)
+    part, meta = _part_paths(dst)
+    signature = _source_signature(src, chunk_size)
+    total = signature["size"]
+
+    start = 0
+    if resume and part.exists():
+        try:
+            if json.loads(meta.read_text(encoding="utf-8")) == signature:
+                start = min(part.stat().st_size, total)
+        except (OSError, ValueError):
+            start = 0
+    if start == 0:
+        meta.write_text(json.dumps(signature), encoding="utf-8")
+
+    buf = memoryview(bytearray(chunk_size))
+    with open(src, "rb") as fin, open(part, "r+b" if start else "wb") as fout:
+        if start:
+            # Retomar: confirmar o que já está escrito e continuar do primeiro bloco diferente
+            start = _verified_length(fin, fout, start, chunk_size, cancel)
+            fout.truncate(start)
+        done = start
+        if progress:
+            progress(done, total)
+        while done < total:
+            if cancel is not None and cancel.is_set():
+                raise CopyCancelled()
+            n = _copy_range(fin, fout, done, min(chunk_size, total - done), buf)
+            if n <= 0:
+                raise OSError(f"Leitura interrompida em {done} de {total} bytes: {src}")
+            done += n
+            if progress:
+                progress(done, total)
+        fout.flush()
+        os.fsync(fout.fileno())
+
+    shutil.copystat(src, part)
+    os.replace(part, dst)
+    meta.unlink(missing_ok=True)
+    return total - start
+
+
+class CopyWorker(QtCore.QThread):
+    """Executa copy_file numa thread e reporta progresso, débito e tempo restante."""
+
+    # Tamanhos como `object`: ficheiros acima de 2 GB não cabem num int de 32 bits do Qt
+    progress = Signal(object, object, float, float)  # feito, total, bytes/s, ETA (s)
+    completed = Signal(str)
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(self, src, dst, parent=None):
+        super().__init__(parent)
+        self.src = Path(src)
+        self.dst = Path(dst)
+        self._cancel = threading.Event()
+        self._last = None
+        self._rate = 0.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _on_progress(self, done, total):
+        now = time.monotonic()
+        if self._last is None:
+            self._last = (now, done)
+            self.progress.emit(done, total, 0.0, -1.0)
+            return
+        t0, d0 = self._last
+        if now - t0 >= 0.5 or done == total:
+            # Média exponencial do débito para um ETA estável
+            rate = (done - d0) / max(now - t0, 1e-6)
+            self._rate = rate if self._rate == 0 else 0.7 * self._rate + 0.3 * rate
+            self._last = (now, done)
+            eta = (total - done) / self._rate if self._rate > 0 else -1.0
+            self.progress.emit(done, total, self._rate, eta)
+
+    def run(self):
+        try:
+            copy_file(self.src, self.dst, progress=self._on_progress, cancel=self._cancel)
+            self.completed.emit(str(self.dst))
+        except CopyCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
@@ -0,0 +1,508 @@
+# Fila de exportações em lote (vários segmentos de um ficheiro, o mesmo corte
+# em todos os itens da lista de reprodução)
+# - cada tarefa corre num processo de um ProcessPoolExecutor ("spawn"); o
+#   processo só lança o ffmpeg (cópia de pacotes, como em clip_export.py) e
+#   mede o débito — este módulo não importa o Qt, por isso os processos de
+#   trabalho arrancam depressa e ocupam pouca memória
+# - quantas tarefas correm ao mesmo tempo (concurrency) muda-se com a fila a
+#   funcionar; na espera, maior prioridade primeiro e, com a mesma, pela
+#   ordem de chegada
+# - diário em JSON Lines (um por leitor): cada alteração é registada (com
+#   fsync) antes de ter efeito; ao abrir, as tarefas por terminar — incluindo
+#   as que estavam a correr quando o programa fechou ou caiu — voltam à fila
+#   e os parciais delas são apagados
+# - cada tarefa concluída regista MB/s, fator de tempo real e quantas tarefas
+#   corriam em paralelo: throughput() resume-os por número de processos
+# - "concat": cada segmento é cortado para um parcial e os parciais são
+#   juntados com o demuxer concat do ffmpeg (-c copy, sem recodificar)
+
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trinco; use uma fila por instância
+    fcntl = None
+
+DEFAULT_JOURNAL_DIR = Path.home() / ".cache" / "video-viewer"
+COMPACT_AFTER = 1000  # linhas acrescentadas ao diário antes de o reescrever
+KEEP_FINISHED = 200   # tarefas terminadas mantidas ao reescrever (para throughput())
+MAX_ATTEMPTS = 3      # tentativas de uma tarefa cujo processo morreu
+UNFINISHED = ("pending", "running")
+
+
+class QueueLocked(Exception):
+    pass
+
+
+def journal_path(name: str, journal_dir=DEFAULT_JOURNAL_DIR) -> Path:
+    return Path(journal_dir) / f"export-queue-{name}.jsonl"
+
+
+def concat_output(src, count: int) -> Path:
+    """'filme.mkv' -> 'filme_3-segmentos.mkv', na mesma pasta."""
+    src = Path(src)
+    return src.with_name(f"{src.stem}_{count}-segmentos{src.suffix}")
+
+
+# --- Processo de trabalho ---
+_proc = None
+
+
+def _init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # o Ctrl+C é tratado pelo processo principal
+    signal.signal(signal.SIGTERM, _on_term)
+
+
+def _on_term(signum, frame):
+    # Ao fechar o leitor: termina o ffmpeg em curso em vez de o deixar órfão
+    if _proc is not None:
+        _proc.kill()
+    os._exit(1)
+
+
+def _run(cmd):
+    global _proc
+    _proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, text=True, errors="replace")
+    _, error = _proc.communicate()
+    code, _proc = _proc.returncode, None
+    if code != 0:
+        error = error.strip()
+        raise RuntimeError(error.splitlines()[-1] if error else f"o ffmpeg terminou com o código {code}")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def run_job(plan: dict) -> dict:
+    """Executa o plano de uma tarefa (ver ExportQueue._plan) e devolve as medições."""
+    t0 = time.perf_counter()
+    try:
+        for path, text in plan["write"]:
+            Path(path).write_text(text, encoding="utf-8")
+        for cmd in plan["steps"]:
+            _run(cmd)
+        os.replace(plan["part"], plan["output"])
+    except (RuntimeError, OSError) as e:
+        _remove(plan["part"])
+        return {"error": str(e)}
+    finally:
+        for path in plan["temps"]:
+            _remove(path)
+    wall = max(time.perf_counter() - t0, 1e-6)
+    size_mb = os.path.getsize(plan["output"]) / 2 ** 20
+    return {"wall_s": round(wall, 3), "size_mb": round(size_mb, 2),
+            "mb_per_s": round(size_mb / wall, 1), "realtime": round(plan["seconds"] / wall, 1)}
+
+
+def _concat_line(path) -> str:
+    # Sintaxe do demuxer concat: aspas simples, com ' escrito como '\''
+    return "file '" + str(path).replace("'", "'\\''") + "'\n"
+
+
+# --- Processo principal ---
+class ExportQueue:
+    """Fila persistente de exportações sem recodificar.
+
+    As tarefas são dicionários (id, kind, source, segments, output, priority,
+    status, ...). `listeners` são chamados com uma cópia da tarefa a cada
+    mudança de estado (exceto as entradas de add_cuts), na thread da fila ou
+    do executor — as janelas passam a chamada para a thread da GUI com um sinal.
+    """
+
+    def __init__(self, name: str, concurrency: int = 2, journal_dir=DEFAULT_JOURNAL_DIR):
+        self.path = journal_path(name, journal_dir)
+        self.concurrency = max(1, concurrency)
+        self.listeners = []
+        self.jobs: dict[str, dict] = {}
+        self._heap = []
+        self._running = {}  # id -> conjunto de processos onde corre
+        self._pool = None
+        self._pool_size = 0
+        self._retired = []  # conjuntos substituídos ao aumentar a concorrência
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._file = None
+        self._lines = 0
+        self._created = 0.0
+        self._lock = self._acquire_lock()
+        try:
+            self._load()
+        except BaseException:
+            self._lock.close()
+            raise
+        self._thread = threading.Thread(target=self._dispatch, name="export-queue", daemon=True)
+        self._thread.start()
+
+    # --- Diário ---
+    def _acquire_lock(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock = open(self.path.with_suffix(".lock"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                raise QueueLocked(f"A fila de exportação {self.path} está a ser usada por outro leitor.")
+        return lock
+
+    def _load(self):
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._replay(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue  # última linha cortada por uma interrupção
+        for job in self.jobs.values():
+            if job["status"] == "running":
+                # Interrompida: o processo principal terminou antes do fim
+                self._cleanup(job)
+                job["attempts"] += 1
+                job["status"] = "pending" if job["attempts"] < MAX_ATTEMPTS else "failed"
+                if job["status"] == "failed":
+                    job["error"] = "interrompida demasiadas vezes"
+            if job["status"] == "pending":
+                self._heap.append(self._key(job))
+        heapq.heapify(self._heap)
+        self._compact()
+
+    def _replay(self, event):
+        op = event["op"]
+        if op == "add":
+            self.jobs[event["job"]["id"]] = event["job"]
+            return
+        if op == "concurrency":
+            self.concurrency = event["value"]
+            return
+        job = self.jobs[event["id"]]
+        if op == "start":
+            job.update(status="running", busy=event["busy"])
+        elif op == "done":
+            job.update(status="done", result=event["result"])
+        elif op == "failed":
+            job.update(status="failed", error=event["error"])
+        elif op == "cancelled":
+            job["status"] = "cancelled"
+        elif op == "retry":
+            job.update(status="pending", attempts=event["attempts"], error=None)
+        elif op == "priority":
+            job["priority"] = event["priority"]
+
+    def _compact(self):
+        """Reescreve o diário só com o estado atual (troca atómica)."""
+        finished = [j for j in self.jobs.values() if j["status"] not in UNFINISHED]
+        finished.sort(key=lambda j: j["created"])
+        for job in finished[:-KEEP_FINISHED or None]:
+            del self.jobs[job["id"]]
+        if self._file is not None:
+            self._file.close()
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "concurrency", "value": self.concurrency}) + "\n")
+            for job in sorted(self.jobs.values(), key=lambda j: j["created"]):
+                f.write(json.dumps({"op": "add", "job": job}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lines = 0
+
+    def _log(self, *events):
+        for event in events:
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._lines += len(events)
+        if self._lines >= COMPACT_AFTER and not self._running:
+            self._compact()
+
+    # --- Tarefas ---
+    def add_cut(self, source, start_ms: int, end_ms: int, output=None, priority: int = 0) -> dict:
+        """Um segmento para um ficheiro (por omissão 'filme_90s-690s.mkv')."""
+        from clip_export import default_output
+        job = self._job("cut", source, [(start_ms, end_ms)], output or default_output(source, start_ms, end_ms),
+                        priority)
+        self._enqueue([job], strict=True)
+        return job
+
+    def add_cuts(self, sources, start_ms: int, end_ms: int, out_dir, priority: int = 0) -> int:
+        """O mesmo segmento de vários ficheiros, para uma pasta (uma só escrita no diário).
+
+        Devolve quantas tarefas entraram; destinos já na fila são ignorados.
+        """
+        from clip_export import default_output
+        out_dir = Path(out_dir)
+        jobs = [self._job("cut", src, [(start_ms, end_ms)], out_dir / default_output(src, start_ms, end_ms).name,
+                          priority) for src in sources]
+        return self._enqueue(jobs, strict=False)
+
+    def add_concat(self, source, segments, output=None, priority: int = 0) -> dict:
+        """Vários segmentos do mesmo ficheiro, juntados por ordem num só."""
+        if not segments:
+            raise ValueError("sem segmentos")
+        job = self._job("concat", source, segments, output or concat_output(source, len(segments)), priority)
+        self._enqueue([job], strict=True)
+        return job
+
+    def _job(self, kind, source, segments, output, priority) -> dict:
+        from clip_export import ExportError
+        if any(end <= start for start, end in segments):
+            raise ExportError("A marca de saída tem de ficar depois da de entrada.")
+        # Estritamente crescente: em lote, a ordem de chegada é a ordem da lista
+        self._created = max(time.time(), self._created + 1e-6)
+        return {"id": uuid.uuid4().hex[:12], "kind": kind, "source": str(Path(source).resolve()),
+                "segments": [[int(s), int(e)] for s, e in segments], "output": str(Path(output).resolve()),
+                "priority": int(priority), "created": self._created, "status": "pending",
+                "attempts": 0, "busy": None, "result": None, "error": None}
+
+    def _enqueue(self, jobs, strict: bool) -> int:
+        from clip_export import ExportError
+        if not shutil.which("ffmpeg"):
+            raise ExportError("ffmpeg não encontrado (é preciso para exportar sem recodificar).")
+        with self._cond:
+            taken = {j["output"] for j in self.jobs.values() if j["status"] in UNFINISHED}
+            accepted = []
+            for job in jobs:
+                if job["output"] in taken:
+                    if strict:
+                        raise ExportError(f"Já há uma exportação para {job['output']} na fila.")
+                    continue
+                taken.add(job["output"])
+                accepted.append(job)
+            self._log(*({"op": "add", "job": job} for job in accepted))
+            for job in accepted:
+                self.jobs[job["id"]] = job
+                heapq.heappush(self._heap, self._key(job))
+            self._cond.notify()
+        if len(accepted) == 1:  # em lote quem acrescenta dá a notícia (não uma por tarefa)
+            self._notify(accepted[0])
+        return len(accepted)
+
+    def cancel(self, job_id: str) -> bool:
+        """Retira da fila uma tarefa à espera (as que já correm vão até ao fim)."""
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != "pending":
+                return False
+            self._log({"op": "cancelled", "id": job_id})
+            job["status"] = "cancelled"
+            self._rebuild_heap()
+        self._notify(job)
+        return True
+
+    def cancel_pending(self) -> int:
+        with self._cond:
+            pending = [j["id"] for j in self.jobs.values() if j["status"] == "pending"]
+        return sum(self.cancel(job_id) for job_id in pending)
+
+    def retry(self, job_id: str) -> bool:
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] not in ("failed", "cancelled"):
+                return False
+            self._log({"op": "retry", "id": job_id, "attempts": 0})
+            job.update(status="pending", attempts=0, error=None)
+            heapq.heappush(self._heap, self._key(job))
+            self._cond.notify()
+        self._notify(job)
+        return True
+
+    def set_priority(self, job_id: str, priority: int):
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != "pending":
+                return
+            self._log({"op": "priority", "id": job_id, "priority": int(priority)})
+            job["priority"] = int(priority)
+            self._rebuild_heap()
+
+    def set_concurrency(self, n: int):
+        """Número máximo de exportações em paralelo (guardado no diário)."""
+        with self._cond:
+            self.concurrency = max(1, int(n))
+            self._log({"op": "concurrency", "value": self.concurrency})
+            self._cond.notify()
+
+    @staticmethod
+    def _key(job):
+        return (-job["priority"], job["created"], job["id"])
+
+    def _rebuild_heap(self):
+        self._heap = [self._key(j) for j in self.jobs.values() if j["status"] == "pending"]
+        heapq.heapify(self._heap)
+
+    # --- Execução ---
+    def _plan(self, job) -> dict:
+        """Comandos de uma tarefa, montados aqui para o processo de trabalho não importar o Qt."""
+        from clip_export import build_command, part_path
+        ffmpeg = shutil.which("ffmpeg") or "ffmpeg"
+        output = Path(job["output"])
+        part = part_path(output)
+        seconds = sum(end - start for start, end in job["segments"]) / 1000
+        plan = {"output": str(output), "part": str(part), "seconds": seconds, "write": [], "temps": []}
+        if job["kind"] == "cut":
+            start, end = job["segments"][0]
+            plan["steps"] = [build_command(job["source"], part, start, end, ffmpeg)]
+            return plan
+        pieces = [output.with_name(f"{output.stem}.part{i}{output.suffix}") for i in range(len(job["segments"]))]
+        listing = output.with_name(f"{output.stem}.part.txt")
+        plan["steps"] = [build_command(job["source"], piece, start, end, ffmpeg)
+                         for piece, (start, end) in zip(pieces, job["segments"])]
+        plan["steps"].append([ffmpeg, "-hide_banner", "-nostdin", "-v", "error", "-y",
+                              "-f", "concat", "-safe", "0", "-i", str(listing),
+                              "-map", "0", "-c", "copy", str(part)])
+        plan["write"] = [(str(listing), "".join(_concat_line(p) for p in pieces))]
+        plan["temps"] = [str(p) for p in pieces] + [str(listing)]
+        return plan
+
+    def _cleanup(self, job):
+        plan = self._plan(job)
+        for path in [plan["part"], *plan["temps"]]:
+            _remove(path)
+
+    def _executor(self):
+        if self._pool is None or self._pool_size < self.concurrency:
+            if self._pool is not None:
+                # As tarefas em curso acabam no conjunto antigo
+                self._pool.shutdown(wait=False)
+                self._retired.append(self._pool)
+            self._pool_size = self.concurrency
+            self._pool = ProcessPoolExecutor(self._pool_size, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker)
+        return self._pool
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._stopping and not (self._heap and len(self._running) < self.concurrency):
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                job = self.jobs[heapq.heappop(self._heap)[2]]
+                if job["status"] != "pending":
+                    continue
+                busy = len(self._running) + 1
+                self._log({"op": "start", "id": job["id"], "busy": busy})
+                job.update(status="running", busy=busy)
+                pool = self._executor()
+                future = pool.submit(run_job, self._plan(job))
+                self._running[job["id"]] = pool
+            self._notify(job)
+            future.add_done_callback(lambda f, job_id=job["id"]: self._finished(job_id, f))
+
+    def _finished(self, job_id, future):
+        with self._cond:
+            pool = self._running.pop(job_id, None)
+            if self._stopping:
+                return  # fica "running" no diário: é retomada na próxima vez
+            job = self.jobs[job_id]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # Um processo de trabalho morreu: as tarefas do conjunto voltam à fila
+                if pool is self._pool:
+                    self._retired.append(pool)
+                    self._pool = None
+                self._cleanup(job)
+                if job["attempts"] + 1 < MAX_ATTEMPTS:
+                    self._log({"op": "retry", "id": job_id, "attempts": job["attempts"] + 1})
+                    job.update(status="pending", attempts=job["attempts"] + 1)
+                    heapq.heappush(self._heap, self._key(job))
+                    result = None
+                else:
+                    result = {"error": "o processo de exportação terminou inesperadamente"}
+            except Exception as e:
+                result = {"error": str(e) or type(e).__name__}
+            if result is not None and "error" in result:
+                self._log({"op": "failed", "id": job_id, "error": result["error"]})
+                job.update(status="failed", error=result["error"])
+            elif result is not None:
+                self._log({"op": "done", "id": job_id, "result": result})
+                job.update(status="done", result=result)
+            self._cond.notify()
+        self._notify(job)
+
+    def _notify(self, job):
+        for listener in list(self.listeners):
+            listener(dict(job))
+
+    # --- Estado ---
+    def counts(self) -> dict:
+        counts = dict.fromkeys(("running", "pending", "done", "failed", "cancelled"), 0)
+        with self._cond:
+            for job in self.jobs.values():
+                counts[job["status"]] += 1
+        return counts
+
+    def summary(self) -> str:
+        c = self.counts()
+        parts = [f"{c['running']} a exportar"] if c["running"] else []
+        if c["pending"]:
+            parts.append(f"{c['pending']} em espera")
+        if c["failed"]:
+            parts.append(f"{c['failed']} com erro")
+        return "Fila de exportação: " + (", ".join(parts) or "vazia")
+
+    def throughput(self) -> dict:
+        """Mediana de MB/s e de tempo real por número de exportações em paralelo."""
+        by_busy = {}
+        with self._cond:
+            for job in self.jobs.values():
+                if job["status"] == "done" and job.get("busy"):
+                    by_busy.setdefault(job["busy"], []).append(job["result"])
+        return {busy: {"jobs": len(results),
+                       "mb_per_s": statistics.median(r["mb_per_s"] for r in results),
+                       "realtime": statistics.median(r["realtime"] for r in results)}
+                for busy, results in sorted(by_busy.items())}
+
+    @staticmethod
+    def describe(job: dict) -> str:
+        name = Path(job["output"]).name
+        status = job["status"]
+        if status == "done":
+            r = job["result"]
+            return f"{name} exportado ({r['mb_per_s']:.0f} MB/s, {r['realtime']:.0f}× o tempo real)"
+        if status == "failed":
+            return f"Falha ao exportar {name}: {job['error']}"
+        if status == "running":
+            return f"A exportar {name}…"
+        if status == "cancelled":
+            return f"{name} retirado da fila"
+        return f"{name} na fila"
+
+    def shutdown(self):
+        """Pára a fila; as exportações em curso são interrompidas e retomadas na próxima vez."""
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+        for pool in [*self._retired, self._pool]:
+            if pool is None:
+                continue
+            # Sem isto, o fim do interpretador esperaria pelo fim de cada ffmpeg
+            for process in list((getattr(pool, "_processes", None) or {}).values()):
+                process.terminate()
+            pool.shutdown(wait=True, cancel_futures=True)
+        with self._cond:
+            self._file.close()
+        self._lock.close()
@@ -0,0 +1,273 @@
+# Avançar/recuar fotograma a fotograma sem voltar a descodificar
+# - FrameRing guarda os últimos fotogramas descodificados, por ordem de PTS,
+#   limitado por um orçamento de fotogramas (e de bytes): o mais antigo sai
+# - em pausa, recuar ou avançar dentro do anel é só voltar a mostrar um
+#   fotograma já descodificado — custo de descodificação zero
+# - fora do anel: avançar deixa o leitor tocar (sem som) até chegar o
+#   fotograma seguinte e pausa — descodifica só esse, sem seek; recuar faz um
+#   seek normal, a partir do keyframe anterior; no fim do ficheiro não há
+#   avanço, e um avanço sem fotograma em ADVANCE_TIMEOUT_MS é abandonado
+# - Qt: os fotogramas chegam por QVideoSink.videoFrameChanged (thread de
+#   renderização) e voltam ao ecrã por QVideoSink.setVideoFrame; as cópias são
+#   superficiais (o QVideoFrame partilha o buffer, sem copiar píxeis); com
+#   descodificação na GPU o anel guarda no máximo GPU_FRAME_BUDGET, para não
+#   prender as poucas superfícies do descodificador (copiar cada fotograma
+#   para a RAM custaria uma leitura da GPU por fotograma)
+# - só conta como vizinho um fotograma a menos de 1,5 intervalos: um
+#   fotograma que não chegou ao sink (descartado) obriga a um seek, em vez de
+#   ser saltado em silêncio
+
+import statistics
+import threading
+from bisect import bisect_left, bisect_right
+
+from qt_compat import QtCore, Signal
+
+DEFAULT_FRAME_BUDGET = 120           # ~5 s a 24 fps; 1080p em NV12 são ~3 MB por fotograma
+DEFAULT_BYTE_BUDGET = 1024 * 2 ** 20  # teto para vídeos grandes (120 fotogramas 4K em RGB32 são ~4 GB)
+GPU_FRAME_BUDGET = 16
+MAX_GAP_US = 1_000_000                # um salto maior no PTS é um seek: o anel recomeça
+ADVANCE_TIMEOUT_MS = 2000             # avançar fora do anel: desistir se nenhum fotograma chegar
+
+
+class FrameRing:
+    """Últimos fotogramas descodificados, por ordem de PTS (µs).
+
+    Acrescentados na thread de descodificação/renderização e lidos na da
+    interface (com lock). Os fotogramas são objetos opacos; `nbytes` é o que
+    cada um conta para o orçamento de bytes.
+    """
+
+    def __init__(self, max_frames: int = DEFAULT_FRAME_BUDGET, max_bytes: int = DEFAULT_BYTE_BUDGET):
+        self.max_frames = max(2, max_frames)
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._pts = []
+        self._frames = []  # (fotograma, nbytes), paralela a _pts
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pts)
+
+    def set_budget(self, max_frames: int):
+        with self._lock:
+            self.max_frames = max(2, max_frames)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._pts.clear()
+            self._frames.clear()
+            self.nbytes = 0
+
+    def push(self, pts_us: int, frame, nbytes: int) -> bool:
+        """Acrescenta um fotograma; devolve True se o anel recomeçou (seek)."""
+        with self._lock:
+            restarted = bool(self._pts) and not 0 < pts_us - self._pts[-1] <= MAX_GAP_US
+            if restarted:
+                if pts_us == self._pts[-1]:
+                    return False  # o mesmo fotograma outra vez (p.ex. ao pausar)
+                self._pts.clear()
+                self._frames.clear()
+                self.nbytes = 0
+            self._pts.append(pts_us)
+            self._frames.append((frame, nbytes))
+            self.nbytes += nbytes
+            self._evict()
+            return restarted
+
+    def _evict(self):
+        while len(self._pts) > self.max_frames or (self.nbytes > self.max_bytes and len(self._pts) > 1):
+            del self._pts[0]
+            _, nbytes = self._frames.pop(0)
+            self.nbytes -= nbytes
+
+    def last(self):
+        """(pts, fotograma) mais recente, ou None."""
+        with self._lock:
+            return (self._pts[-1], self._frames[-1][0]) if self._pts else None
+
+    def step_us(self) -> int | None:
+        """Intervalo típico entre fotogramas (mediana), ou None com menos de 2."""
+        with self._lock:
+            if len(self._pts) < 2:
+                return None
+            return int(statistics.median(b - a for a, b in zip(self._pts, self._pts[1:])))
+
+    def before(self, pts_us: int):
+        """(pts, fotograma) imediatamente antes de `pts_us`, se for vizinho no anel."""
+        step = self.step_us()
+        with self._lock:
+            i = bisect_left(self._pts, pts_us)
+            if i == 0 or step is None or pts_us - self._pts[i - 1] > step * 3 // 2:
+                return None
+            return self._pts[i - 1], self._frames[i - 1][0]
+
+    def after(self, pts_us: int):
+        """(pts, fotograma) imediatamente depois de `pts_us`, se for vizinho no anel."""
+        step = self.step_us()
+        with self._lock:
+            i = bisect_right(self._pts, pts_us)
+            if i == len(self._pts) or step is None or self._pts[i] - pts_us > step * 3 // 2:
+                return None
+            return self._pts[i], self._frames[i][0]
+
+
+class QtFrameStepper(QtCore.QObject):
+    """Passo a passo sobre um QMediaPlayer e o QVideoSink onde ele desenha.
+
+    stepped(posição em ms, True se o fotograma veio do anel) a cada passo.
+    Durante a reprodução o anel vai enchendo; o primeiro passo pausa.
+    """
+
+    stepped = Signal(int, bool)
+    _arrived = Signal()  # fotograma novo durante um avanço (vem da thread de renderização)
+
+    def __init__(self, player, sink, max_frames: int = DEFAULT_FRAME_BUDGET, parent=None):
+        super().__init__(parent)
+        from PySide6.QtMultimedia import QMediaPlayer, QVideoFrame
+        self._QVideoFrame = QVideoFrame
+        self._playing = QMediaPlayer.PlayingState
+        self._end_of_media = QMediaPlayer.EndOfMedia
+        self.player = player
+        self.sink = sink
+        self.ring = FrameRing(max_frames)
+        self.max_frames = max_frames
+        self.cursor = None  # PTS (µs) do fotograma mostrado pelo passo a passo
+        self._replaying = False
+        self._advancing = None  # PTS de partida de um avanço em curso
+        self._was_muted = False
+        self._advance_timer = QtCore.QTimer(self)
+        self._advance_timer.setSingleShot(True)
+        self._advance_timer.setInterval(ADVANCE_TIMEOUT_MS)
+        self._advance_timer.timeout.connect(self._end_advance)
+        sink.videoFrameChanged.connect(self._on_frame, QtCore.Qt.DirectConnection)
+        self._arrived.connect(self._on_arrived)
+        player.playbackStateChanged.connect(self._on_state)
+        player.mediaStatusChanged.connect(self._on_status)
+
+    def set_budget(self, max_frames: int):
+        self.max_frames = max_frames
+        self.ring.set_budget(max_frames)
+
+    def reset(self):
+        """Ficheiro novo: o anel e a posição do passo a passo deixam de valer."""
+        self.ring.clear()
+        self.ring.set_budget(self.max_frames)
+        self.cursor = None
+        if self._advancing is not None:
+            self._advance_timer.stop()
+            self._advancing = None
+            self._restore_audio()
+
+    def _on_frame(self, frame):
+        # Thread de renderização
+        if self._replaying or not frame.isValid() or frame.startTime() < 0:
+            return
+        pts = frame.startTime()
+        if frame.handleType() != self._QVideoFrame.HandleType.NoHandle and self.ring.max_frames > GPU_FRAME_BUDGET:
+            self.ring.set_budget(GPU_FRAME_BUDGET)
+        # Cópia superficial (partilha o buffer); bytes por excesso: o formato pode ser YUV
+        if self.ring.push(pts, self._QVideoFrame(frame), frame.width() * frame.height() * 4):
+            self.cursor = None  # seek: o fotograma mostrado deixou de estar no anel
+        if self._advancing is not None and pts > self._advancing:
+            self._arrived.emit()
+
+    def _current(self):
+        if self.cursor is not None:
+            return self.cursor
+        last = self.ring.last()
+        return last[0] if last else None
+
+    def _show(self, pts, frame, from_ring: bool):
+        self._replaying = True
+        try:
+            self.sink.setVideoFrame(frame)
+        finally:
+            self._replaying = False
+        self.cursor = pts
+        self.stepped.emit(pts // 1000, from_ring)
+
+    def step_forward(self):
+        if self._advancing is not None:
+            return
+        if self.player.playbackState() == self._playing:
+            self.player.pause()
+        current = self._current()
+        nxt = self.ring.after(current) if current is not None else None
+        if nxt is not None:
+            self._show(*nxt, True)
+            return
+        if self._at_end(current):
+            return  # play() recomeçaria do início
+        # Fora do anel: tocar sem som até chegar o fotograma seguinte
+        self._advancing = current if current is not None else -1
+        audio = self.player.audioOutput()
+        self._was_muted = audio.isMuted() if audio is not None else False
+        if audio is not None:
+            audio.setMuted(True)
+        self._advance_timer.start()
+        self.player.play()
+
+    def _at_end(self, current) -> bool:
+        if self.player.mediaStatus() == self._end_of_media:
+            return True
+        duration = self.player.duration()
+        position = current // 1000 if current is not None else self.player.position()
+        return duration > 0 and position >= duration
+
+    def _on_arrived(self):
+        if self._advancing is None:
+            return
+        start = self._advancing
+        self._end_advance()
+        # O leitor pode ter passado um fotograma além: mostrar o seguinte exato
+        nxt = self.ring.after(start) or self.ring.last()
+        if nxt is not None:
+            self._show(*nxt, False)
+
+    def _end_advance(self):
+        """Fim de um avanço: chegou o fotograma, acabou o ficheiro ou passou ADVANCE_TIMEOUT_MS."""
+        if self._advancing is None:
+            return
+        self._advance_timer.stop()
+        self._advancing = None
+        if self.player.playbackState() == self._playing:
+            self.player.pause()
+        self._restore_audio()
+
+    def _on_status(self, status):
+        if status == self._end_of_media:
+            self._end_advance()
+
+    def _restore_audio(self):
+        audio = self.player.audioOutput()
+        if audio is not None:
+            audio.setMuted(self._was_muted)
+
+    def step_back(self):
+        if self._advancing is not None:
+            return
+        if self.player.playbackState() == self._playing:
+            self.player.pause()
+        current = self._current()
+        if current is None:
+            return
+        prev = self.ring.before(current)
+        if prev is not None:
+            self._show(*prev, True)
+            return
+        # Fora do anel: seek normal (o descodificador parte do keyframe anterior)
+        target_ms = max(0, (current - (self.ring.step_us() or 40_000)) // 1000)
+        self.ring.clear()  # até chegar o fotograma do seek, um novo passo não tem de onde partir
+        self.cursor = None
+        self.player.setPosition(target_ms)
+        self.stepped.emit(target_ms, False)
+
+    def _on_state(self, state):
+        # Retomar a reprodução a partir do fotograma mostrado, não do último descodificado
+        if state == self._playing and self._advancing is None and self.cursor is not None:
+            last = self.ring.last()
+            if last is not None and self.cursor < last[0]:
+                self.player.setPosition(self.cursor // 1000)
+            self.cursor = None
@@ -0,0 +1,172 @@
+# Leitor com dois QMediaPlayer para transições sem pausa entre itens da playlist
+# O leitor ativo reproduz; o de reserva carrega o próximo item e fica parado no
+# primeiro fotograma. No fim do ativo (EndOfMedia) os papéis trocam: o de reserva
+# só precisa de continuar e o widget de vídeo visível muda para o dele.
+
+import time
+
+from PySide6.QtCore import QObject, QUrl, Signal
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+
+class GaplessPlayer(QObject):
+    """Dois QMediaPlayer com a interface do QMediaPlayer que os leitores usam.
+
+    `video_outputs` são dois QVideoWidget (ou QVideoSink), um por leitor.
+    Os sinais repetem apenas os do leitor ativo.
+    """
+
+    playbackStateChanged = Signal(object)
+    mediaStatusChanged = Signal(object)
+    durationChanged = Signal(int)
+    positionChanged = Signal(int)
+    errorOccurred = Signal(object, str)
+    bufferProgressChanged = Signal(float)
+    activeChanged = Signal(int)  # índice do leitor ativo (para mostrar o widget certo)
+    advanced = Signal(QUrl)  # passou automaticamente para o item pré-carregado
+    transitionGap = Signal(float)  # ms entre o fim do item e o 1.º fotograma do seguinte
+
+    def __init__(self, video_outputs, parent=None):
+        super().__init__(parent)
+        self.players = []
+        self.audio_outputs = []
+        self.video_outputs = list(video_outputs)
+        for i, output in enumerate(self.video_outputs):
+            audio = QAudioOutput(self)
+            player = QMediaPlayer(self)
+            player.setAudioOutput(audio)
+            player.setVideoOutput(output)
+            player.playbackStateChanged.connect(lambda s, i=i: self._forward(i, self.playbackStateChanged, s))
+            player.durationChanged.connect(lambda d, i=i: self._forward(i, self.durationChanged, d))
+            player.positionChanged.connect(lambda p, i=i: self._forward(i, self.positionChanged, p))
+            player.errorOccurred.connect(lambda e, w, i=i: self._forward(i, self.errorOccurred, e, w))
+            player.bufferProgressChanged.connect(lambda b, i=i: self._forward(i, self.bufferProgressChanged, b))
+            player.mediaStatusChanged.connect(lambda s, i=i: self._on_status(i, s))
+            self._sink(i).videoFrameChanged.connect(lambda f, i=i: self._on_frame(i, f))
+            self.players.append(player)
+            self.audio_outputs.append(audio)
+        self.active = 0
+        self._play_when_loaded = False
+        self._next_url = None  # item pré-carregado no leitor de reserva
+        self._ended_at = None
+
+    # --- Estado ---
+    @property
+    def player(self) -> QMediaPlayer:
+        return self.players[self.active]
+
+    @property
+    def standby(self) -> QMediaPlayer:
+        return self.players[1 - self.active]
+
+    @property
+    def preloaded(self) -> QUrl | None:
+        """Item pronto no leitor de reserva (None: no fim do atual a reprodução para)."""
+        return self._next_url
+
+    @property
+    def video_sinks(self) -> list:
+        """QVideoSink de cada leitor (pela ordem de `players`)."""
+        return [self._sink(i) for i in range(len(self.players))]
+
+    def _sink(self, i):
+        output = self.video_outputs[i]
+        return output.videoSink() if hasattr(output, "videoSink") else output
+
+    # --- Interface estilo QMediaPlayer ---
+    def setSource(self, url: QUrl):
+        """Carrega `url` no leitor ativo e começa a reproduzir quando estiver carregado."""
+        if self._next_url is not None and url == self._next_url:
+            # Já está pré-carregado na reserva: trocar em vez de voltar a abrir
+            self._swap()
+            return
+        self._play_when_loaded = True
+        self.player.setSource(url)
+
+    def source(self) -> QUrl:
+        return self.player.source()
+
+    def preload(self, url: QUrl | None):
+        """Prepara `url` no leitor de reserva (None cancela)."""
+        self._next_url = url
+        if url is None:
+            self.standby.setSource(QUrl())
+        else:
+            self.standby.setSource(url)
+
+    def play(self):
+        self.player.play()
+
+    def pause(self):
+        self.player.pause()
+
+    def stop(self):
+        self._play_when_loaded = False
+        self.player.stop()
+
+    def setPosition(self, ms: int):
+        self.player.setPosition(ms)
+
+    def position(self) -> int:
+        return self.player.position()
+
+    def duration(self) -> int:
+        return self.player.duration()
+
+    def playbackState(self):
+        return self.player.playbackState()
+
+    def mediaStatus(self):
+        return self.player.mediaStatus()
+
+    def setPlaybackRate(self, rate: float):
+        for p in self.players:
+            p.setPlaybackRate(rate)
+
+    def playbackRate(self) -> float:
+        return self.player.playbackRate()
+
+    def setVolume(self, volume: float):
+        for a in self.audio_outputs:
+            a.setVolume(volume)
+
+    def setMuted(self, muted: bool):
+        for a in self.audio_outputs:
+            a.setMuted(muted)
+
+    # --- Interno ---
+    def _forward(self, i, signal, *args):
+        if i == self.active:
+            signal.emit(*args)
+
+    def _on_status(self, i, status):
+        if i == self.active:
+            self.mediaStatusChanged.emit(status)
+            if status == QMediaPlayer.LoadedMedia and self._play_when_loaded:
+                self._play_when_loaded = False
+                self.player.play()
+            elif status == QMediaPlayer.EndOfMedia and self._next_url is not None:
+                self._ended_at = time.perf_counter()
+                self._swap()
+                self.advanced.emit(self.player.source())
+        elif status == QMediaPlayer.LoadedMedia and self._next_url is not None:
+            # Pausar o leitor de reserva descodifica o 1.º fotograma sem reproduzir
+            self.players[i].pause()
+
+    def _swap(self):
+        previous = self.player
+        self.active = 1 - self.active
+        self._next_url = None
+        self._play_when_loaded = self.player.mediaStatus() == QMediaPlayer.LoadingMedia
+        if not self._play_when_loaded:
+            self.player.play()
+        previous.stop()
+        self.activeChanged.emit(self.active)
+        self.durationChanged.emit(self.player.duration())
+        self.positionChanged.emit(self.player.position())
+        self.playbackStateChanged.emit(self.player.playbackState())
+
+    def _on_frame(self, i, frame):
+        if self._ended_at is not None and i == self.active and frame.isValid():
+            self.transitionGap.emit((time.perf_counter() - self._ended_at) * 1000)
+            self._ended_at = None
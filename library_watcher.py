@@ -0,0 +1,247 @@
+# Biblioteca: pastas vigiadas que alimentam a playlist e o índice de metadados
+# - cada subpasta fica registada na base de dados com a data de modificação
+#   (mtime) da última leitura; a mtime de uma pasta muda quando entram, saem
+#   ou mudam de nome ficheiros nela, por isso ao arrancar basta um stat() por
+#   pasta e só as pastas alteradas voltam a ser lidas (os.scandir), em paralelo
+# - com o programa aberto, o QFileSystemWatcher (inotify no Linux) indica que
+#   pastas mudaram; se não for possível vigiar todas (p.ex. limite de watches
+#   do inotify), as pastas são verificadas periodicamente (só stat)
+# - ficheiros acabados de chegar (ainda a ser copiados) voltam a ser vistos
+#   alguns segundos depois, para o índice ficar com o tamanho final
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from qt_compat import QtCore, Signal
+from media_index import MediaIndex
+
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".mov", ".m4v", ".wmv", ".webm", ".flv", ".ts", ".mpg", ".mpeg"}
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_dir(path):
+    """Lê uma pasta: (mtime, subpastas, {ficheiro de vídeo: (tamanho, mtime)}) ou None."""
+    subdirs, files = [], {}
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS and entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue  # entrada removida entretanto
+    except OSError:
+        return None
+    return mtime, subdirs, files
+
+
+class LibraryWatcher(QtCore.QObject):
+    """Vigia pastas e reporta, em lotes, os ficheiros de vídeo acrescentados,
+    removidos e alterados (`changed(added, removed, modified)`); um erro ao
+    ler uma pasta chega por `failed` e a thread continua com os pedidos seguintes."""
+
+    changed = Signal(list, list, list)
+    scanned = Signal(str, int, float)  # pasta raiz, n.º de pastas lidas, segundos
+    failed = Signal(str, str)  # pasta raiz, erro (a vigilância continua)
+    _watch = Signal(list, list)  # (pastas a vigiar, pastas a deixar) -> thread da GUI
+
+    def __init__(self, index: MediaIndex | None = None, workers: int | None = None,
+                 poll_interval_ms: int = 10000, settle_s: float = 5.0, parent=None):
+        super().__init__(parent)
+        self.index = index or MediaIndex()
+        self.settle_s = settle_s
+        self.roots: list[str] = []
+        self._pool = ThreadPoolExecutor(workers or min(8, (os.cpu_count() or 1) * 2),
+                                        thread_name_prefix="library-scan")
+        self._jobs: list[tuple] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="library-watcher", daemon=True)
+        self._thread.start()
+
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watch.connect(self._update_watches)
+        self._dirty: set[str] = set()
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(300)
+        self._debounce.timeout.connect(self._flush_dirty)
+        # Verificação periódica (só stat) quando o inotify não chega para tudo
+        self._poll = QtCore.QTimer(self)
+        self._poll.setInterval(poll_interval_ms)
+        self._poll.timeout.connect(lambda: [self._submit(("sync", root, None)) for root in self.roots])
+
+    # --- API ---
+    def restore(self):
+        """Volta a vigiar as pastas guardadas de sessões anteriores."""
+        for root in self.index.library_roots():
+            self.add_root(root)
+
+    def add_root(self, root):
+        root = os.path.abspath(root)
+        if root in self.roots:
+            return
+        self.roots.append(root)
+        self.index.set_library_root(root)
+        self._submit(("load", root, None))
+        self._submit(("sync", root, None))
+
+    def remove_root(self, root):
+        root = os.path.abspath(root)
+        if root not in self.roots:
+            return
+        self.roots.remove(root)
+        dirs = list(self.index.library_dirs(root))
+        removed = self.index.library_paths(root)
+        self.index.set_library_root(root, watched=False)
+        self._update_watches([], dirs)
+        if removed:
+            self.changed.emit([], removed, [])
+
+    def rescan(self, dirs):
+        """Voltar a ler `dirs` (pastas já conhecidas de alguma raiz)."""
+        for root in self.roots:
+            mine = [d for d in dirs if d == root or d.startswith(root + os.sep)]
+            if mine:
+                self._submit(("sync", root, mine))
+
+    def shutdown(self):
+        with self._cond:
+            self._stopping = True
+            self._jobs.clear()
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- GUI: inotify ---
+    def _on_directory_changed(self, path):
+        self._dirty.add(path)
+        self._debounce.start()
+
+    def _flush_dirty(self):
+        dirs, self._dirty = list(self._dirty), set()
+        self.rescan(dirs)
+
+    def _update_watches(self, add, remove):
+        if remove:
+            watched = set(self.watcher.directories())
+            stale = [d for d in remove if d in watched]
+            if stale:
+                self.watcher.removePaths(stale)
+        if add:
+            failed = self.watcher.addPaths(add)
+            if failed and not self._poll.isActive():
+                self._poll.start()
+
+    # --- Thread de trabalho ---
+    def _submit(self, job):
+        with self._cond:
+            self._jobs.append(job)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                kind, root, dirs = self._jobs.pop(0)
+            try:
+                if kind == "load":
+                    # Conteúdo conhecido: aparece logo, sem esperar pela verificação
+                    known = self.index.library_paths(root)
+                    if known:
+                        self.changed.emit(known, [], [])
+                    self._watch.emit(list(self.index.library_dirs(root)) or [root], [])
+                else:
+                    self._sync(root, dirs)
+            except Exception as e:
+                if self._stopping:
+                    return
+                # Um erro numa pasta (p.ex. base de dados bloqueada) não pode parar a vigilância
+                self.failed.emit(root, f"{type(e).__name__}: {e}")
+
+    def _sync(self, root, dirs):
+        if root not in self.roots:
+            return
+        started = time.monotonic()
+        known = self.index.library_dirs(root)
+        explicit = dirs is not None
+        candidates = dirs if explicit else (list(known) or [root])
+        if root not in known and root not in candidates:
+            candidates.append(root)
+
+        # 1) stat() de cada pasta candidata; só as alteradas (ou novas) são lidas
+        to_scan, gone = [], []
+        for d, mtime in zip(candidates, self._pool.map(_dir_mtime, candidates)):
+            if mtime is None:
+                gone.append(d)
+            elif explicit or known.get(d) != mtime:
+                to_scan.append(d)
+
+        added, removed, modified, new_dirs = [], [], [], []
+        scanned = 0
+        settling = []
+        now_ns = time.time_ns()
+        # 2) os.scandir em paralelo, por níveis (as subpastas novas vão para o nível seguinte)
+        while to_scan and not self._stopping:
+            next_level = []
+            for d, result in zip(to_scan, self._pool.map(_scan_dir, to_scan)):
+                if result is None:
+                    gone.append(d)
+                    continue
+                scanned += 1
+                mtime, subdirs, files = result
+                old = self.index.library_files(d)
+                for path, sig in files.items():
+                    if path not in old:
+                        added.append(path)
+                    elif old[path] != sig:
+                        modified.append(path)
+                    if now_ns - sig[1] < self.settle_s * 1e9:
+                        settling.append(d)
+                removed.extend(p for p in old if p not in files)
+                self.index.put_library_dir(root, d, mtime, files)
+                # Subpastas que desapareceram desta pasta
+                prefix = d + os.sep
+                present = set(subdirs)
+                gone.extend(k for k in known if k.startswith(prefix) and os.sep not in k[len(prefix):]
+                            and k not in present)
+                for sd in subdirs:
+                    if sd not in known:
+                        known[sd] = None
+                        new_dirs.append(sd)
+                        next_level.append(sd)
+            to_scan = next_level
+
+        # 3) pastas removidas: levam consigo todas as subpastas e ficheiros conhecidos
+        if gone:
+            gone_all = {k for g in gone for k in known if k == g or k.startswith(g + os.sep)}
+            for d in gone_all:
+                removed.extend(self.index.library_files(d))
+            self.index.remove_library_dirs(gone_all)
+            self._watch.emit([], sorted(gone_all))
+        if new_dirs:
+            self._watch.emit(new_dirs, [])
+        if added or removed or modified:
+            self.changed.emit(added, removed, modified)
+        if settling:
+            # Ficheiros ainda a crescer: voltar a ver estas pastas depois de assentarem
+            timer = threading.Timer(self.settle_s, self.rescan, args=(sorted(set(settling)),))
+            timer.daemon = True
+            timer.start()
+        self.scanned.emit(root, scanned, time.monotonic() - started)
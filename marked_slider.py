@@ -0,0 +1,97 @@
+# Slider de posição com marcas de entrada e saída (para exportar um segmento)
+# É um QSlider normal (DragSeeker e SliderPreview continuam a funcionar); as
+# marcas são guardadas em ms e desenhadas por cima do sulco, com o segmento
+# entre elas sombreado. Pode mostrar também traços finos (p.ex. mudanças de
+# cena, scene_detect.py) em `ticks`.
+
+from qt_compat import QtCore, QtGui, QtWidgets, Signal
+
+
+class MarkedSlider(QtWidgets.QSlider):
+    """QSlider horizontal com marcas de entrada/saída em ms.
+
+    `ms_to_value` converte ms no valor do slider (nos leitores VLC o slider
+    vai de 0 a 1000); por omissão o valor já está em ms.
+    """
+
+    marksChanged = Signal(object, object)  # entrada, saída (ms ou None)
+
+    def __init__(self, orientation=QtCore.Qt.Horizontal, ms_to_value=None, parent=None):
+        super().__init__(orientation, parent)
+        self.ms_to_value = ms_to_value or (lambda ms: ms)
+        self.in_ms = None
+        self.out_ms = None
+        self.ticks = []  # ms, por ordem
+
+    def set_ticks(self, ticks):
+        self.ticks = list(ticks)
+        self.update()
+
+    def set_in(self, ms: int):
+        self.in_ms = int(ms)
+        if self.out_ms is not None and self.out_ms <= self.in_ms:
+            self.out_ms = None
+        self._changed()
+
+    def set_out(self, ms: int):
+        self.out_ms = int(ms)
+        if self.in_ms is not None and self.in_ms >= self.out_ms:
+            self.in_ms = None
+        self._changed()
+
+    def clear_marks(self):
+        if self.in_ms is None and self.out_ms is None:
+            return
+        self.in_ms = self.out_ms = None
+        self._changed()
+
+    def segment(self, duration_ms: int) -> tuple[int, int] | None:
+        """(início, fim) em ms; sem marca de entrada começa no 0, sem saída vai até ao fim."""
+        if self.in_ms is None and self.out_ms is None:
+            return None
+        start = self.in_ms or 0
+        end = self.out_ms if self.out_ms is not None else duration_ms
+        return (start, end) if end > start else None
+
+    def _changed(self):
+        self.update()
+        self.marksChanged.emit(self.in_ms, self.out_ms)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.in_ms is None and self.out_ms is None and not self.ticks:
+            return
+        opt = QtWidgets.QStyleOptionSlider()
+        self.initStyleOption(opt)
+        style = self.style()
+        groove = style.subControlRect(QtWidgets.QStyle.CC_Slider, opt, QtWidgets.QStyle.SC_SliderGroove, self)
+        handle = style.subControlRect(QtWidgets.QStyle.CC_Slider, opt, QtWidgets.QStyle.SC_SliderHandle, self)
+        # O centro da pega percorre o sulco menos a largura da pega
+        offset = groove.x() + handle.width() // 2
+        span = max(1, groove.width() - handle.width())
+
+        def x(ms):
+            value = min(self.maximum(), max(self.minimum(), int(self.ms_to_value(ms))))
+            return offset + QtWidgets.QStyle.sliderPositionFromValue(self.minimum(), self.maximum(), value, span)
+
+        painter = QtGui.QPainter(self)
+        if self.ticks:
+            painter.setPen(QtGui.QPen(QtGui.QColor(70, 150, 255), 1))
+            top, bottom = groove.center().y() - 6, groove.center().y() + 6
+            for ms in self.ticks:
+                xpos = x(ms)
+                painter.drawLine(xpos, top, xpos, bottom)
+        if self.in_ms is None and self.out_ms is None:
+            painter.end()
+            return
+        x0 = x(self.in_ms) if self.in_ms is not None else offset
+        x1 = x(self.out_ms) if self.out_ms is not None else offset + span
+        color = QtGui.QColor(255, 140, 0)
+        shade = QtGui.QColor(color)
+        shade.setAlpha(90)
+        painter.fillRect(QtCore.QRect(x0, groove.center().y() - 4, max(1, x1 - x0), 8), shade)
+        painter.setPen(QtGui.QPen(color, 2))
+        for ms, xpos in ((self.in_ms, x0), (self.out_ms, x1)):
+            if ms is not None:
+                painter.drawLine(xpos, 1, xpos, self.height() - 2)
+        painter.end()
@@ -0,0 +1,358 @@
+# Índice de metadados dos vídeos (duração, codecs, resolução, bitrate)
+# Os ficheiros são analisados uma única vez com o ffprobe, fora da thread da GUI,
+# e o resultado fica numa base de dados SQLite local. Numa nova análise só os
+# ficheiros cujo tamanho ou data de modificação mudaram voltam a ser lidos.
+# Uma análise falhada (ffprobe ausente, com erro ou que excedeu o tempo) não é
+# guardada: o ficheiro volta a ser analisado na indexação seguinte.
+
+import json
+from array import array
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from pathlib import Path
+
+from qt_compat import QtCore, Signal
+
+DEFAULT_DB_PATH = Path.home() / ".cache" / "video-viewer" / "media-index.sqlite3"
+
+FIELDS = ("path", "size", "mtime_ns", "duration_ms", "video_codec", "audio_codec",
+          "width", "height", "bitrate", "probed_at")
+
+
+def probe_file(path, ffprobe: str | None = None, timeout: float = 30) -> dict:
+    """Lê os metadados de um ficheiro com o ffprobe.
+
+    Sem ffprobe instalado, ou se a análise falhar, devolve apenas tamanho e
+    data de modificação, com `probed_at` a None (não deve ser guardado).
+    """
+    st = os.stat(path)
+    info = dict.fromkeys(FIELDS)
+    info.update(path=str(path), size=st.st_size, mtime_ns=st.st_mtime_ns)
+    ffprobe = ffprobe or shutil.which("ffprobe")
+    if not ffprobe:
+        return info
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)],
+            capture_output=True, timeout=timeout, check=True).stdout
+        data = json.loads(out or b"{}")
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return info
+    info["probed_at"] = time.time()
+    fmt = data.get("format", {})
+    if fmt.get("duration"):
+        info["duration_ms"] = int(float(fmt["duration"]) * 1000)
+    if fmt.get("bit_rate"):
+        info["bitrate"] = int(fmt["bit_rate"])
+    for stream in data.get("streams", []):
+        kind = stream.get("codec_type")
+        if kind == "video" and info["video_codec"] is None:
+            info["video_codec"] = stream.get("codec_name")
+            info["width"] = stream.get("width")
+            info["height"] = stream.get("height")
+        elif kind == "audio" and info["audio_codec"] is None:
+            info["audio_codec"] = stream.get("codec_name")
+    return info
+
+
+class MediaIndex:
+    """Base de dados SQLite com os metadados dos ficheiros (segura entre threads)."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, duration_ms INTEGER,"
+            " video_codec TEXT, audio_codec TEXT, width INTEGER, height INTEGER,"
+            " bitrate INTEGER, probed_at REAL)")
+        # Instantes (ms) dos keyframes do 1.º stream de vídeo, como array('i') em bytes
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS keyframes ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, times BLOB)")
+        # Mudanças de cena (scene_detect.py), em ms como array('i'); `analysed_ms` é até
+        # onde a análise chegou (continua daí se foi interrompida) e `params` os
+        # limiares com que foi feita
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scenes ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, params TEXT,"
+            " analysed_ms INTEGER, complete INTEGER, times BLOB)")
+        # Biblioteca (library_watcher.py): pastas vigiadas, as suas subpastas com a
+        # data de modificação da última leitura e os ficheiros de vídeo de cada uma
+        self._db.execute("CREATE TABLE IF NOT EXISTS library_roots (path TEXT PRIMARY KEY)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS library_dirs (path TEXT PRIMARY KEY, root TEXT, mtime_ns INTEGER)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS library_files ("
+            " path TEXT PRIMARY KEY, dir TEXT, size INTEGER, mtime_ns INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS library_files_dir ON library_files (dir)")
+        self._db.commit()
+
+    def get(self, path) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(FIELDS)} FROM media WHERE path = ?", (str(path),)).fetchone()
+        return dict(zip(FIELDS, row)) if row else None
+
+    def get_many(self, paths, chunk: int = 500) -> dict:
+        """Metadados guardados para `paths` (caminho -> dict)."""
+        paths = [str(p) for p in paths]
+        result = {}
+        with self._lock:
+            for i in range(0, len(paths), chunk):
+                part = paths[i:i + chunk]
+                rows = self._db.execute(
+                    f"SELECT {', '.join(FIELDS)} FROM media WHERE path IN ({', '.join('?' * len(part))})",
+                    part)
+                for row in rows:
+                    result[row[0]] = dict(zip(FIELDS, row))
+        return result
+
+    def put_many(self, infos):
+        with self._lock:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO media ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                [tuple(info[f] for f in FIELDS) for info in infos])
+            self._db.commit()
+
+    def remove(self, paths):
+        with self._lock:
+            self._db.executemany("DELETE FROM media WHERE path = ?", [(str(p),) for p in paths])
+            self._db.commit()
+
+    def get_keyframes(self, path) -> array | None:
+        """Keyframes guardados para `path`, se o ficheiro não mudou desde a análise."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, times FROM keyframes WHERE path = ?", (str(path),)).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return None
+        times = array("i")
+        times.frombytes(row[2])
+        return times
+
+    def put_keyframes(self, path, size, mtime_ns, times):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO keyframes (path, size, mtime_ns, times) VALUES (?, ?, ?, ?)",
+                (str(path), size, mtime_ns, array("i", times).tobytes()))
+            self._db.commit()
+
+    def get_scenes(self, path, params: str) -> tuple[array, int, bool] | None:
+        """(cortes, ms analisados, completo) para `path`, se o ficheiro e os limiares não mudaram."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, params, analysed_ms, complete, times FROM scenes WHERE path = ?",
+                (str(path),)).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns or row[2] != params:
+            return None
+        times = array("i")
+        times.frombytes(row[5])
+        return times, row[3], bool(row[4])
+
+    def put_scenes(self, path, size, mtime_ns, params: str, times, analysed_ms: int, complete: bool):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO scenes (path, size, mtime_ns, params, analysed_ms, complete, times)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(path), size, mtime_ns, params, analysed_ms, int(complete), array("i", times).tobytes()))
+            self._db.commit()
+
+    # --- Biblioteca ---
+    def library_roots(self) -> list[str]:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT path FROM library_roots")]
+
+    def set_library_root(self, root, watched: bool = True):
+        with self._lock:
+            if watched:
+                self._db.execute("INSERT OR IGNORE INTO library_roots (path) VALUES (?)", (str(root),))
+            else:
+                self._db.execute("DELETE FROM library_roots WHERE path = ?", (str(root),))
+                dirs = [r[0] for r in self._db.execute("SELECT path FROM library_dirs WHERE root = ?", (str(root),))]
+                self._db.executemany("DELETE FROM library_files WHERE dir = ?", [(d,) for d in dirs])
+                self._db.execute("DELETE FROM library_dirs WHERE root = ?", (str(root),))
+            self._db.commit()
+
+    def library_dirs(self, root) -> dict:
+        """Subpastas conhecidas de `root` (caminho -> mtime_ns da última leitura)."""
+        with self._lock:
+            return dict(self._db.execute("SELECT path, mtime_ns FROM library_dirs WHERE root = ?", (str(root),)))
+
+    def library_files(self, directory) -> dict:
+        """Ficheiros conhecidos de uma pasta (caminho -> (tamanho, mtime_ns))."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, size, mtime_ns FROM library_files WHERE dir = ?", (str(directory),))
+            return {path: (size, mtime) for path, size, mtime in rows}
+
+    def library_paths(self, root) -> list[str]:
+        """Todos os ficheiros conhecidos de `root`."""
+        with self._lock:
+            return [r[0] for r in self._db.execute(
+                "SELECT f.path FROM library_files f JOIN library_dirs d ON f.dir = d.path WHERE d.root = ?",
+                (str(root),))]
+
+    def put_library_dir(self, root, directory, mtime_ns, files: dict):
+        """Guarda o resultado da leitura de uma pasta (`files`: caminho -> (tamanho, mtime_ns))."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO library_dirs (path, root, mtime_ns) VALUES (?, ?, ?)",
+                             (str(directory), str(root), mtime_ns))
+            self._db.execute("DELETE FROM library_files WHERE dir = ?", (str(directory),))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO library_files (path, dir, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                [(p, str(directory), size, mtime) for p, (size, mtime) in files.items()])
+            self._db.commit()
+
+    def remove_library_dirs(self, dirs):
+        with self._lock:
+            self._db.executemany("DELETE FROM library_files WHERE dir = ?", [(str(d),) for d in dirs])
+            self._db.executemany("DELETE FROM library_dirs WHERE path = ?", [(str(d),) for d in dirs])
+            self._db.commit()
+
+    @staticmethod
+    def is_current(info, st) -> bool:
+        return (info is not None and info["probed_at"] is not None
+                and info["size"] == st.st_size and info["mtime_ns"] == st.st_mtime_ns)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class MediaIndexer(QtCore.QObject):
+    """Indexa listas de ficheiros numa thread de trabalho.
+
+    Os resultados (em cache ou acabados de analisar) chegam à GUI em lotes
+    através de `indexed`, como listas de dicts com os campos de `FIELDS`.
+    """
+
+    indexed = Signal(list)
+    progress = Signal(int, int)
+    finished = Signal()
+
+    def __init__(self, index: MediaIndex | None = None, workers: int | None = None,
+                 batch_interval: float = 0.2, parent=None):
+        super().__init__(parent)
+        self.index = index or MediaIndex()
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.batch_interval = batch_interval
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="ffprobe")
+        self._queue: list[list[str]] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="media-indexer", daemon=True)
+        self._thread.start()
+
+    def submit(self, paths):
+        """Pede a indexação de `paths` (só os ficheiros alterados são analisados)."""
+        with self._cond:
+            self._queue.append([str(p) for p in paths])
+            self._cond.notify()
+
+    def shutdown(self):
+        with self._cond:
+            self._stopping = True
+            self._queue.clear()
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if not self._thread.is_alive():
+            self.index.close()  # senão a thread ainda pode escrever (um ffprobe a terminar)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                paths = self._queue.pop(0)
+            self._index_paths(paths)
+
+    def _index_paths(self, paths):
+        total = len(paths)
+        done = 0
+        batch = []
+        last_emit = time.monotonic()
+
+        def flush(force=False):
+            nonlocal batch, last_emit
+            if batch and (force or time.monotonic() - last_emit >= self.batch_interval):
+                self.indexed.emit(batch)
+                self.progress.emit(done, total)
+                batch = []
+                last_emit = time.monotonic()
+
+        cached = self.index.get_many(paths)
+        changed = []
+        for path in paths:
+            if self._stopping:
+                return
+            try:
+                st = os.stat(path)
+            except OSError:
+                done += 1
+                continue
+            info = cached.get(path)
+            if self.index.is_current(info, st):
+                done += 1
+                batch.append(info)
+                flush()
+            else:
+                changed.append(path)
+
+        # Poucos ficheiros de cada vez no pool: ao fechar, só esses ficam por terminar
+        probed = []
+        step = self.workers * 2
+        for i in range(0, len(changed), step):
+            try:
+                futures = [self._pool.submit(self._probe, path) for path in changed[i:i + step]]
+            except RuntimeError:
+                return  # pool já fechado (shutdown)
+            for future in futures:
+                try:
+                    info = future.result()
+                except CancelledError:
+                    return  # cancelado por shutdown()
+                if self._stopping:
+                    return
+                done += 1
+                if info is not None:
+                    batch.append(info)
+                    if info["probed_at"] is not None:
+                        probed.append(info)
+                if len(probed) >= 100:
+                    self.index.put_many(probed)
+                    probed = []
+                flush()
+        if probed:
+            self.index.put_many(probed)
+        flush(force=True)
+        self.progress.emit(total, total)
+        self.finished.emit()
+
+    def _probe(self, path):
+        if self._stopping:
+            return None
+        try:
+            return probe_file(path)
+        except OSError:
+            return None
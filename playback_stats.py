@@ -0,0 +1,436 @@
+# Estatísticas de reprodução: contadores, histogramas, overlay e exportação
+# - Qt (PySide6): cada fotograma que chega ao QVideoSink só deixa numa deque o
+#   instante de chegada e o seu startTime(); a ligação é direta, por isso corre
+#   na thread que entrega o fotograma (a de renderização do backend) e não na
+#   da interface
+# - VLC: media.get_stats() (fotogramas descodificados/mostrados/perdidos,
+#   débito de entrada e da desmultiplexagem, buffers de áudio perdidos)
+# - uma thread de amostragem junta tudo a cada intervalo: intervalo entre
+#   fotogramas (histograma), fotogramas perdidos (saltos no PTS), fps, desvio
+#   do relógio do vídeo em relação ao relógio de parede (≈ desvio A/V: a saída
+#   de áudio segue o relógio do dispositivo) e ocupação do buffer
+# - o instantâneo de cada intervalo vai para o overlay (sinal entregue na
+#   thread da interface) e, se pedido, para um ficheiro JSONL (uma linha por
+#   intervalo) ou de texto do Prometheus (.prom, reescrito a cada intervalo;
+#   p.ex. para o textfile collector do node_exporter)
+#
+# Nenhum dos backends expõe o tempo de descodificação de cada fotograma: no Qt
+# o intervalo entre fotogramas apresentados é o indicador de atraso, no VLC a
+# diferença entre fotogramas descodificados e mostrados.
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+
+from qt_compat import QtCore, QtWidgets, Signal
+
+FRAME_INTERVAL_BUCKETS = (10, 20, 30, 40, 50, 70, 100, 200, 500)  # ms
+DRIFT_BUCKETS = (5, 10, 20, 40, 80, 160, 320, 640)  # ms, em valor absoluto
+
+# nome: (tipo no Prometheus, descrição)
+METRICS = {
+    "frames_presented": ("counter", "Fotogramas apresentados"),
+    "frames_dropped": ("counter", "Fotogramas perdidos (saltos no PTS no Qt, lost_pictures no VLC)"),
+    "frames_decoded": ("counter", "Fotogramas descodificados (só VLC)"),
+    "audio_buffers_lost": ("counter", "Buffers de áudio perdidos (só VLC)"),
+    "demux_corrupted": ("counter", "Pacotes corrompidos na desmultiplexagem (só VLC)"),
+    "bytes_read": ("counter", "Bytes lidos da origem (só VLC)"),
+    "fps": ("gauge", "Fotogramas apresentados por segundo no último intervalo"),
+    "frame_interval_max_ms": ("gauge", "Maior intervalo entre fotogramas no último intervalo"),
+    "av_drift_ms": ("gauge", "Desvio do relógio do vídeo em relação ao relógio de parede"),
+    "buffer_percent": ("gauge", "Ocupação do buffer de rede/cache"),
+    "input_kbps": ("gauge", "Débito de entrada (só VLC)"),
+    "demux_kbps": ("gauge", "Débito da desmultiplexagem (só VLC)"),
+    "frame_interval_ms": ("histogram", "Intervalo entre fotogramas apresentados"),
+    "av_drift_abs_ms": ("histogram", "Desvio A/V em valor absoluto"),
+}
+
+# Contadores acumulados de libvlc_media_stats_t -> nossos contadores
+_VLC_COUNTERS = {
+    "displayed_pictures": "frames_presented",
+    "lost_pictures": "frames_dropped",
+    "decoded_video": "frames_decoded",
+    "lost_abuffers": "audio_buffers_lost",
+    "demux_corrupted": "demux_corrupted",
+    "read_bytes": "bytes_read",
+}
+
+
+class Histogram:
+    """Histograma de baldes fixos (limites superiores inclusivos, como no Prometheus)."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # o último balde é +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Estimativa por interpolação linear dentro do balde (None sem observações)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(self.bounds):
+                    return float(self.bounds[-1])
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return float(self.bounds[-1])
+
+    def to_dict(self) -> dict:
+        cumulative, buckets = 0, []
+        for bound, n in zip(self.bounds + ("+Inf",), self.counts):
+            cumulative += n
+            buckets.append([bound, cumulative])
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {"buckets": buckets, "sum": round(self.sum, 3), "count": self.count,
+                "p50": None if p50 is None else round(p50, 1), "p95": None if p95 is None else round(p95, 1)}
+
+
+def prometheus_text(snapshot: dict) -> str:
+    """Instantâneo no formato de texto do Prometheus (métricas video_player_*)."""
+    label = snapshot["player"].replace("\\", "\\\\").replace('"', '\\"')
+    lines = []
+
+    def header(name, kind, text):
+        lines.append(f"# HELP {name} {text}.")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for key, (kind, text) in METRICS.items():
+        if kind == "counter":
+            name = f"video_player_{key}_total"
+            header(name, kind, text)
+            lines.append(f'{name}{{player="{label}"}} {snapshot["counters"][key]}')
+        elif kind == "gauge":
+            value = snapshot["gauges"][key]
+            if value is None:
+                continue
+            name = f"video_player_{key}"
+            header(name, kind, text)
+            lines.append(f'{name}{{player="{label}"}} {value}')
+        else:
+            hist = snapshot["histograms"][key]
+            name = f"video_player_{key}"
+            header(name, kind, text)
+            for bound, cumulative in hist["buckets"]:
+                lines.append(f'{name}_bucket{{player="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{player="{label}"}} {hist["sum"]}')
+            lines.append(f'{name}_count{{player="{label}"}} {hist["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class StatsSampler(QtCore.QObject):
+    """Estatísticas de um leitor, amostradas numa thread própria.
+
+    A janela liga as fontes (attach_sinks no Qt, attach_vlc no VLC) e informa
+    o que só a thread da interface sabe (media_changed, set_playing, set_rate,
+    set_buffer). A cada intervalo `updated(dict)` leva um instantâneo à
+    thread da interface e, com export_to(), o mesmo instantâneo vai para o
+    ficheiro.
+    """
+
+    updated = Signal(dict)
+
+    def __init__(self, player_name: str, interval_s: float = 1.0, parent=None):
+        super().__init__(parent)
+        self.player_name = player_name
+        self.interval = interval_s
+        self.counters = {k: 0 for k, (kind, _) in METRICS.items() if kind == "counter"}
+        self.gauges = {k: None for k, (kind, _) in METRICS.items() if kind == "gauge"}
+        self.histograms = {"frame_interval_ms": Histogram(FRAME_INTERVAL_BUCKETS),
+                           "av_drift_abs_ms": Histogram(DRIFT_BUCKETS)}
+        self.source = None
+        self._frames = deque(maxlen=20000)  # (instante, PTS em µs, índice do sink)
+        self._lock = threading.Lock()  # estado partilhado com a thread de amostragem
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._active = lambda: 0
+        self._vlc_players = None
+        self._vlc_previous = None  # (mrl, contadores acumulados da amostra anterior)
+        self._playing = False
+        self._rate = 1.0
+        self._clock = None  # (instante, posição do media em s) de referência para o desvio
+        self._last_frame = None  # (instante, PTS) do último fotograma do sink ativo
+        self._steps = deque(maxlen=31)  # últimos avanços de PTS (ms), para a duração nominal
+        self._last_sample = time.perf_counter()
+        self._export_path = None
+        self._export_format = "jsonl"
+
+    # --- Fontes ---
+    def attach_sinks(self, sinks, active=None):
+        """Regista os fotogramas de QVideoSinks; `active()` é o índice do sink que está a tocar."""
+        self._active = active or (lambda: 0)
+        for i, sink in enumerate(sinks):
+            sink.videoFrameChanged.connect(lambda frame, i=i: self._on_frame(i, frame),
+                                           QtCore.Qt.DirectConnection)
+        self.start()
+
+    def attach_vlc(self, players, active=None):
+        """Amostra media.get_stats() do MediaPlayer `players[active()]`."""
+        import vlc
+        self._active = active or (lambda: 0)
+        self._vlc_players = list(players)
+        for i, player in enumerate(self._vlc_players):
+            player.event_manager().event_attach(vlc.EventType.MediaPlayerBuffering, self._on_vlc_buffering, i)
+        self.start()
+
+    def _on_frame(self, index, frame):
+        # Thread de renderização: só o mínimo, a deque dispensa o lock
+        self._frames.append((time.perf_counter(), frame.startTime(), index))
+
+    def _on_vlc_buffering(self, event, index):
+        if index == self._active():
+            self.set_buffer(event.u.new_cache / 100)
+
+    # --- Estado vindo da interface ---
+    def media_changed(self, source: str):
+        with self._lock:
+            self.source = source
+            self.gauges["buffer_percent"] = None
+            self._resync()
+
+    def set_playing(self, playing: bool):
+        with self._lock:
+            if playing != self._playing:
+                self._playing = playing
+                self._resync()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._rate = rate or 1.0
+            self._resync()
+
+    def set_buffer(self, fraction: float):
+        with self._lock:
+            self.gauges["buffer_percent"] = round(fraction * 100, 1)
+
+    def _resync(self):
+        self._clock = None
+        self._last_frame = None
+
+    # --- Exportação ---
+    def export_to(self, path, interval_s: float | None = None):
+        """Exporta a cada intervalo: .prom -> texto do Prometheus, outro -> JSONL."""
+        self._export_path = Path(path)
+        self._export_format = "prometheus" if self._export_path.suffix.lower() == ".prom" else "jsonl"
+        if interval_s:
+            self.interval = interval_s
+        self.start()
+
+    def _export(self, snapshot):
+        if self._export_path is None:
+            return
+        try:
+            if self._export_format == "jsonl":
+                with open(self._export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+            else:
+                # O coletor nunca pode ler um ficheiro a meio
+                tmp = self._export_path.with_name(self._export_path.name + ".tmp")
+                tmp.write_text(prometheus_text(snapshot), encoding="utf-8")
+                os.replace(tmp, self._export_path)
+        except OSError:
+            pass  # disco cheio/pasta apagada: as estatísticas não podem parar o leitor
+
+    # --- Thread de amostragem ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="playback-stats", daemon=True)
+        self._thread.start()
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            # Com --exit-at-end a janela não chega a ser fechada: o último intervalo tem de sair na mesma
+            app.aboutToQuit.connect(self.shutdown)
+
+    def shutdown(self):
+        """Para a thread depois de uma última amostra (e exportação)."""
+        if self._thread is None or self._stopping:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            snapshot = self.sample()
+            self._export(snapshot)
+            if not self._stopping:
+                self.updated.emit(snapshot)
+
+    def sample(self) -> dict:
+        """Junta as amostras desde a chamada anterior e devolve o instantâneo."""
+        with self._lock:
+            now = time.perf_counter()
+            elapsed, self._last_sample = now - self._last_sample, now
+            if self._vlc_players is not None:
+                self._sample_vlc(now, elapsed)
+            else:
+                self._sample_frames(elapsed)
+            return self._snapshot()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        return {
+            "time": round(time.time(), 3),
+            "player": self.player_name,
+            "source": self.source,
+            "playing": self._playing,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+
+    def _sample_frames(self, elapsed):
+        active = self._active()
+        presented, worst = 0, None
+        while self._frames:
+            t, pts, index = self._frames.popleft()
+            if index != active or pts < 0:
+                continue  # leitor de reserva a preparar o próximo item, ou fotograma vazio
+            presented += 1
+            last, self._last_frame = self._last_frame, (t, pts)
+            if not self._playing or last is None or self._clock is None:
+                self._clock = (t, pts / 1e6) if self._playing else None
+                continue
+            step = (pts - last[1]) / 1000
+            if step <= 0 or step > 5000:
+                self._clock = (t, pts / 1e6)  # seek ou recomeço do item
+                continue
+            interval = (t - last[0]) * 1000
+            self.histograms["frame_interval_ms"].observe(interval)
+            worst = interval if worst is None else max(worst, interval)
+            self._steps.append(step)
+            nominal = sorted(self._steps)[len(self._steps) // 2]
+            if step > nominal * 1.5:
+                self.counters["frames_dropped"] += round(step / nominal) - 1
+            self._observe_drift(t, pts / 1e6)
+        self.counters["frames_presented"] += presented
+        self.gauges["fps"] = round(presented / elapsed, 2) if elapsed > 0 and self._playing else None
+        self.gauges["frame_interval_max_ms"] = None if worst is None else round(worst, 1)
+
+    def _observe_drift(self, t, media_s):
+        clock_t, clock_media = self._clock
+        drift_ms = ((media_s - clock_media) / self._rate - (t - clock_t)) * 1000
+        self.gauges["av_drift_ms"] = round(drift_ms, 1)
+        self.histograms["av_drift_abs_ms"].observe(abs(drift_ms))
+
+    def _sample_vlc(self, now, elapsed):
+        import vlc
+        player = self._vlc_players[self._active()]
+        media = player.get_media()
+        stats = vlc.MediaStats()
+        if media is None or not media.get_stats(stats):
+            return
+        mrl = media.get_mrl()
+        totals = {name: getattr(stats, name) for name in _VLC_COUNTERS}
+        previous, self._vlc_previous = self._vlc_previous, (mrl, totals)
+        if previous is None or previous[0] != mrl:
+            self._resync()
+            return  # 1.ª amostra deste media: fica só como referência
+        for name, counter in _VLC_COUNTERS.items():
+            # Os totais recomeçam do zero quando o mesmo media volta a ser aberto
+            self.counters[counter] += max(0, totals[name] - previous[1][name])
+        playing = player.is_playing()
+        shown = max(0, totals["displayed_pictures"] - previous[1]["displayed_pictures"])
+        self.gauges["fps"] = round(shown / elapsed, 2) if elapsed > 0 and playing else None
+        self.gauges["input_kbps"] = round(stats.input_bitrate * 8000, 1)
+        self.gauges["demux_kbps"] = round(stats.demux_bitrate * 8000, 1)
+        self._playing = bool(playing)
+        position = player.get_time()
+        if not playing or position < 0:
+            self._clock = None
+        elif self._clock is None or player.get_rate() != self._rate:
+            self._rate = player.get_rate() or 1.0
+            self._clock = (now, position / 1000)
+        else:
+            # get_time() avança aos saltos (atualizado pelo input do libvlc): valor aproximado
+            self._observe_drift(now, position / 1000)
+
+
+class StatsOverlay(QtWidgets.QLabel):
+    """Painel semitransparente com as estatísticas, no canto da área de vídeo.
+
+    É uma janela à parte (sem moldura, transparente ao rato) porque a saída de
+    vídeo do VLC — e do QVideoWidget nalgumas plataformas — é uma janela
+    nativa que tapa os widgets filhos.
+    """
+
+    def __init__(self, anchor: QtWidgets.QWidget):
+        flags = (QtCore.Qt.Tool | QtCore.Qt.FramelessWindowHint | QtCore.Qt.WindowTransparentForInput
+                 | QtCore.Qt.WindowDoesNotAcceptFocus)
+        super().__init__(anchor.window(), flags)
+        self.anchor = anchor
+        self.setAttribute(QtCore.Qt.WA_ShowWithoutActivating)
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
+        self.setStyleSheet("QLabel { background: rgba(0, 0, 0, 170); color: #e0e0e0;"
+                           " font-family: monospace; padding: 6px; border-radius: 4px; }")
+        self.setText("Sem estatísticas (nada a tocar)")
+        anchor.installEventFilter(self)
+        anchor.window().installEventFilter(self)
+
+    def set_anchor(self, anchor: QtWidgets.QWidget):
+        """Passa a acompanhar outro widget (p.ex. o QVideoWidget que substituiu o painel preto)."""
+        self.anchor.removeEventFilter(self)
+        self.anchor = anchor
+        anchor.installEventFilter(self)
+        if self.isVisible():
+            self._reposition()
+
+    def eventFilter(self, obj, event):
+        if self.isVisible() and event.type() in (QtCore.QEvent.Move, QtCore.QEvent.Resize):
+            self._reposition()
+        return False
+
+    def showEvent(self, event):
+        self._reposition()
+        super().showEvent(event)
+
+    def _reposition(self):
+        self.adjustSize()
+        self.move(self.anchor.mapToGlobal(QtCore.QPoint(8, 8)))
+
+    def show_snapshot(self, snapshot: dict):
+        if not self.isVisible():
+            return
+        self.setText(self.format(snapshot))
+        self._reposition()
+
+    @staticmethod
+    def format(snapshot: dict) -> str:
+        c, g = snapshot["counters"], snapshot["gauges"]
+        interval = snapshot["histograms"]["frame_interval_ms"]
+        lines = [os.path.basename(snapshot["source"] or "") or "—"]
+        fps = "—" if g["fps"] is None else f"{g['fps']:.1f}"
+        lines.append(f"fps {fps}   apresentados {c['frames_presented']}   perdidos {c['frames_dropped']}")
+        if interval["count"]:
+            worst = "" if g["frame_interval_max_ms"] is None else f"   máx {g['frame_interval_max_ms']:.0f} ms"
+            lines.append(f"intervalo p50 {interval['p50']:.0f} ms   p95 {interval['p95']:.0f} ms{worst}")
+        extra = []
+        if g["av_drift_ms"] is not None:
+            extra.append(f"desvio A/V {g['av_drift_ms']:+.0f} ms")
+        if g["buffer_percent"] is not None:
+            extra.append(f"buffer {g['buffer_percent']:.0f}%")
+        if extra:
+            lines.append("   ".join(extra))
+        if g["input_kbps"] is not None:
+            lines.append(f"entrada {g['input_kbps'] / 1000:.1f} Mb/s   descodificados {c['frames_decoded']}"
+                         f"   áudio perdido {c['audio_buffers_lost']}")
+        return "\n".join(lines)
@@ -0,0 +1,301 @@
+# Modelo de playlist para o Leitor de Vídeo Qt (PySide6)
+# Os caminhos vivem num PlaylistStore (lista compacta + índice caminho -> linha) e
+# são mostrados através de um QListView virtualizado: não há um widget/item por
+# linha, por isso a memória cresce apenas com os caminhos e a vista só pinta as
+# linhas visíveis.
+# O filtro de pesquisa corre numa thread, FILTER_DELAY_MS depois da última
+# tecla: filtrar 1 milhão de entradas leva centenas de ms e não pode parar a
+# janela a cada letra escrita.
+
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QThread, QTimer, Signal
+
+from playlist_store import PlaylistStore
+
+FILTER_DELAY_MS = 150
+
+
+class PlaylistModel(QAbstractListModel):
+    # (geração do pedido, versão do store, texto, linhas) vindo da thread do filtro
+    _filtered = Signal(int, int, str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = PlaylistStore()
+        self._filter_text = ""  # filtro aplicado à vista
+        self._rows: list[int] | None = None  # linhas do store visíveis quando há filtro
+        self._wanted_text = ""  # último texto pedido (pode ainda não estar aplicado)
+        self._generation = 0  # muda a cada pedido: resultados de pedidos antigos são ignorados
+        self._job = None  # (geração, texto) à espera da thread
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY_MS)
+        self._filter_timer.timeout.connect(self._submit_filter)
+        self._filtered.connect(self._apply_filter)
+        self._thread = threading.Thread(target=self._run_filters, name="playlist-filter", daemon=True)
+        self._thread.start()
+        self._durations: dict[str, int] = {}  # caminho -> duração (ms), vinda do índice de metadados
+        self._scenes: dict[str, int] = {}  # caminho -> número de cenas detetadas (scene_detect.py)
+        self.total_ms = 0
+
+    # --- API Qt ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store) if self._rows is None else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            path = self.path_at(index.row())
+            ms = self._durations.get(path)
+            scenes = self._scenes.get(path)
+            if role == Qt.DisplayRole and (ms is not None or scenes is not None):
+                info = [format_ms(ms)] if ms is not None else []
+                if scenes is not None:
+                    info.append(f"{scenes} cenas")
+                return f"{path}  [{' · '.join(info)}]"
+            return path
+        return None
+
+    def moveRows(self, src_parent, src_row, count, dst_parent, dst_row):
+        # Só é possível reordenar a lista completa, uma linha de cada vez
+        if self._rows is not None or count != 1 or src_row == dst_row or src_row + 1 == dst_row:
+            return False
+        if not self.beginMoveRows(src_parent, src_row, src_row, dst_parent, dst_row):
+            return False
+        self.store.move(src_row, dst_row - 1 if dst_row > src_row else dst_row)
+        self.endMoveRows()
+        return True
+
+    # --- API da playlist ---
+    def append_paths(self, paths):
+        """Acrescenta um lote de caminhos (sem duplicados) com uma única notificação à vista."""
+        new = self.store.new_paths(paths)
+        if not new:
+            return 0
+        first = len(self.store)
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            self.store.extend(new)
+            self.endInsertRows()
+            return len(new)
+        # Com filtro ativo só as novas entradas que coincidem aparecem na vista
+        self.store.extend(new)
+        needle = self._filter_text.casefold()
+        matches = [first + i for i, p in enumerate(new) if needle in p.casefold()]
+        if matches:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(matches) - 1)
+            self._rows.extend(matches)
+            self.endInsertRows()
+        return len(new)
+
+    def remove_row(self, row: int) -> str:
+        store_row = self.source_row(row)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        path = self.store.remove(store_row)
+        self.total_ms -= self._durations.pop(path, 0)
+        self._scenes.pop(path, None)
+        if self._rows is not None:
+            del self._rows[row]
+            self._rows[row:] = [r - 1 for r in self._rows[row:]]
+        self.endRemoveRows()
+        return path
+
+    def remove_paths(self, paths) -> int:
+        """Remove um lote de caminhos (p.ex. apagados do disco) com uma única notificação."""
+        if not any(p in self.store for p in paths):
+            return 0
+        self.beginResetModel()
+        if self._rows is not None:
+            # As linhas visíveis que ficam descem tantas posições quantas as removidas antes delas
+            gone = sorted(self.store.index_of(p) for p in set(paths) if p in self.store)
+            gone_set = set(gone)
+            self._rows = [r - bisect_right(gone, r) for r in self._rows if r not in gone_set]
+        removed = self.store.remove_paths(paths)
+        for path in removed:
+            self.total_ms -= self._durations.pop(path, 0)
+            self._scenes.pop(path, None)
+        self.endResetModel()
+        return len(removed)
+
+    def set_filter(self, text: str):
+        """Pede o filtro `text`; é aplicado quando o utilizador parar de escrever.
+
+        Sem texto, a lista completa volta logo.
+        """
+        self._wanted_text = text
+        self._generation += 1
+        if text:
+            self._filter_timer.start()
+            return
+        self._filter_timer.stop()
+        if self._rows is not None:
+            self._set_rows("", None)
+
+    def shutdown(self):
+        self._filter_timer.stop()
+        with self._cond:
+            self._stopping = True
+            self._job = None
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _submit_filter(self):
+        with self._cond:
+            self._job = (self._generation, self._wanted_text)
+            self._cond.notify()
+
+    def _run_filters(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                generation, text = self._job
+                self._job = None
+            version = self.store.version
+            try:
+                rows = self.store.filter(text)
+            except (IndexError, RuntimeError):
+                rows = None  # a playlist mudou a meio: a versão já não coincide
+            if not self._stopping:
+                self._filtered.emit(generation, version, text, rows)
+
+    def _apply_filter(self, generation: int, version: int, text: str, rows):
+        if generation != self._generation:
+            return  # entretanto o texto mudou
+        if rows is None or version != self.store.version:
+            self._submit_filter()  # a playlist mudou enquanto se filtrava: repetir
+            return
+        self._set_rows(text, rows)
+
+    def _set_rows(self, text: str, rows):
+        self.beginResetModel()
+        self._filter_text = text
+        self._rows = rows
+        self.endResetModel()
+
+    def find(self, path: str) -> int:
+        """Linha da vista onde está `path`, ou -1."""
+        row = self.store.index_of(path)
+        if row < 0 or self._rows is None:
+            return row
+        i = bisect_left(self._rows, row)
+        return i if i < len(self._rows) and self._rows[i] == row else -1
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self._durations = {}
+        self._scenes = {}
+        self.total_ms = 0
+        if self._rows is not None:
+            self._rows = []
+        self.endResetModel()
+
+    def update_metadata(self, infos):
+        """Aplica um lote de resultados do índice de metadados (dicts com path/duration_ms)."""
+        changed = False
+        for info in infos:
+            path, ms = info["path"], info.get("duration_ms")
+            if ms is None or path not in self.store:
+                continue
+            old = self._durations.get(path)
+            if old != ms:
+                self._durations[path] = ms
+                self.total_ms += ms - (old or 0)
+                changed = True
+        if changed and self.rowCount():
+            # Uma única notificação: a vista só volta a pintar as linhas visíveis
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.DisplayRole])
+        return changed
+
+    def duration(self, path):
+        return self._durations.get(path)
+
+    def set_scene_count(self, path, count: int):
+        """Número de cenas de `path` (mostrado ao lado da duração); só a linha dele é pintada de novo."""
+        if path not in self.store or self._scenes.get(path) == count:
+            return
+        self._scenes[path] = count
+        row = self.find(path)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row), self.index(row), [Qt.DisplayRole])
+
+    def source_row(self, row: int) -> int:
+        return row if self._rows is None else self._rows[row]
+
+    def path_at(self, row: int) -> str:
+        return self.store.path_at(self.source_row(row))
+
+    def paths(self):
+        return iter(self.store)
+
+    def __len__(self):
+        return len(self.store)
+
+
+def format_ms(ms):
+    secs = max(0, int(ms / 1000))
+    h, r = divmod(secs, 3600)
+    m, s = divmod(r, 60)
+    if h:
+        return f"{h:02d}:{m:02d}:{s:02d}"
+    return f"{m:02d}:{s:02d}"
+
+
+class PlaylistLoader(QThread):
+    """Lê um ficheiro de playlist (.txt / .m3u) numa thread de trabalho.
+
+    Os caminhos são enviados à GUI em lotes através de `batch_ready`, para que a
+    janela continue a responder mesmo com playlists de centenas de milhares de
+    entradas. O progresso é reportado em bytes lidos / bytes totais.
+    """
+
+    batch_ready = Signal(list)
+    progress = Signal(int, int)
+    loaded = Signal(int)
+    failed = Signal(str)
+
+    def __init__(self, path, batch_size: int = 5000, parent=None):
+        super().__init__(parent)
+        self.path = Path(path)
+        self.batch_size = batch_size
+
+    def run(self):
+        try:
+            total = self.path.stat().st_size
+            count = 0
+            batch = []
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    if self.isInterruptionRequested():
+                        break
+                    line = raw.decode("utf-8", errors="replace").strip()
+                    # Linhas vazias e comentários/diretivas M3U (#EXTINF, ...) são ignorados
+                    if not line or line.startswith("#"):
+                        continue
+                    batch.append(line)
+                    if len(batch) >= self.batch_size:
+                        count += len(batch)
+                        self.batch_ready.emit(batch)
+                        self.progress.emit(f.tell(), total)
+                        batch = []
+                if batch:
+                    count += len(batch)
+                    self.batch_ready.emit(batch)
+            if self.isInterruptionRequested():
+                return  # cancelado: a playlist não ficou carregada
+            self.progress.emit(total, total)
+            self.loaded.emit(count)
+        except Exception as e:
+            self.failed.emit(str(e))
@@ -0,0 +1,257 @@
+# Estrutura de dados da playlist (sem dependências de Qt)
+# - caminhos em blocos de BLOCK_SIZE/4 a 2×BLOCK_SIZE entradas (strings
+#   "interned": cada caminho existe uma só vez em memória); inserir, remover e
+#   mover só mexem num ou dois blocos
+# - índice caminho -> bloco (dict) para procura e deduplicação em O(1); a
+#   linha é o início do bloco mais a posição dentro dele
+# - o início de cada bloco é recalculado só a partir do primeiro bloco que
+#   mudou de tamanho (uma soma acumulada sobre ~N/BLOCK_SIZE números), por isso
+#   procurar, remover e mover custam o mesmo antes e depois de editar
+# - filtro incremental: refinar a pesquisa só percorre os resultados anteriores;
+#   `version` permite corrê-lo noutra thread e descartar resultados antigos
+
+import sys
+from bisect import bisect_right
+from itertools import accumulate, chain
+
+BLOCK_SIZE = 1024
+
+
+class _Block:
+    __slots__ = ("paths", "keys", "pos")
+
+    def __init__(self, paths, keys, pos):
+        self.paths = paths
+        self.keys = keys  # caminhos em minúsculas, paralela a `paths`
+        self.pos = pos    # posição em PlaylistStore._blocks
+
+
+class PlaylistStore:
+    """Playlist sem duplicados com procura por caminho em tempo constante.
+
+    `version` aumenta a cada alteração: `filter` pode correr noutra thread e
+    quem o chamou compara a versão lida antes com a atual para saber se o
+    resultado ainda corresponde à playlist.
+    """
+
+    __slots__ = ("_blocks", "_block_of", "_starts", "_len", "_flat_keys", "_filter_cache", "version")
+
+    def __init__(self, paths=()):
+        self.version = 0
+        self.clear()
+        self.extend(paths)
+
+    # --- Leitura ---
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(b.paths for b in list(self._blocks))
+
+    def __contains__(self, path):
+        return path in self._block_of
+
+    def path_at(self, row: int) -> str:
+        block, i = self._locate(row)
+        return block.paths[i]
+
+    def index_of(self, path: str) -> int:
+        """Linha do caminho na playlist, ou -1 se não existir."""
+        block = self._block_of.get(path)
+        if block is None:
+            return -1
+        return self._ensure_starts()[block.pos] + block.paths.index(path)
+
+    # --- Alteração ---
+    def new_paths(self, paths) -> list[str]:
+        """Caminhos de `paths` que ainda não estão na playlist (sem repetições)."""
+        index = self._block_of
+        return [p for p in dict.fromkeys(paths) if p not in index]
+
+    def append(self, path: str) -> bool:
+        return self.extend((path,)) == 1
+
+    def extend(self, paths) -> int:
+        """Acrescenta os caminhos ainda inexistentes; devolve quantos foram acrescentados."""
+        added = [sys.intern(p) for p in self.new_paths(paths)]
+        if not added:
+            return 0
+        keys = [self._key(p) for p in added]
+        blocks = self._blocks
+        block_of = self._block_of
+        i = 0
+        # Completar o último bloco e depois abrir blocos novos
+        if blocks and len(blocks[-1].paths) < BLOCK_SIZE:
+            last = blocks[-1]
+            i = BLOCK_SIZE - len(last.paths)
+            last.paths.extend(added[:i])
+            last.keys.extend(keys[:i])
+            block_of.update(dict.fromkeys(added[:i], last))
+            self._invalidate(last.pos + 1)
+        while i < len(added):
+            block = _Block(added[i:i + BLOCK_SIZE], keys[i:i + BLOCK_SIZE], len(blocks))
+            blocks.append(block)
+            block_of.update(dict.fromkeys(block.paths, block))
+            i += BLOCK_SIZE
+        self._len += len(added)
+        # Acrescentar no fim não muda as linhas existentes: as chaves planas continuam válidas
+        flat = self._flat_keys
+        if flat is not None and flat[0] == self.version:
+            flat[1].extend(keys)
+            self._changed()
+            self._flat_keys = (self.version, flat[1])
+        else:
+            self._changed()
+        return len(added)
+
+    def remove(self, row: int) -> str:
+        block, i = self._locate(row)
+        path = block.paths.pop(i)
+        del block.keys[i]
+        del self._block_of[path]
+        self._len -= 1
+        self._resized(block)
+        self._changed()
+        return path
+
+    def remove_path(self, path: str) -> bool:
+        row = self.index_of(path)
+        if row < 0:
+            return False
+        self.remove(row)
+        return True
+
+    def remove_paths(self, paths) -> list[str]:
+        """Remove um lote de caminhos de uma vez (uma só reconstrução)."""
+        gone = {p for p in paths if p in self._block_of}
+        if not gone:
+            return []
+        kept = [p for p in self if p not in gone]
+        self.clear()
+        self.extend(kept)
+        return list(gone)
+
+    def move(self, src: int, dst: int):
+        """Move a entrada da linha `src` para a linha `dst`."""
+        if src == dst:
+            return
+        self._insert(dst, self.remove(src))
+
+    def clear(self):
+        self._blocks: list[_Block] = []
+        self._block_of: dict[str, _Block] = {}
+        self._starts: list[int] = []  # linha inicial dos primeiros blocos (os restantes por calcular)
+        self._len = 0
+        self._flat_keys = None  # (versão, chaves de todas as linhas por ordem), para filtrar
+        self._changed()
+
+    # --- Pesquisa ---
+    def filter(self, text: str) -> list[int]:
+        """Linhas cujo caminho contém `text` (sem distinguir maiúsculas).
+
+        Se `text` contém a pesquisa anterior (o utilizador continuou a escrever),
+        só os resultados anteriores são verificados. Percorre a playlist toda:
+        em listas grandes deve correr fora da thread da interface.
+        """
+        version = self.version
+        needle = text.casefold()
+        cache = self._filter_cache
+        if cache is not None and cache[0] == version and cache[1] in needle:
+            rows = self.filter_rows(needle, cache[2])
+        else:
+            rows = self.filter_rows(needle)
+        if self.version == version:
+            self._filter_cache = (version, needle, rows)
+        return rows
+
+    def filter_rows(self, needle: str, rows=None) -> list[int]:
+        """Filtra `rows` (ou todas as linhas) por `needle`, já em minúsculas."""
+        keys = self._keys()
+        if rows is None:
+            return [i for i, k in enumerate(keys) if needle in k]
+        return [i for i in rows if needle in keys[i]]
+
+    # --- Interno ---
+    @staticmethod
+    def _key(path):
+        key = path.casefold()
+        # Reutiliza a própria string quando o caminho já está em minúsculas
+        return path if key == path else key
+
+    def _keys(self) -> list[str]:
+        flat = self._flat_keys
+        version = self.version
+        if flat is not None and flat[0] == version:
+            return flat[1]
+        keys = list(chain.from_iterable(b.keys for b in list(self._blocks)))
+        if self.version == version:
+            self._flat_keys = (version, keys)
+        return keys
+
+    def _changed(self):
+        self.version += 1
+        self._filter_cache = None
+
+    def _invalidate(self, pos: int):
+        """Os blocos a partir de `pos` mudaram de linha inicial."""
+        del self._starts[pos:]
+
+    def _ensure_starts(self) -> list[int]:
+        starts = self._starts
+        blocks = self._blocks
+        valid = len(starts)
+        if valid < len(blocks):
+            first = starts[-1] + len(blocks[valid - 1].paths) if valid else 0
+            starts.extend(accumulate((len(b.paths) for b in blocks[valid:-1]), initial=first))
+        return starts
+
+    def _locate(self, row: int) -> tuple[_Block, int]:
+        if not 0 <= row < self._len:
+            raise IndexError(row)
+        starts = self._ensure_starts()
+        b = bisect_right(starts, row) - 1
+        # Não há blocos vazios, por isso o bloco encontrado contém a linha
+        return self._blocks[b], row - starts[b]
+
+    def _insert(self, row: int, path: str):
+        if row >= self._len:
+            self.extend((path,))
+            return
+        block, i = self._locate(row)
+        block.paths.insert(i, path)
+        block.keys.insert(i, self._key(path))
+        self._block_of[path] = block
+        self._len += 1
+        self._resized(block)
+        self._changed()
+
+    def _resized(self, block: _Block):
+        """Depois de um bloco crescer ou encolher: dividi-lo, retirá-lo ou juntar-lhe o seguinte."""
+        blocks = self._blocks
+        pos = block.pos
+        n = len(block.paths)
+        if n > 2 * BLOCK_SIZE:
+            half = n // 2
+            new = _Block(block.paths[half:], block.keys[half:], pos + 1)
+            del block.paths[half:], block.keys[half:]
+            blocks.insert(pos + 1, new)
+            self._block_of.update(dict.fromkeys(new.paths, new))
+            self._renumber(pos + 1)
+        elif n == 0:
+            del blocks[pos]
+            self._renumber(pos)
+            self._invalidate(pos)
+            return
+        elif n < BLOCK_SIZE // 4 and pos + 1 < len(blocks) and n + len(blocks[pos + 1].paths) <= BLOCK_SIZE:
+            # Bloco pequeno: absorve o seguinte, para o número de blocos não crescer com remoções
+            nxt = blocks.pop(pos + 1)
+            block.paths.extend(nxt.paths)
+            block.keys.extend(nxt.keys)
+            self._block_of.update(dict.fromkeys(nxt.paths, block))
+            self._renumber(pos + 1)
+        self._invalidate(pos + 1)
+
+    def _renumber(self, start: int):
+        blocks = self._blocks
+        for i in range(start, len(blocks)):
+            blocks[i].pos = i
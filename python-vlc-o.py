@@ -15,28 +15,78 @@ Execução:
  python editor_exibidor_video_vlc.py
 """
 
+import os
 import sys
-import vlc
+import time
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QAction, QFileDialog, QSlider, QLabel, QStatusBar, QMessageBox, QInputDialog
+    QPushButton, QAction, QFileDialog, QSlider, QLabel, QStatusBar, QMessageBox, QStackedWidget, QInputDialog
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+from thumbnails import ThumbnailService, SliderPreview
+from seeking import KeyframeIndexer, DragSeeker
+from single_instance import SingleInstance
+from cli import parse_args, prepare_environment, PlaybackSession
+from playback_stats import StatsSampler, StatsOverlay
+from marked_slider import MarkedSlider
+from clip_export import ClipExporter, ExportError, keyframe_before, default_output
+from export_queue import ExportQueue, QueueLocked, concat_output, journal_path
 
 class VideoPlayerVLC(QMainWindow):
+    # Os eventos do libvlc chegam numa thread do VLC; estes sinais levam-nos para a thread da GUI
+    vlcTimeChanged = pyqtSignal()
+    vlcLengthChanged = pyqtSignal()
+    vlcEndReached = pyqtSignal()
+    vlcError = pyqtSignal()
+    # Andamento da reprodução (para cli.PlaybackSession): origem = caminho ou URL
+    mediaLoading = pyqtSignal(str)
+    mediaStarted = pyqtSignal(str)
+    mediaEnded = pyqtSignal(str)
+    mediaFailed = pyqtSignal(str, str)
+    playbackFinished = pyqtSignal()  # fim da fila (sem --loop)
+    exportJobChanged = pyqtSignal(dict)  # tarefa da fila de exportação (vem de outra thread)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Editor / Exibidor de Vídeo - VLC + Qt")
         self.resize(900, 600)
 
-        # Instância do VLC
-        self.instance = vlc.Instance()
-        self.media_player = self.instance.media_player_new()
-
-        # Widget de vídeo
-        self.video_frame = QWidget(self)
-        self.video_frame.setStyleSheet("background-color: black;")
+        # Instância partilhada do VLC e leitores pré-aquecidos (vlc_pool.py):
+        # o leitor ativo reproduz enquanto o outro já abriu o próximo ficheiro.
+        # Criar o vlc.Instance (carregar os plugins do libvlc) é o passo mais
+        # lento do arranque: só acontece ao abrir o primeiro ficheiro (_ensure_pool)
+        self.pool = None
+        self.instance = None
+        self.media_player = None
+
+        # Widget de vídeo: uma janela nativa por leitor, associada uma única vez
+        self.video_stack = QStackedWidget(self)
+        self.video_frames = []
+        for _ in range(2):
+            frame = QWidget()
+            frame.setStyleSheet("background-color: black;")
+            self.video_stack.addWidget(frame)
+            self.video_frames.append(frame)
+        self.video_frame = self.video_frames[0]
+
+        # Lista de ficheiros abertos (o seguinte é preparado em segundo plano)
+        self.queue = []
+        self.queue_pos = -1
+        self.current_mrl = None
+        # Opções da linha de comandos (apply_options)
+        self.loop = False
+        self.start_ms = 0  # posição inicial pedida para o 1.º item
+        self.rate = 1.0
+        self.muted = False
+        self.headless = False  # saída de vídeo nula, sem janelas nativas
+        self.video_callbacks = False  # desenhar a partir de buffers próprios (vlc_video.py)
+        self.video_outputs = []
+        self.frame_steppers = {}  # índice do leitor -> VlcFrameStepper (só com callbacks)
+        self._failed_in_row = 0
+        self.nextButton = QPushButton("Seguinte")
+        self.nextButton.clicked.connect(self.next_video)
 
         # Botões de controlo
         self.playButton = QPushButton("Ligar")
@@ -48,36 +98,62 @@ class VideoPlayerVLC(QMainWindow):
         self.fullscreenButton = QPushButton("Fullscreen")
         self.fullscreenButton.clicked.connect(self.toggle_fullscreen)
 
-        # Slider de progresso
-        self.positionSlider = QSlider(Qt.Horizontal)
+        # Slider de progresso, com as marcas de entrada/saída do segmento a exportar
+        self.positionSlider = MarkedSlider(
+            Qt.Horizontal, ms_to_value=lambda ms: ms * 1000 / self._vlc_length if self._vlc_length else 0)
         self.positionSlider.setRange(0, 1000)
-        self.positionSlider.sliderMoved.connect(self.set_position)
+        # Arrastar: seeks agrupados e ajustados a keyframes; seek exato ao largar
+        self.keyframes = KeyframeIndexer(parent=self)
+        self.seeker = DragSeeker(
+            self.positionSlider, self.seek_to, indexer=self.keyframes,
+            value_to_ms=lambda v: v / 1000 * self._vlc_length)
+        self.seeker.scheduler.rateChanged.connect(lambda r: self.statusBar.showMessage(f"Seeks: {r:.0f}/s", 1000))
+
+        # Miniaturas ao passar o rato sobre o slider (o slider vai de 0 a 1000)
+        self.thumbnails = ThumbnailService(backend="vlc", parent=self)
+        self.slider_preview = SliderPreview(
+            self.positionSlider, self.thumbnails,
+            value_to_ms=lambda v: v / 1000 * self._vlc_length)
 
         # Slider de volume
         self.volumeSlider = QSlider(Qt.Horizontal)
         self.volumeSlider.setRange(0, 100)
         self.volumeSlider.setValue(50)
         self.volumeSlider.valueChanged.connect(self.set_volume)
-        self.set_volume(50)
 
         # Rótulos
         self.timeLabel = QLabel("00:00 / 00:00")
         self.volumeLabel = QLabel("Vol:")
 
+        # Equalizador do libvlc (graves/agudos em dB)
+        self.bassSlider = QSlider(Qt.Horizontal)
+        self.bassSlider.setRange(-10, 10)
+        self.bassSlider.setFixedWidth(80)
+        self.bassSlider.valueChanged.connect(self.set_equalizer)
+        self.trebleSlider = QSlider(Qt.Horizontal)
+        self.trebleSlider.setRange(-10, 10)
+        self.trebleSlider.setFixedWidth(80)
+        self.trebleSlider.valueChanged.connect(self.set_equalizer)
+
         # Layout dos controlos
         controls = QHBoxLayout()
         controls.addWidget(self.playButton)
         controls.addWidget(self.pauseButton)
         controls.addWidget(self.stopButton)
+        controls.addWidget(self.nextButton)
         controls.addWidget(self.fullscreenButton)
         controls.addWidget(self.timeLabel)
         controls.addStretch(1)
+        controls.addWidget(QLabel("Graves:"))
+        controls.addWidget(self.bassSlider)
+        controls.addWidget(QLabel("Agudos:"))
+        controls.addWidget(self.trebleSlider)
         controls.addWidget(self.volumeLabel)
         controls.addWidget(self.volumeSlider)
 
         # Layout principal
         layout = QVBoxLayout()
-        layout.addWidget(self.video_frame)
+        layout.addWidget(self.video_stack)
         layout.addWidget(self.positionSlider)
         layout.addLayout(controls)
 
@@ -85,6 +161,11 @@ class VideoPlayerVLC(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        # Estatísticas de reprodução (media.get_stats() amostrado numa thread; overlay com Ctrl+I)
+        self.stats = StatsSampler("python-vlc-o.py", parent=self)
+        self.stats_overlay = StatsOverlay(self.video_stack)
+        self.stats.updated.connect(self.stats_overlay.show_snapshot)
+
         # Menu
         fileMenu = self.menuBar().addMenu("Ficheiro")
 
@@ -94,67 +175,361 @@ class VideoPlayerVLC(QMainWindow):
         streamAction = QAction("Abrir stream online…", self)
         streamAction.triggered.connect(self.open_stream)
 
+        # Gravar o stream aberto enquanto se vê (uma só ligação à rede)
+        self.recordAction = QAction("Gravar stream…", self, checkable=True)
+        self.recordAction.triggered.connect(self.toggle_recording)
+        self.recorder = None
+        self.recordTimer = QTimer(self)
+        self.recordTimer.setInterval(1000)
+        self.recordTimer.timeout.connect(self._update_recording_status)
+
         exitAction = QAction("Sair", self)
         exitAction.triggered.connect(self.close)
 
         fileMenu.addAction(openAction)
         fileMenu.addAction(streamAction)
+        fileMenu.addAction(self.recordAction)
         fileMenu.addSeparator()
         fileMenu.addAction(exitAction)
 
+        # Editar: segmento entre as marcas, exportado sem recodificar (clip_export.py)
+        self.exporter = ClipExporter(self)
+        self.exporter.progress.connect(self._on_export_progress)
+        self.exporter.completed.connect(self._on_export_completed)
+        self.exporter.cancelled.connect(lambda: self._export_finished("Exportação cancelada."))
+        self.exporter.failed.connect(lambda msg: self._export_finished(f"Falha ao exportar: {msg}"))
+        markInAction = QAction("Marcar entrada", self)
+        markInAction.setShortcut("I")
+        markInAction.triggered.connect(self.mark_in)
+        markOutAction = QAction("Marcar saída", self)
+        markOutAction.setShortcut("O")
+        markOutAction.triggered.connect(self.mark_out)
+        clearMarksAction = QAction("Limpar marcas", self)
+        clearMarksAction.triggered.connect(self.positionSlider.clear_marks)
+        exportAction = QAction("Exportar segmento…", self)
+        exportAction.setShortcut("Ctrl+E")
+        exportAction.triggered.connect(self.export_segment)
+        self.cancelExportAction = QAction("Cancelar exportação", self)
+        self.cancelExportAction.setEnabled(False)
+        self.cancelExportAction.triggered.connect(self.exporter.cancel)
+
+        editMenu = self.menuBar().addMenu("Editar")
+        editMenu.addAction(markInAction)
+        editMenu.addAction(markOutAction)
+        editMenu.addAction(clearMarksAction)
+        editMenu.addSeparator()
+        editMenu.addAction(exportAction)
+        editMenu.addAction(self.cancelExportAction)
+
+        # Fila de exportação (export_queue.py): vários segmentos, em processos à parte
+        self.export_queue = None
+        self.segment_list = []  # segmentos do ficheiro atual para exportar juntos
+        self.exportJobChanged.connect(self._on_export_job)
+        queueAction = QAction("Adicionar segmento à fila", self)
+        queueAction.setShortcut("Ctrl+Shift+E")
+        queueAction.triggered.connect(self.queue_segment)
+        joinAction = QAction("Juntar segmento à lista", self)
+        joinAction.setShortcut("Ctrl+J")
+        joinAction.triggered.connect(self.join_segment)
+        exportJoinedAction = QAction("Exportar segmentos juntos…", self)
+        exportJoinedAction.triggered.connect(self.export_joined)
+        workersAction = QAction("Exportações em paralelo…", self)
+        workersAction.triggered.connect(self.set_export_workers)
+        clearQueueAction = QAction("Esvaziar fila de exportação", self)
+        clearQueueAction.triggered.connect(self.clear_export_queue)
+        editMenu.addSeparator()
+        for action in (queueAction, joinAction, exportJoinedAction, workersAction, clearQueueAction):
+            editMenu.addAction(action)
+        if journal_path("python-vlc-o").exists():
+            QTimer.singleShot(0, self._ensure_export_queue)  # retomar o que ficou por exportar
+
+        self.statsAction = QAction("Estatísticas de reprodução", self, checkable=True)
+        self.statsAction.setShortcut("Ctrl+I")
+        self.statsAction.toggled.connect(self.stats_overlay.setVisible)
+        self.menuBar().addMenu("Ver").addAction(self.statsAction)
+
+        nextFrameAction = QAction("Fotograma seguinte", self)
+        nextFrameAction.setShortcut(".")
+        nextFrameAction.triggered.connect(self.step_forward)
+        prevFrameAction = QAction("Fotograma anterior", self)
+        prevFrameAction.setShortcut(",")
+        prevFrameAction.triggered.connect(self.step_back)
+        playbackMenu = self.menuBar().addMenu("Reprodução")
+        playbackMenu.addAction(nextFrameAction)
+        playbackMenu.addAction(prevFrameAction)
+
         # Barra de estado
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
 
-        # Timer para atualização
-        self.timer = QTimer(self)
-        self.timer.setInterval(500)
-        self.timer.timeout.connect(self.update_ui)
+        # Posição e tempo atualizados por eventos do libvlc (sem polling):
+        # os callbacks guardam o valor mais recente e pedem uma única atualização
+        # à GUI de cada vez; a GUI só redesenha o que mudou.
+        self._vlc_time = 0
+        self._vlc_length = 0
+        self._time_pending = False
+        self._shown_text = None
+        self.vlcTimeChanged.connect(self.update_ui)
+        self.vlcLengthChanged.connect(self.update_ui)
+        self.vlcEndReached.connect(self.on_end_reached)
+        self.vlcError.connect(self.on_error)
+        # Tempo desde o pedido de abertura até ao primeiro avanço do relógio
+        self._open_started = None
+        self._open_latency = None
 
         self.media = None
         self.is_fullscreen = False
 
     def open_file(self):
-        filename, _ = QFileDialog.getOpenFileName(
-            self, "Abrir ficheiro de vídeo", str(Path.home()),
+        filenames, _ = QFileDialog.getOpenFileNames(
+            self, "Abrir ficheiro(s) de vídeo", str(Path.home()),
             "Vídeos (*.mp4 *.mkv *.avi *.mov *.flv *.webm);;Todos os ficheiros (*)")
-        if filename:
-            self.load_video(filename)
+        if filenames:
+            self.stop_recording()
+            self.queue = filenames
+            self.play_queue_item(0)
 
     def open_stream(self):
         url, ok = QInputDialog.getText(self, "Abrir stream", "Introduza o URL do vídeo/stream:")
         if ok and url:
-            self.load_video(url)
+            self.stop_recording()
+            self.queue = [url]
+            self.play_queue_item(0)
 
-    def load_video(self, path_or_url):
-        self.media = self.instance.media_new(path_or_url)
-        self.media_player.set_media(self.media)
+    def open_paths(self, paths, enqueue=False):
+        """Abre o que veio da linha de comandos (ou de outra invocação, ver single_instance.py).
 
-        if sys.platform.startswith('linux'):
-            self.media_player.set_xwindow(self.video_frame.winId())
-        elif sys.platform == "win32":
-            self.media_player.set_hwnd(self.video_frame.winId())
-        elif sys.platform == "darwin":
-            self.media_player.set_nsobject(int(self.video_frame.winId()))
+        Sem enqueue substitui a fila; com enqueue acrescenta ao fim e só
+        começa a tocar se ainda não houver nada aberto.
+        """
+        if not paths:
+            return
+        if enqueue and self.media is not None:
+            was_last = self.queue_pos + 1 == len(self.queue)
+            self.queue.extend(paths)
+            if was_last:  # o atual já está a tocar: preparar já o seguinte
+                self._prepare_next(paths[0])
+            self.statusBar.showMessage(f"{len(paths)} item(s) adicionados à fila", 3000)
+            return
+        self.stop_recording()
+        self.queue = list(paths)
+        self.play_queue_item(0)
+
+    def apply_options(self, options):
+        """Opções da linha de comandos (cli.py) que dizem respeito ao leitor."""
+        self.loop = options.loop
+        self.start_ms = options.start
+        self.headless = options.headless
+        self.video_callbacks = options.video_callbacks
+        self.rate = options.rate or 1.0
+        self.muted = options.mute
+        if options.volume is not None:
+            self.volumeSlider.setValue(options.volume)
+        if options.metrics:
+            self.stats.export_to(options.metrics, options.metrics_interval)
+        self.statsAction.setChecked(options.stats_overlay)
+        if self.media_player is not None:
+            self._apply_player_options()
+
+    def _apply_player_options(self):
+        # Cada leitor do conjunto tem o seu estado: repor ao ativar um novo
+        self.media_player.set_rate(self.rate)
+        self.media_player.audio_set_mute(self.muted)
+    def play_queue_item(self, pos):
+        if self.recorder is not None and not self.recordTimer.isActive():
+            self.stop_recording()  # gravação já terminada: o leitor deixa de precisar do servidor local
+        self.queue_pos = pos
+        item = self.queue[pos]
+        if "://" not in item and not os.path.isfile(item):
+            self.statusBar.showMessage(f"Não encontrado: {item}", 5000)
+            self.mediaFailed.emit(item, "ficheiro não encontrado")
+            QTimer.singleShot(0, self._skip_failed)
+            return
+        self.load_video(item)
+        following = self._next_pos()
+        if following is not None and following != pos:
+            # Preparar o seguinte depois de o atual arrancar, para não competirem pelo disco
+            next_item = self.queue[following]
+            QTimer.singleShot(1000, lambda: self._prepare_next(next_item))
+
+    def _next_pos(self):
+        """Posição do item seguinte da fila (com loop volta ao início), ou None."""
+        if self.queue_pos + 1 < len(self.queue):
+            return self.queue_pos + 1
+        return 0 if self.loop and self.queue else None
+
+    def _prepare_next(self, mrl):
+        following = self._next_pos()
+        if following is not None and self.queue[following] == mrl and self.pool is not None:
+            self.pool.prepare(mrl)
+
+    def next_video(self):
+        following = self._next_pos()
+        if following is not None:
+            self.play_queue_item(following)
+
+    def _skip_failed(self):
+        self._failed_in_row += 1
+        if self._failed_in_row >= len(self.queue):
+            # Nenhum item da fila consegue tocar: parar mesmo com loop
+            self._failed_in_row = 0
+            self.playbackFinished.emit()
+        elif self._next_pos() is not None:
+            self.next_video()
+        else:
+            self.playbackFinished.emit()
+
+    def _ensure_pool(self):
+        """Cria a instância do VLC e os leitores na primeira abertura."""
+        if self.pool is not None:
+            return self.pool
+        import vlc
+        from vlc_pool import PlayerPool
+
+        if self.headless and not self.video_callbacks:
+            # Sem janela para desenhar: descodifica na mesma, mas a saída de vídeo é nula
+            from vlc_pool import DEFAULT_OPTIONS, shared_instance
+            self.pool = PlayerPool(size=len(self.video_frames),
+                                   instance=shared_instance(DEFAULT_OPTIONS + ("--vout=dummy",)))
+        else:
+            self.pool = PlayerPool(size=len(self.video_frames))
+        self.instance = self.pool.instance
+        self.media_player = self.pool.players[0]
+        for i, (player, frame) in enumerate(zip(self.pool.players, self.video_frames)):
+            if self.video_callbacks:
+                self._use_video_callbacks(i, player)
+            elif not self.headless:
+                self.pool.bind_window(i, frame.winId())
+            events = player.event_manager()
+            events.event_attach(vlc.EventType.MediaPlayerTimeChanged, self._on_vlc_time, i)
+            events.event_attach(vlc.EventType.MediaPlayerLengthChanged, self._on_vlc_length, i)
+            events.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_vlc_end, i)
+            events.event_attach(vlc.EventType.MediaPlayerEncounteredError, self._on_vlc_error, i)
+        self.stats.attach_vlc(self.pool.players, lambda: self.pool.active)
+        if self.bassSlider.value() or self.trebleSlider.value():
+            self.set_equalizer()
+        return self.pool
+
+    def _use_video_callbacks(self, index, player):
+        """Troca a janela nativa do leitor `index` por um widget pintado a partir dos buffers do libvlc."""
+        from vlc_video import VlcFrameStepper, VlcVideoOutput, VlcVideoWidget
+        output = VlcVideoOutput(parent=self)
+        output.attach(player)
+        self.frame_steppers[index] = VlcFrameStepper(output, player)
+        widget = VlcVideoWidget(output)
+        old = self.video_frames[index]
+        self.video_stack.insertWidget(index, widget)
+        self.video_stack.removeWidget(old)
+        old.deleteLater()
+        self.video_frames[index] = widget
+        self.video_outputs.append(output)
 
+    def load_video(self, path_or_url):
+        self._open_started = time.perf_counter()
+        self._vlc_time = 0
+        self._vlc_length = 0
+        self.current_mrl = path_or_url
+        self.mediaLoading.emit(path_or_url)
+        self.stats.media_changed(path_or_url)
+        self.positionSlider.clear_marks()
+        self.segment_list = []
+        index, self.media_player = self._ensure_pool().activate(path_or_url)
+        if index in self.frame_steppers:
+            self.frame_steppers[index].reset()
+        self._apply_player_options()
+        self.video_stack.setCurrentIndex(index)
+        self.video_frame = self.video_frames[index]
+        self.media = self.media_player.get_media()
+        self.slider_preview.set_source(path_or_url if os.path.isfile(path_or_url) else None)
+        self.seeker.set_source(path_or_url if os.path.isfile(path_or_url) else None)
+
+        self.set_volume(self.volumeSlider.value())
         self.statusBar.showMessage(f"Carregado: {path_or_url}")
-        self.play_video()
+
+    # --- Gravação do stream ---
+    def toggle_recording(self, checked):
+        if not checked:
+            self.stop_recording(resume_direct=True)
+            return
+        url = self.queue[self.queue_pos] if 0 <= self.queue_pos < len(self.queue) else ""
+        if not url.lower().startswith(("http://", "https://")):
+            QMessageBox.information(self, "Gravar stream", "Abra primeiro um stream HTTP/HTTPS.")
+            self.recordAction.setChecked(False)
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Gravar stream como…", str(Path.home() / "stream.ts"))
+        if not path:
+            self.recordAction.setChecked(False)
+            return
+        from stream_recorder import StreamRecorder, RecordingError
+        self.stop_recording()  # uma gravação já terminada ainda pode estar a servir o leitor
+        recorder = StreamRecorder(url, path)
+        try:
+            recorder.start()
+        except (RecordingError, OSError) as e:
+            QMessageBox.critical(self, "Erro ao gravar", str(e))
+            self.recordAction.setChecked(False)
+            return
+        self.recorder = recorder
+        # O VLC passa a ler do servidor local do gravador em vez do URL original; o
+        # gravador descarrega desde o byte 0 (o ficheiro tem de ficar completo) e o
+        # leitor retoma onde estava, à espera que esses bytes cheguem
+        if self.media_player.is_seekable():
+            self.start_ms = max(0, self.media_player.get_time())
+        self.load_video(recorder.local_url)
+        self.recordTimer.start()
+
+    def stop_recording(self, resume_direct=False):
+        """Termina a gravação e fecha o servidor local do gravador."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        if resume_direct:
+            self.media_player.stop()
+        recorder.stop()
+        if resume_direct:
+            self.load_video(recorder.url)
+        if self.recordTimer.isActive():
+            self._recording_ended(recorder)
+
+    def _recording_ended(self, recorder):
+        self.recordTimer.stop()
+        self.recordAction.setChecked(False)
+        msg = f"Gravação terminada: {recorder.path} ({recorder.bytes_written / 2**20:,.1f} MB)"
+        if recorder.error:
+            msg += f" — {recorder.error}"
+        self.statusBar.showMessage(msg, 8000)
+
+    def _update_recording_status(self):
+        if self.recorder is None or not self.recordTimer.isActive():
+            return
+        if not self.recorder.running:
+            # O download terminou (ou a ligação falhou). O VLC continua a ler do
+            # servidor local (seeks, novas ligações), que só fecha ao mudar de
+            # ficheiro ou ao fechar a janela (stop_recording)
+            self._recording_ended(self.recorder)
+            return
+        self.statusBar.showMessage(
+            f"A gravar… {self.recorder.bytes_written / 2**20:,.1f} MB → {self.recorder.path}")
 
     def play_video(self):
         if self.media is None:
             QMessageBox.warning(self, "Aviso", "Nenhum ficheiro ou stream carregado")
             return
+        self._resume_from_step()
         self.media_player.play()
-        self.timer.start()
 
     def pause_video(self):
-        self.media_player.pause()
+        if self.media_player is not None:
+            if not self.media_player.is_playing():
+                self._resume_from_step()
+            self.media_player.pause()
 
     def stop_video(self):
-        self.media_player.stop()
-        self.timer.stop()
+        if self.media_player is not None:
+            self.media_player.stop()
+        self._vlc_time = 0
         self.positionSlider.setValue(0)
-        self.timeLabel.setText("00:00 / 00:00")
+        self._set_time_text("00:00 / 00:00")
 
     def toggle_fullscreen(self):
         if self.is_fullscreen:
@@ -164,22 +539,277 @@ class VideoPlayerVLC(QMainWindow):
         self.is_fullscreen = not self.is_fullscreen
 
     def set_volume(self, value):
-        self.media_player.audio_set_volume(value)
+        if self.media_player is not None:
+            self.media_player.audio_set_volume(value)
+
+    def set_equalizer(self, *args):
+        bass, treble = self.bassSlider.value(), self.trebleSlider.value()
+        if self.pool is not None:  # sem leitores ainda: aplicado em _ensure_pool
+            from vlc_pool import shelf_equalizer
+            self.pool.set_equalizer(shelf_equalizer(bass, treble))
+        self.statusBar.showMessage(f"Graves: {bass:+d} dB · Agudos: {treble:+d} dB", 3000)
+
+    # --- Segmento: marcas de entrada/saída e exportação ---
+    def mark_in(self):
+        if self.media is None:
+            return
+        # Sem recodificar, o segmento só pode começar num keyframe
+        ms = keyframe_before(self.seeker.keyframes, self._vlc_time)
+        self.positionSlider.set_in(ms)
+        self.statusBar.showMessage(f"Entrada: {self.format_time(ms / 1000)}", 3000)
 
-    def set_position(self, position):
-        self.media_player.set_position(position / 1000.0)
+    def mark_out(self):
+        if self.media is None:
+            return
+        self.positionSlider.set_out(self._vlc_time)
+        self.statusBar.showMessage(f"Saída: {self.format_time(self._vlc_time / 1000)}", 3000)
+
+    def _marked_segment(self):
+        """Segmento entre as marcas, ou None (com o motivo na barra de estado)."""
+        if not self.current_mrl or not os.path.isfile(self.current_mrl):
+            # Streams: gravar com "Gravar stream…"
+            self.statusBar.showMessage("Só é possível exportar segmentos de ficheiros locais.", 5000)
+            return None
+        segment = self.positionSlider.segment(self._vlc_length)
+        if segment is None:
+            self.statusBar.showMessage("Marque a entrada (I) e/ou a saída (O) do segmento.", 5000)
+        return segment
+
+    def export_segment(self):
+        segment = self._marked_segment()
+        if segment is None:
+            return
+        path = self.current_mrl
+        start, end = segment
+        suffix = Path(path).suffix
+        dst, _ = QFileDialog.getSaveFileName(self, "Exportar segmento", str(default_output(path, start, end)),
+                                             f"Mesmo formato (*{suffix})")
+        if not dst:
+            return
+        if not dst.lower().endswith(suffix.lower()):
+            dst += suffix  # os pacotes copiados têm de ir para o mesmo tipo de contentor
+        try:
+            self.exporter.start(path, dst, start, end)
+        except ExportError as e:
+            QMessageBox.warning(self, "Exportar segmento", str(e))
+            return
+        self.cancelExportAction.setEnabled(True)
+        self.statusBar.showMessage("A exportar segmento…")
+
+    def _on_export_progress(self, fraction, mb_per_s, realtime):
+        self.statusBar.showMessage(
+            f"A exportar segmento… {fraction:.0%} ({mb_per_s:.0f} MB/s, {realtime:.0f}× o tempo real)")
+
+    def _on_export_completed(self, dst):
+        self._export_finished(f"Segmento exportado para: {dst}")
+
+    def _export_finished(self, message):
+        self.cancelExportAction.setEnabled(False)
+        self.statusBar.showMessage(message, 8000)
+
+    # --- Fila de exportação ---
+    def _ensure_export_queue(self):
+        if self.export_queue is None:
+            try:
+                self.export_queue = ExportQueue("python-vlc-o")
+            except QueueLocked as e:
+                self.statusBar.showMessage(str(e), 8000)
+                return None
+            self.export_queue.listeners.append(self.exportJobChanged.emit)
+            counts = self.export_queue.counts()
+            unfinished = counts["pending"] + counts["running"]
+            if unfinished:
+                self.statusBar.showMessage(f"Fila de exportação retomada: {unfinished} tarefa(s)", 5000)
+        return self.export_queue
+
+    def queue_segment(self):
+        segment = self._marked_segment()
+        if segment is None or self._ensure_export_queue() is None:
+            return
+        try:
+            self.export_queue.add_cut(self.current_mrl, *segment)
+        except ExportError as e:
+            QMessageBox.warning(self, "Fila de exportação", str(e))
+            return
+        self.positionSlider.clear_marks()  # pronto para marcar o próximo
 
-    def update_ui(self):
-        length = self.media_player.get_length() / 1000
-        current = self.media_player.get_time() / 1000
+    def join_segment(self):
+        segment = self._marked_segment()
+        if segment is None:
+            return
+        self.segment_list.append(segment)
+        self.positionSlider.clear_marks()
+        self.statusBar.showMessage(f"{len(self.segment_list)} segmento(s) para exportar juntos", 5000)
+
+    def export_joined(self):
+        if not self.segment_list:
+            self.statusBar.showMessage("Junte primeiro segmentos à lista (Ctrl+J).", 5000)
+            return
+        if self._ensure_export_queue() is None:
+            return
+        path = self.current_mrl
+        suffix = Path(path).suffix
+        dst, _ = QFileDialog.getSaveFileName(self, "Exportar segmentos juntos",
+                                             str(concat_output(path, len(self.segment_list))),
+                                             f"Mesmo formato (*{suffix})")
+        if not dst:
+            return
+        if not dst.lower().endswith(suffix.lower()):
+            dst += suffix
+        try:
+            self.export_queue.add_concat(path, self.segment_list, dst, priority=1)
+        except ExportError as e:
+            QMessageBox.warning(self, "Fila de exportação", str(e))
+            return
+        self.segment_list = []
+
+    def set_export_workers(self):
+        if self._ensure_export_queue() is None:
+            return
+        n, ok = QInputDialog.getInt(self, "Exportações em paralelo", "Processos ffmpeg ao mesmo tempo:",
+                                    self.export_queue.concurrency, 1, os.cpu_count() or 1)
+        if ok:
+            self.export_queue.set_concurrency(n)
+
+    def clear_export_queue(self):
+        if self.export_queue is not None:
+            n = self.export_queue.cancel_pending()
+            self.statusBar.showMessage(f"{n} tarefa(s) retirada(s) da fila de exportação", 5000)
+
+    def _on_export_job(self, job):
+        self.statusBar.showMessage(f"{ExportQueue.describe(job)} — {self.export_queue.summary()}", 8000)
 
-        if length > 0:
-            pos = int(self.media_player.get_position() * 1000)
-            self.positionSlider.setValue(pos)
+    def _frame_stepper(self):
+        # Só a saída por callbacks (--video-callbacks) dá acesso aos fotogramas descodificados
+        return self.frame_steppers.get(self.pool.active) if self.pool is not None else None
 
-        cur_time = self.format_time(current)
-        total_time = self.format_time(length)
-        self.timeLabel.setText(f"{cur_time} / {total_time}")
+    def step_forward(self):
+        if self.media is None:
+            return
+        # Depois de recuar, os fotogramas seguintes ainda estão no anel
+        stepper = self._frame_stepper()
+        time_ms = stepper.step_forward() if stepper is not None else None
+        if time_ms is not None:
+            self._show_step(time_ms)
+            return
+        # O libvlc descodifica só o fotograma seguinte (sem seek) e fica em pausa
+        self.media_player.next_frame()
+
+    def step_back(self):
+        if self.media is None or self._vlc_length <= 0:
+            return
+        if self.media_player.is_playing():
+            self.media_player.set_pause(1)
+        stepper = self._frame_stepper()
+        time_ms = stepper.step_back() if stepper is not None else None
+        if time_ms is not None:
+            self._show_step(time_ms)
+            return
+        # Fora do anel (ou com janela nativa, sem acesso aos fotogramas): seek de um fotograma
+        fps = self.media_player.get_fps() or 25
+        self.seek_to(max(0, int(self.media_player.get_time() - 1000 / fps)))
+
+    def _show_step(self, time_ms):
+        self._vlc_time = time_ms
+        self.update_ui()
+
+    def _resume_from_step(self):
+        # Retomar a partir do fotograma mostrado pelo passo a passo, não do último descodificado
+        stepper = self._frame_stepper()
+        resume_ms = stepper.take_resume_ms() if stepper is not None else None
+        if resume_ms is not None:
+            self.seek_to(resume_ms)
+
+    def seek_to(self, ms):
+        # Sem duração conhecida (alguns streams) não há posição para onde ir
+        if self._vlc_length > 0:
+            stepper = self._frame_stepper()
+            if stepper is not None:
+                stepper.reset()
+            self.media_player.set_time(int(ms))
+
+    # --- Eventos do libvlc (thread do VLC: não tocar na GUI aqui) ---
+    def _on_vlc_time(self, event, index):
+        if index != self.pool.active:
+            return
+        self._vlc_time = event.u.new_time
+        if self._open_started is not None and self._vlc_time > 0:
+            self._open_latency = time.perf_counter() - self._open_started
+            self._open_started = None
+        if not self._time_pending:
+            self._time_pending = True
+            self.vlcTimeChanged.emit()
+
+    def _on_vlc_length(self, event, index):
+        if index != self.pool.active:
+            return
+        self._vlc_length = event.u.new_length
+        self.vlcLengthChanged.emit()
+
+    def _on_vlc_end(self, event, index):
+        if index == self.pool.active:
+            self.vlcEndReached.emit()
+
+    def _on_vlc_error(self, event, index):
+        if index == self.pool.active:
+            self.vlcError.emit()
+
+    # --- Atualização da GUI ---
+    def update_ui(self):
+        self._time_pending = False
+        latency = self._open_latency
+        if latency is not None:
+            self._open_latency = None
+            self.statusBar.showMessage(f"Primeiro fotograma em {latency * 1000:.0f} ms", 5000)
+            self._failed_in_row = 0
+            self.mediaStarted.emit(self.current_mrl)
+            if self.start_ms:
+                self.media_player.set_time(self.start_ms)
+                self.start_ms = 0
+        length = self._vlc_length
+        current = self._vlc_time
+        self.seeker.scheduler.completed(current)
+
+        if length > 0 and not self.positionSlider.isSliderDown():
+            pos = min(1000, int(current * 1000 / length))
+            if pos != self.positionSlider.value():
+                self.positionSlider.setValue(pos)
+
+        cur_time = self.format_time(current / 1000)
+        total_time = self.format_time(length / 1000)
+        self._set_time_text(f"{cur_time} / {total_time}")
+
+    def _set_time_text(self, text):
+        if text != self._shown_text:
+            self._shown_text = text
+            self.timeLabel.setText(text)
+
+    def on_end_reached(self):
+        self._vlc_time = self._vlc_length
+        self.update_ui()
+        self.mediaEnded.emit(self.current_mrl)
+        if self._next_pos() is not None:
+            self.next_video()
+        else:
+            self.statusBar.showMessage("Fim da reprodução")
+            self.playbackFinished.emit()
+
+    def on_error(self):
+        self.statusBar.showMessage(f"Erro ao reproduzir: {self.current_mrl}", 5000)
+        self.mediaFailed.emit(self.current_mrl, "erro do libvlc")
+        self._skip_failed()
+
+    def closeEvent(self, event):
+        self.stop_recording()
+        self.thumbnails.shutdown()
+        self.keyframes.shutdown()
+        self.exporter.cancel()
+        if self.export_queue is not None:
+            self.export_queue.shutdown()  # as exportações em curso são retomadas na próxima vez
+        self.stats.shutdown()  # antes de libertar os leitores que a thread consulta
+        if self.pool is not None:
+            self.pool.release()
+        super().closeEvent(event)
 
     @staticmethod
     def format_time(seconds):
@@ -191,9 +821,24 @@ class VideoPlayerVLC(QMainWindow):
 
 
 def main():
-    app = QApplication(sys.argv)
+    options = parse_args(sys.argv[1:], "python-vlc-o.py")
+    # Com outra instância aberta, os ficheiros vão para essa e esta termina já
+    instance = SingleInstance("python-vlc-o")
+    if options.forward and instance.forward(options.paths, options.enqueue):
+        sys.exit(0)
+
+    prepare_environment(options)
+    app = QApplication(sys.argv[:1])
     player = VideoPlayerVLC()
+    session = PlaybackSession(options, player, app, "python-vlc-o.py")
+    player.apply_options(options)
+    if options.forward:  # só uma janela interativa recebe os ficheiros de outras execuções
+        instance.listen(player, player.open_paths)
     player.show()
+    player.open_paths(options.paths, options.enqueue)
+    if not options.paths and options.exit_at_end:
+        session.write_report()
+        sys.exit(0)
     sys.exit(app.exec_())
 
 if __name__ == '__main__':
@@ -0,0 +1,17 @@
+# Compatibilidade entre bindings Qt
+# Os scripts deste repositório usam PySide6 (Video-Viewer-1/2/3.py) ou PyQt5
+# (Video-Viewer.py, python-vlc*.py). Os módulos partilhados importam o Qt a
+# partir daqui e ficam com o binding que o script já tiver carregado.
+
+import sys
+
+if "PyQt5" in sys.modules and "PySide6" not in sys.modules:
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    Signal = QtCore.pyqtSignal
+    Slot = QtCore.pyqtSlot
+    QT_API = "PyQt5"
+else:
+    from PySide6 import QtCore, QtGui, QtWidgets
+    Signal = QtCore.Signal
+    Slot = QtCore.Slot
+    QT_API = "PySide6"
@@ -0,0 +1,333 @@
+# Deteção de mudanças de cena (cortes), para saltar entre cenas em gravações longas
+# - o ffmpeg descodifica o vídeo numa só thread e entrega SAMPLE_FPS
+#   fotogramas por segundo, reduzidos a 64×36 em tons de cinzento, por um pipe
+#   (rawvideo); a descodificação salta os fotogramas que não servem de
+#   referência (-skip_frame noref) e o filtro de desbloqueio, que não mudam
+#   nada a esta escala — é o que permite analisar muito mais depressa do que
+#   o tempo real num só núcleo
+# - as diferenças são calculadas em NumPy para um bloco de fotogramas de uma
+#   vez: histograma de 16 níveis de cada fotograma (um único bincount, com
+#   cada fotograma deslocado para os seus 16 contentores) e SAD (média das
+#   diferenças absolutas por píxel) entre fotogramas seguidos
+# - há corte quando as duas diferenças passam os limiares e a do histograma
+#   é também HIST_RATIO vezes a mediana dos 2 s anteriores (o limiar adapta-se
+#   a cenas com muito ruído ou movimento): o histograma ignora movimento de
+#   câmara, a SAD ignora mudanças só de exposição; dois cortes ficam a pelo
+#   menos MIN_SCENE_MS (flashes, explosões)
+# - precisão: um intervalo de amostragem (100 ms); fundidos e transições
+#   lentas não são detetados
+# - os resultados vão para o índice (media_index.py) à medida que a análise
+#   avança; uma análise interrompida (outro ficheiro aberto, leitor fechado)
+#   continua de onde ficou: o ffmpeg recomeça WINDOW+1 amostras antes, para
+#   refazer o fotograma anterior e a janela da mediana, e só contam os cortes
+#   a partir do ponto onde a análise tinha parado
+# - o instante de cada amostra é o PTS real (filtro showinfo, lido do stderr),
+#   não o número da amostra × intervalo: depois de um -ss que não cai num
+#   fotograma da origem, o ffmpeg pode começar uma amostra mais à frente
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from array import array
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from qt_compat import QtCore, Signal
+from media_index import MediaIndex
+
+SAMPLE_FPS = 10
+FRAME_W, FRAME_H = 64, 36
+HIST_BINS = 16
+HIST_THRESHOLD = 0.12  # metade da distância L1 entre histogramas normalizados (0–1)
+HIST_RATIO = 4.0       # ... e face à mediana da janela anterior
+WINDOW = 2 * SAMPLE_FPS
+SAD_THRESHOLD = 0.08   # diferença média por píxel, em fração de 255
+MIN_SCENE_MS = 1000
+CHUNK_FRAMES = 5 * SAMPLE_FPS  # fotogramas lidos (e comparados) de cada vez
+_PTS_TIME = re.compile(rb"pts_time:\s*(-?\d+(?:\.\d+)?)")
+PARAMS = f"{SAMPLE_FPS}/{FRAME_W}x{FRAME_H}/{HIST_THRESHOLD}x{HIST_RATIO}/{SAD_THRESHOLD}/{MIN_SCENE_MS}"
+
+
+def scene_command(path, start_ms: int = 0, ffmpeg: str = "ffmpeg") -> list[str]:
+    """ffmpeg a escrever no stdout os fotogramas amostrados (FRAME_W×FRAME_H, 8 bits) desde `start_ms`.
+
+    No stderr, uma linha do showinfo por fotograma com o seu `pts_time`
+    (segundos desde `start_ms`).
+    """
+    return [ffmpeg, "-hide_banner", "-nostdin", "-nostats", "-v", "info",
+            "-threads", "1", "-skip_frame", "noref", "-skip_loop_filter", "all",
+            "-ss", f"{start_ms / 1000:.3f}", "-i", str(path), "-map", "0:v:0", "-an", "-sn", "-dn",
+            "-vf", f"fps={SAMPLE_FPS},scale={FRAME_W}:{FRAME_H}:flags=area,format=gray,showinfo",
+            "-f", "rawvideo", "-"]
+
+
+def frame_differences(frames: np.ndarray, previous: np.ndarray | None):
+    """(histograma, SAD) entre cada fotograma de `frames` (N × píxeis, uint8) e o anterior.
+
+    O primeiro compara-se com `previous` (último do bloco anterior); sem ele,
+    as diferenças do primeiro são 0.
+    """
+    if previous is not None:
+        frames = np.concatenate((previous[None], frames))
+    n, pixels = frames.shape
+    bins = (frames >> 4).astype(np.intp) + (np.arange(n, dtype=np.intp) * HIST_BINS)[:, None]
+    hist = np.bincount(bins.ravel(), minlength=n * HIST_BINS).reshape(n, HIST_BINS) / pixels
+    hist_d = np.abs(hist[1:] - hist[:-1]).sum(axis=1) / 2
+    sad = np.abs(frames[1:].astype(np.int16) - frames[:-1]).mean(axis=1) / 255
+    if previous is None:
+        hist_d = np.concatenate(([0.0], hist_d))
+        sad = np.concatenate(([0.0], sad))
+    return hist_d, sad
+
+
+class SceneScanner:
+    """Encontra cortes num fluxo de fotogramas amostrados, bloco a bloco."""
+
+    def __init__(self, start_ms: int = 0, cuts=(), previous: np.ndarray | None = None, known_ms: int = 0):
+        """`start_ms`: instante da primeira amostra; `known_ms`: até onde já se
+        tinha analisado (os cortes antes disso já estão em `cuts`)."""
+        self.cuts = array("i", cuts)
+        self.analysed_ms = max(start_ms, known_ms)
+        self.frame_ms = 1000 / SAMPLE_FPS
+        self._next_index = 0  # fotogramas vistos desde start_ms
+        self._start_ms = start_ms
+        self._known_ms = known_ms
+        self._previous = previous
+        self._recent = np.zeros(WINDOW)  # diferenças de histograma dos últimos WINDOW fotogramas
+        self.compute_s = 0.0  # tempo gasto em feed() (o resto da análise é descodificação)
+
+    def feed(self, frames: np.ndarray, times=None) -> list[int]:
+        """Analisa um bloco (N × píxeis, uint8); devolve os cortes novos (ms).
+
+        `times`: instante (ms) de cada fotograma; sem ele, conta-se um
+        intervalo de amostragem por fotograma desde `start_ms`.
+        """
+        if not len(frames):
+            return []
+        t0 = time.perf_counter()
+        hist_d, sad = frame_differences(frames, self._previous)
+        if times is None:
+            times = self._start_ms + (self._next_index + np.arange(len(frames))) * self.frame_ms
+        # Mediana dos WINDOW valores antes de cada fotograma (janelas deslizantes, sem ciclo)
+        history = np.concatenate((self._recent, hist_d))
+        baseline = np.median(sliding_window_view(history[:-1], WINDOW), axis=1)
+        self._recent = history[-WINDOW:]
+        candidates = (hist_d >= HIST_THRESHOLD) & (hist_d >= HIST_RATIO * baseline) & (sad >= SAD_THRESHOLD)
+        new = []
+        for i in np.flatnonzero(candidates):
+            ms = int(times[i])
+            if ms < self._known_ms:
+                continue  # zona já analisada, refeita só para reconstruir o contexto
+            if (not self.cuts or ms - self.cuts[-1] >= MIN_SCENE_MS) and ms >= MIN_SCENE_MS:
+                self.cuts.append(ms)
+                new.append(ms)
+        self._previous = frames[-1].copy()
+        self._next_index += len(frames)
+        self.analysed_ms = max(self.analysed_ms, int(times[-1] + self.frame_ms))
+        self.compute_s += time.perf_counter() - t0
+        return new
+
+
+def scan_scenes(path, start_ms: int = 0, cuts=(), ffmpeg: str | None = None, stop=None):
+    """Gerador: analisa `path` desde `start_ms` e produz o SceneScanner depois de cada bloco.
+
+    Termina no fim do pipe — `scanner.complete` verdadeiro se o ffmpeg
+    terminou sem erro; se não (ficheiro truncado ou ilegível) `scanner.failed`
+    fica verdadeiro e os cortes são só os da parte lida — ou quando `stop()`
+    devolve True. Sem ffmpeg não produz nada.
+    """
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if not ffmpeg:
+        return
+    # Ao retomar, recua o suficiente para refazer o fotograma anterior e a janela da mediana
+    resume_ms = max(0, start_ms - (WINDOW + 1) * 1000 // SAMPLE_FPS) if start_ms else 0
+    scanner = SceneScanner(resume_ms, cuts, known_ms=start_ms)
+    scanner.complete = scanner.failed = False
+    frame_bytes = FRAME_W * FRAME_H
+    chunk_bytes = frame_bytes * CHUNK_FRAMES
+    proc = subprocess.Popen(scene_command(path, resume_ms, ffmpeg), stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, bufsize=chunk_bytes)
+    pts = _FrameTimes(proc.stderr)
+    pts.start()
+    use_pts = True
+    try:
+        while not (stop and stop()):
+            data = proc.stdout.read(chunk_bytes)
+            usable = len(data) - len(data) % frame_bytes
+            if usable:
+                frames = np.frombuffer(data, np.uint8, usable).reshape(-1, frame_bytes)
+                times = pts.take(len(frames)) if use_pts else None
+                if times is None:
+                    use_pts = False  # sem PTS (ou desalinhados): contar amostras, como antes
+                else:
+                    times = resume_ms + np.asarray(times)
+                scanner.feed(frames, times)
+            if len(data) < chunk_bytes:  # fim do pipe
+                scanner.failed = proc.wait() != 0
+                scanner.complete = not scanner.failed
+                yield scanner
+                return
+            yield scanner
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+        pts.join(timeout=1)
+        proc.stderr.close()
+
+
+class _FrameTimes(threading.Thread):
+    """Lê o stderr do ffmpeg e guarda o pts_time (ms) de cada fotograma, pela ordem do pipe."""
+
+    def __init__(self, stream):
+        super().__init__(name="scene-pts", daemon=True)
+        self._stream = stream
+        self._times: list[float] = []
+        self._done = False
+        self._cond = threading.Condition()
+
+    def run(self):
+        try:
+            for line in self._stream:
+                match = _PTS_TIME.search(line)
+                if match:
+                    with self._cond:
+                        self._times.append(float(match[1]) * 1000)
+                        self._cond.notify_all()
+        except (OSError, ValueError):
+            pass  # pipe fechado
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def take(self, n: int, timeout: float = 2.0) -> list[float] | None:
+        """Instantes dos próximos `n` fotogramas, ou None se não chegarem a tempo."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self._times) < n and not self._done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if len(self._times) < n:
+                return None
+            taken = self._times[:n]
+            del self._times[:n]
+            return taken
+
+
+class SceneDetector(QtCore.QObject):
+    """Deteta mudanças de cena numa thread e guarda-as no índice.
+
+    `request(path)` devolve logo os cortes se a análise já estiver completa em
+    memória; caso contrário pede-a em segundo plano. `found(path, cortes, ms
+    analisados, completo)` chega com o que já se sabe (da cache e depois a
+    cada `flush_interval` segundos); `finished(path, × tempo real)` no fim de
+    uma análise. Um só ficheiro de cada vez (um núcleo): o pedido mais
+    recente passa à frente e o interrompido continua depois.
+    """
+
+    found = Signal(str, object, int, bool)
+    finished = Signal(str, float)
+
+    def __init__(self, index: MediaIndex | None = None, flush_interval: float = 1.0, parent=None):
+        super().__init__(parent)
+        self.index = index or MediaIndex()
+        self.flush_interval = flush_interval
+        self._memory: dict[str, array] = {}
+        self._queue: list[str] = []
+        self._current = None  # ficheiro em análise
+        self._requests = 0  # pedidos recebidos: um novo interrompe a análise em curso
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="scene-detector", daemon=True)
+        self._thread.start()
+
+    def request(self, path) -> array | None:
+        path = str(path)
+        times = self._memory.get(path)
+        if times is not None:
+            return times
+        with self._cond:
+            if path in self._queue:
+                self._queue.remove(path)
+            if path != self._current:
+                self._queue.insert(0, path)
+                self._requests += 1
+            self._cond.notify()
+        return None
+
+    def shutdown(self):
+        with self._cond:
+            self._stopping = True
+            self._queue.clear()
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                path = self._current = self._queue.pop(0)
+                requests = self._requests
+            try:
+                self._analyse(path, requests)
+            finally:
+                with self._cond:
+                    self._current = None
+
+    def _preempted(self, requests: int) -> bool:
+        return self._stopping or self._requests != requests
+
+    def _analyse(self, path, requests: int):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        cached = self.index.get_scenes(path, PARAMS)
+        cuts, start_ms, complete = cached if cached is not None else (array("i"), 0, False)
+        if cached is not None:
+            self.found.emit(path, array("i", cuts), start_ms, complete)
+        if complete:
+            self._memory[path] = cuts
+            return
+        t0 = time.perf_counter()
+        last_flush = t0
+        scanner = None
+        for scanner in scan_scenes(path, start_ms, cuts, stop=lambda: self._preempted(requests)):
+            now = time.perf_counter()
+            if scanner.complete or now - last_flush >= self.flush_interval:
+                last_flush = now
+                self.index.put_scenes(path, st.st_size, st.st_mtime_ns, PARAMS, scanner.cuts,
+                                      scanner.analysed_ms, scanner.complete)
+                if not self._stopping:
+                    self.found.emit(path, array("i", scanner.cuts), scanner.analysed_ms, scanner.complete)
+        if scanner is None:
+            return  # sem ffmpeg
+        if scanner.failed:
+            # O ffmpeg não leu o ficheiro até ao fim: fica incompleto (com os cortes da
+            # parte lida) e não volta à fila; é retomado quando o ficheiro for aberto de novo
+            self.index.put_scenes(path, st.st_size, st.st_mtime_ns, PARAMS, scanner.cuts, scanner.analysed_ms, False)
+            if not self._stopping:
+                self.found.emit(path, array("i", scanner.cuts), scanner.analysed_ms, False)
+            return
+        if scanner.complete:
+            self._memory[path] = scanner.cuts
+            wall = time.perf_counter() - t0
+            if not self._stopping:
+                self.finished.emit(path, (scanner.analysed_ms - start_ms) / 1000 / wall if wall else 0.0)
+            return
+        # Interrompido: guardar até onde chegou e, se foi por outro pedido, continuar depois dele
+        self.index.put_scenes(path, st.st_size, st.st_mtime_ns, PARAMS, scanner.cuts, scanner.analysed_ms, False)
+        with self._cond:
+            if not self._stopping and path not in self._queue:
+                self._queue.insert(1, path)
@@ -0,0 +1,271 @@
+# Seeks rápidos no slider de posição
+# Cada ficheiro tem um índice dos seus keyframes (lido uma vez com o ffprobe,
+# numa thread, e guardado na base de dados de media_index.py). Ao arrastar o
+# slider, os movimentos são agrupados num único seek de cada vez, ajustado ao
+# keyframe mais próximo — o descodificador não tem de descodificar um GOP
+# inteiro para chegar lá. Ao largar o slider faz-se o seek exato.
+# O SeekScheduler garante que o leitor só recebe um seek de cada vez (o mais
+# recente) ao ritmo a que os consegue fazer.
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from qt_compat import QtCore, Signal
+from media_index import MediaIndex
+
+
+def probe_keyframes(path, ffprobe: str | None = None) -> array | None:
+    """Instantes (ms) dos keyframes do 1.º stream de vídeo, por ordem.
+
+    None sem ffprobe ou se o ffprobe falhar (ficheiro ilegível ou truncado):
+    um índice parcial não deve ficar guardado como se fosse o do ficheiro.
+
+    Só lê os pacotes do contentor (não descodifica), por isso é rápido mesmo em
+    ficheiros longos.
+    """
+    ffprobe = ffprobe or shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    times = array("i")
+    cmd = [ffprobe, "-v", "error", "-select_streams", "v:0",
+           "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(path)]
+    try:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+            for line in proc.stdout:
+                pts, _, flags = line.strip().partition(",")
+                if "K" in flags and pts not in ("", "N/A"):
+                    times.append(int(float(pts) * 1000))
+            if proc.wait() != 0:
+                return None
+    except (OSError, ValueError):
+        return None
+    # A ordem dos pacotes é a de descodificação; com B-frames os PTS podem vir trocados
+    return array("i", sorted(set(times)))
+
+
+def snap_to_keyframe(times, ms: int) -> int:
+    """Keyframe mais próximo de `ms` (ou `ms` se não houver índice)."""
+    if not times:
+        return ms
+    i = bisect_left(times, ms)
+    if i == 0:
+        return times[0]
+    if i == len(times):
+        return times[-1]
+    before, after = times[i - 1], times[i]
+    return before if ms - before <= after - ms else after
+
+
+class KeyframeIndexer(QtCore.QObject):
+    """Constrói índices de keyframes numa thread e guarda-os no disco.
+
+    `request(path)` devolve logo o índice se já estiver em memória (os
+    `memory_files` ficheiros usados mais recentemente); caso contrário pede-o
+    em segundo plano e `ready(path, times)` chega depois.
+    """
+
+    ready = Signal(str, object)
+
+    def __init__(self, index: MediaIndex | None = None, memory_files: int = 64, parent=None):
+        super().__init__(parent)
+        self.index = index or MediaIndex()
+        self.memory_files = memory_files
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._queue: list[str] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="keyframe-indexer", daemon=True)
+        self._thread.start()
+
+    def request(self, path) -> array | None:
+        path = str(path)
+        with self._memory_lock:
+            times = self._memory.get(path)
+            if times is not None:
+                self._memory.move_to_end(path)
+                return times
+        with self._cond:
+            # O pedido mais recente (o ficheiro que acabou de ser aberto) vai à frente
+            if path in self._queue:
+                self._queue.remove(path)
+            self._queue.insert(0, path)
+            self._cond.notify()
+        return None
+
+    def shutdown(self):
+        with self._cond:
+            self._stopping = True
+            self._queue.clear()
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                path = self._queue.pop(0)
+            times = self.index.get_keyframes(path)
+            if times is None:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                times = probe_keyframes(path)
+                if times is None:
+                    continue
+                self.index.put_keyframes(path, st.st_size, st.st_mtime_ns, times)
+            self._remember(path, times)
+            if not self._stopping:
+                self.ready.emit(path, times)
+
+    def _remember(self, path, times):
+        with self._memory_lock:
+            self._memory[path] = times
+            self._memory.move_to_end(path)
+            while len(self._memory) > self.memory_files:
+                self._memory.popitem(last=False)
+
+
+class SeekScheduler(QtCore.QObject):
+    """Fila de seeks com um só pedido pendente (o mais recente).
+
+    Há no máximo um seek "em curso" no leitor: o seguinte só é enviado quando o
+    leitor indicar que chegou ao destino (`completed(pos_ms)`, ligado ao sinal
+    de posição do leitor) ou, se nada chegar, após `max_interval_ms`. Assim o
+    ritmo de seeks acompanha o que o descodificador consegue fazer. Nunca há
+    mais de um seek a cada `min_interval_ms`.
+    """
+
+    rateChanged = Signal(float)  # seeks/s efetivamente enviados ao leitor
+
+    def __init__(self, seek, min_interval_ms: int = 30, max_interval_ms: int = 400,
+                 tolerance_ms: int = 500, parent=None):
+        super().__init__(parent)
+        self.seek = seek
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.tolerance_ms = tolerance_ms
+        self.requested = 0  # pedidos recebidos
+        self.issued = 0  # seeks enviados ao leitor
+        self.latency_ms = None  # média móvel do tempo até o leitor chegar ao destino
+        self._pending = None
+        self._in_flight = None  # (destino, instante do envio)
+        self._last_issue = 0.0
+        self._recent: list[float] = []  # instantes dos seeks do último segundo
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._pump)
+
+    @property
+    def seeks_per_second(self) -> float:
+        now = time.monotonic()
+        self._recent = [t for t in self._recent if now - t <= 1.0]
+        return float(len(self._recent))
+
+    def request(self, ms: int):
+        """Pede um seek para `ms`; substitui qualquer pedido ainda não enviado."""
+        self.requested += 1
+        self._pending = int(ms)
+        self._pump()
+
+    def seek_now(self, ms: int):
+        """Seek imediato (p.ex. ao largar o slider); descarta o pedido pendente."""
+        self.requested += 1
+        self._pending = None
+        self._timer.stop()
+        self._issue(int(ms))
+
+    def completed(self, pos_ms: int | None = None):
+        """O leitor reportou uma posição: se for a do seek em curso, libera o seguinte."""
+        if self._in_flight is None:
+            return
+        target, sent = self._in_flight
+        if pos_ms is not None and abs(pos_ms - target) > self.tolerance_ms:
+            return
+        elapsed = (time.monotonic() - sent) * 1000
+        self.latency_ms = elapsed if self.latency_ms is None else 0.8 * self.latency_ms + 0.2 * elapsed
+        self._in_flight = None
+        self._pump()
+
+    def reset(self):
+        """Esquecer pedidos e seeks em curso (p.ex. ao mudar de ficheiro)."""
+        self._pending = None
+        self._in_flight = None
+        self._timer.stop()
+
+    def _pump(self):
+        if self._pending is None:
+            return
+        now = time.monotonic()
+        if self._in_flight is not None:
+            # Ainda à espera do leitor: tentar de novo quando o prazo acabar
+            wait = self.max_interval_ms - (now - self._in_flight[1]) * 1000
+        else:
+            wait = self.min_interval_ms - (now - self._last_issue) * 1000
+        if wait > 0:
+            self._timer.start(int(wait) + 1)
+            return
+        target, self._pending = self._pending, None
+        if self._in_flight is None or target != self._in_flight[0]:
+            self._issue(target)
+
+    def _issue(self, target):
+        now = time.monotonic()
+        self._in_flight = (target, now)
+        self._last_issue = now
+        self.issued += 1
+        self._recent.append(now)
+        self.seek(target)
+        self.rateChanged.emit(self.seeks_per_second)
+
+
+class DragSeeker(QtCore.QObject):
+    """Liga o arrastar de um QSlider de posição a `seek(ms)` através de um SeekScheduler.
+
+    Durante o arrasto os valores passam pelo agendador (só o último conta),
+    ajustados ao keyframe mais próximo; ao largar o slider é feito o seek
+    exato. `value_to_ms` converte o valor do slider em ms (por omissão o valor
+    já está em ms). O leitor deve chamar `scheduler.completed(pos_ms)` quando
+    a posição mudar.
+    """
+
+    def __init__(self, slider, seek, value_to_ms=None, indexer: KeyframeIndexer | None = None, parent=None):
+        super().__init__(parent or slider)
+        self.slider = slider
+        self.scheduler = SeekScheduler(seek, parent=self)
+        self.value_to_ms = value_to_ms or (lambda v: v)
+        self.indexer = indexer
+        self.keyframes = None
+        self._path = None
+        slider.sliderMoved.connect(self._on_moved)
+        slider.sliderReleased.connect(self._on_released)
+        if indexer is not None:
+            indexer.ready.connect(self._on_index_ready)
+
+    def set_source(self, path):
+        """Ficheiro local atual (None para streams: seeks sem ajuste a keyframes)."""
+        self._path = str(path) if path else None
+        self.keyframes = None
+        self.scheduler.reset()
+        if self._path and self.indexer is not None:
+            self.keyframes = self.indexer.request(self._path)
+
+    def _on_index_ready(self, path, times):
+        if path == self._path:
+            self.keyframes = times
+
+    def _on_moved(self, value):
+        self.scheduler.request(snap_to_keyframe(self.keyframes, int(self.value_to_ms(value))))
+
+    def _on_released(self):
+        self.scheduler.seek_now(int(self.value_to_ms(self.slider.value())))
@@ -0,0 +1,142 @@
+# Instância única: "abrir com" reutiliza o leitor que já está aberto
+# - a primeira instância de cada script fica a escutar num QLocalServer
+#   (socket Unix / named pipe no Windows, só acessível ao próprio utilizador)
+# - uma segunda invocação liga-se a esse servidor, envia os ficheiros/URLs da
+#   linha de comandos (uma linha JSON) e termina logo, sem criar a
+#   QApplication nem o backend de vídeo
+# - a escolha entre "ligar ao servidor" e "passar a ser o servidor" é feita
+#   com um QLockFile, para que dois lançamentos simultâneos (duplo clique em
+#   vários ficheiros) não fiquem os dois a servir
+#
+# Uso em main() (as opções vêm de cli.py):
+#   instance = SingleInstance("Video-Viewer-1")
+#   if options.forward and instance.forward(options.paths, options.enqueue):
+#       sys.exit(0)
+#   app = QApplication(sys.argv[:1])
+#   window = VideoPlayer()
+#   instance.listen(window, window.open_paths)
+
+import getpass
+import json
+import os
+
+from qt_compat import QtCore, Signal, QT_API
+
+if QT_API == "PyQt5":
+    from PyQt5 import QtNetwork
+else:
+    from PySide6 import QtNetwork
+
+
+class SingleInstance(QtCore.QObject):
+    """Servidor local de uma instância de leitor (ou cliente, se já houver uma)."""
+
+    received = Signal(list, bool)  # caminhos/URLs, enqueue
+
+    def __init__(self, key: str, parent=None):
+        super().__init__(parent)
+        # Um nome por utilizador: duas sessões na mesma máquina não se misturam
+        self.name = f"{key}-{getpass.getuser()}"
+        self.server = None
+        self._lock = QtCore.QLockFile(os.path.join(QtCore.QDir.tempPath(), f"{self.name}.lock"))
+        self._lock.setStaleLockTime(0)  # o lock só é largado por um processo que morreu a meio
+        self._buffers = {}
+
+    def forward(self, paths, enqueue: bool = False, timeout_ms: int = 1000) -> bool:
+        """Entrega os argumentos à instância já aberta; False se esta deve ser a instância principal.
+
+        Com False o lock fica com este processo até listen(), que só pode ser
+        chamado depois de criada a QApplication.
+        """
+        if not self._lock.tryLock(timeout_ms):
+            return False  # quem tem o lock está encravado: abrir uma instância independente
+        socket = QtNetwork.QLocalSocket()
+        socket.connectToServer(self.name)
+        if not socket.waitForConnected(timeout_ms):
+            return False  # não há servidor (ou é um socket órfão): listen() trata disso
+        self._lock.unlock()
+        message = json.dumps({"paths": list(paths), "enqueue": bool(enqueue)}) + "\n"
+        socket.write(message.encode("utf-8"))
+        # Esperar pela confirmação: o processo só termina quando a outra instância recebeu
+        delivered = socket.waitForBytesWritten(timeout_ms) and socket.waitForReadyRead(timeout_ms)
+        delivered = delivered and bytes(socket.readAll().data()).startswith(b"ok")
+        socket.disconnectFromServer()
+        return delivered
+
+    def listen(self, window=None, handler=None) -> bool:
+        """Passa a receber os argumentos das invocações seguintes.
+
+        `handler(paths, enqueue)` é ligado ao sinal received e a janela vem
+        para a frente a cada pedido.
+        """
+        if window is not None or handler is not None:
+            self.received.connect(lambda paths, enqueue: self._deliver(window, handler, paths, enqueue))
+        locked = self._lock.isLocked() or self._lock.tryLock(0)
+        try:
+            # Outra instância a responder (forward() falhou por tempo): esta fica independente,
+            # sem lhe roubar o nome
+            if self._server_alive():
+                return False
+            self.server = QtNetwork.QLocalServer(self)
+            self.server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+            self.server.newConnection.connect(self._on_new_connection)
+            ok = self.server.listen(self.name)
+            if not ok and self.server.serverError() == QtNetwork.QAbstractSocket.AddressInUseError:
+                # Socket deixado por uma instância que terminou mal
+                QtNetwork.QLocalServer.removeServer(self.name)
+                ok = self.server.listen(self.name)
+            return ok
+        finally:
+            if locked:
+                self._lock.unlock()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def _server_alive(self, timeout_ms: int = 200) -> bool:
+        socket = QtNetwork.QLocalSocket()
+        socket.connectToServer(self.name)
+        alive = socket.waitForConnected(timeout_ms)
+        socket.abort()
+        return alive
+
+    def _on_new_connection(self):
+        while self.server is not None and self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._drop(s))
+
+    def _on_ready_read(self, socket):
+        data = self._buffers.get(socket, b"") + bytes(socket.readAll().data())
+        if b"\n" not in data:
+            self._buffers[socket] = data
+            return
+        line = data.split(b"\n", 1)[0]
+        self._buffers[socket] = b""
+        try:
+            message = json.loads(line.decode("utf-8"))
+            paths = [str(p) for p in message.get("paths", [])]
+            enqueue = bool(message.get("enqueue", False))
+        except (ValueError, AttributeError):
+            socket.write(b"error\n")
+            return
+        socket.write(b"ok\n")
+        socket.flush()
+        self.received.emit(paths, enqueue)
+
+    def _drop(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+    @staticmethod
+    def _deliver(window, handler, paths, enqueue):
+        if window is not None:
+            if window.isMinimized():
+                window.showNormal()
+            window.raise_()
+            window.activateWindow()
+        if handler is not None:
+            handler(paths, enqueue)
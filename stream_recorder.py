@@ -0,0 +1,332 @@
+# Gravação de streams de rede enquanto são reproduzidos
+# O stream é descarregado uma única vez: uma thread lê da rede para um buffer
+# circular de tamanho fixo, de onde o ficheiro em disco (thread própria) lê
+# os bytes por ordem. O leitor de vídeo abre o stream através de um pequeno
+# servidor HTTP local, que lhe serve os bytes do buffer ou, se ficou para trás
+# (p.ex. em pausa), do ficheiro já gravado — o leitor nunca é descartado nem
+# trava a gravação, e pedidos com Range começam no byte certo.
+# A memória usada é a do buffer, seja qual for a duração do stream.
+# A ligação à rede é feita na thread de download, não na de quem chama start().
+# O servidor local continua ativo depois de o download terminar (o leitor
+# pode fazer seeks ou voltar a ligar-se, servido do ficheiro) até stop().
+#
+# Funciona com streams HTTP(S) progressivos (um único recurso: MP4, MKV, TS,
+# FLV, ...). Playlists segmentadas (HLS .m3u8, DASH .mpd) não são suportadas.
+
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+READ_SIZE = 64 * 1024
+
+
+class RecordingError(Exception):
+    pass
+
+
+class RingBuffer:
+    """Buffer circular com um escritor e várias leituras (posições absolutas).
+
+    O escritor espera quando a leitura mais atrasada ficaria a mais de
+    `capacity` bytes de distância. `peek` lê a partir de qualquer posição
+    ainda em memória, sem ser uma leitura registada (não trava o escritor).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._write_pos = 0  # total de bytes escritos desde o início
+        self._readers: dict[str, int] = {}
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def write_pos(self):
+        return self._write_pos
+
+    @property
+    def oldest(self):
+        """Posição do byte mais antigo ainda em memória."""
+        return max(0, self._write_pos - self.capacity)
+
+    def add_reader(self, name: str, at: int | None = None):
+        with self._cond:
+            self._readers[name] = self.oldest if at is None else max(at, self.oldest)
+
+    def remove_reader(self, name: str):
+        with self._cond:
+            self._readers.pop(name, None)
+            self._cond.notify_all()
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    slowest = min(self._readers.values(), default=self._write_pos)
+                    free = self.capacity - (self._write_pos - slowest)
+                    if free > 0:
+                        break
+                    self._cond.wait(0.1)
+                n = min(free, len(view))
+                start = self._write_pos % self.capacity
+                first = min(n, self.capacity - start)
+                self._buf[start:start + first] = view[:first]
+                if n > first:
+                    self._buf[:n - first] = view[first:n]
+                self._write_pos += n
+                self._cond.notify_all()
+            view = view[n:]
+
+    def read(self, name: str, max_size: int = READ_SIZE, timeout: float = 1.0):
+        """Próximos bytes para a leitura `name`; b"" no fim, None se ainda não há dados."""
+        with self._cond:
+            if name not in self._readers:
+                return b""
+            pos = self._readers[name]
+            if pos == self._write_pos:
+                if self._closed:
+                    return b""
+                self._cond.wait(timeout)
+                if name not in self._readers:
+                    return b""
+                if pos == self._write_pos:
+                    return b"" if self._closed else None
+            data = self._copy(pos, max_size)
+            self._readers[name] = pos + len(data)
+            self._cond.notify_all()
+            return data
+
+    def peek(self, pos: int, max_size: int = READ_SIZE, timeout: float = 1.0):
+        """Bytes a partir de `pos`; b"" no fim, None se ainda não chegaram ou já saíram da memória."""
+        with self._cond:
+            if pos >= self._write_pos:
+                if self._closed:
+                    return b""
+                self._cond.wait(timeout)
+                if pos >= self._write_pos:
+                    return b"" if self._closed else None
+            if pos < self.oldest:
+                return None
+            return self._copy(pos, max_size)
+
+    def _copy(self, pos, max_size):
+        n = min(max_size, self._write_pos - pos)
+        start = pos % self.capacity
+        first = min(n, self.capacity - start)
+        data = bytes(self._buf[start:start + first])
+        if n > first:
+            data += bytes(self._buf[:n - first])
+        return data
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StreamRecorder:
+    """Descarrega `url` uma vez, grava-o em `path` e serve-o ao leitor em `local_url`."""
+
+    def __init__(self, url: str, path, buffer_size: int = 16 * 1024 * 1024):
+        self.url = url
+        self.path = Path(path)
+        self.ring = RingBuffer(buffer_size)
+        self.content_type = "application/octet-stream"
+        self.length: int | None = None  # Content-Length do stream, se o servidor o indicar
+        self.error: str | None = None
+        self.bytes_written = 0  # bytes já no ficheiro (e legíveis por outro handle)
+        self._stop = threading.Event()
+        self._connected = threading.Event()  # ligação feita (ou falhada: _response fica None)
+        self._response = None
+        self._disk_failed = False
+        self._server = None
+        self._threads: list[threading.Thread] = []
+        self._disk_thread = None
+
+    @property
+    def local_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/stream"
+
+    @property
+    def running(self) -> bool:
+        # Enquanto houver dados a chegar ao ficheiro
+        return self._disk_thread is not None and self._disk_thread.is_alive()
+
+    def start(self):
+        """Arranca sem esperar pela rede: erros de ligação ficam em `error` (e `running` passa a falso)."""
+        if self.url.lower().split("?")[0].endswith((".m3u8", ".mpd")):
+            raise RecordingError("Playlists segmentadas (HLS/DASH) não podem ser gravadas.")
+        self.ring.add_reader("disk")
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        for target, name in ((self._fetch, "stream-fetch"), (self._write_disk, "stream-disk"),
+                             (self._server.serve_forever, "stream-http")):
+            t = threading.Thread(target=target, name=name, daemon=True)
+            t.start()
+            self._threads.append(t)
+        self._disk_thread = self._threads[1]
+
+    def stop(self):
+        """Interrompe o download (se ainda decorre) e fecha o servidor local."""
+        self._stop.set()
+        self.ring.close()
+        if self._response is not None:
+            try:
+                self._response.close()  # interrompe uma leitura da rede em curso
+            except OSError:
+                pass
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for t in self._threads:
+            # Uma ligação ainda a ser feita não é interrompível: a thread termina sozinha depois
+            if t is not self._threads[0] or self._connected.is_set():
+                t.join(timeout=5)
+
+    def _connect(self):
+        request = urllib.request.Request(self.url, headers={"User-Agent": "Video-Viewer"})
+        response = urllib.request.urlopen(request, timeout=15)
+        content_type = response.headers.get("Content-Type", self.content_type)
+        if "mpegurl" in content_type.lower() or "dash+xml" in content_type.lower():
+            response.close()
+            raise RecordingError("Playlists segmentadas (HLS/DASH) não podem ser gravadas.")
+        self.content_type = content_type
+        length = response.headers.get("Content-Length")
+        self.length = int(length) if length and length.isdigit() else None
+        return response
+
+    def _fetch(self):
+        try:
+            self._response = self._connect()
+            self._connected.set()
+            while not self._stop.is_set():
+                data = self._response.read(READ_SIZE)
+                if not data:
+                    break
+                self.ring.write(data)
+        except Exception as e:
+            if not self._stop.is_set():
+                self.error = str(e)
+        finally:
+            self._connected.set()
+            self.ring.close()
+
+    def _write_disk(self):
+        while not self._connected.wait(0.1):
+            if self._stop.is_set():
+                return
+        if self._response is None:
+            return  # a ligação falhou: não fica um ficheiro vazio
+        try:
+            with open(self.path, "wb") as f:
+                while True:
+                    data = self.ring.read("disk")
+                    if data is None:
+                        continue
+                    if not data:
+                        break
+                    f.write(data)
+                    f.flush()  # o servidor local pode precisar de ler estes bytes do ficheiro
+                    self.bytes_written += len(data)
+        except OSError as e:
+            self.error = str(e)
+            self._disk_failed = True
+            self.ring.remove_reader("disk")
+
+    def read_at(self, pos: int, file, max_size: int = READ_SIZE):
+        """Bytes a partir de `pos`, da memória ou (se já lá não estão) do ficheiro gravado.
+
+        `file` é um handle de leitura do ficheiro (ou None, aberto aqui quando
+        for preciso); devolve (bytes, file): b"" no fim, None se ainda não há.
+        """
+        if pos >= self.ring.oldest:
+            data = self.ring.peek(pos, max_size)
+            if data is not None or pos >= self.ring.oldest:
+                return data, file
+        if self._disk_failed:
+            return b"", file  # sem ficheiro de onde ler o que saiu da memória
+        if pos >= self.bytes_written:
+            time.sleep(0.05)  # saiu da memória mas ainda não chegou ao ficheiro
+            return None, file
+        if file is None:
+            file = open(self.path, "rb")
+        file.seek(pos)
+        return file.read(min(max_size, self.bytes_written - pos)), file
+
+    def _make_handler(recorder):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/stream":
+                    self.send_error(404)
+                    return
+                if not recorder._connected.wait(20):
+                    self.send_error(504)
+                    return
+                if recorder._response is None:
+                    self.send_error(502, explain=recorder.error)
+                    return
+                start, end = self._range()
+                if start is None:
+                    return
+                # Cada ligação lê por posição: do buffer ou, se ficou para trás, do ficheiro
+                file = None
+                pos = start
+                try:
+                    while end is None or pos <= end:
+                        size = READ_SIZE if end is None else min(READ_SIZE, end + 1 - pos)
+                        data, file = recorder.read_at(pos, file, size)
+                        if data is None:
+                            continue
+                        if not data:
+                            break
+                        self.wfile.write(data)
+                        pos += len(data)
+                except OSError:
+                    pass  # o leitor fechou a ligação
+                finally:
+                    if file is not None:
+                        file.close()
+
+            def _range(self):
+                """Envia os cabeçalhos; devolve (início, fim ou None), ou (None, None) se respondeu com erro."""
+                length = recorder.length
+                header = self.headers.get("Range")
+                match = re.fullmatch(r"bytes=(\d+)-(\d*)", header.strip()) if header else None
+                if header and (match is None or (length is None and int(match[1]) > 0)):
+                    # Sem o tamanho total não há como indicar o intervalo servido
+                    self.send_response(416)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None, None
+                start = int(match[1]) if match else 0
+                if length is not None and start >= length > 0:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{length}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None, None
+                end = None
+                if length is not None:
+                    end = min(int(match[2]), length - 1) if match and match[2] else length - 1
+                self.send_response(206 if match and length is not None else 200)
+                self.send_header("Content-Type", recorder.content_type)
+                self.send_header("Accept-Ranges", "bytes" if length is not None else "none")
+                if length is not None:
+                    self.send_header("Content-Length", str(end + 1 - start))
+                    if match:
+                        self.send_header("Content-Range", f"bytes {start}-{end}/{length}")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                return start, end
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
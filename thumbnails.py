@@ -0,0 +1,551 @@
+# Miniaturas (pré-visualização de fotogramas) para os leitores de vídeo
+# - extração de fotogramas fora da thread da GUI (QMediaPlayer + QVideoSink em
+#   PySide6, ou um MediaPlayer do libvlc com saída por callbacks nos leitores VLC)
+# - cache LRU em memória limitada por bytes
+# - cache em disco indexada por um hash do conteúdo do ficheiro, para que a
+#   segunda visita a um vídeo mostre as miniaturas sem voltar a descodificar;
+#   limitada por bytes: acima do limite saem as miniaturas usadas há mais
+#   tempo (data de modificação, atualizada a cada leitura)
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from qt_compat import QtCore, QtGui, QtWidgets, Signal, Slot, QT_API
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "video-viewer" / "thumbnails"
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+
+
+def content_key(path, sample_size: int = 64 * 1024) -> str:
+    """Hash do conteúdo do ficheiro, calculado por amostragem.
+
+    Ler um ficheiro de 40 GB inteiro para o identificar não é viável; usa-se o
+    tamanho e três blocos (início, meio e fim), o que distingue ficheiros
+    diferentes e sobrevive a renomear ou mover o ficheiro.
+    """
+    size = os.path.getsize(path)
+    h = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in (0, size // 2, max(0, size - sample_size)):
+            f.seek(offset)
+            h.update(f.read(sample_size))
+    return h.hexdigest()
+
+
+class ThumbnailCache:
+    """Cache de miniaturas (bytes JPEG/PNG) em memória (LRU) e em disco.
+
+    Pode ser usada a partir de várias threads. Acima de `max_disk_bytes` em
+    disco, as miniaturas usadas há mais tempo são apagadas até ficar 10%
+    abaixo do limite.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, disk_dir=DEFAULT_CACHE_DIR,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._mem: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+        self._mem_bytes = 0
+        self._disk_bytes = None  # medido na primeira escrita
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+
+    def _disk_path(self, key: str, bucket: int) -> Path:
+        return self.disk_dir / key[:2] / key / f"{bucket}.img"
+
+    def get(self, key: str, bucket: int):
+        with self._lock:
+            data = self._mem.get((key, bucket))
+            if data is not None:
+                self._mem.move_to_end((key, bucket))
+                return data
+        if self.disk_dir is None:
+            return None
+        target = self._disk_path(key, bucket)
+        try:
+            data = target.read_bytes()
+            os.utime(target)  # usada agora: é das últimas a sair
+        except OSError:
+            return None
+        self._remember(key, bucket, data)
+        return data
+
+    def get_memory(self, key: str, bucket: int):
+        """Só a cache em memória (seguro para chamar na thread da GUI)."""
+        with self._lock:
+            data = self._mem.get((key, bucket))
+            if data is not None:
+                self._mem.move_to_end((key, bucket))
+            return data
+
+    def put(self, key: str, bucket: int, data: bytes):
+        self._remember(key, bucket, data)
+        if self.disk_dir is None:
+            return
+        target = self._disk_path(key, bucket)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+        except OSError:
+            return  # a cache em disco é opcional; a miniatura continua em memória
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune_disk()
+
+    def _disk_files(self):
+        """(caminho, bytes, mtime) de cada miniatura em disco."""
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def _prune_disk(self):
+        """Apaga as miniaturas usadas há mais tempo até ficar 10% abaixo do limite."""
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 9 // 10
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            try:
+                os.rmdir(os.path.dirname(path))  # só sai se era a última miniatura do vídeo
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def _remember(self, key, bucket, data):
+        with self._lock:
+            old = self._mem.pop((key, bucket), None)
+            if old is not None:
+                self._mem_bytes -= len(old)
+            self._mem[(key, bucket)] = data
+            self._mem_bytes += len(data)
+            while self._mem_bytes > self.max_bytes and len(self._mem) > 1:
+                _, evicted = self._mem.popitem(last=False)
+                self._mem_bytes -= len(evicted)
+
+
+# --- Extratores de fotogramas (usados apenas dentro da thread de trabalho) ---
+def _wait_ms(timeout_ms: int, deadline: float | None) -> int:
+    """Espera máxima de um passo: timeout_ms, sem passar de `deadline` (time.monotonic())."""
+    if deadline is None:
+        return timeout_ms
+    return max(0, min(timeout_ms, int((deadline - time.monotonic()) * 1000)))
+
+
+class QtFrameGrabber:
+    """Extrai fotogramas com um QMediaPlayer próprio ligado a um QVideoSink (Qt6).
+
+    Cada espera dura no máximo `timeout_ms` e nunca passa de `deadline`
+    (time.monotonic(), ou None), que quem chama pode fixar por ficheiro.
+    """
+
+    def __init__(self, width: int = 160, timeout_ms: int = 3000):
+        from PySide6.QtMultimedia import QMediaPlayer, QVideoSink
+        self.width = width
+        self.timeout_ms = timeout_ms
+        self.deadline = None
+        self._QMediaPlayer = QMediaPlayer
+        self.player = QMediaPlayer()
+        self.sink = QVideoSink()
+        self.player.setVideoOutput(self.sink)
+        self.source = None
+
+    def _wait(self, signal, predicate):
+        wait_ms = _wait_ms(self.timeout_ms, self.deadline)
+        if not wait_ms:
+            return None
+        loop = QtCore.QEventLoop()
+        timer = QtCore.QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(loop.quit)
+        result = {}
+
+        def on_signal(*args):
+            if predicate(*args):
+                result["args"] = args
+                loop.quit()
+
+        signal.connect(on_signal)
+        try:
+            timer.start(wait_ms)
+            loop.exec()
+        finally:
+            timer.stop()
+            signal.disconnect(on_signal)
+        return result.get("args")
+
+    def open(self, path) -> bool:
+        if self.source == str(path):
+            return True
+        self.source = None
+        P = self._QMediaPlayer
+        self.player.setSource(QtCore.QUrl.fromLocalFile(str(path)))
+        if self.player.mediaStatus() not in (P.LoadedMedia, P.BufferedMedia):
+            if not self._wait(self.player.mediaStatusChanged,
+                              lambda s: s in (P.LoadedMedia, P.BufferedMedia, P.InvalidMedia)):
+                return False
+            if self.player.mediaStatus() == P.InvalidMedia:
+                return False
+        # Em pausa o leitor apresenta o fotograma de cada setPosition()
+        self.player.pause()
+        self.source = str(path)
+        return True
+
+    def duration_ms(self) -> int:
+        return max(0, self.player.duration())
+
+    def grab(self, pos_ms: int):
+        self.player.setPosition(int(pos_ms))
+        # Aceitar o primeiro fotograma válido perto da posição pedida (startTime em µs)
+        args = self._wait(self.sink.videoFrameChanged,
+                          lambda f: f.isValid() and abs(f.startTime() / 1000 - pos_ms) < 2000)
+        if not args:
+            return None
+        image = args[0].toImage()
+        if image.isNull():
+            return None
+        return encode_image(image.scaledToWidth(self.width, QtCore.Qt.SmoothTransformation))
+
+    def close(self):
+        self.player.stop()
+        self.source = None
+
+
+class VlcFrameGrabber:
+    """Extrai fotogramas com um MediaPlayer do libvlc sem janela (saída por callbacks, vlc_video.py).
+
+    As esperas respeitam `timeout_ms` e `deadline`, como no QtFrameGrabber.
+    """
+
+    def __init__(self, width: int = 160, timeout_ms: int = 3000):
+        import vlc
+        from vlc_pool import shared_instance
+        from vlc_video import VlcVideoOutput
+        self._vlc = vlc
+        self.width = width
+        self.timeout_ms = timeout_ms
+        self.deadline = None
+        # A instância do processo (vlc_pool) pode ter uma saída de vídeo com janela:
+        # os fotogramas chegam por callbacks a buffers próprios, sem janela
+        self.instance = shared_instance()
+        self.player = self.instance.media_player_new()
+        self.output = VlcVideoOutput()
+        self.output.attach(self.player)
+        self.output.listeners.append(self._on_frame)
+        self._frame = None
+        self.source = None
+
+    def _on_frame(self, view):
+        # Thread do libvlc: o buffer é reutilizado, fica uma cópia
+        self._frame = view.copy()
+
+    def _poll(self, predicate) -> bool:
+        deadline = time.monotonic() + _wait_ms(self.timeout_ms, self.deadline) / 1000
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def open(self, path) -> bool:
+        if self.source == str(path):
+            return True
+        self.source = None
+        media = self.instance.media_new(str(path))
+        media.add_option(":no-audio")
+        self.player.set_media(media)
+        self.player.play()
+        if not self._poll(lambda: self.player.get_state() == self._vlc.State.Playing):
+            return False
+        self.player.set_pause(1)
+        self.source = str(path)
+        return True
+
+    def duration_ms(self) -> int:
+        self._poll(lambda: self.player.get_length() > 0)
+        return max(0, self.player.get_length())
+
+    def grab(self, pos_ms: int):
+        self._frame = None
+        self.player.set_time(int(pos_ms))
+        if not self._poll(lambda: self._frame is not None and abs(self.player.get_time() - pos_ms) < 1000):
+            return None
+        frame = self._frame
+        height, width = frame.shape[:2]
+        image = QtGui.QImage(frame.data, width, height, frame.strides[0], QtGui.QImage.Format_RGB32)
+        return encode_image(image.scaledToWidth(self.width, QtCore.Qt.SmoothTransformation))
+
+    def close(self):
+        self.player.stop()
+        self.source = None
+
+
+def encode_image(image, fmt: str = "JPG", quality: int = 80) -> bytes:
+    buf = QtCore.QBuffer()
+    buf.open(QtCore.QIODevice.WriteOnly)
+    image.save(buf, fmt, quality)
+    return bytes(buf.data())
+
+
+# --- Serviço de miniaturas (GUI <-> thread de trabalho) ---
+class _ThumbnailWorker(QtCore.QObject):
+    ready = Signal(str, int, bytes)
+    key_ready = Signal(str, str)
+
+    def __init__(self, service, backend, width):
+        super().__init__()
+        self.service = service
+        self.backend = backend
+        self.width = width
+        self.grabber = None
+        self._busy = False
+
+    @Slot()
+    def process(self):
+        # Os extratores esperam pelo fotograma num QEventLoop local, que pode
+        # voltar a entregar `process`; o ciclo exterior trata desses pedidos.
+        if self._busy:
+            return
+        self._busy = True
+        try:
+            self._drain()
+        finally:
+            self._busy = False
+
+    def _drain(self):
+        # Só o pedido mais recente interessa: enquanto o utilizador arrasta o
+        # cursor, os pedidos intermédios são descartados.
+        while True:
+            request = self.service._take_pending()
+            if request is None:
+                return
+            path, bucket = request
+            try:
+                key = self.service._keys.get(path) or content_key(path)
+            except OSError:
+                continue
+            self.key_ready.emit(path, key)
+            data = self.service.cache.get(key, bucket)
+            if data is None:
+                data = self._extract(path, bucket * self.service.step_ms)
+                if data is None:
+                    continue
+                self.service.cache.put(key, bucket, data)
+            self.ready.emit(path, bucket, data)
+
+    def _extract(self, path, pos_ms):
+        if self.grabber is None:
+            if self.backend == "vlc":
+                self.grabber = VlcFrameGrabber(self.width)
+            else:
+                self.grabber = QtFrameGrabber(self.width)
+        if not self.grabber.open(path):
+            return None
+        return self.grabber.grab(pos_ms)
+
+    @Slot()
+    def shutdown(self):
+        if self.grabber is not None:
+            self.grabber.close()
+            self.grabber = None
+
+
+class ThumbnailService(QtCore.QObject):
+    """Pede miniaturas a uma thread de trabalho e devolve-as via `thumbnail_ready`.
+
+    As posições são agrupadas em intervalos de `step_ms`: todas as posições do
+    mesmo intervalo partilham a mesma miniatura.
+    """
+
+    thumbnail_ready = Signal(str, int, bytes)  # caminho, posição (ms), imagem codificada
+    _wake = Signal()
+    _stop = Signal()
+
+    def __init__(self, backend: str | None = None, step_ms: int = 2000, width: int = 160,
+                 cache: ThumbnailCache | None = None, parent=None):
+        super().__init__(parent)
+        self.step_ms = step_ms
+        self.cache = cache or ThumbnailCache()
+        self._keys: dict[str, str] = {}
+        self._pending = None
+        self._lock = threading.Lock()
+
+        if backend is None:
+            backend = "qt" if QT_API == "PySide6" else "vlc"
+        self._thread = QtCore.QThread()
+        self._worker = _ThumbnailWorker(self, backend, width)
+        self._worker.moveToThread(self._thread)
+        self._wake.connect(self._worker.process)
+        self._stop.connect(self._worker.shutdown, QtCore.Qt.BlockingQueuedConnection)
+        self._worker.ready.connect(self._on_ready)
+        self._worker.key_ready.connect(self._on_key)
+        self._thread.start()
+
+    def request(self, path, pos_ms: int):
+        path = str(path)
+        bucket = int(pos_ms) // self.step_ms
+        key = self._keys.get(path)
+        if key is not None:
+            data = self.cache.get_memory(key, bucket)
+            if data is not None:
+                self.thumbnail_ready.emit(path, bucket * self.step_ms, data)
+                return
+        with self._lock:
+            self._pending = (path, bucket)
+        self._wake.emit()
+
+    def _take_pending(self):
+        with self._lock:
+            request, self._pending = self._pending, None
+            return request
+
+    def _on_key(self, path, key):
+        self._keys[path] = key
+
+    def _on_ready(self, path, bucket, data):
+        self.thumbnail_ready.emit(path, bucket * self.step_ms, data)
+
+    def shutdown(self):
+        if self._thread.isRunning():
+            with self._lock:
+                self._pending = None
+            self._stop.emit()
+            self._thread.quit()
+            self._thread.wait()
+
+
+class _PreviewPopup(QtCore.QObject):
+    """Janela flutuante (estilo tooltip) com a miniatura mais recente.
+
+    `wanted(path, pos_ms)` diz se uma miniatura acabada de chegar é a que o
+    rato está a pedir (as outras são ignoradas).
+    """
+
+    def __init__(self, widget, service: ThumbnailService, wanted):
+        super().__init__(widget)
+        self.widget = widget
+        self.service = service
+        self.wanted = wanted
+        self.popup = QtWidgets.QLabel(None, QtCore.Qt.ToolTip)
+        self.popup.setStyleSheet("background-color: black; border: 1px solid gray;")
+        widget.setMouseTracking(True)
+        service.thumbnail_ready.connect(self._on_thumbnail)
+
+    def _show(self, data):
+        pixmap = QtGui.QPixmap()
+        if not pixmap.loadFromData(data):
+            return
+        self.popup.setPixmap(pixmap)
+        self.popup.adjustSize()
+        self.popup.show()
+        self._move_popup(self.widget.mapFromGlobal(QtGui.QCursor.pos()))
+
+    def _move_popup(self, pos):
+        if self.popup.isVisible():
+            self.popup.move(self.widget.mapToGlobal(
+                QtCore.QPoint(pos.x() - self.popup.width() // 2, pos.y() - self.popup.height() - 12)))
+
+    def _on_thumbnail(self, path, pos_ms, data):
+        if self.wanted(path, pos_ms):
+            self._show(data)
+
+
+class SliderPreview(_PreviewPopup):
+    """Mostra a miniatura da posição sob o rato ao passar sobre o slider de posição.
+
+    `value_to_ms` converte o valor do slider em milissegundos (por omissão o
+    valor já é em ms, como nos leitores QMediaPlayer).
+    """
+
+    def __init__(self, slider, service: ThumbnailService, value_to_ms=None):
+        super().__init__(slider, service, self._hovered)
+        self.value_to_ms = value_to_ms or (lambda v: v)
+        self.source = None
+        self._hover_ms = None
+        self._last_ms = None
+        slider.installEventFilter(self)
+
+    def set_source(self, path):
+        """Caminho local do vídeo atual (None para streams/URLs)."""
+        self.source = str(path) if path else None
+        self.popup.hide()
+
+    def eventFilter(self, obj, event):
+        etype = event.type()
+        slider = self.widget
+        if etype == QtCore.QEvent.MouseMove and self.source and slider.maximum() > 0:
+            value = QtWidgets.QStyle.sliderValueFromPosition(
+                slider.minimum(), slider.maximum(), event.pos().x(), slider.width())
+            self._hover_ms = int(self.value_to_ms(value))
+            bucket_ms = self._hover_ms - self._hover_ms % self.service.step_ms
+            if bucket_ms != self._last_ms:
+                self._last_ms = bucket_ms
+                self.service.request(self.source, self._hover_ms)
+            self._move_popup(event.pos())
+        elif etype in (QtCore.QEvent.Leave, QtCore.QEvent.Hide):
+            self._hover_ms = None
+            self._last_ms = None
+            self.popup.hide()
+        return False
+
+    def _hovered(self, path, pos_ms):
+        return (path == self.source and self._hover_ms is not None
+                and pos_ms <= self._hover_ms < pos_ms + self.service.step_ms)
+
+
+class ListPreview(_PreviewPopup):
+    """Mostra uma miniatura do vídeo ao passar o rato sobre uma entrada da playlist.
+
+    `path_for_row` devolve o caminho local da linha da vista.
+    """
+
+    def __init__(self, view, service: ThumbnailService, path_for_row, pos_ms: int = 5000):
+        super().__init__(view.viewport(), service, self._hovered)
+        self.path_for_row = path_for_row
+        self.pos_ms = pos_ms
+        self._hover_path = None
+        view.entered.connect(self._on_entered)
+        view.viewport().installEventFilter(self)
+
+    def _on_entered(self, index):
+        path = self.path_for_row(index.row())
+        if path == self._hover_path:
+            return
+        self._hover_path = path
+        self.popup.hide()
+        if os.path.isfile(path):
+            self.service.request(path, self.pos_ms)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.MouseMove:
+            self._move_popup(event.pos())
+        elif event.type() in (QtCore.QEvent.Leave, QtCore.QEvent.Hide):
+            self._hover_path = None
+            self.popup.hide()
+        return False
+
+    def _hovered(self, path, pos_ms):
+        return path == self._hover_path and pos_ms == self.pos_ms - self.pos_ms % self.service.step_ms
@@ -0,0 +1,129 @@
+# Instância partilhada do VLC e conjunto de MediaPlayers pré-aquecidos
+# Criar um vlc.Instance é caro e abrir um ficheiro "a frio" obriga o libvlc a
+# analisar o contentor, criar o vout e descodificar o primeiro fotograma. Aqui
+# existe uma única instância por processo e um pequeno conjunto de leitores:
+# enquanto um reproduz, outro já abriu o próximo item da lista e está parado no
+# primeiro fotograma, pronto a arrancar.
+
+import sys
+
+import vlc
+
+# Opções de cache (ms): valores mais baixos abrem mais depressa ficheiros locais
+DEFAULT_OPTIONS = (
+    "--file-caching=300",
+    "--network-caching=1000",
+    "--no-video-title-show",
+)
+
+_instance = None
+
+
+def shared_instance(options=DEFAULT_OPTIONS) -> vlc.Instance:
+    """Instância do libvlc partilhada por todo o processo (criada na 1.ª chamada)."""
+    global _instance
+    if _instance is None:
+        _instance = vlc.Instance(*options)
+    return _instance
+
+
+def shelf_equalizer(bass_db: float, treble_db: float) -> vlc.AudioEqualizer | None:
+    """Equalizador do libvlc com as bandas graves/agudas ajustadas (None se ambos a 0)."""
+    if bass_db == 0 and treble_db == 0:
+        return None
+    eq = vlc.AudioEqualizer()
+    for i in range(vlc.libvlc_audio_equalizer_get_band_count()):
+        freq = vlc.libvlc_audio_equalizer_get_band_frequency(i)
+        if freq <= 250:
+            eq.set_amp_at_index(float(bass_db), i)
+        elif freq >= 4000:
+            eq.set_amp_at_index(float(treble_db), i)
+    return eq
+
+
+class PlayerPool:
+    """Conjunto fixo de MediaPlayers sobre a instância partilhada.
+
+    Cada leitor fica associado à sua própria janela nativa uma única vez
+    (`bind_window`); mudar de ficheiro passa a ser trocar de leitor ativo.
+    """
+
+    def __init__(self, size: int = 2, instance: vlc.Instance | None = None):
+        self.instance = instance or shared_instance()
+        self.players = [self.instance.media_player_new() for _ in range(size)]
+        self.mrls = [None] * size  # item carregado em cada leitor
+        self.prepared = [False] * size  # aberto e parado no 1.º fotograma
+        self.active = 0
+        self.equalizer = None  # mantido vivo enquanto estiver aplicado
+
+    def bind_window(self, index: int, win_id):
+        player = self.players[index]
+        if sys.platform.startswith('linux'):
+            player.set_xwindow(int(win_id))
+        elif sys.platform == "win32":
+            player.set_hwnd(int(win_id))
+        elif sys.platform == "darwin":
+            player.set_nsobject(int(win_id))
+
+    def _new_media(self, mrl, start_paused=False):
+        media = self.instance.media_new(mrl)
+        if start_paused:
+            media.add_option(":start-paused")
+        return media
+
+    def prepare(self, mrl):
+        """Abre `mrl` num leitor livre e deixa-o parado no primeiro fotograma."""
+        if mrl in self.mrls and self.mrls.index(mrl) != self.active:
+            return
+        index = self._spare_index()
+        player = self.players[index]
+        media = self._new_media(mrl, start_paused=True)
+        # Análise do contentor em segundo plano (não bloqueia)
+        media.parse_with_options(vlc.MediaParseFlag.local | vlc.MediaParseFlag.network, 5000)
+        player.set_media(media)
+        player.audio_set_mute(True)
+        player.play()
+        self.mrls[index] = mrl
+        self.prepared[index] = True
+
+    def activate(self, mrl):
+        """Torna ativo o leitor com `mrl` (pré-aquecido se possível) e devolve (índice, leitor)."""
+        previous = self.players[self.active]
+        if mrl in self.mrls and self.prepared[self.mrls.index(mrl)]:
+            index = self.mrls.index(mrl)
+        else:
+            index = self.active if self.mrls[self.active] is None else self._spare_index()
+            self.players[index].set_media(self._new_media(mrl))
+            self.mrls[index] = mrl
+        if index != self.active:
+            previous.stop()
+            self.mrls[self.active] = None
+            self.prepared[self.active] = False
+        self.active = index
+        player = self.players[index]
+        player.audio_set_mute(False)
+        if self.prepared[index]:
+            self.prepared[index] = False
+            player.set_pause(0)
+        else:
+            player.play()
+        return index, player
+
+    def set_equalizer(self, equalizer):
+        """Aplica `equalizer` (ou None para desligar) a todos os leitores do conjunto."""
+        self.equalizer = equalizer
+        for player in self.players:
+            player.set_equalizer(equalizer)
+
+    def _spare_index(self):
+        for offset in range(1, len(self.players) + 1):
+            index = (self.active + offset) % len(self.players)
+            if index != self.active:
+                return index
+        return self.active
+
+    def release(self):
+        for player in self.players:
+            player.stop()
+            player.release()
+        self.players = []
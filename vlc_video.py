@@ -0,0 +1,267 @@
+# Saída de vídeo do libvlc por callbacks, em vez de uma janela nativa
+# - o libvlc converte cada fotograma para buffers nossos: o callback de formato
+#   escolhe RV32 (BGRX em memória, o mesmo que QImage.Format_RGB32) e os de
+#   lock/display entregam e recebem um desses buffers a cada fotograma
+# - os buffers são arrays NumPy alocados uma vez por resolução e reutilizados
+#   em ciclo (3: o que está no ecrã, o que o libvlc está a escrever e um
+#   livre) — nenhuma alocação por fotograma; ficheiros seguidos com a mesma
+#   resolução usam os mesmos buffers
+# - o widget pinta uma QImage construída por cima do buffer mais recente (sem
+#   cópia); enquanto pinta, esse buffer não é entregue ao libvlc
+# - sem janela nativa: funciona na plataforma "offscreen" (--headless) e os
+#   `listeners` recebem cada fotograma como vista NumPy (análise, benchmarks)
+# - custo: o libvlc converte para RGB no CPU (sem aceleração do vout nativo)
+# - VlcFrameStepper guarda cópias dos últimos fotogramas num FrameRing
+#   (frame_ring.py): recuar em pausa volta a mostrar um deles, sem seek nem
+#   nova descodificação; sem callbacks (janela nativa) não há fotogramas a
+#   guardar e recuar continua a ser um seek
+
+import ctypes
+import threading
+
+import numpy as np
+import vlc
+
+from frame_ring import DEFAULT_FRAME_BUDGET, MAX_GAP_US, FrameRing
+from qt_compat import QtCore, QtGui, QtWidgets, Signal
+
+CHROMA = b"RV32"
+BUFFERS = 3
+
+# Protótipos próprios: o python-vlc declara o chroma como c_char_p (o Python
+# recebe uma cópia em bytes), mas o libvlc espera que o escrevamos no lugar
+_uint_p = ctypes.POINTER(ctypes.c_uint)
+_LockCb = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p))
+_UnlockCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p))
+_DisplayCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+_FormatCb = ctypes.CFUNCTYPE(ctypes.c_uint, ctypes.POINTER(ctypes.c_void_p), ctypes.c_void_p,
+                             _uint_p, _uint_p, _uint_p, _uint_p)
+_CleanupCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+_set_callbacks = ctypes.CFUNCTYPE(None, ctypes.c_void_p, _LockCb, _UnlockCb, _DisplayCb, ctypes.c_void_p)(
+    ("libvlc_video_set_callbacks", vlc.dll))
+_set_format_callbacks = ctypes.CFUNCTYPE(None, ctypes.c_void_p, _FormatCb, _CleanupCb)(
+    ("libvlc_video_set_format_callbacks", vlc.dll))
+
+
+class VlcVideoOutput(QtCore.QObject):
+    """Recebe os fotogramas de um vlc.MediaPlayer em buffers NumPy reutilizados.
+
+    frameReady é emitido na thread do libvlc quando há um fotograma novo (no
+    máximo um por pintar: fotogramas que chegam antes de o anterior ser
+    pintado substituem-no). `listeners` são chamados nessa mesma thread com
+    uma vista (altura, largura, 4) BGRX do buffer — válida só durante a
+    chamada; quem a quiser guardar copia.
+    """
+
+    frameReady = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.width = self.height = self.pitch = 0
+        self.buffers = []
+        self.listeners = []
+        self.frames = 0       # fotogramas entregues pelo libvlc
+        self.allocations = 0  # vezes que os buffers foram (re)alocados
+        self._lock = threading.Lock()
+        self._front = None     # buffer com o fotograma mais recente
+        self._painting = None  # buffer a ser pintado
+        self._writing = None   # buffer entregue ao libvlc e ainda não mostrado
+        self._next = 0
+        self._pending = False
+        # Referências mantidas: o libvlc chama estes ponteiros enquanto o leitor existir
+        self._format_cb = _FormatCb(self._on_format)
+        self._cleanup_cb = _CleanupCb(self._on_cleanup)
+        self._lock_cb = _LockCb(self._on_lock)
+        self._unlock_cb = _UnlockCb(self._on_unlock)
+        self._display_cb = _DisplayCb(self._on_display)
+
+    def attach(self, player):
+        """Passa `player` a desenhar aqui (antes de começar a reproduzir)."""
+        _set_format_callbacks(player, self._format_cb, self._cleanup_cb)
+        _set_callbacks(player, self._lock_cb, self._unlock_cb, self._display_cb, None)
+
+    # --- Thread do libvlc ---
+    def _on_format(self, opaque, chroma, width, height, pitches, lines):
+        w, h = width[0], height[0]
+        ctypes.memmove(chroma, CHROMA, 4)
+        pitch = (w * 4 + 31) & ~31  # linhas alinhadas a 32 bytes (conversores SIMD do libvlc)
+        rows = (h + 15) & ~15
+        with self._lock:
+            if (w, h) != (self.width, self.height) or not self.buffers:
+                self.buffers = [np.zeros((rows, pitch), np.uint8) for _ in range(BUFFERS)]
+                self.allocations += 1
+                self._front = self._painting = self._writing = None
+                self.width, self.height, self.pitch = w, h, pitch
+        pitches[0] = pitch
+        lines[0] = rows
+        return BUFFERS
+
+    def _on_cleanup(self, opaque):
+        pass  # os buffers ficam para o próximo ficheiro com a mesma resolução
+
+    def _on_lock(self, opaque, planes):
+        with self._lock:
+            busy = (self._front, self._painting)
+            for _ in range(BUFFERS):
+                index, self._next = self._next, (self._next + 1) % BUFFERS
+                if index not in busy:
+                    break
+            self._writing = index
+            buffer = self.buffers[index]
+        planes[0] = buffer.ctypes.data
+        return index + 1  # identificador da imagem (0 seria NULL)
+
+    def _on_unlock(self, opaque, picture, planes):
+        pass
+
+    def _on_display(self, opaque, picture):
+        index = (picture or 1) - 1
+        with self._lock:
+            self._front = index
+            self._writing = None
+            self.frames += 1
+            notify, self._pending = not self._pending, True
+        if self.listeners:
+            view = self.frame_view(index)
+            for listener in list(self.listeners):
+                listener(view)
+        if notify:
+            self.frameReady.emit()
+
+    def frame_view(self, index: int) -> np.ndarray:
+        """Vista (altura, largura, 4) BGRX do buffer `index`, sem cópia."""
+        return self.buffers[index][:self.height, :self.width * 4].reshape(self.height, self.width, 4)
+
+    # --- Thread da interface ---
+    def show(self, frame: np.ndarray) -> bool:
+        """Mostra `frame` (altura, largura, 4), copiado para um buffer livre; False se não couber."""
+        with self._lock:
+            if frame.shape[:2] != (self.height, self.width):
+                return False
+            busy = (self._front, self._painting, self._writing)
+            free = [i for i in range(BUFFERS) if i not in busy]
+            if not free:
+                return False
+            self.frame_view(free[0])[:] = frame
+            self._front = free[0]
+            notify, self._pending = not self._pending, True
+        if notify:
+            self.frameReady.emit()
+        return True
+
+    def begin_paint(self):
+        """(buffer, largura, altura, pitch) do fotograma mais recente, preso até end_paint()."""
+        with self._lock:
+            self._pending = False
+            if self._front is None:
+                return None
+            self._painting = self._front
+            return self.buffers[self._painting], self.width, self.height, self.pitch
+
+    def end_paint(self):
+        with self._lock:
+            self._painting = None
+
+
+class VlcVideoWidget(QtWidgets.QWidget):
+    """Pinta os fotogramas de um VlcVideoOutput, com a proporção original e barras pretas."""
+
+    def __init__(self, output: VlcVideoOutput, parent=None):
+        super().__init__(parent)
+        self.output = output
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+        output.frameReady.connect(self.update)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.black)
+        frame = self.output.begin_paint()
+        try:
+            if frame is not None:
+                buffer, width, height, pitch = frame
+                # A QImage aponta para o buffer: nenhuma cópia dos píxeis
+                image = QtGui.QImage(buffer.data, width, height, pitch, QtGui.QImage.Format_RGB32)
+                target = QtCore.QRect(QtCore.QPoint(), image.size().scaled(self.size(), QtCore.Qt.KeepAspectRatio))
+                target.moveCenter(self.rect().center())
+                painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+                painter.drawImage(target, image)
+        finally:
+            self.output.end_paint()
+            painter.end()
+
+
+class VlcFrameStepper:
+    """Passo a passo sobre um VlcVideoOutput: os fotogramas mostrados ficam num FrameRing.
+
+    Os buffers do libvlc são reutilizados, por isso cada fotograma é copiado
+    (na thread do libvlc). No anel a chave é o número de ordem do fotograma
+    (em µs fictícios, um fotograma = 1 ms) e cada entrada guarda a cópia e o
+    instante do leitor; um salto de mais de MAX_GAP_US nesse instante (seek)
+    recomeça o anel.
+    """
+
+    _STEP_US = 1000
+
+    def __init__(self, output: VlcVideoOutput, player, max_frames: int = DEFAULT_FRAME_BUDGET):
+        self.output = output
+        self.player = player
+        self.ring = FrameRing(max_frames)
+        self.cursor = None  # chave do fotograma mostrado pelo passo a passo
+        self._cursor_ms = 0
+        self._seq = 0
+        self._last_ms = None
+        output.listeners.append(self._on_frame)
+
+    def reset(self):
+        """Ficheiro novo ou seek: os fotogramas guardados deixam de ser vizinhos."""
+        self.ring.clear()
+        self.cursor = None
+        self._last_ms = None
+
+    def _on_frame(self, view):
+        # Thread do libvlc
+        time_ms = self.player.get_time()
+        if self._last_ms is not None and abs(time_ms - self._last_ms) * 1000 > MAX_GAP_US:
+            self.ring.clear()
+        self._last_ms = time_ms
+        self._seq += 1
+        self.ring.push(self._seq * self._STEP_US, (view.copy(), time_ms), view.nbytes)
+        self.cursor = None  # o ecrã mostra agora o fotograma acabado de descodificar
+
+    def _current(self):
+        if self.cursor is not None:
+            return self.cursor
+        last = self.ring.last()
+        return last[0] if last else None
+
+    def _show(self, entry) -> int | None:
+        key, (frame, time_ms) = entry
+        if not self.output.show(frame):
+            return None
+        self.cursor = key
+        self._cursor_ms = time_ms
+        return time_ms
+
+    def step_back(self) -> int | None:
+        """Mostra o fotograma anterior, se estiver no anel; devolve o seu instante (ms) ou None."""
+        current = self._current()
+        prev = self.ring.before(current) if current is not None else None
+        return self._show(prev) if prev is not None else None
+
+    def step_forward(self) -> int | None:
+        """Depois de recuar, mostra o fotograma seguinte do anel; None se é preciso descodificar."""
+        if self.cursor is None:
+            return None
+        nxt = self.ring.after(self.cursor)
+        if nxt is None:
+            self.cursor = None
+            return None
+        return self._show(nxt)
+
+    def take_resume_ms(self) -> int | None:
+        """Instante de onde retomar a reprodução, se o fotograma mostrado não é o último descodificado."""
+        cursor, self.cursor = self.cursor, None
+        last = self.ring.last()
+        if cursor is None or last is None or cursor >= last[0]:
+            return None
+        return self._cursor_ms